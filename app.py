@@ -1,12 +1,222 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
+import atexit
+import json
+import math
+import os
 import random
-from backend.model_utils import predict_flood_risk
+import threading
+import time
+from datetime import datetime
+from time import perf_counter
+import numpy as np
+from backend.model_utils import HeuristicScorer, default_scorer, predict_flood_risk
+from backend.model_registry import ModelRegistry
+from backend.risk_raster import BASIN_BOUNDS, DEFAULT_BBOX, RiskRasterCache
+from backend.alert_index import AlertIndex
+from backend.event_stream import EventChannel, StreamsFull
+from backend.prediction_cache import PredictionCache
+from backend.telemetry import Telemetry
+from backend.inference_pool import InferencePool, Overloaded
+from backend.scenario_sweep import ScenarioSweeper, SweepSpec, dask_executor
+from backend.timeseries_store import TimeSeriesStore
+from backend.worker_pool import fork_pool
 
+import feature_schema
 import flood_predictor
 import warnings
 warnings.filterwarnings("ignore")
 
-standalone_predictor = flood_predictor.FloodRiskPredictorStandalone()
+# "production" serves without the debug reloader and scores through a
+# pool of preloaded model workers (see the bottom of this file)
+SERVE_MODE = os.environ.get("FLOOD_SERVE_MODE", "development")
+
+# The model is loaded lazily (memory-mapped) so workers start serving pages
+# immediately; set FLOOD_MODEL_WARMUP=0 to defer loading to the first /predict.
+standalone_predictor = flood_predictor.FloodRiskPredictorStandalone(lazy=True)
+
+# Versioned artifacts published under FLOOD_MODEL_REGISTRY are hot-swapped in
+# the background; the bundled model is served until the first version appears.
+model_registry = ModelRegistry(
+    os.environ.get("FLOOD_MODEL_REGISTRY", "model_registry"),
+    keep=int(os.environ.get("FLOOD_MODEL_KEEP", "3")),
+    poll_interval=float(os.environ.get("FLOOD_MODEL_POLL_SECONDS", "10")),
+    fallback=standalone_predictor
+)
+
+# The map layers and /fetch_alerts are served from a precomputed risk grid,
+# rescored once per FLOOD_RISK_INTERVAL seconds rather than on every poll.
+# FLOOD_RISK_BBOX is "lat_min,lon_min,lat_max,lon_max" (defaults to the basins;
+# /fetch_alerts only reports basins lying entirely inside it).
+risk_raster = RiskRasterCache(
+    model_registry.active,
+    bbox=[float(v) for v in os.environ["FLOOD_RISK_BBOX"].split(",")] if os.environ.get("FLOOD_RISK_BBOX") else DEFAULT_BBOX,
+    resolution=float(os.environ.get("FLOOD_RISK_RESOLUTION", "0.1")),
+    interval=float(os.environ.get("FLOOD_RISK_INTERVAL", "20"))
+)
+
+# Raster cells at or above FLOOD_ALERT_MIN_LEVEL (a RISK_LEVELS index; 3 is
+# HIGH) are active alerts, kept in a grid index of FLOOD_ALERT_CELL_DEGREES
+# cells that is synced with each new raster for bbox/basin/nearest queries.
+ALERT_MIN_LEVEL = int(os.environ.get("FLOOD_ALERT_MIN_LEVEL", "3"))
+alert_index = AlertIndex(cell_size=float(os.environ.get("FLOOD_ALERT_CELL_DEGREES", "0.5")), basins=BASIN_BOUNDS)
+
+# Opt-in (FLOOD_PREDICTION_CACHE=1): /predict answers repeated inputs from an
+# LRU keyed on the rounded feature vector. FLOOD_PREDICTION_CACHE_PRECISION
+# is a JSON object of per-feature decimals, e.g. {"elevation_m": 0}.
+prediction_cache = None
+if os.environ.get("FLOOD_PREDICTION_CACHE", "0") != "0":
+    prediction_cache = PredictionCache(
+        maxsize=int(os.environ.get("FLOOD_PREDICTION_CACHE_SIZE", "4096")),
+        ttl=float(os.environ.get("FLOOD_PREDICTION_CACHE_TTL", "300")),
+        precision=json.loads(os.environ.get("FLOOD_PREDICTION_CACHE_PRECISION", "{}")),
+        default_decimals=int(os.environ.get("FLOOD_PREDICTION_CACHE_DECIMALS", "2"))
+    )
+
+# Request counts, latency histograms and per-stage model timings, served on
+# /api/admin/stats and in Prometheus format on /metrics
+telemetry = Telemetry()
+flood_predictor.set_stage_observer(telemetry.stage_observer())
+SERIALIZATION_STAGE = (("stage", "serialization"),)
+RISK_LEVEL_LABELS = {level: (("level", level.split()[-1]),) for level in flood_predictor.RISK_LEVELS}
+RISK_LEVEL_INDEX = {level: i for i, level in enumerate(flood_predictor.RISK_LEVELS)}
+
+def record_predictions(results):
+    """Counts scored rows by risk level and accumulates their probabilities."""
+    scored = [row for row in results if "risk_level" in row]
+    for row in scored:
+        telemetry.count("risk_level_total", RISK_LEVEL_LABELS[row["risk_level"]])
+        telemetry.count("predicted_probability_sum", n=row["probability"])
+    if history is not None and scored:
+        history.append_many("predictions", PREDICTIONS_STATION, np.full(len(scored), int(time.time() * 1000)), {
+            "probability": [row["probability"] for row in scored],
+            "level": [RISK_LEVEL_INDEX[row["risk_level"]] for row in scored],
+        })
+
+def timed_jsonify(payload):
+    start = perf_counter()
+    response = jsonify(payload)
+    telemetry.observe("stage_duration_seconds", perf_counter() - start, SERIALIZATION_STAGE)
+    return response
+
+# With FLOOD_INFERENCE_WORKERS > 0 (default: one per CPU in production),
+# request threads hand scoring to a bounded worker pool that coalesces
+# requests arriving within FLOOD_INFERENCE_MAX_WAIT_MS into one batched call
+# and sheds load with a 503 once FLOOD_INFERENCE_MAX_QUEUE rows are waiting.
+# FLOOD_INFERENCE_EXECUTOR=thread keeps workers in-process.
+inference_pool = None
+inference_workers = int(os.environ.get("FLOOD_INFERENCE_WORKERS", str(os.cpu_count() or 1) if SERVE_MODE == "production" else "0"))
+if inference_workers > 0:
+    # Started before any other thread (and pool), so worker processes fork cleanly
+    inference_pool = InferencePool(
+        inference_workers,
+        max_batch=int(os.environ.get("FLOOD_INFERENCE_MAX_BATCH", "64")),
+        max_wait=float(os.environ.get("FLOOD_INFERENCE_MAX_WAIT_MS", "2")) / 1000,
+        max_queue=int(os.environ.get("FLOOD_INFERENCE_MAX_QUEUE", "512")),
+        use_processes=os.environ.get("FLOOD_INFERENCE_EXECUTOR", "process") == "process",
+        preload_path=standalone_predictor.model_path,
+        telemetry=telemetry
+    ).start()
+
+# POST /api/scenarios/sweep scores Monte Carlo what-if sweeps of up to
+# FLOOD_SWEEP_MAX_SAMPLES samples in chunks of FLOOD_SWEEP_CHUNK_ROWS. With
+# FLOOD_SWEEP_WORKERS > 0 (default: one per CPU in production) chunks run on
+# that many forked worker processes; otherwise in the request thread, with
+# sweeps capped at FLOOD_SWEEP_INLINE_MAX_SAMPLES.
+# FLOOD_SWEEP_EXECUTOR=dask sends them to the Dask scheduler at
+# FLOOD_SWEEP_DASK_SCHEDULER instead, whose workers (started from the
+# repository root) load the active model from the same path.
+sweep_executor = None
+sweep_workers = int(os.environ.get("FLOOD_SWEEP_WORKERS", str(os.cpu_count() or 1) if SERVE_MODE == "production" else "0"))
+if os.environ.get("FLOOD_SWEEP_EXECUTOR", "process") == "dask":
+    if os.environ.get("FLOOD_SWEEP_DASK_SCHEDULER"):
+        sweep_executor = dask_executor(os.environ["FLOOD_SWEEP_DASK_SCHEDULER"])
+    else:
+        print("⚠️ FLOOD_SWEEP_EXECUTOR=dask needs FLOOD_SWEEP_DASK_SCHEDULER; using worker processes.")
+if sweep_executor is None and sweep_workers > 0:
+    # Forked right after the inference pool, whose threads are still idle
+    sweep_executor = fork_pool(sweep_workers, preload_path=standalone_predictor.model_path)
+if sweep_executor is not None:
+    atexit.register(sweep_executor.shutdown, wait=False)
+    sweep_max_samples = int(os.environ.get("FLOOD_SWEEP_MAX_SAMPLES", "10000000"))
+else:
+    sweep_max_samples = int(os.environ.get("FLOOD_SWEEP_INLINE_MAX_SAMPLES", "200000"))
+scenario_sweeper = ScenarioSweeper(
+    sweep_executor,
+    chunk_rows=int(os.environ.get("FLOOD_SWEEP_CHUNK_ROWS", "100000")),
+    max_samples=sweep_max_samples,
+    max_in_flight=2 * max(1, sweep_workers)
+)
+SWEEP_PROGRESS_SECONDS = float(os.environ.get("FLOOD_SWEEP_PROGRESS_SECONDS", "0.5"))
+
+# The weighted-sum heuristic behind /fetch_data; FLOOD_HEURISTIC_CONFIG points
+# at a JSON file overriding its weights, thresholds, labels or recommendations.
+# With FLOOD_HEURISTIC_FALLBACK=1, /predict and /predict/batch answer from it
+# (marked "degraded") instead of failing while no model is loaded or while
+# the inference pool sheds load.
+heuristic_scorer = HeuristicScorer.from_config(os.environ["FLOOD_HEURISTIC_CONFIG"]) if os.environ.get("FLOOD_HEURISTIC_CONFIG") else default_scorer
+HEURISTIC_FALLBACK = os.environ.get("FLOOD_HEURISTIC_FALLBACK", "0") != "0"
+NO_MODEL_REASON = (("reason", "no_model"),)
+OVERLOADED_REASON = (("reason", "overloaded"),)
+
+def degraded_results(records, reason):
+    """Heuristic answers in predict_many's shape; invalid rows keep their error."""
+    features, errors = feature_schema.decode_records(records)
+    results = heuristic_scorer.results(features)
+    for i, message in errors.items():
+        results[i] = {"error": message}
+    telemetry.count("heuristic_fallback_total", reason, n=len(results))
+    return results
+
+def degraded_response(records, reason, single=False):
+    try:
+        results = degraded_results(records, reason)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    for row in results:
+        row["success"] = "error" not in row
+        row["degraded"] = True
+    if single:
+        return timed_jsonify({**results[0], "model_version": "heuristic"})
+    return timed_jsonify({"success": True, "degraded": True, "count": len(results),
+                          "model_version": "heuristic", "results": results})
+
+def score_one(predictor, params):
+    if inference_pool is not None:
+        return inference_pool.predict(predictor, params)
+    return predictor.predict(**params)
+
+def overloaded_response(e):
+    response = jsonify({"success": False, "error": str(e)})
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+# Unless FLOOD_HISTORY=0, readings, alerts and predictions are appended to
+# an on-disk time-series store under FLOOD_HISTORY_DIR (chunks sealed every
+# FLOOD_HISTORY_FLUSH_SECONDS) and served by /api/history for the historical
+# page. It is only opened in the process serving requests: under the debug
+# reloader this module also runs in the parent, which just restarts the
+# child (marked by WERKZEUG_RUN_MAIN) on code changes.
+RELOADER_PARENT = (__name__ == "__main__" and SERVE_MODE != "production"
+                   and os.environ.get("WERKZEUG_RUN_MAIN") != "true")
+history = None
+if os.environ.get("FLOOD_HISTORY", "1") != "0" and not RELOADER_PARENT:
+    history = TimeSeriesStore(
+        os.environ.get("FLOOD_HISTORY_DIR", "history"),
+        flush_interval=float(os.environ.get("FLOOD_HISTORY_FLUSH_SECONDS", "30"))
+    )
+READINGS_STATION = "simulated"
+PREDICTIONS_STATION = "api"
+
+# -------------------------------
+# Background Jobs
+# -------------------------------
+# Like the history store, only in the process serving requests: the
+# reloader parent would run a second registry watcher and raster loop
+if not RELOADER_PARENT:
+    model_registry.start(warm=os.environ.get("FLOOD_MODEL_WARMUP", "1") != "0")
+    if os.environ.get("FLOOD_RISK_BACKGROUND", "1") != "0":
+        risk_raster.start()
 
 app = Flask(__name__)
 # -------------------------------
@@ -47,9 +257,8 @@ def admin():
 # -------------------------------
 # Data Fetching Endpoint
 # -------------------------------
-@app.route('/fetch_data')
-def fetch_data():
-    """Simulated environmental data (mocked for now)."""
+def simulated_readings():
+    """Simulated environmental data (mocked for now), in feature_schema units."""
     data = {
         "rainfall": round(random.uniform(5, 100), 2),
         "river_discharge": round(random.uniform(50, 500), 2),
@@ -61,14 +270,26 @@ def fetch_data():
         "pressure": round(random.uniform(900, 1020), 1),
         "elevation": round(random.uniform(10, 2500), 1),
         "population_density": round(random.uniform(100, 2000), 1),
-        "drainage_efficiency": round(random.uniform(50, 100), 1),
+        "drainage_efficiency": round(random.uniform(0.5, 1.0), 3),
         "distance_to_coast": round(random.uniform(0, 500), 1),
-        "deforestation_index": round(random.uniform(0, 100), 1)
+        "deforestation_index": round(random.uniform(0, 1.0), 3)
     }
 
-    risk = predict_flood_risk(data)
+    risk = predict_flood_risk(data, heuristic_scorer)
     data["flood_risk"] = risk
-    return jsonify(data)
+    return data
+
+def recorded_readings():
+    """The readings stream's producer: one reading per tick, kept in the history."""
+    data = simulated_readings()
+    if history is not None:
+        history.append("readings", READINGS_STATION, data)
+    return data
+
+@app.route('/fetch_data')
+@telemetry.instrument("fetch_data")
+def fetch_data():
+    return jsonify(simulated_readings())
 
 # -------------------------------
 # Contact Form Submission
@@ -97,48 +318,421 @@ def submit_contact():
 # -------------------------------
 @app.route('/api/admin/stats')
 def admin_stats():
-    """Example API endpoint for admin dashboard."""
+    """Live request, latency and prediction metrics for the admin dashboard."""
+    metrics = telemetry.snapshot()
+    counters = metrics["counters"]
+    levels = counters.get("risk_level_total", {})
+    total_predictions = sum(levels.values())
+    avg_probability = counters.get("predicted_probability_sum", {}).get("total", 0.0) / total_predictions if total_predictions else None
     stats = {
-        "total_predictions": random.randint(50, 500),
-        "avg_risk": random.choice(["Low", "Moderate", "High"]),
-        "active_users": random.randint(5, 50)
+        "total_predictions": total_predictions,
+        "avg_probability": round(avg_probability, 4) if avg_probability is not None else None,
+        "avg_risk": flood_predictor.RISK_LEVELS[np.searchsorted(flood_predictor.RISK_THRESHOLDS, avg_probability, side='right')] if avg_probability is not None else None,
+        # Dashboards currently holding a live stream open
+        "active_users": sum(channel.subscribers for channel in streams.values()),
+        "risk_level_distribution": levels,
+        "requests": counters.get("requests_total", {}),
+        "latency": metrics["latency"],
+        "model_version": model_registry.active_version,
+        "resident_model_versions": model_registry.resident_versions(),
+        "streams": {name: channel.stats() for name, channel in streams.items()},
+        "prediction_cache": prediction_cache.stats() if prediction_cache else None,
+        "inference_pool": inference_pool.stats() if inference_pool else None
     }
     return jsonify(stats)
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of the same metrics."""
+    gauges = {
+        "model_info": [((("version", model_registry.active_version or ""),), 1)],
+        "stream_subscribers": [((("stream", name),), channel.subscribers) for name, channel in streams.items()]
+    }
+    if inference_pool is not None:
+        gauges["inference_queue_depth"] = [((), inference_pool.queue_depth)]
+    return Response(telemetry.prometheus(gauges), mimetype="text/plain; version=0.0.4")
+
+@app.route('/api/admin/model/activate', methods=['POST'])
+def activate_model():
+    """Switches the served model to a given version, or rolls back one."""
+    data = request.get_json(silent=True) or {}
+    try:
+        if data.get("version"):
+            version = model_registry.activate(data["version"])
+        else:
+            version = model_registry.rollback()
+    except (ValueError, RuntimeError) as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify({"success": True, "model_version": version})
+
+# -------------------------------
+# Cached Risk Raster
+# -------------------------------
+def cached_response(body, mimetype, etag):
+    """Sends a precomputed body, or 304 when the client already has this version."""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    # Clients may keep the body but must revalidate; a 304 costs no scoring
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+def current_raster():
+    snapshot = risk_raster.current()
+    if snapshot is None:
+        return None, (jsonify({"success": False, "error": "Model is not loaded."}), 503)
+    return snapshot, None
+
 @app.route('/fetch_alerts')
+@telemetry.instrument("fetch_alerts")
 def fetch_alerts():
-    # Simulate real-time alerts
-    regions = ["Ganga Basin", "Yamuna Basin", "Brahmaputra Basin", "Godavari Basin", "Mahanadi Basin"]
-    alert_levels = ["Low Flood Risk", "Moderate Flood Risk", "High Flood Risk"]
+    """Highest-risk cell per basin from the latest risk raster."""
+    snapshot, error = current_raster()
+    if error:
+        return error
+    return cached_response(snapshot.alerts_json, "application/json", snapshot.etag)
+
+@app.route('/api/risk/raster')
+def risk_raster_info():
+    """Raster metadata, or the probability grid itself with ?format=npy."""
+    snapshot, error = current_raster()
+    if error:
+        return error
+    if request.args.get("format") == "npy":
+        return cached_response(snapshot.npy, "application/octet-stream", snapshot.etag)
+    return cached_response(snapshot.metadata_json, "application/json", snapshot.etag)
 
-    alerts = []
-    for _ in range(5):  # 5 random alerts
-        region = random.choice(regions)
-        level = random.choice(alert_levels)
-        lat = round(random.uniform(20.0, 30.0), 3)
-        lon = round(random.uniform(75.0, 95.0), 3)
-        time = f"2025-10-26 {random.randint(0,23)}:{random.randint(0,59):02d}"
-        alerts.append({"title": level, "region": region, "lat": lat, "lon": lon, "time": time})
+indexed_alerts_etag = None
 
-    return jsonify(alerts)
+def sync_alert_index(snapshot):
+    """Raises and clears indexed alerts to match the snapshot, once per snapshot."""
+    global indexed_alerts_etag
+    if snapshot.etag != indexed_alerts_etag:
+        # An alert keeps the time it was first raised, so unchanged ones stay equal
+        raised, updated, cleared = alert_index.sync(snapshot.cell_alerts(ALERT_MIN_LEVEL), keep=("time",))
+        indexed_alerts_etag = snapshot.etag
+        telemetry.count("alerts_raised_total", n=raised)
+        telemetry.count("alerts_cleared_total", n=cleared)
+
+def alerts_response(alerts):
+    return jsonify({"success": True, "count": len(alerts), "alerts": alerts})
+
+@app.route('/api/alerts')
+@telemetry.instrument("alerts_query")
+def query_alerts():
+    """
+    Active cell alerts inside ?bbox=lat_min,lon_min,lat_max,lon_max or
+    ?basin=<name>, at most ?limit= of them.
+    """
+    snapshot, error = current_raster()
+    if error:
+        return error
+    sync_alert_index(snapshot)
+    try:
+        limit = int(request.args["limit"]) if request.args.get("limit") else None
+        if request.args.get("bbox"):
+            lat_min, lon_min, lat_max, lon_max = [float(v) for v in request.args["bbox"].split(",")]
+            return alerts_response(alert_index.in_bbox(lat_min, lon_min, lat_max, lon_max, limit=limit))
+        if request.args.get("basin"):
+            return alerts_response(alert_index.in_basin(request.args["basin"])[:limit])
+    except KeyError as e:
+        return jsonify({"success": False, "error": str(e.args[0])}), 404
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"Invalid query: {e}"}), 400
+    return jsonify({"success": False, "error": "Pass ?bbox= or ?basin=."}), 400
+
+@app.route('/api/alerts/nearest')
+@telemetry.instrument("alerts_nearest")
+def nearest_alerts():
+    """The ?k= (default 5) active alerts closest to ?lat=&lon=, optionally within ?max_km=."""
+    snapshot, error = current_raster()
+    if error:
+        return error
+    sync_alert_index(snapshot)
+    try:
+        lat, lon = float(request.args["lat"]), float(request.args["lon"])
+        k = min(1000, int(request.args.get("k", "5")))
+        max_km = float(request.args["max_km"]) if request.args.get("max_km") else None
+    except KeyError as e:
+        return jsonify({"success": False, "error": f"Missing parameter: {e.args[0]}"}), 400
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"Invalid query: {e}"}), 400
+    return alerts_response([{**alert, "distance_km": round(distance, 2)}
+                            for distance, alert in alert_index.nearest(lat, lon, k, max_km)])
+
+@app.route('/api/risk/tiles/<int:z>/<int:x>/<int:y>.png')
+def risk_tile(z, x, y):
+    """Web Mercator overlay tile coloured by risk level."""
+    if not (0 <= z <= 18 and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return jsonify({"success": False, "error": "Tile out of range."}), 404
+    snapshot, error = current_raster()
+    if error:
+        return error
+    return cached_response(snapshot.tile(z, x, y), "image/png", snapshot.etag)
+
+# -------------------------------
+# Server-Sent Event Streams
+# -------------------------------
+recorded_alerts_etag = None
+
+def latest_alerts():
+    global recorded_alerts_etag
+    snapshot = risk_raster.current()
+    if snapshot is None:
+        return None
+    sync_alert_index(snapshot)
+    # The stream polls faster than the raster refreshes: store each snapshot once
+    if history is not None and snapshot.etag != recorded_alerts_etag:
+        recorded_alerts_etag = snapshot.etag
+        timestamp = int(snapshot.generated_at.timestamp() * 1000)
+        for alert in snapshot.alerts:
+            history.append("alerts", alert["region"], {
+                "probability": alert["probability"],
+                "level": RISK_LEVEL_INDEX[alert["risk_level"]],
+                "lat": alert["lat"],
+                "lon": alert["lon"],
+            }, timestamp=timestamp)
+    return snapshot.alerts_json
+
+# Each update is computed once by the channel's producer and fanned out to
+# every open dashboard, instead of once per client poll. An open stream holds
+# a server thread for as long as its client stays connected (and waitress
+# has only FLOOD_HTTP_THREADS), so at most FLOOD_STREAM_MAX_SUBSCRIBERS
+# streams are served at once (default: half the threads in production, no
+# limit in development; 0 = no limit). Further ones get a 503.
+#
+# Capacity: a dashboard page holds two streams (readings and alerts) and the
+# alerts page one, so the production defaults (32 threads, 16 streams) push
+# to about 8 dashboards at a time. Pages refused a stream fall back to
+# polling /fetch_data and /fetch_alerts and retry the stream every minute or
+# so. Raise FLOOD_HTTP_THREADS (and with it the stream limit) for more.
+HTTP_THREADS = int(os.environ.get("FLOOD_HTTP_THREADS", "32"))
+stream_limit = int(os.environ.get("FLOOD_STREAM_MAX_SUBSCRIBERS", str(HTTP_THREADS // 2) if SERVE_MODE == "production" else "0"))
+stream_slots = threading.BoundedSemaphore(stream_limit) if stream_limit > 0 else None
+streams = {
+    "readings": EventChannel("readings", recorded_readings,
+                             interval=float(os.environ.get("FLOOD_STREAM_READINGS_SECONDS", "4")), slots=stream_slots),
+    "alerts": EventChannel("alerts", latest_alerts,
+                           interval=float(os.environ.get("FLOOD_STREAM_ALERTS_SECONDS", "5")), slots=stream_slots)
+}
+
+# With history on, the feeds run without subscribers too so nothing is missed
+if history is not None:
+    history.start()
+    atexit.register(history.close)
+    for channel in streams.values():
+        channel.start()
+
+@app.route('/stream/<name>')
+def stream(name):
+    """text/event-stream of readings or alerts; resumes from Last-Event-ID."""
+    channel = streams.get(name)
+    if channel is None:
+        return jsonify({"success": False, "error": f"Unknown stream: {name}"}), 404
+    try:
+        events = channel.subscribe(request.headers.get("Last-Event-ID"))
+    except StreamsFull as e:
+        return overloaded_response(e)
+    response = Response(events, mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Stop reverse proxies (nginx) from buffering the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+# -------------------------------
+# Historical Data
+# -------------------------------
+def parse_time_ms(value, default):
+    """Epoch seconds or an ISO date/datetime from a query string, as epoch ms."""
+    if not value:
+        return default
+    try:
+        return int(float(value) * 1000)
+    except ValueError:
+        return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+def json_floats(values):
+    """Rounded floats for JSON, with NaN (no data) as null."""
+    values = np.round(np.asarray(values, dtype=np.float64), 4)
+    return [None if math.isnan(v) else v for v in values.tolist()]
+
+@app.route('/api/history')
+def history_catalog():
+    """Stored series with their columns and stations."""
+    if history is None:
+        return jsonify({"success": False, "error": "History is disabled (FLOOD_HISTORY=0)."}), 404
+    return jsonify({"success": True, "series": history.catalog()})
+
+@app.route('/api/history/<series>/<path:station>')
+@telemetry.instrument("history")
+def history_query(series, station):
+    """
+    Rows of one station between ?start= and ?end= (epoch seconds or ISO
+    dates; default: the last 30 days), optionally limited to ?columns=a,b.
+    Ranges holding more than ?max_points= rows (default 1000) come back
+    downsampled to per-bucket min/max/mean/count; ?bucket= (seconds) forces
+    a bucket width.
+    """
+    if history is None:
+        return jsonify({"success": False, "error": "History is disabled (FLOOD_HISTORY=0)."}), 404
+    try:
+        end = parse_time_ms(request.args.get("end"), int(time.time() * 1000))
+        start = parse_time_ms(request.args.get("start"), end - 30 * 86400 * 1000)
+        columns = [c for c in request.args.get("columns", "").split(",") if c] or None
+        max_points = max(1, int(request.args.get("max_points", "1000")))
+        bucket_ms = int(float(request.args["bucket"]) * 1000) if request.args.get("bucket") else None
+        if bucket_ms is None and history.count(series, station, start, end) > max_points:
+            bucket_ms = max(1000, math.ceil((end - start) / max_points / 1000) * 1000)
+
+        if bucket_ms is None:
+            times, values = history.range(series, station, start, end, columns)
+            data = {col: json_floats(v) for col, v in values.items()}
+        else:
+            times, aggregates = history.downsample(series, station, start, end, bucket_ms, columns)
+            data = {col: {"mean": json_floats(agg["mean"]), "min": json_floats(agg["min"]),
+                          "max": json_floats(agg["max"]), "count": agg["count"].tolist()}
+                    for col, agg in aggregates.items()}
+    except KeyError as e:
+        return jsonify({"success": False, "error": str(e.args[0])}), 404
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"Invalid query: {e}"}), 400
+    return jsonify({
+        "success": True, "series": series, "station": station, "start": start, "end": end,
+        "bucket_seconds": bucket_ms / 1000 if bucket_ms else None,
+        "time": times.tolist(), "columns": data
+    })
 
 @app.route("/predict", methods=["POST"])
+@telemetry.instrument("predict")
 def predict():
     data = request.get_json()
     result = {}
-    if standalone_predictor.model:
+    model_version, predictor = model_registry.active()
+    if (predictor is None or not predictor.model) and HEURISTIC_FALLBACK and isinstance(data, dict):
+        return degraded_response([data], NO_MODEL_REASON, single=True)
+    if predictor is not None and predictor.model:
         try:
-            result = standalone_predictor.predict(**data)
+            if prediction_cache is not None:
+                result = prediction_cache.predict(model_version, predictor, data, score=score_one)
+            else:
+                result = score_one(predictor, data)
             result["success"] = True
-        
+            result["model_version"] = model_version
+            record_predictions((result,))
+
+        except Overloaded as e:
+            if HEURISTIC_FALLBACK:
+                return degraded_response([data], OVERLOADED_REASON, single=True)
+            return overloaded_response(e)
         except (ValueError, RuntimeError) as e:
             result["success"] = False
     
-    return jsonify(result)
+    return timed_jsonify(result)
+
+@app.route("/predict/batch", methods=["POST"])
+@telemetry.instrument("predict_batch")
+def predict_batch():
+    """
+    Scores many locations in one request.
+
+    Accepts a list of records, {"records": [...]} or a columnar payload
+    {"columns": {feature: [values, ...]}}. Large uploads can skip JSON: an
+    (N, 13) .npy array (Content-Type: application/x-npy) or an Arrow IPC
+    table with one column per feature (application/vnd.apache.arrow.stream
+    or .file) is decoded straight into the feature matrix.
+    Results keep the input order.
+    """
+    if request.mimetype in feature_schema.NPY_MIMETYPES + feature_schema.ARROW_MIMETYPES:
+        try:
+            # Validated again by predict_many; the matrix itself is not copied
+            records, _ = feature_schema.decode_body(request.get_data(cache=False), request.mimetype)
+        except (ValueError, RuntimeError) as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+    else:
+        data = request.get_json()
+        if isinstance(data, dict):
+            records = data.get("columns", data.get("records"))
+        else:
+            records = data
+
+    if not isinstance(records, (list, dict, np.ndarray)):
+        return jsonify({"success": False, "error": "Expected a list of records or a 'columns' mapping."}), 400
+    model_version, predictor = model_registry.active()
+    if predictor is None or not predictor.model:
+        if HEURISTIC_FALLBACK:
+            return degraded_response(records, NO_MODEL_REASON)
+        return jsonify({"success": False, "error": "Model is not loaded."}), 503
+
+    try:
+        if inference_pool is not None:
+            results = inference_pool.predict_many(predictor, records)
+        else:
+            results = predictor.predict_many(records)
+    except Overloaded as e:
+        if HEURISTIC_FALLBACK:
+            return degraded_response(records, OVERLOADED_REASON)
+        return overloaded_response(e)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    for row in results:
+        row["success"] = "error" not in row
+    record_predictions(results)
+    return timed_jsonify({"success": True, "count": len(results), "model_version": model_version, "results": results})
+
+# -------------------------------
+# Scenario Sweeps
+# -------------------------------
+@app.route("/api/scenarios/sweep", methods=["POST"])
+@telemetry.instrument("scenario_sweep")
+def scenario_sweep():
+    """
+    Monte Carlo what-if sweep around base conditions (see SweepSpec for the
+    request body). Streams newline-delimited JSON: the aggregates so far every
+    FLOOD_SWEEP_PROGRESS_SECONDS, then a final line with "done": true that also
+    breaks every scenario down per district. No individual samples are sent.
+    """
+    model_version, predictor = model_registry.active()
+    if predictor is None or not predictor.model:
+        return jsonify({"success": False, "error": "Model is not loaded."}), 503
+    try:
+        spec = SweepSpec.from_json(request.get_json(silent=True), max_samples=scenario_sweeper.max_samples)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    def generate():
+        start = perf_counter()
+        try:
+            for totals, done in scenario_sweeper.run(spec, predictor, SWEEP_PROGRESS_SECONDS):
+                yield json.dumps({"success": True, "done": done, "model_version": model_version,
+                                  "total": spec.total, "seconds": round(perf_counter() - start, 3),
+                                  **spec.summary(totals, districts=done)}) + "\n"
+        except Exception as e:
+            # Headers are already sent: report the failure as the last line
+            yield json.dumps({"success": False, "done": True, "error": str(e)}) + "\n"
+        else:
+            telemetry.count("scenario_samples_total", n=spec.total)
+
+    response = Response(generate(), mimetype="application/x-ndjson")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 # -------------------------------
 # Run the App
 # -------------------------------
 if __name__ == '__main__':
-    app.run(debug=True)
+    if SERVE_MODE == "production":
+        host = os.environ.get("FLOOD_HOST", "0.0.0.0")
+        port = int(os.environ.get("FLOOD_PORT", "5000"))
+        try:
+            # waitress is optional: a bounded thread pool instead of a thread per connection
+            from waitress import serve
+            serve(app, host=host, port=port, threads=HTTP_THREADS)
+        except ImportError:
+            app.run(host=host, port=port, threaded=True, debug=False, use_reloader=False)
+    else:
+        app.run(debug=True)
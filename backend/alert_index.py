@@ -0,0 +1,255 @@
+import heapq
+import math
+import threading
+from operator import itemgetter
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    h = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+class AlertIndex:
+    """
+    In-memory spatial index of active alerts, updated as they are raised and cleared.
+
+    Alerts are dicts with at least 'lat' and 'lon', keyed by a caller-chosen
+    id. Each lives in one bucket of a uniform `cell_size`-degree grid and in
+    the member set of every basin whose bounds contain it, so:
+
+    - a bounding-box query visits only the grid cells the box overlaps, and
+      checks coordinates only in the cells along its edges;
+    - a basin query returns its member set without looking at other alerts;
+    - a nearest-k query searches rings of cells outward from the query point
+      and stops once no unvisited cell can hold anything closer than the
+      current k-th best (great-circle distance, km).
+
+    Upserts and removals touch a single bucket and the alert's basins. All
+    methods are thread-safe; queries return new lists of the stored dicts.
+    """
+
+    # Bucket entries: (lat, lon, alert, lat_rad, lon_rad, cos_lat), so scans
+    # never go back to the id table and distances skip the degree conversion
+    _alert_of = itemgetter(2)
+
+    def __init__(self, cell_size=0.5, basins=None):
+        self.cell_size = float(cell_size)
+        # {name: (lat_min, lon_min, lat_max, lon_max)}
+        self.basins = dict(basins or {})
+        self._alerts = {}
+        self._cells = {}
+        self._members = {name: {} for name in self.basins}
+        # Grid extent ever occupied and largest |lat|, bounding the nearest-k search
+        self._extent = None
+        self._max_abs_lat = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._alerts)
+
+    def __contains__(self, alert_id):
+        return alert_id in self._alerts
+
+    def get(self, alert_id):
+        entry = self._alerts.get(alert_id)
+        return entry[1][2] if entry else None
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def basins_of(self, lat, lon):
+        """
+        Names of the basins whose bounds contain the point.
+        """
+        return [name for name, (lat_min, lon_min, lat_max, lon_max) in self.basins.items()
+                if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max]
+
+    # ---------------- Updates ----------------
+    def upsert(self, alert_id, alert):
+        """
+        Raises a new alert or replaces the stored one with the same id.
+        """
+        lat, lon = float(alert['lat']), float(alert['lon'])
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+            raise ValueError(f"Alert {alert_id!r} has invalid coordinates ({lat}, {lon}).")
+        cell = self._cell(lat, lon)
+        with self._lock:
+            previous = self._alerts.get(alert_id)
+            if previous is not None and previous[1][:2] == (lat, lon):
+                # Same place: only the payload changes
+                entry = previous[1][:2] + (alert,) + previous[1][3:]
+                self._cells[cell][alert_id] = entry
+                for name in previous[2]:
+                    self._members[name][alert_id] = alert
+                self._alerts[alert_id] = (cell, entry, previous[2])
+                return
+            if previous is not None:
+                self._unlink(alert_id, previous)
+            basins = tuple(self.basins_of(lat, lon))
+            lat_rad = math.radians(lat)
+            entry = (lat, lon, alert, lat_rad, math.radians(lon), math.cos(lat_rad))
+            self._cells.setdefault(cell, {})[alert_id] = entry
+            for name in basins:
+                self._members[name][alert_id] = alert
+            self._alerts[alert_id] = (cell, entry, basins)
+            if self._extent is None:
+                self._extent = [cell[0], cell[0], cell[1], cell[1]]
+            else:
+                extent = self._extent
+                extent[0], extent[1] = min(extent[0], cell[0]), max(extent[1], cell[0])
+                extent[2], extent[3] = min(extent[2], cell[1]), max(extent[3], cell[1])
+            self._max_abs_lat = max(self._max_abs_lat, abs(lat))
+
+    def remove(self, alert_id):
+        """
+        Clears an alert. Returns False if it was not active.
+        """
+        with self._lock:
+            entry = self._alerts.get(alert_id)
+            if entry is None:
+                return False
+            self._unlink(alert_id, entry)
+            if not self._alerts:
+                self._extent, self._max_abs_lat = None, 0.0
+            return True
+
+    def _unlink(self, alert_id, entry):
+        cell, _, basins = entry
+        bucket = self._cells[cell]
+        del bucket[alert_id]
+        if not bucket:
+            del self._cells[cell]
+        for name in basins:
+            del self._members[name][alert_id]
+        del self._alerts[alert_id]
+
+    def sync(self, alerts, keep=()):
+        """
+        Makes the active set equal to `alerts` ({id: alert}): raises new ids,
+        updates changed ones and clears the rest. Fields named in `keep` are
+        carried over from the stored alert while it stays active (e.g. the
+        time it was first raised). Returns the number of (raised, updated,
+        cleared) alerts.
+        """
+        raised = updated = 0
+        with self._lock:
+            stale = [alert_id for alert_id in self._alerts if alert_id not in alerts]
+            for alert_id in stale:
+                self.remove(alert_id)
+            for alert_id, alert in alerts.items():
+                current = self._alerts.get(alert_id)
+                if current is None:
+                    raised += 1
+                else:
+                    stored = current[1][2]
+                    if keep:
+                        alert = {**alert, **{key: stored[key] for key in keep if key in stored}}
+                    if stored == alert:
+                        continue
+                    updated += 1
+                self.upsert(alert_id, alert)
+        return raised, updated, len(stale)
+
+    # ---------------- Queries ----------------
+    def in_bbox(self, lat_min, lon_min, lat_max, lon_max, limit=None):
+        """
+        Alerts with lat_min <= lat <= lat_max and lon_min <= lon <= lon_max.
+        """
+        if lat_min > lat_max or lon_min > lon_max:
+            raise ValueError("Bounding box must be lat_min,lon_min,lat_max,lon_max with min <= max.")
+        i0, j0 = self._cell(lat_min, lon_min)
+        i1, j1 = self._cell(lat_max, lon_max)
+        found = []
+        with self._lock:
+            n_cells = (i1 - i0 + 1) * (j1 - j0 + 1)
+            if n_cells > len(self._cells):
+                # A box wider than the occupied grid: walk the occupied cells instead
+                cells = [(cell, bucket) for cell, bucket in self._cells.items()
+                         if i0 <= cell[0] <= i1 and j0 <= cell[1] <= j1]
+            else:
+                cells = [((i, j), self._cells[(i, j)]) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)
+                         if (i, j) in self._cells]
+            for (i, j), bucket in cells:
+                if i0 < i < i1 and j0 < j < j1:
+                    # Interior cells lie wholly inside the box
+                    found.extend(map(self._alert_of, bucket.values()))
+                else:
+                    found.extend([entry[2] for entry in bucket.values()
+                                  if lat_min <= entry[0] <= lat_max and lon_min <= entry[1] <= lon_max])
+                if limit is not None and len(found) >= limit:
+                    return found[:limit]
+        return found
+
+    def in_basin(self, basin):
+        """
+        Alerts inside a basin's bounds; KeyError for an unknown basin.
+        """
+        with self._lock:
+            if basin not in self._members:
+                raise KeyError(f"Unknown basin: {basin}")
+            return list(self._members[basin].values())
+
+    def nearest(self, lat, lon, k=5, max_km=None):
+        """
+        Up to k (distance_km, alert) pairs closest to the point, nearest
+        first, optionally only those within max_km.
+        """
+        if k <= 0:
+            return []
+        qi, qj = self._cell(lat, lon)
+        size = self.cell_size
+        lat_rad, lon_rad = math.radians(lat), math.radians(lon)
+        cos_lat = math.cos(lat_rad)
+        sin = math.sin
+        # Candidates are ranked by the haversine term h, which grows with distance
+        h_max = math.inf if max_km is None else sin(min(math.pi, max_km / EARTH_RADIUS_KM) / 2) ** 2
+        best = []  # max-heap of (-h, tie, alert) holding the k closest so far
+        with self._lock:
+            if self._extent is None:
+                return []
+            i_min, i_max, j_min, j_max = self._extent
+            reach = max(qi - i_min, i_max - qi, qj - j_min, j_max - qj)
+            cos_max = math.cos(math.radians(min(90.0, max(self._max_abs_lat, abs(lat)))))
+            ring = 0
+            while ring <= reach:
+                for cell in self._ring(qi, qj, ring):
+                    bucket = self._cells.get(cell)
+                    if not bucket:
+                        continue
+                    for _, _, alert, a_lat, a_lon, a_cos in bucket.values():
+                        d_lat = sin((a_lat - lat_rad) / 2)
+                        d_lon = sin((a_lon - lon_rad) / 2)
+                        h = d_lat * d_lat + cos_lat * a_cos * d_lon * d_lon
+                        if h > h_max:
+                            continue
+                        if len(best) < k:
+                            heapq.heappush(best, (-h, id(alert), alert))
+                        elif h < -best[0][0]:
+                            heapq.heapreplace(best, (-h, id(alert), alert))
+                # Smallest h any point outside the searched square of cells can have:
+                # h >= sin^2(dlat/2) and h >= cos^2(max |lat|) * sin^2(dlon/2)
+                gap_lat = min(lat - (qi - ring) * size, (qi + ring + 1) * size - lat)
+                gap_lon = min(lon - (qj - ring) * size, (qj + ring + 1) * size - lon)
+                bound = min(sin(math.radians(gap_lat) / 2) ** 2,
+                            (cos_max * sin(math.radians(gap_lon) / 2)) ** 2)
+                if (len(best) == k and -best[0][0] <= bound) or bound > h_max:
+                    break
+                ring += 1
+        return [(2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(-h))), alert)
+                for h, _, alert in sorted(best, reverse=True)]
+
+    @staticmethod
+    def _ring(qi, qj, ring):
+        if ring == 0:
+            yield qi, qj
+            return
+        for j in range(qj - ring, qj + ring + 1):
+            yield qi - ring, j
+            yield qi + ring, j
+        for i in range(qi - ring + 1, qi + ring):
+            yield i, qj - ring
+            yield i, qj + ring
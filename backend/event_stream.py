@@ -0,0 +1,173 @@
+import json
+import threading
+from collections import deque
+
+
+class StreamsFull(RuntimeError):
+    """
+    Raised by EventChannel.subscribe when every stream slot is taken.
+    """
+
+
+class _Subscription:
+    """
+    One client's stream. The WSGI server calls close() when the response
+    ends or the client goes away; that frees the subscriber's place even if
+    the stream never started.
+    """
+
+    def __init__(self, channel, events):
+        self._channel = channel
+        self._events = events
+        self._open = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._events)
+
+    def close(self):
+        self._events.close()
+        if self._open:
+            self._open = False
+            self._channel._unsubscribe()
+
+
+class EventChannel:
+    """
+    One server-sent-events feed shared by every connected client.
+
+    A single producer thread calls `produce()` every `interval` seconds and
+    encodes the result once; all subscribers read the same bytes from a
+    small shared ring of recent events, so the per-update cost does not grow
+    with the number of open dashboards. `produce()` may return a JSON string,
+    any JSON-serializable value, or None to skip the tick; identical payloads
+    are not re-sent.
+
+    Backpressure: each subscriber generator only advances when its client
+    has taken the previous write, so a slow connection stalls only itself.
+    The ring holds the last `history` events; a client that falls further
+    behind is sent everything still in the ring at once, and the events
+    that already left it are counted in `dropped`.
+
+    Every open stream occupies a server thread for as long as its client
+    stays connected. `slots`, a threading.BoundedSemaphore shared by the
+    channels of one server, caps how many may be open at a time; beyond
+    that, subscribe() raises StreamsFull (counted in `refused`).
+    """
+
+    def __init__(self, name, produce, interval=4.0, history=32, heartbeat=15.0, retry_ms=3000, slots=None):
+        self.name = name
+        self.produce = produce
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.retry_ms = retry_ms
+        self.slots = slots
+
+        self._events = deque(maxlen=history)
+        self._seq = 0
+        self._last_payload = None
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.subscribers = 0
+        self.published = 0
+        self.dropped = 0
+        self.refused = 0
+
+    # ---------------- Producer ----------------
+    def publish(self, data):
+        """
+        Encodes one event and wakes every subscriber. Returns False if unchanged.
+        """
+        payload = data if isinstance(data, str) else json.dumps(data)
+        if payload == self._last_payload:
+            return False
+        with self._cond:
+            self._seq += 1
+            message = f"id: {self._seq}\nevent: {self.name}\ndata: {payload}\n\n".encode()
+            self._events.append((self._seq, message))
+            self._last_payload = payload
+            self.published += 1
+            self._cond.notify_all()
+        return True
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return self._thread
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"stream-{self.name}", daemon=True)
+            self._thread.start()
+            return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._cond:
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            try:
+                data = self.produce()
+                if data is not None:
+                    self.publish(data)
+            except Exception as e:
+                print(f"❌ ERROR: {self.name} stream producer failed. {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    # ---------------- Subscribers ----------------
+    def subscribe(self, last_event_id=None):
+        """
+        Iterable of SSE bytes for one client, starting with the latest event;
+        raises StreamsFull when no slot is free.
+
+        A reconnecting client sending Last-Event-ID resumes after that event
+        if it is still in the ring.
+        """
+        if self.slots is not None and not self.slots.acquire(blocking=False):
+            with self._cond:
+                self.refused += 1
+            raise StreamsFull("Too many open streams; retry later.")
+        self.start()
+        with self._cond:
+            self.subscribers += 1
+            oldest = self._events[0][0] if self._events else self._seq + 1
+            if last_event_id is not None and str(last_event_id).isdigit() and int(last_event_id) >= oldest - 1:
+                seen = min(int(last_event_id), self._seq)
+            else:
+                # Replay the newest event so the client renders immediately
+                seen = max(self._seq - 1, 0)
+        return _Subscription(self, self._stream(seen))
+
+    def _stream(self, seen):
+        yield f"retry: {self.retry_ms}\n\n".encode()
+        while not self._stop.is_set():
+            with self._cond:
+                self._cond.wait_for(lambda: self._seq > seen or self._stop.is_set(), timeout=self.heartbeat)
+                pending = [message for seq, message in self._events if seq > seen]
+                if pending:
+                    first = self._seq - len(pending) + 1
+                    self.dropped += first - seen - 1
+                    seen = self._seq
+            if pending:
+                # Write outside the lock: a blocked socket never holds up the producer
+                yield b"".join(pending)
+            else:
+                yield b": keep-alive\n\n"
+
+    def _unsubscribe(self):
+        with self._cond:
+            self.subscribers -= 1
+        if self.slots is not None:
+            self.slots.release()
+
+    def stats(self):
+        return {"subscribers": self.subscribers, "published": self.published, "dropped": self.dropped,
+                "refused": self.refused}
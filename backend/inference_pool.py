@@ -0,0 +1,283 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import flood_predictor
+from backend.worker_pool import fork_pool, worker_predictor
+
+
+class Overloaded(RuntimeError):
+    """
+    Raised by InferencePool.submit when the queue is full (load shedding).
+    """
+
+
+# ---------------- Worker-process side ----------------
+def _score_in_worker(model_path, records):
+    # Stage timings observed here would stay in this process: send them back
+    timings = []
+    flood_predictor.set_stage_observer(timings.extend)
+    return worker_predictor(model_path).predict_many(records), timings
+
+
+def _score_in_thread(predictor, records):
+    return predictor.predict_many(records)
+
+
+def _row_count(records):
+    if isinstance(records, dict):
+        # Columnar payload; malformed ones are rejected by predict_many itself
+        first = next(iter(records.values()), ())
+        return len(first) if hasattr(first, '__len__') else 1
+    return len(records)
+
+
+class _Job:
+    __slots__ = ('predictor', 'records', 'future', 'enqueued')
+
+    def __init__(self, predictor, records):
+        self.predictor = predictor
+        self.records = records
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class InferencePool:
+    """
+    Bounded pool of scoring workers with micro-batching and load shedding.
+
+    Request threads only enqueue work and wait on a future. A dispatcher
+    thread coalesces whatever arrives within `max_wait` seconds (up to
+    `max_batch` rows) into a single predict_many call and hands it to one
+    of `workers` executors. A request arriving while every worker is idle is
+    sent straight away; while workers are busy, new requests keep
+    accumulating, so batches grow with load. Once `max_queue` rows are
+    waiting, submit() raises Overloaded instead of queueing more.
+
+    With use_processes=True each worker is a separate process holding its
+    own preloaded FloodRiskPredictorStandalone (by model path), so CPU-bound
+    predict_proba calls are not serialized by the GIL. Their per-stage
+    timings come back with the results and are recorded in `telemetry` by
+    this process (thread workers report through the stage observer as
+    usual). The pool forks its workers in start(); call it before starting
+    other threads. If a worker process dies, its batch fails and the
+    executor is replaced before the next one is sent.
+    """
+
+    def __init__(self, workers=2, max_batch=64, max_wait=0.002, max_queue=512,
+                 use_processes=True, preload_path=None, telemetry=None):
+        self.workers = max(1, workers)
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self.max_queue = max(1, max_queue)
+        self.use_processes = use_processes
+        self.preload_path = preload_path
+        self.telemetry = telemetry
+        self._observe_stages = telemetry.stage_observer() if telemetry is not None else None
+
+        self._queue = deque()
+        self._queued_rows = 0
+        self._cond = threading.Condition()
+        self._slots = threading.Semaphore(self.workers)
+        self._in_flight = 0
+        self._executor = None
+        self._thread = None
+        self._closed = False
+
+        self.shed = 0
+        self.batches = 0
+        self.rows = 0
+        self.restarts = 0
+
+    # ---------------- Lifecycle ----------------
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._executor = self._make_executor()
+        self._thread = threading.Thread(target=self._dispatch, name="inference-dispatch", daemon=True)
+        self._thread.start()
+        print(f"⚙️ Inference pool: {self.workers} {'process' if self.use_processes else 'thread'} worker(s), "
+              f"batches of up to {self.max_batch} within {self.max_wait * 1e3:.1f} ms")
+        return self
+
+    def _make_executor(self):
+        if not self.use_processes:
+            return ThreadPoolExecutor(self.workers, thread_name_prefix="inference")
+        # Forks every worker now (in start(), before other threads are busy)
+        return fork_pool(self.workers, self.preload_path)
+
+    def _restart_executor(self):
+        """
+        Replaces a process pool broken by a worker that died. Unlike start(),
+        this forks with other threads running; the children only load and
+        score models.
+        """
+        broken, self._executor = self._executor, None
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._make_executor()
+        self.restarts += 1
+        if self.telemetry is not None:
+            self.telemetry.count('inference_pool_restarts_total')
+        print(f"⚠️ Inference worker process died; process pool restarted ({self.restarts} restart(s))")
+
+    def _submit(self, predictor, records):
+        if self.use_processes:
+            return self._executor.submit(_score_in_worker, predictor.model_path, records)
+        return self._executor.submit(_score_in_thread, predictor, records)
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    # ---------------- Request side ----------------
+    @property
+    def queue_depth(self):
+        return self._queued_rows
+
+    def submit(self, predictor, records):
+        """
+        Queues records for scoring; returns a Future of predict_many's results.
+        Columnar payloads (a dict of columns or a decoded feature matrix) are
+        scored as their own batch.
+        """
+        n_rows = _row_count(records)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Inference pool is shut down.")
+            # An oversized batch is still admitted when nothing else is waiting
+            if self._queue and self._queued_rows + n_rows > self.max_queue:
+                self.shed += 1
+                if self.telemetry is not None:
+                    self.telemetry.count('inference_shed_total')
+                raise Overloaded(f"Inference queue is full ({self._queued_rows} rows waiting).")
+            job = _Job(predictor, records)
+            self._queue.append(job)
+            self._queued_rows += n_rows
+            self._cond.notify()
+        return job.future
+
+    def predict(self, predictor, params, timeout=None):
+        """
+        Pooled equivalent of predictor.predict(**params).
+        """
+        result = self.submit(predictor, [params]).result(timeout)[0]
+        if 'error' in result:
+            raise ValueError(result['error'])
+        return result
+
+    def predict_many(self, predictor, records, timeout=None):
+        return self.submit(predictor, records).result(timeout)
+
+    # ---------------- Dispatcher ----------------
+    def _take_batch(self):
+        """
+        Waits for work, then up to max_wait for a full batch; pops the jobs.
+        """
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            # With every worker idle there is nothing to wait for: send at once.
+            # Under load, requests pile up while the dispatcher waits for a slot.
+            deadline = self._queue[0].enqueued + (self.max_wait if self._in_flight else 0)
+            while self._queued_rows < self.max_batch and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            predictor = self._queue[0].predictor
+            jobs, n_rows = [], 0
+            # One model per batch; jobs for another version wait for the next one
+            while self._queue and self._queue[0].predictor is predictor:
+                job = self._queue[0]
+                if jobs and (not isinstance(jobs[0].records, list) or not isinstance(job.records, list)
+                             or n_rows + len(job.records) > self.max_batch):
+                    break
+                jobs.append(self._queue.popleft())
+                n_rows += _row_count(job.records)
+            self._queued_rows -= n_rows
+            self._in_flight += 1
+            return jobs, n_rows
+
+    def _dispatch(self):
+        while True:
+            # Hold a worker slot before batching, so requests pile up while all are busy
+            self._slots.acquire()
+            batch = self._take_batch()
+            if batch is None:
+                self._slots.release()
+                return
+            jobs, n_rows = batch
+            records = jobs[0].records if len(jobs) == 1 else [row for job in jobs for row in job.records]
+            predictor = jobs[0].predictor
+            try:
+                try:
+                    future = self._submit(predictor, records)
+                except BrokenProcessPool:
+                    # A worker died since the last batch (which failed with it)
+                    self._restart_executor()
+                    future = self._submit(predictor, records)
+            except Exception as e:
+                self._finished()
+                for job in jobs:
+                    job.future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.rows += n_rows
+            if self.telemetry is not None:
+                now = time.perf_counter()
+                self.telemetry.count('inference_batches_total')
+                self.telemetry.count('inference_rows_total', n=n_rows)
+                for job in jobs:
+                    self.telemetry.observe('inference_queue_seconds', now - job.enqueued)
+            future.add_done_callback(lambda done, jobs=jobs: self._complete(done, jobs))
+
+    def _finished(self):
+        with self._cond:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _complete(self, done, jobs):
+        self._finished()
+        try:
+            results = done.result()
+        except Exception as e:
+            for job in jobs:
+                job.future.set_exception(e)
+            return
+        if self.use_processes:
+            results, timings = results
+            if self._observe_stages is not None:
+                self._observe_stages(timings)
+        if len(jobs) == 1:
+            jobs[0].future.set_result(results)
+            return
+        start = 0
+        for job in jobs:
+            job.future.set_result(results[start:start + len(job.records)])
+            start += len(job.records)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "executor": "process" if self.use_processes else "thread",
+            "queue_depth": self._queued_rows,
+            "max_queue": self.max_queue,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "shed": self.shed,
+            "restarts": self.restarts,
+        }
@@ -0,0 +1,238 @@
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+import compiled_model
+import flood_predictor
+
+MODEL_FILENAME = 'universal_flood_model.joblib'
+BUNDLED_VERSION = 'bundled'
+
+
+def version_key(name):
+    """
+    Natural sort key so that 'v10' orders after 'v9'.
+    """
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+
+def load_standalone(version_dir):
+    """
+    Default loader: reads the universal model from a version directory.
+    """
+    predictor = flood_predictor.FloodRiskPredictorStandalone(os.path.join(version_dir, MODEL_FILENAME))
+    if predictor.model is None:
+        raise RuntimeError(f"No usable {MODEL_FILENAME} in {version_dir}")
+    return predictor
+
+
+class ModelRegistry:
+    """
+    Watches a versioned artifact directory and hot-swaps the served model.
+
+    Layout: one sub-directory per version (e.g. model_registry/v12/), holding
+    whatever the loader needs - universal_flood_model.joblib for the default
+    loader, or the files written by HybridHPCPredictor.save_model when a
+    custom loader is passed (e.g. ``lambda d: HybridHPCPredictor(model_dir=d)``
+    followed by load_model()). Directories starting with '.' are ignored, so
+    publish() can stage a copy and rename it into place atomically.
+
+    New versions are loaded on a background thread and only then swapped in,
+    so requests never wait on a retrain. Readers take one (version, model)
+    snapshot per request via active(); the swap is a single reference
+    assignment. The last `keep` versions stay resident for instant rollback.
+    A version that fails to load is skipped until its files change.
+    """
+
+    def __init__(self, artifact_dir='model_registry', keep=3, poll_interval=10.0, loader=None, fallback=None):
+        self.artifact_dir = artifact_dir
+        self.keep = max(1, keep)
+        self.poll_interval = poll_interval
+        self.loader = loader or load_standalone
+        # Served as BUNDLED_VERSION while the artifact directory has no versions
+        self.fallback = fallback
+
+        self._resident = OrderedDict()
+        self._active = None
+        self._latest_seen = None
+        # Version -> modification time of its files when loading it failed
+        self._failed = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------------- Discovery & loading ----------------
+    def available_versions(self):
+        """
+        Versions currently published on disk, oldest first.
+        """
+        try:
+            names = [
+                name for name in os.listdir(self.artifact_dir)
+                if not name.startswith('.') and os.path.isdir(os.path.join(self.artifact_dir, name))
+            ]
+        except FileNotFoundError:
+            return []
+        return sorted(names, key=version_key)
+
+    def _modified(self, version):
+        """
+        Newest modification time of a version directory and the files in it.
+        """
+        directory = os.path.join(self.artifact_dir, version)
+        try:
+            return max([os.stat(directory).st_mtime_ns] + [
+                os.stat(os.path.join(root, name)).st_mtime_ns
+                for root, _, files in os.walk(directory) for name in files
+            ])
+        except FileNotFoundError:
+            return None
+
+    def refresh(self):
+        """
+        Loads and activates the newest published version if it is new.
+        Returns True when the active model changed.
+
+        Runs under the lock, so the watcher and a first request never load
+        the same version twice; requests meanwhile keep their snapshot of
+        the current model, as active() only locks while nothing is served.
+        """
+        with self._lock:
+            versions = [v for v in self.available_versions()
+                        if v not in self._failed or self._failed[v] != self._modified(v)]
+            if not versions:
+                if self._active is None and self.fallback is not None:
+                    self.fallback.load()
+                    self._active = (BUNDLED_VERSION, self.fallback)
+                    return True
+                return False
+
+            newest = versions[-1]
+            if newest == self._latest_seen:
+                return False
+
+            predictor = self._resident.get(newest)
+            if predictor is None:
+                modified = self._modified(newest)
+                print(f"🔄 Loading model version {newest}...")
+                try:
+                    predictor = self.loader(os.path.join(self.artifact_dir, newest))
+                except Exception as e:
+                    print(f"❌ ERROR: Could not load model version {newest}. {e}")
+                    self._failed[newest] = modified
+                    return False
+                self._failed.pop(newest, None)
+
+            self._resident[newest] = predictor
+            self._latest_seen = newest
+            self._active = (newest, predictor)
+            self._evict()
+        print(f"✅ Now serving model version {newest}.")
+        return True
+
+    def _evict(self):
+        active_version = self._active[0]
+        while len(self._resident) > self.keep:
+            oldest = min((v for v in self._resident if v != active_version), key=version_key)
+            del self._resident[oldest]
+
+    # ---------------- Serving ----------------
+    def active(self):
+        """
+        Returns a (version, predictor) snapshot to use for one request.
+        """
+        snapshot = self._active
+        if snapshot is None:
+            with self._lock:
+                if self._active is None:
+                    self.refresh()
+                snapshot = self._active
+        return snapshot if snapshot is not None else (None, None)
+
+    @property
+    def active_version(self):
+        snapshot = self._active
+        return snapshot[0] if snapshot else None
+
+    def resident_versions(self):
+        return list(self._resident)
+
+    def activate(self, version):
+        """
+        Switches to a resident version (or loads it from disk if evicted).
+        """
+        with self._lock:
+            predictor = self._resident.get(version)
+            if predictor is None:
+                if version not in self.available_versions():
+                    raise ValueError(f"Unknown model version: {version}")
+                predictor = self.loader(os.path.join(self.artifact_dir, version))
+                self._resident[version] = predictor
+            self._active = (version, predictor)
+            self._evict()
+        print(f"✅ Now serving model version {version}.")
+        return version
+
+    def rollback(self):
+        """
+        Activates the newest resident version older than the active one.
+        """
+        with self._lock:
+            current = self.active_version
+            older = [v for v in self._resident if current is None or version_key(v) < version_key(current)]
+            if not older:
+                raise ValueError("No older resident model version to roll back to.")
+            return self.activate(max(older, key=version_key))
+
+    # ---------------- Publishing ----------------
+    def publish(self, source, version=None):
+        """
+        Copies a model file or artifact directory in as a new version.
+
+        The copy is staged under a hidden name and renamed into place, so the
+        watcher never sees a partially written version.
+        """
+        version = version or time.strftime('v%Y%m%d%H%M%S')
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        staging = os.path.join(self.artifact_dir, f".staging-{version}")
+        if os.path.isdir(source):
+            shutil.copytree(source, staging)
+        else:
+            os.makedirs(staging)
+            shutil.copy2(source, os.path.join(staging, MODEL_FILENAME))
+            # Bring the compiled scorer along when it was exported next to the model
+            if os.path.exists(compiled_model.scorer_path(source)):
+                shutil.copy2(compiled_model.scorer_path(source),
+                             os.path.join(staging, compiled_model.scorer_path(MODEL_FILENAME)))
+        os.replace(staging, os.path.join(self.artifact_dir, version))
+        return version
+
+    # ---------------- Background watcher ----------------
+    def start(self, warm=True):
+        """
+        Starts the watcher thread; with warm=True the first load happens now.
+        """
+        if self._thread is not None:
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, args=(warm,), name="model-registry", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self, warm):
+        if warm:
+            self.active()
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"❌ ERROR: Model registry refresh failed. {e}")
@@ -1,23 +1,135 @@
-def predict_flood_risk(params):
+import json
+from datetime import datetime
+
+import numpy as np
+
+import feature_schema
+
+# Weight of each schema feature in the heuristic score, per unit of the
+# schema (fractions are 0..1, so deforestation_index counts 0.15 per
+# percentage point); unlisted features do not count
+HEURISTIC_WEIGHTS = {
+    'rainfall_mm': 0.3,
+    'river_discharge_cumec': 0.2,
+    'water_level_m': 0.1,
+    'soil_moisture_percent': 0.1,
+    'humidity_percent': 0.05,
+    'wind_speed_ms': 0.05,
+    'pressure_hpa': 0.05,
+    'deforestation_index': 15.0,
+}
+# A score above thresholds[k] reaches level k + 1
+HEURISTIC_THRESHOLDS = (80.0, 150.0)
+HEURISTIC_LABELS = ("Low Risk ✅", "Moderate Risk ⚡", "High Risk ⚠️")
+HEURISTIC_RECOMMENDATIONS = (
+    "Current conditions appear normal.",
+    "Monitor conditions closely. Prepare emergency supplies.",
+    "Take immediate precautionary measures. Prepare for potential evacuation.",
+)
+
+
+class HeuristicScorer:
     """
-    Basic risk prediction model.
-    Takes environmental parameters and computes a flood risk score.
+    Weighted-sum flood risk heuristic over the schema features, for many rows at once.
+
+    The score is one matrix-vector product and the level one searchsorted
+    over the ascending thresholds, so a million rows take milliseconds. It
+    needs no model, which makes it the degraded-mode answer when the ML
+    model is not loaded or the inference pool is shedding load.
     """
 
-    score = (
-        params.get('rainfall', 0) * 0.3 +
-        params.get('river_discharge', 0) * 0.2 +
-        params.get('water_level', 0) * 0.1 +
-        params.get('soil_moisture', 0) * 0.1 +
-        params.get('humidity', 0) * 0.05 +
-        params.get('wind_speed', 0) * 0.05 +
-        params.get('pressure', 0) * 0.05 +
-        params.get('deforestation_index', 0) * 0.15
-    )
-
-    if score > 150:
-        return "High Risk ⚠️"
-    elif score > 80:
-        return "Moderate Risk ⚡"
-    else:
-        return "Low Risk ✅"
+    def __init__(self, weights=None, thresholds=None, labels=None, recommendations=None):
+        self.weights = dict(HEURISTIC_WEIGHTS if weights is None else weights)
+        unknown = set(self.weights) - set(feature_schema.FEATURE_NAMES) - set(feature_schema.SHORT_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown heuristic feature(s): {', '.join(sorted(unknown))}")
+        self.thresholds = np.asarray(HEURISTIC_THRESHOLDS if thresholds is None else thresholds, dtype=np.float64)
+        if np.any(np.diff(self.thresholds) <= 0):
+            raise ValueError("Heuristic thresholds must be strictly ascending.")
+        self.labels = np.array(HEURISTIC_LABELS if labels is None else labels, dtype=object)
+        self.recommendations = np.array(
+            HEURISTIC_RECOMMENDATIONS if recommendations is None else recommendations, dtype=object
+        )
+        if not len(self.labels) == len(self.recommendations) == len(self.thresholds) + 1:
+            raise ValueError("Heuristic labels and recommendations need one entry per level (thresholds + 1).")
+        self.weight_vector = feature_schema.lookup(self.weights)
+
+    @classmethod
+    def from_config(cls, path):
+        """
+        Loads a JSON file with any of the keys weights, thresholds, labels
+        and recommendations; missing keys keep their defaults.
+        """
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        return cls(config.get('weights'), config.get('thresholds'),
+                   config.get('labels'), config.get('recommendations'))
+
+    def score(self, features):
+        """
+        Scores for an (N, n_features) array in schema order, or a DataFrame
+        with full or short feature names (absent columns count as 0).
+        """
+        if hasattr(features, 'columns'):
+            scores = np.zeros(len(features))
+            for feature, weight in zip(feature_schema.FEATURES, self.weight_vector):
+                name = feature.name if feature.name in features.columns else feature.short_name
+                if weight and name in features.columns:
+                    scores += weight * features[name].to_numpy(dtype=np.float64)
+            return scores
+        features = np.asarray(features)
+        if features.ndim != 2 or features.shape[1] != len(self.weight_vector):
+            raise ValueError(f"Expected an array of shape (N, {len(self.weight_vector)}), got {features.shape}.")
+        # Stay in the input's float precision rather than upcasting the whole matrix
+        dtype = features.dtype if features.dtype.kind == 'f' else np.float64
+        return features @ self.weight_vector.astype(dtype)
+
+    def levels(self, scores):
+        """
+        Level index per score: 0 up to and including thresholds[0], and so on.
+        """
+        return np.searchsorted(self.thresholds, scores, side='left')
+
+    def predict(self, features):
+        """
+        Scores and level labels for many rows.
+        """
+        scores = self.score(features)
+        return scores, self.labels[self.levels(scores)]
+
+    def predict_one(self, params):
+        """
+        Score and label for a dict keyed by full or short feature names.
+        """
+        score = float(feature_schema.lookup(params) @ self.weight_vector)
+        return score, self.labels[self.levels(score)]
+
+    def results(self, features):
+        """
+        Result dicts shaped like FloodRiskPredictorStandalone.predict_many's,
+        for serving in degraded mode. There is no probability to report.
+        """
+        scores = self.score(features)
+        levels = self.levels(scores)
+        top = len(self.labels) - 1
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return [{
+            'prediction': 'FLOOD WARNING' if level == top else 'NORMAL CONDITIONS',
+            'probability': None,
+            'heuristic_score': round(float(score), 3),
+            'risk_level': self.labels[level],
+            'recommendation': self.recommendations[level],
+            'timestamp': timestamp
+        } for score, level in zip(scores.tolist(), levels.tolist())]
+
+
+default_scorer = HeuristicScorer()
+
+
+def predict_flood_risk(params, scorer=None):
+    """
+    Basic risk prediction model.
+    Takes environmental parameters (full or short feature names, as served
+    by /fetch_data) and computes a flood risk score.
+    """
+    return (scorer or default_scorer).predict_one(params)[1]
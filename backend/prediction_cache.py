@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+class PredictionCache:
+    """
+    Opt-in memoization in front of FloodRiskPredictorStandalone.predict.
+
+    Inputs are rounded to `precision[feature]` decimals (`default_decimals`
+    otherwise) and the rounded vector is both the cache key and what gets
+    scored, so every request landing in the same bucket gets the same answer
+    whichever one filled it. Entries live in a bounded LRU and expire after
+    `ttl` seconds; the whole cache is dropped when the served model version
+    changes.
+    """
+
+    def __init__(self, maxsize=4096, ttl=300.0, precision=None, default_decimals=2):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self.precision = dict(precision or {})
+        self.default_decimals = default_decimals
+
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def quantize(self, feature_columns, params):
+        """
+        The rounded feature values, in feature_columns order.
+        Raises KeyError/TypeError/ValueError like predict() would.
+        """
+        return tuple(
+            round(float(params[col]), self.precision.get(col, self.default_decimals))
+            for col in feature_columns
+        )
+
+    def predict(self, model_version, predictor, params, score=None):
+        """
+        Cached predictor.predict(**params) for the given model version.
+        `score(predictor, params)` replaces the direct call on a miss.
+        """
+        try:
+            key = self.quantize(predictor.feature_columns, params)
+        except (KeyError, TypeError, ValueError):
+            # Let the predictor produce its usual validation error
+            return predictor.predict(**params)
+
+        now = time.monotonic()
+        with self._lock:
+            if model_version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._version = model_version
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    result = dict(entry[1])
+                    result['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    return result
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        # Score outside the lock; concurrent misses on one key just both compute
+        rounded = dict(zip(predictor.feature_columns, key))
+        result = score(predictor, rounded) if score is not None else predictor.predict(**rounded)
+
+        with self._lock:
+            if model_version == self._version:
+                self._entries[key] = (now, result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return dict(result)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,374 @@
+import io
+import json
+import math
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from functools import cached_property
+
+import numpy as np
+
+import feature_schema
+from flood_predictor import RISK_THRESHOLDS, RISK_LEVELS
+
+# Approximate (lat_min, lon_min, lat_max, lon_max) extents of the basins served by /fetch_alerts
+BASIN_BOUNDS = {
+    "Ganga Basin": (22.0, 73.0, 31.0, 89.0),
+    "Yamuna Basin": (23.5, 74.5, 31.5, 82.5),
+    "Brahmaputra Basin": (24.0, 88.0, 30.0, 97.0),
+    "Godavari Basin": (16.5, 73.5, 23.0, 83.0),
+    "Mahanadi Basin": (19.3, 80.5, 23.6, 86.8),
+}
+DEFAULT_BBOX = (
+    min(b[0] for b in BASIN_BOUNDS.values()), min(b[1] for b in BASIN_BOUNDS.values()),
+    max(b[2] for b in BASIN_BOUNDS.values()), max(b[3] for b in BASIN_BOUNDS.values())
+)
+
+# /fetch_alerts keeps its three coarse titles; RISK_LEVELS index -> title
+ALERT_TITLES = ["Low Flood Risk", "Low Flood Risk", "Moderate Flood Risk", "High Flood Risk", "High Flood Risk"]
+
+# RGBA per RISK_LEVELS entry for map tiles (SAFE is left transparent)
+LEVEL_COLORS = np.array([
+    [0, 0, 0, 0],
+    [253, 216, 53, 110],
+    [251, 140, 0, 140],
+    [229, 57, 53, 160],
+    [136, 14, 79, 190],
+], dtype=np.uint8)
+
+TILE_SIZE = 256
+
+
+# ---------------- Simulated conditions ----------------
+def _smooth_field(rng, shape, low, high, coarse=6):
+    """
+    Spatially smooth random field in [low, high]: a coarse random grid
+    bilinearly upsampled to `shape`.
+    """
+    grid = rng.uniform(low, high, (coarse, coarse))
+    rows = np.linspace(0, coarse - 1, shape[0])
+    cols = np.linspace(0, coarse - 1, shape[1])
+    r0 = np.minimum(rows.astype(int), coarse - 2)
+    c0 = np.minimum(cols.astype(int), coarse - 2)
+    fr = (rows - r0)[:, None]
+    fc = (cols - c0)[None, :]
+    top = grid[r0][:, c0] * (1 - fc) + grid[r0][:, c0 + 1] * fc
+    bottom = grid[r0 + 1][:, c0] * (1 - fc) + grid[r0 + 1][:, c0 + 1] * fc
+    return top * (1 - fr) + bottom * fr
+
+
+class SimulatedConditions:
+    """
+    Mock per-cell inputs for the universal model, in the spirit of /fetch_data.
+
+    Terrain (elevation, coast distance, drainage, deforestation, population)
+    is drawn once per grid; each call moves a handful of storm cells across
+    it and derives discharge, water level, soil moisture, humidity and
+    pressure with the same relations the training data was generated with.
+    Swap in a callable returning real gridded observations when available.
+    """
+
+    def __init__(self, seed=42, n_storms=6):
+        self.rng = np.random.default_rng(seed)
+        self.n_storms = n_storms
+        self._terrain = None
+        self._storms = None
+
+    def __call__(self, lats, lons):
+        shape = (len(lats), len(lons))
+        if self._terrain is None or self._terrain['elevation_m'].shape != shape:
+            self._terrain = {
+                'elevation_m': _smooth_field(self.rng, shape, 0, 2500),
+                'population_density': np.exp(_smooth_field(self.rng, shape, 3, 8)),
+                'drainage_efficiency': _smooth_field(self.rng, shape, 0.1, 0.9),
+                'distance_to_coast_km': _smooth_field(self.rng, shape, 0, 1500),
+                'deforestation_index': _smooth_field(self.rng, shape, 0.05, 0.9),
+            }
+            self._storms = np.column_stack([
+                self.rng.uniform(lats[0], lats[-1], self.n_storms),
+                self.rng.uniform(lons[0], lons[-1], self.n_storms),
+                self.rng.uniform(80, 300, self.n_storms),
+                self.rng.uniform(0.5, 2.0, self.n_storms),
+            ])
+
+        # Drift each storm a little per cycle, wrapping around the grid
+        storms = self._storms
+        storms[:, 0] = lats[0] + (storms[:, 0] - lats[0] + self.rng.normal(0, 0.2, len(storms))) % (lats[-1] - lats[0])
+        storms[:, 1] = lons[0] + (storms[:, 1] - lons[0] + self.rng.uniform(0, 0.4, len(storms))) % (lons[-1] - lons[0])
+
+        lat_grid, lon_grid = lats[:, None], lons[None, :]
+        rainfall = self.rng.exponential(15, shape)
+        for lat, lon, peak, radius in storms:
+            rainfall += peak * np.exp(-((lat_grid - lat) ** 2 + (lon_grid - lon) ** 2) / (2 * radius ** 2))
+
+        elevation = self._terrain['elevation_m']
+        discharge = np.maximum(0, rainfall * 0.5 * (1 + elevation / 1000))
+        columns = dict(self._terrain)
+        columns.update({
+            'rainfall_mm': rainfall,
+            'river_discharge_cumec': discharge,
+            'water_level_m': 1.5 + discharge / 300,
+            'soil_moisture_percent': np.clip(35 + rainfall * 1.5, 15, 100),
+            'temperature_c': np.full(shape, 25.0),
+            'humidity_percent': np.clip(60 + rainfall * 0.7, 40, 100),
+            'wind_speed_ms': np.full(shape, 10.0),
+            'pressure_hpa': 1010 - rainfall / 10,
+        })
+        return columns
+
+
+# ---------------- PNG encoding ----------------
+def _png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+
+def encode_png(rgba):
+    """
+    Minimal RGBA PNG encoder (no filtering) for an (h, w, 4) uint8 array.
+    """
+    height, width = rgba.shape[:2]
+    rows = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    rows[:, 1:] = rgba.reshape(height, -1)
+    header = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', header)
+            + _png_chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)) + _png_chunk(b'IEND', b''))
+
+
+def _tile_lat_lon(z, x, y):
+    """
+    Latitudes (per pixel row) and longitudes (per pixel column) of a Web Mercator tile.
+    """
+    n = 2 ** z
+    pixels = np.arange(TILE_SIZE) + 0.5
+    lons = (x + pixels / TILE_SIZE) / n * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(math.pi * (1 - 2 * (y + pixels / TILE_SIZE) / n))))
+    return lats, lons
+
+
+# ---------------- Raster snapshots ----------------
+class RiskSnapshot:
+    """
+    One scored grid. Never mutated after construction, so request handlers
+    can read it without locks while the next cycle is being computed.
+
+    `probability` is an (n_lat, n_lon) float32 array whose row 0 is the
+    southern edge; `levels` holds the RISK_LEVELS index per cell as uint8.
+    """
+
+    def __init__(self, probability, bbox, resolution, model_version, cycle, epoch='0', max_tiles=512):
+        self.probability = probability
+        self.levels = np.searchsorted(RISK_THRESHOLDS, probability, side='right').astype(np.uint8)
+        self.bbox = bbox
+        self.resolution = resolution
+        self.model_version = model_version
+        self.cycle = cycle
+        self.generated_at = datetime.now()
+        # The epoch keeps etags unique across restarts, when cycles start over
+        self.etag = f"{model_version}-{epoch}-{cycle}"
+
+        self._tiles = OrderedDict()
+        self._max_tiles = max_tiles
+        self._tile_lock = threading.Lock()
+
+        self.metadata = {
+            'bbox': list(bbox),
+            'resolution': resolution,
+            'shape': list(probability.shape),
+            'model_version': model_version,
+            'cycle': cycle,
+            'generated_at': self.generated_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'level_counts': np.bincount(self.levels.ravel(), minlength=len(RISK_LEVELS)).tolist(),
+            'risk_levels': RISK_LEVELS.tolist(),
+        }
+        # Serialized once; polls just re-send the bytes
+        self.metadata_json = json.dumps(self.metadata)
+        self.alerts = self._basin_alerts()
+        self.alerts_json = json.dumps(self.alerts)
+
+    @cached_property
+    def npy(self):
+        """
+        The probability grid as .npy bytes, for clients that want the raw raster.
+        """
+        buffer = io.BytesIO()
+        np.save(buffer, self.probability)
+        return buffer.getvalue()
+
+    def cell_index(self, lats, lons):
+        """
+        Grid (row, col) for each lat/lon, and a mask of points inside the raster.
+        """
+        lat_min, lon_min = self.bbox[0], self.bbox[1]
+        rows = np.floor((np.asarray(lats) - lat_min) / self.resolution).astype(np.int64)
+        cols = np.floor((np.asarray(lons) - lon_min) / self.resolution).astype(np.int64)
+        inside = (rows >= 0) & (rows < self.probability.shape[0]) & (cols >= 0) & (cols < self.probability.shape[1])
+        return np.clip(rows, 0, self.probability.shape[0] - 1), np.clip(cols, 0, self.probability.shape[1] - 1), inside
+
+    def _basin_alerts(self):
+        # One alert per basin at its highest-risk cell. A basin the raster
+        # only partly covers gets none: its peak may lie outside the bbox.
+        alerts = []
+        timestamp = self.generated_at.strftime('%Y-%m-%d %H:%M')
+        for region, (lat_min, lon_min, lat_max, lon_max) in BASIN_BOUNDS.items():
+            if not (self.bbox[0] <= lat_min and self.bbox[1] <= lon_min
+                    and lat_max <= self.bbox[2] and lon_max <= self.bbox[3]):
+                continue
+            r0, c0, _ = self.cell_index(lat_min, lon_min)
+            r1, c1, _ = self.cell_index(lat_max, lon_max)
+            block = self.probability[r0:r1 + 1, c0:c1 + 1]
+            if block.size == 0:
+                continue
+            row, col = np.unravel_index(int(block.argmax()), block.shape)
+            level = int(self.levels[r0 + row, c0 + col])
+            alerts.append({
+                "title": ALERT_TITLES[level],
+                "region": region,
+                "lat": round(self.bbox[0] + (r0 + row + 0.5) * self.resolution, 3),
+                "lon": round(self.bbox[1] + (c0 + col + 0.5) * self.resolution, 3),
+                "time": timestamp,
+                "probability": round(float(block[row, col]), 3),
+                "risk_level": RISK_LEVELS[level]
+            })
+        return alerts
+
+    def cell_alerts(self, min_level=3):
+        """
+        {id: alert} for every cell at RISK_LEVELS index `min_level` or above,
+        keyed by the cell's "row:col" so a cell keeps its id across cycles.
+        """
+        rows, cols = np.nonzero(self.levels >= min_level)
+        lats = np.round(self.bbox[0] + (rows + 0.5) * self.resolution, 3).tolist()
+        lons = np.round(self.bbox[1] + (cols + 0.5) * self.resolution, 3).tolist()
+        probabilities = np.round(self.probability[rows, cols].astype(np.float64), 3).tolist()
+        levels = self.levels[rows, cols].tolist()
+        timestamp = self.generated_at.strftime('%Y-%m-%d %H:%M')
+        return {f"{row}:{col}": {
+            "id": f"{row}:{col}",
+            "title": ALERT_TITLES[level],
+            "lat": lat,
+            "lon": lon,
+            "probability": probability,
+            "risk_level": RISK_LEVELS[level],
+            "time": timestamp
+        } for row, col, lat, lon, probability, level in zip(rows.tolist(), cols.tolist(), lats, lons,
+                                                            probabilities, levels)}
+
+    def tile(self, z, x, y):
+        """
+        256x256 PNG of the risk levels for Web Mercator tile z/x/y (cached).
+        """
+        key = (z, x, y)
+        with self._tile_lock:
+            png = self._tiles.get(key)
+            if png is not None:
+                self._tiles.move_to_end(key)
+                return png
+
+        lats, lons = _tile_lat_lon(z, x, y)
+        rows, _, lat_inside = self.cell_index(lats, np.full_like(lats, self.bbox[1]))
+        _, cols, lon_inside = self.cell_index(np.full_like(lons, self.bbox[0]), lons)
+        rgba = LEVEL_COLORS[self.levels[rows[:, None], cols[None, :]]]
+        rgba[~(lat_inside[:, None] & lon_inside[None, :])] = 0
+        png = encode_png(rgba)
+
+        with self._tile_lock:
+            self._tiles[key] = png
+            if len(self._tiles) > self._max_tiles:
+                self._tiles.popitem(last=False)
+        return png
+
+
+class RiskRasterCache:
+    """
+    Background job that scores the universal model over a lat/lon grid.
+
+    Every `interval` seconds the current model (from `model_source`, e.g.
+    ModelRegistry.active) is run once over all grid cells with a single
+    predict_proba call, and the result is published as an immutable
+    RiskSnapshot. Request handlers read the latest snapshot (a reference
+    load), so dashboard and alert polls cost a dictionary lookup instead of
+    a model evaluation per client; the snapshot's etag lets clients skip the
+    body entirely with If-None-Match.
+    """
+
+    def __init__(self, model_source, bbox=DEFAULT_BBOX, resolution=0.1, interval=20.0, conditions=None):
+        self.model_source = model_source
+        self.bbox = tuple(float(v) for v in bbox)
+        self.resolution = float(resolution)
+        self.interval = interval
+        self.conditions = conditions or SimulatedConditions()
+
+        # Cell centres; row 0 / column 0 are the south-west corner
+        n_lat = max(1, int(round((self.bbox[2] - self.bbox[0]) / self.resolution)))
+        n_lon = max(1, int(round((self.bbox[3] - self.bbox[1]) / self.resolution)))
+        self.lats = self.bbox[0] + (np.arange(n_lat) + 0.5) * self.resolution
+        self.lons = self.bbox[1] + (np.arange(n_lon) + 0.5) * self.resolution
+
+        self._snapshot = None
+        self._cycle = 0
+        self._epoch = format(int(time.time()), 'x')
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def shape(self):
+        return len(self.lats), len(self.lons)
+
+    def refresh(self):
+        """
+        Scores the grid once and publishes a new snapshot. Returns it, or
+        None when no model is available yet.
+        """
+        model_version, predictor = self.model_source()
+        if predictor is None or predictor.model is None:
+            return None
+
+        with self._lock:
+            columns = self.conditions(self.lats, self.lons)
+            features = feature_schema.empty_matrix(self.lats.size * self.lons.size)
+            for j, col in enumerate(predictor.feature_columns):
+                features[:, j] = np.broadcast_to(columns[col], self.shape).ravel()
+            probability = predictor.model.predict_proba(features)[:, 1].astype(np.float32).reshape(self.shape)
+
+            self._cycle += 1
+            snapshot = RiskSnapshot(probability, self.bbox, self.resolution, model_version, self._cycle, self._epoch)
+            self._snapshot = snapshot
+        return snapshot
+
+    def current(self):
+        """
+        Latest snapshot, scoring the first one on demand.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshot or self.refresh()
+        return snapshot
+
+    # ---------------- Background job ----------------
+    def start(self):
+        if self._thread is not None:
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="risk-raster", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"❌ ERROR: Risk raster refresh failed. {e}")
+            if self._stop.wait(self.interval):
+                return
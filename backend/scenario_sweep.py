@@ -0,0 +1,384 @@
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from itertools import product
+
+import numpy as np
+
+import feature_schema
+import flood_predictor
+from backend.worker_pool import worker_predictor
+
+# Parameters of each perturbation distribution, in numpy.random.Generator order
+DISTRIBUTIONS = {
+    'normal': ('mean', 'std'),
+    'uniform': ('low', 'high'),
+    'triangular': ('low', 'peak', 'high'),
+}
+# Flood probabilities whose exceedance is reported unless a sweep names its own
+DEFAULT_THRESHOLDS = (0.5, 0.65, 0.85)
+PROBABILITY_BINS = 20
+N_LEVELS = len(flood_predictor.RISK_LEVELS)
+
+
+def _number(value, what):
+    if isinstance(value, bool):
+        raise ValueError(f"❌ {what} must be a number.")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"❌ {what} must be a number.")
+    if not math.isfinite(value):
+        raise ValueError(f"❌ {what} must be a finite number.")
+    return value
+
+
+def _column(name):
+    if name not in feature_schema.FEATURE_NAMES:
+        raise ValueError(f"❌ Unknown parameter: '{name}'.")
+    return feature_schema.FEATURE_NAMES.index(name)
+
+
+def _draw(rng, distribution, params, n):
+    if distribution == 'normal':
+        return rng.normal(params[0], params[1], n)
+    if distribution == 'uniform':
+        return rng.uniform(params[0], params[1], n)
+    return rng.triangular(params[0], params[1], params[2], n)
+
+
+class SweepTotals:
+    """
+    Additive aggregates of scored samples per cell (grid point x district):
+    sample counts, risk-level counts, threshold exceedances, the sum and sum
+    of squares of the flood probability, and a probability histogram per
+    grid point. merge() is element-wise addition, so partial totals from any
+    number of chunks and workers combine in any order.
+    """
+
+    FIELDS = ('count', 'levels', 'exceeded', 'probability_sum', 'probability_squares', 'histogram')
+
+    def __init__(self, n_points, n_districts, n_thresholds):
+        n_cells = n_points * n_districts
+        self.count = np.zeros(n_cells, dtype=np.int64)
+        self.levels = np.zeros((n_cells, N_LEVELS), dtype=np.int64)
+        self.exceeded = np.zeros((n_cells, n_thresholds), dtype=np.int64)
+        self.probability_sum = np.zeros(n_cells)
+        self.probability_squares = np.zeros(n_cells)
+        self.histogram = np.zeros((n_points, PROBABILITY_BINS), dtype=np.int64)
+
+    def add(self, cells, points, probabilities, thresholds):
+        n_cells = len(self.count)
+        self.count += np.bincount(cells, minlength=n_cells)
+        levels = np.searchsorted(flood_predictor.RISK_THRESHOLDS, probabilities, side='right')
+        self.levels += np.bincount(cells * N_LEVELS + levels, minlength=n_cells * N_LEVELS).reshape(n_cells, N_LEVELS)
+        for k, threshold in enumerate(thresholds):
+            self.exceeded[:, k] += np.bincount(cells[probabilities > threshold], minlength=n_cells)
+        self.probability_sum += np.bincount(cells, weights=probabilities, minlength=n_cells)
+        self.probability_squares += np.bincount(cells, weights=probabilities * probabilities, minlength=n_cells)
+        bins = np.minimum((probabilities * PROBABILITY_BINS).astype(np.int64), PROBABILITY_BINS - 1)
+        self.histogram += np.bincount(points * PROBABILITY_BINS + bins,
+                                      minlength=self.histogram.size).reshape(self.histogram.shape)
+        return self
+
+    def merge(self, other):
+        for name in self.FIELDS:
+            getattr(self, name).__iadd__(getattr(other, name))
+        return self
+
+    @property
+    def samples(self):
+        return int(self.count.sum())
+
+
+class SweepSpec:
+    """
+    A validated Monte Carlo what-if sweep: grid points x districts x samples.
+
+    `base` holds the conditions of each district, one row of model features
+    per district. Every grid point is one combination of `grid` offsets (the
+    Cartesian product of each entry's values) and is simulated `samples`
+    times per district with independent draws from `perturbations`.
+    Relative offsets and draws scale a feature's base value, absolute ones
+    are added to it:
+
+        value = base * (1 + sum of relative) + sum of absolute
+
+    after which every feature is clipped to its range in feature_schema.
+    Sample i belongs to grid point i // (districts * samples) and district
+    (i // samples) % districts. Each chunk draws from a generator seeded with
+    (seed, chunk index), so results do not depend on how chunks are spread
+    over workers.
+
+    The JSON form (from_json) is
+        {"base": {feature: value, ...} or [{...}, ...],
+         "perturbations": {feature: {"distribution": "normal", "mean": 0.2, "std": 0.1,
+                                     "relative": true}, ...},
+         "grid": {feature: {"values": [0, 0.1, 0.2], "relative": true}, ...},
+         "samples": 1000, "seed": 0, "thresholds": [0.5, 0.65, 0.85]}
+    where base rows may carry a "district" name and "relative" defaults to true.
+    """
+
+    def __init__(self, base, perturbations=(), grid=(), samples=1000, seed=0,
+                 thresholds=DEFAULT_THRESHOLDS, district_names=None):
+        self.base = np.atleast_2d(np.asarray(base, dtype=np.float64))
+        # (column, relative, distribution, params) per perturbation
+        self.perturbations = tuple(perturbations)
+        # (column, relative, values) per grid entry
+        self.grid = tuple(grid)
+        points = list(product(*[values for _, _, values in self.grid]))
+        self.grid_points = np.array(points, dtype=np.float64).reshape(len(points), len(self.grid))
+        self.samples = int(samples)
+        self.seed = int(seed)
+        self.thresholds = tuple(float(t) for t in thresholds)
+        self.district_names = list(district_names) if district_names is not None else list(range(len(self.base)))
+
+    @property
+    def n_districts(self):
+        return len(self.base)
+
+    @property
+    def n_points(self):
+        return len(self.grid_points)
+
+    @property
+    def total(self):
+        return self.n_points * self.n_districts * self.samples
+
+    @classmethod
+    def from_json(cls, payload, max_samples=None):
+        """
+        Parses a request body; raises ValueError with a readable message on
+        anything malformed, and when the sweep exceeds `max_samples`.
+        """
+        if not isinstance(payload, dict):
+            raise ValueError("❌ Expected a JSON object describing the sweep.")
+        base = payload.get('base')
+        if isinstance(base, dict):
+            base = [base]
+        if not isinstance(base, list) or not base or not all(isinstance(row, dict) for row in base):
+            raise ValueError("❌ 'base' must be an object of conditions or a non-empty list of them.")
+        features, errors = feature_schema.decode_rows(base)
+        if errors:
+            i = min(errors)
+            raise ValueError(errors[i] if len(base) == 1 else f"District {i}: {errors[i]}")
+        names = [row.get('district', i) for i, row in enumerate(base)]
+
+        perturbations = []
+        specs = payload.get('perturbations') or {}
+        if not isinstance(specs, dict):
+            raise ValueError("❌ 'perturbations' must map parameters to distributions.")
+        for name, spec in specs.items():
+            column = _column(name)
+            if not isinstance(spec, dict):
+                raise ValueError(f"❌ Perturbation of '{name}' must be an object.")
+            distribution = spec.get('distribution', 'normal')
+            if distribution not in DISTRIBUTIONS:
+                raise ValueError(f"❌ Unknown distribution '{distribution}' for '{name}' "
+                                 f"(expected {', '.join(DISTRIBUTIONS)}).")
+            params = tuple(_number(spec.get(param, 0.0), f"'{param}' of '{name}'")
+                           for param in DISTRIBUTIONS[distribution])
+            if distribution == 'normal' and params[1] < 0:
+                raise ValueError(f"❌ 'std' of '{name}' must not be negative.")
+            if distribution != 'normal' and not params[0] <= params[-1]:
+                raise ValueError(f"❌ 'low' of '{name}' must not exceed 'high'.")
+            if distribution == 'triangular' and not params[0] <= params[1] <= params[2]:
+                raise ValueError(f"❌ 'peak' of '{name}' must lie between 'low' and 'high'.")
+            perturbations.append((column, bool(spec.get('relative', True)), distribution, params))
+
+        grid = []
+        specs = payload.get('grid') or {}
+        if not isinstance(specs, dict):
+            raise ValueError("❌ 'grid' must map parameters to lists of offsets.")
+        for name, spec in specs.items():
+            column = _column(name)
+            values = spec.get('values') if isinstance(spec, dict) else None
+            if not isinstance(values, list) or not values:
+                raise ValueError(f"❌ Grid entry '{name}' needs a non-empty 'values' list.")
+            grid.append((column, bool(spec.get('relative', True)),
+                         tuple(_number(v, f"Grid value of '{name}'") for v in values)))
+
+        samples = _number(payload.get('samples', 1000), "'samples'")
+        if samples < 1 or samples != int(samples):
+            raise ValueError("❌ 'samples' must be a positive integer.")
+        thresholds = payload.get('thresholds', DEFAULT_THRESHOLDS)
+        if not isinstance(thresholds, (list, tuple)) or not thresholds:
+            raise ValueError("❌ 'thresholds' must be a non-empty list of probabilities.")
+        thresholds = sorted({_number(t, "Threshold") for t in thresholds})
+        if thresholds[0] < 0 or thresholds[-1] > 1:
+            raise ValueError("❌ Thresholds must lie between 0 and 1.")
+
+        seed = int(_number(payload.get('seed', 0), "'seed'"))
+        # Sized before the grid's Cartesian product is built, which a few
+        # long value lists would make astronomically large
+        total = math.prod(len(values) for _, _, values in grid) * len(features) * int(samples)
+        if max_samples is not None and total > max_samples:
+            raise ValueError(f"❌ The sweep has {total:,} samples; at most {max_samples:,} are allowed.")
+        return cls(features, perturbations, grid, int(samples), seed=seed,
+                   thresholds=thresholds, district_names=names)
+
+    # ---------------- Sampling ----------------
+    def chunks(self, chunk_rows):
+        """
+        (index, start, stop) of consecutive chunks covering every sample.
+        """
+        chunk_rows = max(1, int(chunk_rows))
+        return [(k, start, min(start + chunk_rows, self.total))
+                for k, start in enumerate(range(0, self.total, chunk_rows))]
+
+    def sample(self, start, stop, rng):
+        """
+        Float32 features of samples [start, stop) and each sample's cell
+        (grid point * districts + district).
+        """
+        cells = np.arange(start, stop, dtype=np.int64) // self.samples
+        points = cells // self.n_districts
+        values = self.base[cells % self.n_districts]
+        # Per perturbed column: [sum of relative changes, sum of absolute changes]
+        changes = {}
+        for k, (column, relative, _) in enumerate(self.grid):
+            offsets = changes.setdefault(column, [0.0, 0.0])
+            offsets[0 if relative else 1] = offsets[0 if relative else 1] + self.grid_points[points, k]
+        for column, relative, distribution, params in self.perturbations:
+            offsets = changes.setdefault(column, [0.0, 0.0])
+            offsets[0 if relative else 1] = offsets[0 if relative else 1] + _draw(rng, distribution, params, len(cells))
+        for column, (relative, absolute) in changes.items():
+            values[:, column] = values[:, column] * (1.0 + relative) + absolute
+
+        features = values.astype(feature_schema.DTYPE)
+        np.clip(features, feature_schema.LOWER, feature_schema.UPPER, out=features)
+        return features, cells
+
+    def empty_totals(self):
+        return SweepTotals(self.n_points, self.n_districts, len(self.thresholds))
+
+    # ---------------- Results ----------------
+    def summary(self, totals, districts=False):
+        """
+        JSON-ready aggregates per grid point: exceedance probabilities (with
+        their Monte Carlo standard error), risk-level and probability
+        histograms as fractions, and the mean and spread of the flood
+        probability. With districts=True each grid point also lists every
+        district's mean probability and exceedances.
+        """
+        shape = (self.n_points, self.n_districts)
+        count = totals.count.reshape(shape)
+        levels = totals.levels.reshape(shape + (N_LEVELS,))
+        exceeded = totals.exceeded.reshape(shape + (len(self.thresholds),))
+        probability_sum = totals.probability_sum.reshape(shape)
+        probability_squares = totals.probability_squares.reshape(shape)
+        keys = [f"{t:g}" for t in self.thresholds]
+
+        scenarios = []
+        for g in range(self.n_points):
+            n = int(count[g].sum())
+            scale = 1.0 / max(n, 1)
+            mean = probability_sum[g].sum() * scale
+            exceedance = exceeded[g].sum(axis=0) * scale
+            scenario = {
+                'grid': {feature_schema.FEATURE_NAMES[column]: float(self.grid_points[g, k])
+                         for k, (column, _, _) in enumerate(self.grid)},
+                'samples': n,
+                'mean_probability': round(float(mean), 4),
+                'std_probability': round(float(np.sqrt(max(probability_squares[g].sum() * scale - mean * mean, 0.0))), 4),
+                'exceedance': {key: round(float(p), 4) for key, p in zip(keys, exceedance)},
+                'exceedance_stderr': {key: round(float(np.sqrt(p * (1 - p) * scale)), 4)
+                                      for key, p in zip(keys, exceedance)},
+                'risk_levels': {label: round(float(c * scale), 4)
+                                for label, c in zip(flood_predictor.RISK_LEVELS, levels[g].sum(axis=0))},
+                'probability_histogram': [round(float(c * scale), 4) for c in totals.histogram[g]],
+            }
+            if districts:
+                per_district = 1.0 / np.maximum(count[g], 1)
+                scenario['districts'] = {
+                    'names': self.district_names,
+                    'mean_probability': np.round(probability_sum[g] * per_district, 4).tolist(),
+                    'exceedance': {key: np.round(exceeded[g, :, k] * per_district, 4).tolist()
+                                   for k, key in enumerate(keys)},
+                }
+            scenarios.append(scenario)
+        return {'samples': totals.samples, 'thresholds': list(self.thresholds),
+                'probability_bins': PROBABILITY_BINS, 'scenarios': scenarios}
+
+
+def score_chunk(model, spec, index, start, stop):
+    """
+    Draws and scores samples [start, stop) of `spec`; returns their
+    SweepTotals. `model` is a predictor, or a model path resolved to this
+    worker's cached predictor.
+    """
+    predictor = worker_predictor(model) if isinstance(model, str) else model
+    if predictor.model is None:
+        raise RuntimeError("Model is not loaded. Cannot run the sweep.")
+    features, cells = spec.sample(start, stop, np.random.default_rng([spec.seed, index]))
+    probabilities = predictor.model.predict_proba(features)[:, 1]
+    return spec.empty_totals().add(cells, cells // spec.n_districts, probabilities, spec.thresholds)
+
+
+# ---------------- Executors ----------------
+def dask_executor(address):
+    """
+    A concurrent.futures view of the Dask cluster whose scheduler is at
+    `address` (for a local one, see local_cluster() in models/model_hpc.py).
+    Workers must see the model file at the same path as this process.
+    """
+    from dask.distributed import Client
+    return Client(address).get_executor()
+
+
+class ScenarioSweeper:
+    """
+    Scores SweepSpecs chunk by chunk and yields running aggregates.
+
+    Without an executor every chunk is scored in the calling thread. With
+    one - worker_pool.fork_pool(), dask_executor() or any concurrent.futures
+    executor - at most `max_in_flight` chunks are outstanding at a time and
+    each is scored by a worker holding its own copy of the model, loaded
+    once from the predictor's model path. Only SweepTotals travel back, so
+    the cost of a result does not grow with the number of samples.
+    """
+
+    def __init__(self, executor=None, chunk_rows=100_000, max_samples=10_000_000, max_in_flight=4):
+        self.executor = executor
+        self.chunk_rows = max(1, chunk_rows)
+        self.max_samples = max_samples
+        self.max_in_flight = max(1, max_in_flight)
+
+    def run(self, spec, predictor, progress_interval=0.5):
+        """
+        Yields (totals, done): the totals so far at most every
+        `progress_interval` seconds, then the final totals with done=True.
+        Closing the generator early cancels the chunks not yet started.
+        """
+        totals = spec.empty_totals()
+        chunks = iter(spec.chunks(self.chunk_rows))
+        next_report = time.monotonic() + progress_interval
+        if self.executor is None:
+            for chunk in chunks:
+                totals.merge(score_chunk(predictor, spec, *chunk))
+                if time.monotonic() >= next_report:
+                    next_report = time.monotonic() + progress_interval
+                    yield totals, False
+            yield totals, True
+            return
+
+        pending = set()
+        try:
+            for chunk in chunks:
+                pending.add(self.executor.submit(score_chunk, predictor.model_path, spec, *chunk))
+                if len(pending) >= self.max_in_flight:
+                    break
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    totals.merge(future.result())
+                    chunk = next(chunks, None)
+                    if chunk is not None:
+                        pending.add(self.executor.submit(score_chunk, predictor.model_path, spec, *chunk))
+                if pending and time.monotonic() >= next_report:
+                    next_report = time.monotonic() + progress_interval
+                    yield totals, False
+        finally:
+            for future in pending:
+                future.cancel()
+        yield totals, True
@@ -0,0 +1,226 @@
+import functools
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+# Histogram upper bounds in seconds: ten log-spaced buckets per decade from
+# 10 µs to 10 s, so interpolated quantiles are within ~13% of the true value
+DEFAULT_BUCKETS = tuple(float(f"{10 ** (k / 10):.3g}") for k in range(-50, 11))
+
+
+class _Shard:
+    """
+    Counters and histograms written by exactly one thread.
+    """
+    __slots__ = ('counters', 'histograms', 'buckets')
+
+    def __init__(self, buckets):
+        self.counters = {}
+        self.histograms = {}
+        self.buckets = buckets
+
+    def add(self, key, n=1):
+        counters = self.counters
+        counters[key] = counters.get(key, 0) + n
+
+    def observe(self, key, seconds):
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            # bucket counts (the last one is the overflow), then the running sum
+            histogram = self.histograms[key] = [0] * (len(self.buckets) + 2)
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+
+
+class Telemetry:
+    """
+    Low-overhead request and model metrics.
+
+    Every thread records into its own shard, so the hot path is a couple of
+    dict operations with no lock; readers merge the shards when stats are
+    requested. Shards are registered by thread id and cached in a
+    thread-local; ids are only reused once the previous owner has exited,
+    so servers that start a thread per request recycle shards instead of
+    piling them up, and a shard never has two writers.
+
+    Metrics are keyed by (name, labels) with labels a tuple of (key, value)
+    pairs, and rendered as JSON for /api/admin/stats or in the Prometheus
+    text format for /metrics.
+    """
+
+    def __init__(self, namespace='flood', buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._shards = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            ident = threading.get_ident()
+            with self._lock:
+                shard = self._shards.get(ident)
+                if shard is None:
+                    shard = self._shards[ident] = _Shard(self.buckets)
+            self._local.shard = shard
+            return shard
+
+    # ---------------- Recording ----------------
+    def count(self, name, labels=(), n=1):
+        self._shard().add((name, labels), n)
+
+    def observe(self, name, seconds, labels=()):
+        self._shard().observe((name, labels), seconds)
+
+    def stage_observer(self, name='stage_duration_seconds'):
+        """
+        An observer(timings) callable taking a sequence of (stage, seconds)
+        pairs, e.g. for flood_predictor.set_stage_observer.
+        """
+        keys = {}
+
+        def observe(timings):
+            shard = self._shard()
+            for stage, seconds in timings:
+                key = keys.get(stage)
+                if key is None:
+                    key = keys[stage] = (name, (('stage', stage),))
+                shard.observe(key, seconds)
+        return observe
+
+    def instrument(self, endpoint):
+        """
+        View decorator recording request counts by status and latency.
+        """
+        duration_key = ('request_duration_seconds', (('endpoint', endpoint),))
+        status_keys = {}
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                start = perf_counter()
+                status = 500
+                try:
+                    response = view(*args, **kwargs)
+                    if isinstance(response, tuple):
+                        status = response[1]
+                    else:
+                        status = getattr(response, 'status_code', 200)
+                    return response
+                finally:
+                    elapsed = perf_counter() - start
+                    shard = self._shard()
+                    shard.observe(duration_key, elapsed)
+                    key = status_keys.get(status)
+                    if key is None:
+                        key = status_keys[status] = ('requests_total', (('endpoint', endpoint), ('status', str(status))))
+                    shard.add(key)
+            return wrapper
+        return decorator
+
+    # ---------------- Reading ----------------
+    def merged(self):
+        """
+        (counters, histograms) summed over all thread shards.
+        """
+        counters, histograms = {}, {}
+        for shard in list(self._shards.values()):
+            for key, value in shard.counters.copy().items():
+                counters[key] = counters.get(key, 0) + value
+            for key, histogram in shard.histograms.copy().items():
+                total = histograms.get(key)
+                if total is None:
+                    histograms[key] = list(histogram)
+                else:
+                    for i, value in enumerate(histogram):
+                        total[i] += value
+        return counters, histograms
+
+    def quantile(self, histogram, q):
+        """
+        Approximate quantile, interpolated linearly inside the bucket.
+        """
+        total = sum(histogram[:-1])
+        if total == 0:
+            return None
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(histogram[:-1]):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                # The overflow bucket has no upper bound; report its lower edge
+                upper = self.buckets[i] if i < len(self.buckets) else lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def summary(self, histogram):
+        count = sum(histogram[:-1])
+        return {
+            'count': count,
+            'mean_ms': round(histogram[-1] / count * 1e3, 4) if count else None,
+            **{f'p{q}_ms': (round(v * 1e3, 4) if v is not None else None)
+               for q, v in ((50, self.quantile(histogram, 0.50)),
+                            (95, self.quantile(histogram, 0.95)),
+                            (99, self.quantile(histogram, 0.99)))}
+        }
+
+    def snapshot(self):
+        """
+        JSON-friendly view: counters and latency summaries grouped by name.
+        """
+        counters, histograms = self.merged()
+        result = {'counters': {}, 'latency': {}}
+        for (name, labels), value in sorted(counters.items()):
+            label = ','.join(v for _, v in labels) or 'total'
+            result['counters'].setdefault(name, {})[label] = value
+        for (name, labels), histogram in sorted(histograms.items()):
+            label = ','.join(v for _, v in labels) or 'total'
+            result['latency'].setdefault(name, {})[label] = self.summary(histogram)
+        return result
+
+    def prometheus(self, gauges=None):
+        """
+        Prometheus text exposition (version 0.0.4) of all metrics.
+        `gauges` maps name -> [(labels, value), ...] for values read at scrape time.
+        """
+        counters, histograms = self.merged()
+        lines = []
+
+        def metric(name):
+            return f"{self.namespace}_{name}"
+
+        def render_labels(labels, extra=()):
+            pairs = tuple(labels) + tuple(extra)
+            if not pairs:
+                return ''
+            escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+            return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+        for name in sorted({n for n, _ in counters}):
+            lines.append(f"# TYPE {metric(name)} counter")
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{metric(name)}{render_labels(labels)} {value}")
+
+        for name in sorted({n for n, _ in histograms}):
+            lines.append(f"# TYPE {metric(name)} histogram")
+            for (n, labels), histogram in sorted(histograms.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram):
+                    cumulative += count
+                    lines.append(f"{metric(name)}_bucket{render_labels(labels, [('le', repr(bound))])} {cumulative}")
+                cumulative += histogram[len(self.buckets)]
+                lines.append(f"{metric(name)}_bucket{render_labels(labels, [('le', '+Inf')])} {cumulative}")
+                lines.append(f"{metric(name)}_sum{render_labels(labels)} {histogram[-1]!r}")
+                lines.append(f"{metric(name)}_count{render_labels(labels)} {cumulative}")
+
+        for name, samples in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE {metric(name)} gauge")
+            for labels, value in samples:
+                lines.append(f"{metric(name)}{render_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
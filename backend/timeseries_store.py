@@ -0,0 +1,413 @@
+import fcntl
+import json
+import os
+import threading
+import time
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+CHUNK_SUFFIX = '.ts.npy'
+VALUES_SUFFIX = '.values.npy'
+# Timestamp of the unused rows of a chunk; sorts after every real one
+PAD_TS = np.iinfo(np.int64).max
+# Room left in a station's first chunk; each next one doubles it
+MIN_CHUNK_ROWS = 1024
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+class _Series:
+    """
+    In-memory state of one (series, station): sealed chunk index plus the
+    rows appended since the last flush.
+    """
+
+    def __init__(self, directory, columns):
+        self.directory = directory
+        self.columns = columns
+        # (first_ts, last_ts, n_rows, name), ordered by time
+        self.chunks = []
+        self.pending_ts = []
+        self.pending_values = []
+        self.pending_rows = 0
+        self.last_ts = None
+        self.next_seq = 0
+
+    def chunk_paths(self, name):
+        base = os.path.join(self.directory, name)
+        return base + CHUNK_SUFFIX, base + VALUES_SUFFIX
+
+
+class TimeSeriesStore:
+    """
+    Embedded append-only store for per-station readings, predictions and alerts.
+
+    Layout: <root>/<series>/columns.json names the float columns of a series
+    (fixed by its first append); <root>/<series>/<station>/ holds sealed
+    chunks, each a pair of .npy files - int64 epoch-millisecond timestamps
+    and a float32 (n_columns, n_rows) block, so every column is contiguous
+    within a chunk. Reads memory-map only the chunks overlapping the
+    requested range and binary-search their timestamps, so a query never
+    loads more than the rows it returns.
+
+    Appends go to an in-memory buffer (visible to queries straight away)
+    that a background thread seals every `flush_interval` seconds. Chunks
+    are created with spare rows (unused timestamps hold PAD_TS), twice as
+    many as the previous chunk up to `chunk_rows`, and later flushes write
+    into the newest one in place, values before timestamps. A flush costs
+    only the rows it adds and slow feeds do not leave thousands of tiny
+    files. Timestamps never go
+    backwards within a station (an earlier one is clamped to the last
+    stored time), so a chunk's rows are those before its first PAD_TS.
+
+    Only one process may write a root (an flock on <root>/.lock); a second
+    one opens it read-only and rescans the directory on every query. Its
+    appends are dropped, with an error printed on the first one.
+    """
+
+    def __init__(self, root='history', chunk_rows=65536, flush_interval=30.0):
+        self.root = root
+        self.chunk_rows = max(1, chunk_rows)
+        self.flush_interval = flush_interval
+
+        self._series = {}
+        self._columns = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._warned_read_only = False
+
+        os.makedirs(root, exist_ok=True)
+        self._lock_file = open(os.path.join(root, '.lock'), 'a')
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self.writable = True
+        except OSError:
+            print(f"⚠️ {root} is being written by another process; opening it read-only")
+            self.writable = False
+        self._scan()
+
+    # ---------------- Index ----------------
+    def _scan(self):
+        """
+        Rebuilds the chunk index from disk.
+        """
+        series, columns = {}, {}
+        for name in sorted(os.listdir(self.root)):
+            schema_path = os.path.join(self.root, name, 'columns.json')
+            if not os.path.exists(schema_path):
+                continue
+            with open(schema_path, encoding='utf-8') as f:
+                columns[name] = json.load(f)
+            for station_dir in sorted(os.listdir(os.path.join(self.root, name))):
+                directory = os.path.join(self.root, name, station_dir)
+                if os.path.isdir(directory):
+                    series[(name, unquote(station_dir))] = self._scan_station(directory, columns[name])
+        with self._lock:
+            # Keep unflushed rows of this process across a rescan
+            for key, state in self._series.items():
+                if state.pending_rows and key in series:
+                    fresh = series[key]
+                    fresh.pending_ts, fresh.pending_values = state.pending_ts, state.pending_values
+                    fresh.pending_rows, fresh.last_ts = state.pending_rows, state.last_ts
+                elif state.pending_rows:
+                    series[key] = state
+            self._series, self._columns = series, {**self._columns, **columns}
+
+    def _scan_station(self, directory, columns):
+        state = _Series(directory, columns)
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.endswith(CHUNK_SUFFIX):
+                continue
+            chunk = file_name[:-len(CHUNK_SUFFIX)]
+            if not os.path.exists(os.path.join(directory, chunk + VALUES_SUFFIX)):
+                continue
+            ts = np.load(os.path.join(directory, file_name), mmap_mode='r')
+            n_rows = int(np.searchsorted(ts, PAD_TS))
+            if n_rows:
+                state.chunks.append((int(ts[0]), int(ts[n_rows - 1]), n_rows, chunk))
+                state.next_seq = max(state.next_seq, int(chunk) + 1)
+        state.chunks.sort()
+        if state.chunks:
+            state.last_ts = state.chunks[-1][1]
+        return state
+
+    def _refresh(self, series, station):
+        """
+        Read-only openers re-read the index of the station being queried,
+        since the writing process may have sealed or filled chunks.
+        """
+        if series not in self._columns:
+            self._scan()
+            return
+        directory = os.path.join(self.root, series, quote(station, safe=''))
+        if os.path.isdir(directory):
+            state = self._scan_station(directory, self._columns[series])
+            with self._lock:
+                self._series[(series, station)] = state
+
+    def _state(self, series, station, create_columns=None):
+        key = (series, station)
+        state = self._series.get(key)
+        if state is None:
+            columns = self._columns.get(series)
+            if columns is None:
+                if create_columns is None:
+                    raise KeyError(f"Unknown series: {series}")
+                columns = list(create_columns)
+                series_dir = os.path.join(self.root, series)
+                os.makedirs(series_dir, exist_ok=True)
+                with open(os.path.join(series_dir, 'columns.json'), 'w', encoding='utf-8') as f:
+                    json.dump(columns, f)
+                self._columns[series] = columns
+            elif create_columns is None:
+                raise KeyError(f"Unknown station '{station}' in series '{series}'")
+            directory = os.path.join(self.root, series, quote(station, safe=''))
+            state = self._series[key] = _Series(directory, columns)
+        return state
+
+    def catalog(self):
+        """
+        {series: {"columns": [...], "stations": [...]}} for everything stored.
+        """
+        if not self.writable:
+            self._scan()
+        with self._lock:
+            catalog = {name: {"columns": list(columns), "stations": []} for name, columns in self._columns.items()}
+            for series, station in sorted(self._series):
+                catalog[series]["stations"].append(station)
+        return catalog
+
+    # ---------------- Writing ----------------
+    def append(self, series, station, values, timestamp=None):
+        """
+        Appends one row; `values` maps column names to numbers (other keys
+        are ignored, absent columns are stored as NaN). The first append to
+        a series fixes its columns to the numeric keys given.
+        """
+        if not self.writable:
+            self._drop_append()
+            return
+        with self._lock:
+            state = self._series.get((series, station))
+            if state is None:
+                numeric = [k for k, v in values.items() if isinstance(v, (int, float)) and not isinstance(v, bool)]
+                state = self._state(series, station, create_columns=numeric)
+            row = np.array([[values.get(col, np.nan) for col in state.columns]], dtype=np.float32)
+            self._append(state, np.array([now_ms() if timestamp is None else int(timestamp)]), row)
+
+    def _drop_append(self):
+        if not self._warned_read_only:
+            self._warned_read_only = True
+            print(f"❌ ERROR: {self.root} is open read-only (another process holds its .lock); "
+                  f"appended rows are being dropped")
+
+    def append_many(self, series, station, timestamps, columns):
+        """
+        Appends a block of rows: `timestamps` (epoch ms) and a {column: array}
+        mapping of equal lengths.
+        """
+        if not self.writable:
+            self._drop_append()
+            return
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        with self._lock:
+            state = self._state(series, station, create_columns=list(columns))
+            block = np.full((len(timestamps), len(state.columns)), np.nan, dtype=np.float32)
+            for j, col in enumerate(state.columns):
+                if col in columns:
+                    block[:, j] = columns[col]
+            self._append(state, timestamps, block)
+
+    def _append(self, state, timestamps, block):
+        # Clamp to keep each station's timeline sorted
+        floor = state.last_ts if state.last_ts is not None else timestamps[0]
+        timestamps = np.maximum.accumulate(np.maximum(timestamps, floor))
+        state.pending_ts.append(timestamps)
+        state.pending_values.append(block)
+        state.pending_rows += len(timestamps)
+        state.last_ts = int(timestamps[-1])
+        if state.pending_rows >= self.chunk_rows:
+            self._seal(state)
+
+    def flush(self):
+        """
+        Seals every buffered row to disk.
+        """
+        with self._lock:
+            for state in self._series.values():
+                if state.pending_rows:
+                    self._seal(state)
+
+    def _write_chunk(self, state, ts, values, capacity):
+        name = f"{state.next_seq:08d}"
+        state.next_seq += 1
+        ts_path, values_path = state.chunk_paths(name)
+        n_rows = len(ts)
+        # Values first: a chunk exists once its timestamp file does
+        for path, array, pad in ((values_path, values, np.nan), (ts_path, ts, PAD_TS)):
+            tmp = path + '.tmp'
+            shape = array.shape[:-1] + (capacity,)
+            if array.size:
+                block = np.lib.format.open_memmap(tmp, mode='w+', dtype=array.dtype, shape=shape)
+                block[..., :n_rows] = array
+                block[..., n_rows:] = pad
+                block.flush()
+                del block
+            else:
+                np.save(tmp, np.empty(shape, dtype=array.dtype))
+            os.replace(tmp, path)
+        return (int(ts[0]), int(ts[-1]), n_rows, name)
+
+    def _seal(self, state):
+        os.makedirs(state.directory, exist_ok=True)
+        ts = np.concatenate(state.pending_ts)
+        values = np.concatenate(state.pending_values).T
+        state.pending_ts, state.pending_values, state.pending_rows = [], [], 0
+
+        # Fill the free rows of the newest chunk in place
+        capacity = 0
+        if state.chunks:
+            first, _, n_rows, name = state.chunks[-1]
+            ts_path, values_path = state.chunk_paths(name)
+            chunk_ts = np.load(ts_path, mmap_mode='r+')
+            capacity = len(chunk_ts)
+            take = min(capacity - n_rows, len(ts))
+            if take > 0:
+                chunk_values = np.load(values_path, mmap_mode='r+')
+                chunk_values[:, n_rows:n_rows + take] = values[:, :take]
+                chunk_values.flush()
+                chunk_ts[n_rows:n_rows + take] = ts[:take]
+                chunk_ts.flush()
+                del chunk_values
+                state.chunks[-1] = (first, int(ts[take - 1]), n_rows + take, name)
+                ts, values = ts[take:], values[:, take:]
+            del chunk_ts
+
+        for start in range(0, len(ts), self.chunk_rows):
+            end = start + self.chunk_rows
+            capacity = min(self.chunk_rows, max(MIN_CHUNK_ROWS, 2 * capacity, len(ts[start:end])))
+            state.chunks.append(self._write_chunk(state, ts[start:end], values[:, start:end], capacity))
+
+    def _load_chunk(self, state, name, n_rows):
+        ts_path, values_path = state.chunk_paths(name)
+        return np.load(ts_path, mmap_mode='r')[:n_rows], np.load(values_path, mmap_mode='r')[:, :n_rows]
+
+    # ---------------- Background flusher ----------------
+    def start(self):
+        if self._thread is not None or not self.writable:
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="timeseries-flush", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.writable:
+            self.flush()
+
+    def close(self):
+        """
+        Stops the flusher, seals buffered rows and releases the writer lock.
+        """
+        self.stop()
+        self.writable = False
+        # Rows appended during interpreter shutdown are dropped quietly
+        self._warned_read_only = True
+        self._lock_file.close()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ ERROR: Could not flush the time-series store. {e}")
+
+    # ---------------- Queries ----------------
+    def _segments(self, series, station, start, end, columns):
+        """
+        (timestamps, values) slices covering [start, end) in time order:
+        memory-mapped chunk slices, then buffered rows. `values` has one
+        row per requested column.
+        """
+        if not self.writable:
+            self._refresh(series, station)
+        with self._lock:
+            state = self._state(series, station)
+            unknown = [col for col in columns if col not in state.columns]
+            if unknown:
+                raise KeyError(f"Unknown column(s) for series '{series}': {', '.join(unknown)}")
+            index = [state.columns.index(col) for col in columns]
+            mapped = [self._load_chunk(state, name, n_rows) for first, last, n_rows, name in state.chunks
+                      if last >= start and first < end]
+            if state.pending_rows:
+                mapped.append((np.concatenate(state.pending_ts), np.concatenate(state.pending_values).T))
+
+        for ts, values in mapped:
+            lo, hi = np.searchsorted(ts, [start, end], side='left')
+            if hi > lo:
+                yield ts[lo:hi], values[index, lo:hi]
+
+    def count(self, series, station, start, end):
+        return sum(len(ts) for ts, _ in self._segments(series, station, start, end, []))
+
+    def range(self, series, station, start, end, columns=None):
+        """
+        Raw rows in [start, end) (epoch ms): a timestamp array and a
+        {column: float32 array} dict.
+        """
+        columns = list(columns or self._columns.get(series, []))
+        parts = list(self._segments(series, station, start, end, columns))
+        ts = np.concatenate([p[0] for p in parts]) if parts else np.empty(0, dtype=np.int64)
+        values = np.concatenate([p[1] for p in parts], axis=1) if parts else np.empty((len(columns), 0), np.float32)
+        return ts, dict(zip(columns, values))
+
+    def downsample(self, series, station, start, end, bucket_ms, columns=None):
+        """
+        Per-bucket count, min, max and mean of each column over [start, end).
+        Buckets are aligned to multiples of `bucket_ms` since the epoch and
+        empty ones are left out. Each chunk is reduced on its own (reduceat
+        over its sorted bucket ids), then partial buckets that straddle a
+        chunk boundary are merged, so memory stays bounded by one chunk.
+        """
+        columns = list(columns or self._columns.get(series, []))
+        bucket_ms = max(1, int(bucket_ms))
+        ids, counts, sums, mins, maxs = [], [], [], [], []
+        for ts, values in self._segments(series, station, start, end, columns):
+            bucket = ts // bucket_ms
+            starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+            values = np.asarray(values, dtype=np.float64)
+            present = ~np.isnan(values)
+            ids.append(bucket[starts])
+            counts.append(np.add.reduceat(present, starts, axis=1))
+            sums.append(np.add.reduceat(np.where(present, values, 0.0), starts, axis=1))
+            mins.append(np.fmin.reduceat(values, starts, axis=1))
+            maxs.append(np.fmax.reduceat(values, starts, axis=1))
+
+        if not ids:
+            empty = np.empty(0)
+            return np.empty(0, dtype=np.int64), {col: {"count": empty, "min": empty, "max": empty, "mean": empty}
+                                                 for col in columns}
+        ids = np.concatenate(ids)
+        counts, sums = np.concatenate(counts, axis=1), np.concatenate(sums, axis=1)
+        mins, maxs = np.concatenate(mins, axis=1), np.concatenate(maxs, axis=1)
+        # Merge partials of buckets that straddle a chunk boundary
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        if len(starts) != len(ids):
+            ids = ids[starts]
+            counts, sums = np.add.reduceat(counts, starts, axis=1), np.add.reduceat(sums, starts, axis=1)
+            mins, maxs = np.fmin.reduceat(mins, starts, axis=1), np.fmax.reduceat(maxs, starts, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        result = {
+            col: {"count": counts[j], "min": mins[j], "max": maxs[j], "mean": means[j]}
+            for j, col in enumerate(columns)
+        }
+        return ids * bucket_ms, result
@@ -0,0 +1,48 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import flood_predictor
+
+# Predictors loaded in this worker process, by model path
+_predictors = {}
+
+
+def worker_predictor(model_path):
+    """
+    This worker's FloodRiskPredictorStandalone for `model_path`, loaded on
+    first use. The newest two are kept: the active model plus the one it
+    replaced, which in-flight work may still name.
+    """
+    predictor = _predictors.get(model_path)
+    if predictor is None:
+        predictor = flood_predictor.FloodRiskPredictorStandalone(model_path)
+        if predictor.model is None:
+            raise RuntimeError(f"Model could not be loaded from {model_path}")
+        while len(_predictors) >= 2:
+            _predictors.pop(next(iter(_predictors)))
+        _predictors[model_path] = predictor
+    return predictor
+
+
+def worker_init(model_path):
+    """
+    Process-pool initializer: preloads `model_path` (if any) in the worker.
+    """
+    if model_path:
+        worker_predictor(model_path)
+
+
+def fork_pool(workers, preload_path=None):
+    """
+    A ProcessPoolExecutor of `workers` forked processes, each preloading the
+    model at `preload_path`. Every worker is forked before this returns.
+    A child inherits any lock another thread holds at that moment, so create
+    pools at startup, before the background jobs; the manager thread of an
+    idle pool (waiting on its pipes) holds none.
+    """
+    executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'),
+                                   initializer=worker_init, initargs=(preload_path,))
+    for future in [executor.submit(time.sleep, 0) for _ in range(workers)]:
+        future.result()
+    return executor
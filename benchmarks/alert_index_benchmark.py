@@ -0,0 +1,136 @@
+"""
+Lookup latency of the alert spatial index against linear scans.
+
+Raises --alerts random alerts across the basins' bounding box, then times
+viewport bounding-box queries, per-basin queries and nearest-k queries with
+AlertIndex, a plain Python scan over every alert and a vectorized NumPy scan
+over coordinate arrays, checking that all three return the same alerts.
+Incremental updates (sync against a set with a tenth of the alerts moved,
+raised or cleared) are timed too.
+Run from the repository root:
+
+    python benchmarks/alert_index_benchmark.py [--alerts 10000] [--queries 500]
+"""
+import argparse
+import heapq
+import time
+
+import numpy as np
+
+import fixtures
+from backend.alert_index import EARTH_RADIUS_KM, AlertIndex, haversine_km
+from backend.risk_raster import BASIN_BOUNDS, DEFAULT_BBOX
+
+
+def per_query_us(fn, queries):
+    start = time.perf_counter()
+    results = [fn(*q) for q in queries]
+    return results, (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def ids(alerts):
+    return sorted(alert["id"] for alert in alerts)
+
+
+def make_alerts(rng, n, first_id=0):
+    lats = rng.uniform(DEFAULT_BBOX[0], DEFAULT_BBOX[2], n).round(4)
+    lons = rng.uniform(DEFAULT_BBOX[1], DEFAULT_BBOX[3], n).round(4)
+    return {f"a{first_id + i}": {"id": f"a{first_id + i}", "lat": lat, "lon": lon}
+            for i, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist()))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--alerts", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--cell-size", type=float, default=0.5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    alerts = make_alerts(rng, args.alerts)
+    start = time.perf_counter()
+    index = AlertIndex(cell_size=args.cell_size, basins=BASIN_BOUNDS)
+    for alert_id, alert in alerts.items():
+        index.upsert(alert_id, alert)
+    build = time.perf_counter() - start
+
+    rows = list(alerts.values())
+    lats = np.array([a["lat"] for a in rows])
+    lons = np.array([a["lon"] for a in rows])
+
+    # Viewports of about a city-to-state zoom level
+    centres = np.column_stack([rng.uniform(DEFAULT_BBOX[0], DEFAULT_BBOX[2], args.queries),
+                               rng.uniform(DEFAULT_BBOX[1], DEFAULT_BBOX[3], args.queries)])
+    spans = rng.uniform(0.5, 3.0, (args.queries, 1)) * [1.0, 1.5]
+    boxes = [tuple(v) for v in np.hstack([centres - spans / 2, centres + spans / 2]).tolist()]
+    points = [tuple(p) for p in centres.tolist()]
+    basins = [(name,) for name in BASIN_BOUNDS] * max(1, args.queries // len(BASIN_BOUNDS))
+
+    def scan_bbox(lat_min, lon_min, lat_max, lon_max):
+        return [a for a in rows if lat_min <= a["lat"] <= lat_max and lon_min <= a["lon"] <= lon_max]
+
+    def numpy_bbox(lat_min, lon_min, lat_max, lon_max):
+        mask = (lats >= lat_min) & (lats <= lat_max) & (lons >= lon_min) & (lons <= lon_max)
+        return [rows[i] for i in np.flatnonzero(mask)]
+
+    def scan_basin(name):
+        return scan_bbox(*BASIN_BOUNDS[name])
+
+    def numpy_basin(name):
+        return numpy_bbox(*BASIN_BOUNDS[name])
+
+    def scan_nearest(lat, lon):
+        return heapq.nsmallest(args.k, rows, key=lambda a: haversine_km(lat, lon, a["lat"], a["lon"]))
+
+    def numpy_nearest(lat, lon):
+        phi, phis = np.radians(lat), np.radians(lats)
+        h = (np.sin((phis - phi) / 2) ** 2
+             + np.cos(phi) * np.cos(phis) * np.sin(np.radians(lons - lon) / 2) ** 2)
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(h))
+        nearest = np.argpartition(distances, args.k)[:args.k]
+        return [rows[i] for i in nearest[np.argsort(distances[nearest])]]
+
+    print(f"\n⏱ {args.alerts:,} alerts, {args.cell_size}° cells (index built in {build * 1e3:.1f} ms)")
+    print(f"  {'query':<14} {'index':>10} {'Python scan':>13} {'NumPy scan':>12}   avg hits")
+    failures = 0
+    cases = (
+        ("bbox", boxes, lambda *q: index.in_bbox(*q), scan_bbox, numpy_bbox),
+        ("basin", basins, index.in_basin, scan_basin, numpy_basin),
+        (f"nearest-{args.k}", points, lambda lat, lon: [a for _, a in index.nearest(lat, lon, args.k)],
+         scan_nearest, numpy_nearest),
+    )
+    for name, queries, indexed, scan, vectorized in cases:
+        indexed_results, indexed_us = per_query_us(indexed, queries)
+        scan_results, scan_us = per_query_us(scan, queries)
+        numpy_results, numpy_us = per_query_us(vectorized, queries)
+        if name == "bbox" or name == "basin":
+            ok = all(ids(a) == ids(b) == ids(c) for a, b, c in zip(indexed_results, scan_results, numpy_results))
+        else:
+            ok = all([x["id"] for x in a] == [x["id"] for x in b] == [x["id"] for x in c]
+                     for a, b, c in zip(indexed_results, scan_results, numpy_results))
+        failures += not ok
+        hits = sum(map(len, indexed_results)) / len(queries)
+        print(f"  {name:<14} {indexed_us:8.1f} µs {scan_us:10.1f} µs {numpy_us:9.1f} µs   {hits:8.1f} "
+              f"{'✅' if ok else '❌'}")
+
+    # A tenth of the alerts change between raster cycles
+    n_changed = args.alerts // 10
+    updated = dict(alerts)
+    keys = list(updated)
+    for alert_id in keys[:n_changed // 3]:
+        del updated[alert_id]
+    for alert_id in keys[n_changed // 3:2 * n_changed // 3]:
+        updated[alert_id] = {**updated[alert_id], "lat": updated[alert_id]["lat"] + 0.3}
+    updated.update(make_alerts(rng, n_changed - 2 * (n_changed // 3), first_id=args.alerts))
+    start = time.perf_counter()
+    raised, moved, cleared = index.sync(updated)
+    seconds = time.perf_counter() - start
+    ok = len(index) == len(updated) and ids(index.in_bbox(-90, -180, 90, 180)) == ids(updated.values())
+    failures += not ok
+    print(f"  sync: {raised} raised, {moved} moved, {cleared} cleared in {seconds * 1e3:.2f} ms "
+          f"{'✅' if ok else '❌'}")
+    return 1 if failures else 0
+
+
+fixtures.run(main)
@@ -0,0 +1,113 @@
+"""
+Parity, latency and worker memory of the compiled NumPy scorer.
+
+Checks that compiled_model.py reproduces sklearn's predict_proba for the
+universal model on rows from the physical training distribution and on
+rows spread over every split range, then compares single-row predict(),
+batch scoring (sklearn, the compiled tables alone, and the predictor's
+BatchRoutedScorer, which switches to sklearn above COMPILED_MAX_ROWS),
+and the RSS of a fresh worker process that loads the model
+and scores one row, for the joblib model versus the .scorer.npz.
+Run from the repository root (after `python compiled_model.py`):
+
+    python benchmarks/compiled_model_benchmark.py [--rows 200000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+import fixtures
+import compiled_model
+import flood_predictor
+from physical_dataset import FEATURE_COLUMNS, generate_physical_dataset
+
+MODEL_PATH = os.path.join(fixtures.ROOT, "universal_flood_model.joblib")
+
+# Loads one model in a fresh interpreter, scores a row, reports memory.
+WORKER_SCRIPT = """
+import json, sys, time
+def peak_rss_kib():
+    # VmHWM restarts at exec; ru_maxrss would carry over the parent's peak
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM'))
+
+t0 = time.perf_counter()
+import flood_predictor
+predictor = flood_predictor.FloodRiskPredictorStandalone(%r, compiled=%r)
+predictor.predict(**%r)
+print(json.dumps({'seconds': time.perf_counter() - t0,
+                  'rss_mib': peak_rss_kib() / 1024,
+                  'sklearn': 'sklearn' in sys.modules,
+                  'scorer': type(predictor.model).__name__}))
+"""
+
+
+def per_call(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+
+def worker_footprint(compiled):
+    script = WORKER_SCRIPT % (MODEL_PATH, compiled, fixtures.SAMPLE_INPUT)
+    out = subprocess.run([sys.executable, "-c", script], cwd=fixtures.ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    if not os.path.exists(compiled_model.scorer_path(MODEL_PATH)):
+        compiled_model.export(MODEL_PATH)
+    reference = flood_predictor.FloodRiskPredictorStandalone(MODEL_PATH, compiled=False)
+    fast = flood_predictor.FloodRiskPredictorStandalone(MODEL_PATH)
+    if not isinstance(fast.model, compiled_model.BatchRoutedScorer):
+        print("❌ The compiled scorer was not picked up.")
+        return 1
+    compiled = fast.model.compiled
+
+    print(f"\n📊 Parity with sklearn ({compiled.n_trees} trees, depth {compiled.depth})")
+    physical = generate_physical_dataset(args.rows, seed=3)[FEATURE_COLUMNS].to_numpy()
+    spread = compiled_model.parity_inputs(compiled, args.rows)
+    failures = 0
+    for name, X in (("physical distribution", physical), ("split-range sweep", spread)):
+        expected, actual = reference.model.predict_proba(X), compiled.predict_proba(X)
+        error = np.abs(expected - actual).max()
+        flips = int((expected.argmax(axis=1) != actual.argmax(axis=1)).sum())
+        ok = error <= compiled_model.PARITY_TOLERANCE and flips == 0
+        failures += not ok
+        print(f"  {name:<22} {len(X)} rows: max |Δp| {error:.2e}, class flips {flips} {'✅' if ok else '❌'}")
+
+    print("\n⏱ Single-row predict()")
+    for name, predictor in (("sklearn", reference), ("compiled", fast)):
+        seconds = per_call(lambda: predictor.predict(**fixtures.SAMPLE_INPUT), args.calls)
+        print(f"  {name:<9} {seconds * 1e6:8.1f} µs")
+
+    # Micro-batches as the inference pool sends them, then one bulk call as the raster makes
+    for n_rows in (compiled_model.COMPILED_MAX_ROWS, args.rows):
+        print(f"\n⏱ predict_proba on {n_rows} rows")
+        for name, model in (("sklearn", reference.model), ("compiled", compiled), ("routed", fast.model)):
+            repeat = max(1, args.calls // n_rows)
+            seconds = per_call(lambda: model.predict_proba(physical[:n_rows]), repeat)
+            print(f"  {name:<9} {seconds * 1e3:9.2f} ms ({n_rows / seconds:,.0f} rows/s)")
+
+    print("\n📦 Fresh worker: load + first prediction")
+    for name, compiled in (("joblib", False), ("compiled", True)):
+        stats = worker_footprint(compiled)
+        print(f"  {name:<9} {stats['seconds'] * 1e3:7.0f} ms, peak RSS {stats['rss_mib']:6.0f} MiB, "
+              f"sklearn imported: {stats['sklearn']} ({stats['scorer']})")
+    return 1 if failures else 0
+
+
+fixtures.run(main)
@@ -0,0 +1,58 @@
+"""
+Scaling benchmark for the out-of-core Dask training pipeline.
+
+For each dataset size, runs on a LocalCluster: per-partition generation and
+flood labelling, map_overlap feature engineering, and the scaler reductions
+that train_model needs. Reports wall time, throughput, and driver and worker
+memory. Run from the repository root:
+
+    python benchmarks/dask_pipeline_benchmark.py [--rows 1000000 10000000 100000000]
+"""
+import argparse
+import resource
+import time
+
+import dask
+from dask.distributed import Client, LocalCluster
+
+import fixtures
+from dask_pipeline import generate_partitioned_dataset, engineer_features
+from streaming_features import ENGINEERED_FEATURES
+
+
+def worker_rss(client):
+    import psutil
+    return sum(client.run(lambda: psutil.Process().memory_info().rss).values())
+
+
+def run_pipeline(n_rows, rows_per_partition):
+    ddf = generate_partitioned_dataset(n_rows, max(1, n_rows // rows_per_partition))
+    features = engineer_features(ddf)[ENGINEERED_FEATURES]
+    # Everything train_model needs before fitting: scaler statistics and row count
+    mean, std, count = dask.compute(features.mean(), features.std(), features.shape[0])
+    return int(count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000, 100_000_000])
+    parser.add_argument("--rows-per-partition", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads-per-worker", type=int, default=2)
+    parser.add_argument("--memory-limit", default="2GB")
+    args = parser.parse_args()
+
+    with LocalCluster(n_workers=args.workers, threads_per_worker=args.threads_per_worker,
+                      memory_limit=args.memory_limit) as cluster, Client(cluster) as client:
+        print(f"🚀 {args.workers} workers x {args.threads_per_worker} threads, {args.memory_limit} each")
+        for n_rows in args.rows:
+            start = time.perf_counter()
+            count = run_pipeline(n_rows, args.rows_per_partition)
+            elapsed = time.perf_counter() - start
+            driver_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"  {n_rows:>12,} rows: {elapsed:8.1f} s ({n_rows / elapsed:,.0f} rows/s), "
+                  f"{count:,} feature rows, driver peak {driver_mb:,.0f} MiB, "
+                  f"workers now {worker_rss(client) / 2**20:,.0f} MiB")
+
+
+fixtures.run(main)
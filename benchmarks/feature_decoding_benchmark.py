@@ -0,0 +1,96 @@
+"""
+Decoding cost of /predict/batch bodies into the feature matrix.
+
+Compares the previous per-row assembly (a float64 row list built field by
+field, finite check only) with feature_schema's decoders for the same rows
+sent as JSON records, JSON columns, .npy and Arrow IPC. Times cover parsing
+the request body and producing the validated float32 matrix.
+Run from the repository root:
+
+    python benchmarks/feature_decoding_benchmark.py [--rows 100000]
+"""
+import argparse
+import io
+import json
+import time
+
+import numpy as np
+import pyarrow as pa
+
+import fixtures
+import feature_schema
+from feature_schema import FEATURE_NAMES
+
+
+def previous_build(records):
+    # The removed FloodRiskPredictorStandalone._build_feature_matrix row path
+    errors = {}
+    features = np.empty((len(records), len(FEATURE_NAMES)))
+    for i, row in enumerate(records):
+        try:
+            features[i] = [row[col] for col in FEATURE_NAMES]
+        except KeyError as e:
+            errors[i] = f"❌ Missing parameter: {e}."
+        except (TypeError, ValueError):
+            errors[i] = "❌ Invalid parameter value(s)."
+    for i in np.flatnonzero(~np.isfinite(features).all(axis=1)):
+        errors.setdefault(int(i), "❌ Invalid parameter value(s).")
+    return features, errors
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    matrix = (feature_schema.LOWER + rng.random((args.rows, len(FEATURE_NAMES)), dtype=np.float32)
+              * (feature_schema.UPPER - feature_schema.LOWER) * 0.5)
+    records = [dict(zip(FEATURE_NAMES, row)) for row in matrix.astype(float).tolist()]
+    records_body = json.dumps(records).encode()
+    columns_body = json.dumps({"columns": {name: matrix[:, j].astype(float).tolist()
+                                           for j, name in enumerate(FEATURE_NAMES)}}).encode()
+    buffer = io.BytesIO()
+    np.save(buffer, matrix)
+    npy_body = buffer.getvalue()
+    table = pa.table({name: matrix[:, j] for j, name in enumerate(FEATURE_NAMES)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    arrow_body = sink.getvalue().to_pybytes()
+
+    cases = (
+        ("JSON records, previous", records_body, lambda: previous_build(json.loads(records_body))),
+        ("JSON records", records_body, lambda: feature_schema.decode_records(json.loads(records_body))),
+        ("JSON columns", columns_body, lambda: feature_schema.decode_records(json.loads(columns_body)["columns"])),
+        (".npy", npy_body, lambda: feature_schema.decode_body(npy_body, "application/x-npy")),
+        ("Arrow IPC", arrow_body, lambda: feature_schema.decode_body(arrow_body, "application/vnd.apache.arrow.stream")),
+    )
+
+    print(f"\n⏱ Decoding {args.rows:,} rows into the feature matrix (best of {args.repeat})")
+    failures = 0
+    for name, body, decode in cases:
+        seconds = best_of(decode, args.repeat)
+        features, errors = decode()
+        ok = not errors and np.array_equal(np.asarray(features, dtype=np.float32), matrix)
+        failures += not ok
+        print(f"  {name:<24} {len(body) / 2**20:7.1f} MiB body  {seconds * 1e3:8.1f} ms  "
+              f"({seconds / args.rows * 1e9:6.0f} ns/row) {'✅' if ok else '❌'}")
+
+    # Vectorized range validation alone
+    seconds = best_of(lambda: feature_schema.validate(matrix), args.repeat)
+    print(f"  {'range validation only':<24} {'':>17}  {seconds * 1e3:8.1f} ms")
+    return 1 if failures else 0
+
+
+fixtures.run(main)
@@ -0,0 +1,206 @@
+"""
+Seeded, cached inputs for the benchmark suite (benchmarks/suite.py).
+
+Every fixture is built once per process with fixed seeds, so the timed
+code sees the same data on every run and on every machine; building a
+fixture is never part of a timing. Heavy imports (TensorFlow, Dask,
+XGBoost) happen inside the fixtures that need them.
+
+Every benchmark script imports this module first, for the repository and
+models/ import paths, and ends with fixtures.run(main).
+"""
+import atexit
+import os
+import sys
+import tempfile
+from functools import cache
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS = os.path.join(ROOT, "models")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, MODELS)
+
+SEED = 42
+
+# TensorFlow's C++ start-up logging would interleave with the report
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+SAMPLE_INPUT = {
+    'rainfall_mm': 100.0, 'river_discharge_cumec': 250.0, 'water_level_m': 4.5,
+    'soil_moisture_percent': 95.0, 'temperature_c': 24.0, 'humidity_percent': 98.0,
+    'wind_speed_ms': 20.0, 'pressure_hpa': 998.0, 'elevation_m': 10.0,
+    'population_density': 1800.0, 'drainage_efficiency': 0.4,
+    'distance_to_coast_km': 5.0, 'deforestation_index': 0.7
+}
+
+
+def run(main):
+    """
+    Exits with main()'s return code when the calling script is run directly;
+    does nothing when it is imported.
+    """
+    if main.__module__ == "__main__":
+        sys.exit(main())
+
+
+@cache
+def scratch_dir():
+    directory = tempfile.TemporaryDirectory(prefix="flood-bench-")
+    atexit.register(directory.cleanup)
+    return directory.name
+
+
+# ---------------- Training data ----------------
+@cache
+def hybrid_predictor():
+    """
+    An untrained HybridHPCPredictor writing into the scratch directory.
+    """
+    from model_hpc import HybridHPCPredictor
+    return HybridHPCPredictor(model_dir=os.path.join(scratch_dir(), "model_hybrid_hpc"))
+
+
+@cache
+def hybrid_frame(n_hours):
+    return hybrid_predictor().generate_dataset(n_hours=n_hours)
+
+
+@cache
+def engineered_frame(n_hours):
+    return hybrid_predictor().engineer_features_dask(hybrid_frame(n_hours))
+
+
+@cache
+def scaled_sequences(n_hours):
+    """
+    (scaled base features, labels) for the LSTM, scaled like train_model does.
+    """
+    from sklearn.preprocessing import StandardScaler
+    frame = hybrid_frame(n_hours)
+    predictor = hybrid_predictor()
+    data = StandardScaler().fit_transform(frame[predictor.base_features].values)
+    return data, frame['flood_occurred'].values
+
+
+@cache
+def xgb_training_set(n_hours, npartitions=4):
+    """
+    Scaled engineered features and labels as Dask collections, for fit_xgb.
+    """
+    import dask.dataframe as dd
+    from sklearn.preprocessing import StandardScaler
+    frame = engineered_frame(n_hours)
+    features = hybrid_predictor().engineered_features
+    X = frame[features].copy()
+    X[:] = StandardScaler().fit_transform(X.values)
+    return (dd.from_pandas(X, npartitions=npartitions),
+            dd.from_pandas(frame['flood_occurred'], npartitions=npartitions))
+
+
+@cache
+def dask_client():
+    """
+    In-process LocalCluster client, as fit_xgb expects a default client.
+    """
+    import logging
+    import xgboost as xgb
+    from dask.distributed import Client, LocalCluster
+    xgb.set_config(verbosity=0)
+    cluster = LocalCluster(n_workers=1, threads_per_worker=os.cpu_count(), processes=False,
+                           dashboard_address=None, silence_logs=logging.ERROR)
+    client = Client(cluster)
+    atexit.register(cluster.close)
+    atexit.register(client.close)
+    return client
+
+
+# ---------------- Trained models ----------------
+@cache
+def trained_hybrid(n_hours=50_000, lstm_steps=100):
+    """
+    A small but complete hybrid predictor (XGBoost + LSTM + scalers) for
+    realtime benchmarks; fitted in-process with fixed seeds.
+    """
+    import tensorflow as tf
+    import xgboost as xgb
+    from sklearn.preprocessing import StandardScaler
+    from sequence_windows import iter_sequence_batches
+
+    tf.keras.utils.set_random_seed(SEED)
+    predictor = hybrid_predictor()
+    frame = engineered_frame(n_hours)
+    predictor.scaler_xgb = StandardScaler().fit(frame[predictor.engineered_features].values)
+    dtrain = xgb.DMatrix(predictor.scaler_xgb.transform(frame[predictor.engineered_features].values),
+                         label=frame['flood_occurred'].values, feature_names=predictor.engineered_features)
+    predictor.model_xgb = xgb.train({'objective': 'binary:logistic', 'max_depth': 5, 'tree_method': 'hist',
+                                     'seed': SEED}, dtrain, num_boost_round=50)
+
+    base = hybrid_frame(n_hours)
+    predictor.scaler_lstm = StandardScaler().fit(base[predictor.base_features].values)
+    X, y = predictor.create_sequence_data(predictor.scaler_lstm.transform(base[predictor.base_features].values),
+                                          base['flood_occurred'].values)
+    predictor.model_lstm = predictor.build_lstm_model()
+    predictor.model_lstm.fit(iter_sequence_batches(X, y, 32, seed=SEED), steps_per_epoch=lstm_steps,
+                             epochs=1, verbose=0)
+    predictor.is_trained = True
+    return predictor
+
+
+@cache
+def numpy_hybrid():
+    """
+    trained_hybrid() with its LSTM swapped for the NumPy export.
+    """
+    import copy
+    import numpy_lstm
+    predictor = copy.copy(trained_hybrid())
+    predictor.model_lstm = numpy_lstm.from_keras(predictor.model_lstm)
+    return predictor
+
+
+@cache
+def station_history(n_stations, n_hours=72):
+    """
+    (stations, hours, 3) observation history from the hybrid generator.
+    """
+    predictor = hybrid_predictor()
+    data = predictor.generate_dataset(n_hours=n_stations * n_hours)[predictor.base_features].values
+    return data.reshape(n_stations, n_hours, 3)
+
+
+# ---------------- Serving ----------------
+@cache
+def app_client():
+    """
+    Flask test client with background jobs and history off and a scratch
+    model registry; the model is warmed up by one /predict.
+    """
+    os.environ.setdefault("FLOOD_RISK_BACKGROUND", "0")
+    os.environ.setdefault("FLOOD_HISTORY", "0")
+    os.environ.setdefault("FLOOD_MODEL_REGISTRY", os.path.join(scratch_dir(), "model_registry"))
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    client = app.app.test_client()
+    client.post('/predict', json=SAMPLE_INPUT)
+    return client
+
+
+@cache
+def batch_rows(n_rows):
+    """
+    n_rows /predict/batch records: SAMPLE_INPUT scaled by ±20% per value.
+    """
+    rng = np.random.default_rng(SEED)
+    names = list(SAMPLE_INPUT)
+    values = np.array([SAMPLE_INPUT[name] for name in names]) * rng.uniform(0.8, 1.2, (n_rows, len(names)))
+    values[:, names.index('drainage_efficiency')] = values[:, names.index('drainage_efficiency')].clip(0, 1)
+    values[:, names.index('deforestation_index')] = values[:, names.index('deforestation_index')].clip(0, 1)
+    values[:, names.index('humidity_percent')] = values[:, names.index('humidity_percent')].clip(0, 100)
+    values[:, names.index('soil_moisture_percent')] = values[:, names.index('soil_moisture_percent')].clip(0, 100)
+    return [dict(zip(names, row)) for row in values.tolist()]
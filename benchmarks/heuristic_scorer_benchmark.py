@@ -0,0 +1,75 @@
+"""
+Throughput of the vectorized heuristic scorer at a million rows.
+
+Scores the same rows with the per-dict predict_flood_risk (the /fetch_data
+path) and with HeuristicScorer over float64 and float32 matrices and a
+DataFrame, checking that every path assigns the same risk levels.
+Run from the repository root:
+
+    python benchmarks/heuristic_scorer_benchmark.py [--rows 1000000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import fixtures
+import feature_schema
+from backend.model_utils import HeuristicScorer, predict_flood_risk
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--loop-rows", type=int, default=100_000,
+                        help="rows scored one dict at a time (extrapolated to --rows)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Spread over the training ranges so all three levels occur
+    matrix = np.column_stack([
+        rng.uniform(0, 300, args.rows), rng.uniform(0, 700, args.rows), rng.uniform(0, 8, args.rows),
+        rng.uniform(15, 100, args.rows), rng.normal(25, 6, args.rows), rng.uniform(40, 100, args.rows),
+        rng.uniform(0, 30, args.rows), rng.normal(1010, 12, args.rows), rng.uniform(0, 2500, args.rows),
+        rng.lognormal(6, 1.5, args.rows), rng.uniform(0.1, 0.9, args.rows), rng.uniform(0, 1500, args.rows),
+        rng.uniform(0.05, 0.9, args.rows),
+    ])
+    frame = pd.DataFrame(matrix, columns=feature_schema.FEATURE_NAMES)
+    scorer = HeuristicScorer()
+
+    n_loop = min(args.loop_rows, args.rows)
+    records = frame.iloc[:n_loop].to_dict('records')
+    loop_labels, loop_seconds = timed(lambda: [predict_flood_risk(row) for row in records])
+    loop_rate = n_loop / loop_seconds
+
+    print(f"\n⏱ Heuristic scoring, {args.rows:,} rows")
+    print(f"  {'per-dict loop':<22} {args.rows / loop_rate:8.2f} s   ({loop_rate:12,.0f} rows/s, "
+          f"measured on {n_loop:,})")
+    failures = 0
+    reference = None
+    for name, features in (("float64 matrix", matrix), ("float32 matrix", matrix.astype(np.float32)),
+                           ("DataFrame", frame)):
+        (scores, labels), seconds = timed(lambda: scorer.predict(features))
+        if reference is None:
+            reference = labels
+        loop_match = np.array_equal(labels[:n_loop], np.array(loop_labels, dtype=object))
+        # float32 sums can land on the other side of a threshold for borderline rows
+        mismatches = int((labels != reference).sum())
+        ok = loop_match or name == "float32 matrix"
+        failures += not ok
+        print(f"  {name:<22} {seconds * 1e3:8.1f} ms  ({args.rows / seconds:12,.0f} rows/s) "
+              f"level mismatches vs float64: {mismatches} {'✅' if ok else '❌'}")
+
+    counts = dict(zip(*np.unique(reference, return_counts=True)))
+    print("  levels: " + ", ".join(f"{label} {count:,}" for label, count in counts.items()))
+    return 1 if failures else 0
+
+
+fixtures.run(main)
@@ -0,0 +1,83 @@
+"""
+Throughput of batched multi-station hybrid inference.
+
+Loads a trained HybridHPCPredictor (see models/model_hpc.py) and times one
+realtime tick for 1, 100 and 10k stations with MultiStationForecaster,
+next to the per-station loop (one LSTM predict + one DMatrix per station).
+Run from the repository root:
+
+    python benchmarks/multi_station_benchmark.py [--model-dir model_hybrid_hpc]
+"""
+import argparse
+import time
+
+import numpy as np
+import xgboost as xgb
+
+import fixtures
+from model_hpc import HybridHPCPredictor
+from multi_station import MultiStationForecaster
+from streaming_features import StreamingFeatureEngine
+
+
+def synthetic_history(predictor, n_stations, n_hours):
+    data = predictor.generate_dataset(n_hours=n_stations * n_hours)[predictor.base_features].values
+    return data.reshape(n_stations, n_hours, 3)
+
+
+def time_batched(predictor, history, ticks):
+    forecaster = MultiStationForecaster(predictor, history.shape[0])
+    forecaster.warm_start(history[:, :-ticks])
+    forecaster.predict()  # build the traced graph outside the timing
+    start = time.perf_counter()
+    for hour in range(history.shape[1] - ticks, history.shape[1]):
+        forecaster.step(history[:, hour])
+    return (time.perf_counter() - start) / ticks
+
+
+def time_per_station(predictor, history, ticks):
+    # One model call per station per tick, as predict_realtime does
+    n_stations = history.shape[0]
+    engines = [StreamingFeatureEngine() for _ in range(n_stations)]
+    for station, engine in enumerate(engines):
+        engine.extend(history[station, :-ticks])
+    start = time.perf_counter()
+    for hour in range(history.shape[1] - ticks, history.shape[1]):
+        for station, engine in enumerate(engines):
+            engine.update(*history[station, hour])
+            window = predictor.scaler_lstm.transform(history[station, hour - predictor.sequence_length + 1:hour + 1])
+            predictor.model_lstm.predict(window.reshape(1, predictor.sequence_length, 3), verbose=0)
+            scaled = (engine.features - np.asarray(predictor.scaler_xgb.mean_)) / np.asarray(predictor.scaler_xgb.scale_)
+            predictor.model_xgb.predict(xgb.DMatrix(scaled, feature_names=predictor.engineered_features))
+    return (time.perf_counter() - start) / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model-dir", default="model_hybrid_hpc")
+    parser.add_argument("--stations", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--ticks", type=int, default=5)
+    parser.add_argument("--loop-limit", type=int, default=100,
+                        help="skip the per-station loop above this many stations")
+    args = parser.parse_args()
+
+    predictor = HybridHPCPredictor(model_dir=args.model_dir)
+    predictor.load_model()
+    if not predictor.is_trained:
+        print("❌ No trained hybrid model found; run models/model_hpc.py first.")
+        return 1
+
+    print(f"\n⏱ Per-tick cost (mean of {args.ticks} ticks)")
+    for n_stations in args.stations:
+        history = synthetic_history(predictor, n_stations, predictor.sequence_length + args.ticks)
+        batched = time_batched(predictor, history, args.ticks)
+        line = (f"  {n_stations:>6} stations: batched {batched * 1e3:8.2f} ms/tick "
+                f"({n_stations / batched:,.0f} stations/s)")
+        if n_stations <= args.loop_limit:
+            looped = time_per_station(predictor, history, args.ticks)
+            line += f" | per-station loop {looped * 1e3:8.2f} ms/tick ({looped / batched:.0f}x slower)"
+        print(line)
+    return 0
+
+
+fixtures.run(main)
@@ -0,0 +1,135 @@
+"""
+Accuracy, latency and footprint of the NumPy LSTM export against Keras.
+
+Trains the hybrid predictor's two-layer LSTM briefly on synthetic windows,
+saves it and exports it with models/numpy_lstm.py (which refuses exports
+off by more than PARITY_TOLERANCE). Then compares Keras and NumPy
+probabilities and alerts on windows of the series, times predict() and
+predict_on_batch() against NumpyLSTM for several batch sizes, and measures
+cold start (imports + load + first prediction) and peak memory of a worker
+process on each path.
+Run from the repository root:
+
+    python benchmarks/numpy_lstm_benchmark.py [--batches 1 100 1000]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import fixtures
+import numpy_lstm
+
+# Timed inside a fresh interpreter; prints one JSON line
+WORKER_SCRIPT = """
+import json, os, sys, time
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+sys.path.insert(0, {models!r})
+t0 = time.perf_counter()
+import numpy as np
+if {backend!r} == "keras":
+    from tensorflow.keras.models import load_model
+    model = load_model({path!r})
+else:
+    import numpy_lstm
+    model = numpy_lstm.load_lstm_for({path!r})
+window = np.zeros((1, 72, 3), dtype=np.float32)
+model.predict(window, verbose=0)
+seconds = time.perf_counter() - t0
+# Peak RSS of this process image (ru_maxrss would carry over the parent's)
+with open("/proc/self/status") as f:
+    peak_kib = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+print(json.dumps({{"seconds": seconds, "rss_mib": peak_kib / 1024,
+                  "tensorflow": "tensorflow" in sys.modules}}))
+"""
+
+
+def train_model(path, steps=150):
+    import tensorflow as tf
+    from model_hpc import HybridHPCPredictor
+    from sequence_windows import iter_sequence_batches
+
+    tf.keras.utils.set_random_seed(0)
+    predictor = HybridHPCPredictor(model_dir=os.path.dirname(path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        frame = predictor.generate_dataset(n_hours=20_000)
+    data = frame[predictor.base_features].values
+    X, y = predictor.create_sequence_data((data - data.mean(0)) / data.std(0), frame['flood_occurred'].values)
+    model = predictor.build_lstm_model()
+    model.fit(iter_sequence_batches(X, y, 32, seed=0), steps_per_epoch=steps, epochs=1, verbose=0)
+    model.save(path)
+    return model, X
+
+
+def per_call_ms(fn, X, repeat):
+    fn(X)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def cold_start(backend, path):
+    script = WORKER_SCRIPT.format(models=fixtures.MODELS, backend=backend, path=path)
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--windows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "lstm_model.keras")
+        model, X = train_model(path)
+        numpy_lstm.export(path, model=model)
+        lstm = numpy_lstm.load_lstm_for(path)
+        lstm64 = numpy_lstm.from_keras(model, dtype=np.float64)
+
+        # Real (scaled) windows rather than random noise
+        windows = np.ascontiguousarray(X[-args.windows:], dtype=np.float32)
+        reference = model.predict(windows, verbose=0)[:, 0]
+        print(f"\n🔎 Parity on {len(windows):,} synthetic-series windows (Keras probabilities "
+              f"{reference.min():.3f}-{reference.max():.3f})")
+        for name, candidate in (("NumPy float32", lstm), ("NumPy float64", lstm64)):
+            prob = candidate.predict_on_batch(windows)[:, 0]
+            error = float(np.abs(prob - reference).max())
+            agree = float(((prob > 0.5) == (reference > 0.5)).mean())
+            ok = error <= numpy_lstm.PARITY_TOLERANCE and agree == 1.0
+            failures += not ok
+            print(f"  {name:<14} max |Δp| {error:.2e}   alerts agree {agree:.2%} {'✅' if ok else '❌'}")
+
+        print("\n⏱ Per call")
+        print(f"  {'batch':>6} {'Keras predict':>14} {'predict_on_batch':>17} {'NumPy':>9} {'speed-up':>9}")
+        for batch in args.batches:
+            X_batch = windows[:batch]
+            keras_predict = per_call_ms(lambda x: model.predict(x, verbose=0), X_batch, max(3, args.repeat // 4))
+            keras_batch = per_call_ms(model.predict_on_batch, X_batch, args.repeat)
+            numpy_ms = per_call_ms(lstm.predict_on_batch, X_batch, args.repeat)
+            print(f"  {batch:>6} {keras_predict:11.2f} ms {keras_batch:14.2f} ms {numpy_ms:6.2f} ms "
+                  f"{min(keras_predict, keras_batch) / numpy_ms:8.1f}x")
+
+        print("\n⏱ Worker cold start (imports + load + first prediction)")
+        for backend in ("keras", "numpy"):
+            result = cold_start(backend, path)
+            ok = result["tensorflow"] == (backend == "keras")
+            failures += not ok
+            print(f"  {backend:<6} {result['seconds']:6.2f} s   peak RSS {result['rss_mib']:6.0f} MiB   "
+                  f"TensorFlow imported: {result['tensorflow']} {'✅' if ok else '❌'}")
+        size = os.path.getsize(numpy_lstm.lstm_path(path))
+        print(f"  export: {size / 1024:.1f} KiB .lstm.npz vs {os.path.getsize(path) / 1024:.1f} KiB .keras")
+    return 1 if failures else 0
+
+
+fixtures.run(main)
@@ -0,0 +1,125 @@
+"""
+Distribution parity and speed of the vectorized physical dataset generator.
+
+Compares models/physical_dataset.py against the notebook's per-sample loop
+(PhysicalFloodPredictor.generate_physical_dataset, reproduced below):
+two-sample Kolmogorov-Smirnov statistics per column and the flood rate must
+agree within sampling noise. Then times both and streams a large dataset to
+.npy and Parquet with bounded memory. Run from the repository root:
+
+    python benchmarks/physical_dataset_benchmark.py [--parity-samples 50000] [--samples 10000000]
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ks_2samp
+
+import fixtures
+from physical_dataset import COLUMNS, LABEL, generate_physical_dataset, write_npy, write_parquet
+
+
+def notebook_generate(n_samples=10000):
+    # Verbatim logic of the notebook's loop (cell 0), kept as the reference
+    np.random.seed(42)
+    data = []
+    MAX_ELEVATION = 2500
+    for _ in range(n_samples):
+        elevation = np.random.uniform(0, MAX_ELEVATION)
+        population_density = max(10, np.random.lognormal(mean=6, sigma=1.5))
+        distance_to_coast = np.random.uniform(0, 1500)
+        drainage_efficiency = np.random.uniform(0.1, 0.9)
+        deforestation = np.random.uniform(0.05, 0.9)
+
+        rainfall_scenario = np.random.random()
+        if rainfall_scenario > 0.95:
+            rainfall = np.random.uniform(150, 300)
+        elif rainfall_scenario > 0.85:
+            rainfall = np.random.uniform(50, 150)
+        else:
+            rainfall = max(0, np.random.exponential(15))
+
+        river_discharge = max(0, (rainfall * 0.5 * (1 + elevation / 1000)) + np.random.normal(0, 30))
+        water_level = max(0, 1.5 + (river_discharge / 300) + np.random.normal(0, 0.8))
+        soil_moisture = min(100, max(15, 35 + rainfall * 1.5 + np.random.normal(0, 12)))
+        temperature = np.random.normal(25, 6)
+        humidity = min(100, max(40, 60 + rainfall * 0.7))
+        wind_speed = max(0, np.random.normal(10, 8))
+        pressure = np.random.normal(1010, 12) - (rainfall / 10)
+
+        flood_risk_score = (
+            (rainfall / 250) * 0.30 +
+            (river_discharge / 800) * 0.25 +
+            (water_level / 8) * 0.20 +
+            (soil_moisture / 100) * 0.08 +
+            ((MAX_ELEVATION - elevation) / MAX_ELEVATION) * 0.07 +
+            (deforestation) * 0.05 +
+            ((1 - drainage_efficiency)) * 0.03 +
+            (min(population_density, 5000) / 5000) * 0.02
+        )
+
+        flood_occurred = 1 if flood_risk_score > 0.40 else 0
+        if np.random.random() < 0.03:
+            flood_occurred = 1 - flood_occurred
+
+        data.append([
+            rainfall, river_discharge, water_level, soil_moisture,
+            temperature, humidity, wind_speed, pressure, elevation,
+            population_density, drainage_efficiency, distance_to_coast,
+            deforestation, flood_occurred
+        ])
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--parity-samples", type=int, default=50_000)
+    parser.add_argument("--samples", type=int, default=10_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    n = args.parity_samples
+    start = time.perf_counter()
+    reference = notebook_generate(n)
+    loop_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    vectorized = generate_physical_dataset(n, seed=7)
+    vector_seconds = time.perf_counter() - start
+
+    # Two independent samples of the same distribution: D stays below the
+    # 0.1% critical value 1.95 * sqrt(2 / n)
+    critical = 1.95 * np.sqrt(2 / n)
+    print(f"\n📊 Distribution parity on {n} samples (KS critical D at 0.1%: {critical:.4f})")
+    failures = 0
+    for column in COLUMNS:
+        result = ks_2samp(reference[column], vectorized[column])
+        ok = result.statistic < critical
+        failures += not ok
+        print(f"  {column:<24} D={result.statistic:.4f} {'✅' if ok else '❌'}")
+    rate_ref, rate_vec = reference[LABEL].mean(), vectorized[LABEL].mean()
+    rate_tolerance = 4 * np.sqrt(rate_ref * (1 - rate_ref) * 2 / n)
+    rate_ok = abs(rate_ref - rate_vec) < rate_tolerance
+    failures += not rate_ok
+    print(f"  flood rate: loop {rate_ref:.4f} vs vectorized {rate_vec:.4f} {'✅' if rate_ok else '❌'}")
+
+    print(f"\n⏱ {n} samples: loop {loop_seconds:.2f}s, vectorized {vector_seconds * 1e3:.1f} ms "
+          f"({loop_seconds / vector_seconds:.0f}x)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, writer in (("npy", write_npy), ("parquet", write_parquet)):
+            path = os.path.join(tmp, f"physical.{name}")
+            start = time.perf_counter()
+            writer(path, args.samples, chunk_size=args.chunk_size)
+            seconds = time.perf_counter() - start
+            print(f"⏱ {args.samples:,} samples -> {name}: {seconds:.1f}s, "
+                  f"{os.path.getsize(path) / 2**20:,.0f} MiB on disk")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"📦 Peak RSS: {peak:,.0f} MiB")
+    return 1 if failures else 0
+
+
+fixtures.run(main)
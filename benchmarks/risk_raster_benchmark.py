@@ -0,0 +1,76 @@
+"""
+Cost of a dashboard/alerts poll with and without the risk raster cache.
+
+Times one raster refresh at a few grid resolutions, then compares polling
+/fetch_alerts and a map tile from the cache (200 and 304 responses) with
+scoring the model per request, all through Flask's test client.
+Run from the repository root:
+
+    python benchmarks/risk_raster_benchmark.py [--polls 2000]
+"""
+import argparse
+import os
+import time
+
+import fixtures
+
+os.chdir(fixtures.ROOT)
+os.environ.setdefault("FLOOD_RISK_BACKGROUND", "0")
+
+import app  # noqa: E402
+from backend.risk_raster import RiskRasterCache  # noqa: E402
+
+
+def time_polls(client, url, polls, headers=None):
+    start = time.perf_counter()
+    for _ in range(polls):
+        response = client.get(url, headers=headers or {})
+    return (time.perf_counter() - start) / polls, response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--polls", type=int, default=2000)
+    parser.add_argument("--resolutions", type=float, nargs="+", default=[0.25, 0.1, 0.05])
+    args = parser.parse_args()
+
+    _, predictor = app.model_registry.active()
+    if predictor is None or predictor.model is None:
+        print("❌ No model available to score.")
+        return 1
+
+    print("\n⏱ Raster refresh (one predict_proba over the grid)")
+    for resolution in args.resolutions:
+        cache = RiskRasterCache(app.model_registry.active, resolution=resolution)
+        cache.refresh()
+        start = time.perf_counter()
+        cache.refresh()
+        print(f"  {resolution:>5}°  {cache.shape[0]}x{cache.shape[1]} cells: {(time.perf_counter() - start) * 1e3:8.1f} ms")
+
+    client = app.app.test_client()
+    first = client.get("/fetch_alerts")
+    etag = first.headers["ETag"]
+    tile_url = "/api/risk/tiles/5/23/13.png"
+    client.get(tile_url)
+
+    print(f"\n⏱ Per-poll cost (mean of {args.polls} requests)")
+    rows = [
+        ("/fetch_alerts cached", time_polls(client, "/fetch_alerts", args.polls)),
+        ("/fetch_alerts 304", time_polls(client, "/fetch_alerts", args.polls, {"If-None-Match": etag})),
+        ("map tile cached", time_polls(client, tile_url, args.polls)),
+        ("map tile 304", time_polls(client, tile_url, args.polls, {"If-None-Match": etag})),
+    ]
+    # What every poll paid when each request scored the model itself
+    scored_polls = max(1, args.polls // 10)
+    start = time.perf_counter()
+    for _ in range(scored_polls):
+        client.post("/predict", json=fixtures.SAMPLE_INPUT)
+    rows.append(("per-request scoring", ((time.perf_counter() - start) / scored_polls, None)))
+
+    for label, (seconds, response) in rows:
+        status = response.status_code if response is not None else ""
+        print(f"  {label:<22} {seconds * 1e6:10.1f} µs {status}")
+    return 0
+
+
+fixtures.run(main)
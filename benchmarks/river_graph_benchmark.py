@@ -0,0 +1,123 @@
+"""
+Per-tick cost of routing gauge signals through synthetic river trees.
+
+Builds random river trees (models/river_graph.py) of 1k to 100k nodes and
+times RiverGraph.step for discharge and water level together, next to a
+per-node Python loop evaluating the same recurrence. Checks that both agree,
+that a constant input is a fixed point of the area-weighted routing and that
+a pulse at a headwater reaches the outlet after the path's travel time.
+Run from the repository root:
+
+    python benchmarks/river_graph_benchmark.py [--nodes 1000 10000 100000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+import fixtures
+from river_graph import RiverGraph, synthetic_river_tree
+
+
+def loop_step(graph, upstream, history, tick, local):
+    # Reference: the recurrence node by node, reading the same ring buffer
+    routed = np.empty_like(local)
+    for v in range(graph.n_nodes):
+        value = graph.local_weight[v] * local[v]
+        for u, weight, lag in upstream[v]:
+            value = value + weight * history[(tick - lag) % graph.depth][u]
+        routed[v] = value
+    history[tick % graph.depth] = routed
+    return routed
+
+
+def check_against_loop(n_nodes, ticks, rng):
+    graph = RiverGraph.from_tree(*synthetic_river_tree(n_nodes, seed=1))
+    upstream = [list(zip(graph.indices[graph.indptr[v]:graph.indptr[v + 1]].tolist(),
+                         graph.data[graph.indptr[v]:graph.indptr[v + 1]].tolist(),
+                         graph.lags[graph.indptr[v]:graph.indptr[v + 1]].tolist()))
+                for v in range(n_nodes)]
+    signals = rng.gamma(2.0, 20.0, (ticks, n_nodes, 2))
+    history = np.empty((graph.depth, n_nodes, 2))
+    history[:] = graph.steady_state(signals[0])
+    worst = 0.0
+    for tick in range(ticks):
+        expected = loop_step(graph, upstream, history, tick, signals[tick])
+        worst = max(worst, float(np.abs(graph.step(signals[tick]) - expected).max()))
+    return worst
+
+
+def check_pulse(n_nodes):
+    downstream, travel_time, local_area = synthetic_river_tree(n_nodes, seed=2)
+    graph = RiverGraph.from_tree(downstream, travel_time, local_area)
+    # Deepest headwater and its travel time to the outlet
+    path_time = np.zeros(n_nodes, dtype=np.int64)
+    for u in range(1, n_nodes):
+        path_time[u] = path_time[downstream[u]] + travel_time[u]
+    source = int(np.argmax(path_time))
+    local = np.zeros(n_nodes)
+    graph.step(local)
+    local[source] = 1.0
+    arrival = None
+    for tick in range(int(path_time[source]) + 2):
+        routed = graph.step(local)
+        local[source] = 0.0
+        if arrival is None and routed[0] > 0:
+            arrival = tick
+    return arrival, int(path_time[source])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--loop-ticks", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    failures = 0
+
+    worst = check_against_loop(2000, 50, rng)
+    ok = worst < 1e-9
+    failures += not ok
+    print(f"\n🔎 CSR step vs per-node loop, 2,000 nodes x 50 ticks: max abs diff {worst:.2e} {'✅' if ok else '❌'}")
+    arrival, expected = check_pulse(5000)
+    ok = arrival == expected
+    failures += not ok
+    print(f"🔎 Headwater pulse reaches the outlet at tick {arrival} (path travel time {expected}) "
+          f"{'✅' if ok else '❌'}")
+
+    print("\n⏱ Routing discharge + water level per tick")
+    print(f"  {'nodes':>8} {'build':>9} {'max lag':>8} {'CSR step':>10} {'node loop':>11}  steady state ok")
+    for n_nodes in args.nodes:
+        start = time.perf_counter()
+        graph = RiverGraph.from_tree(*synthetic_river_tree(n_nodes, seed=0))
+        build = time.perf_counter() - start
+
+        constant = np.full((n_nodes, 2), [40.0, 3.5])
+        routed = graph.step(constant)
+        ok = np.allclose(graph.step(constant), constant) and np.allclose(routed, constant)
+        failures += not ok
+
+        signals = rng.gamma(2.0, 20.0, (8, n_nodes, 2))
+        start = time.perf_counter()
+        for tick in range(args.ticks):
+            graph.step(signals[tick % len(signals)])
+        step_us = (time.perf_counter() - start) / args.ticks * 1e6
+
+        upstream = [[] for _ in range(n_nodes)]
+        history = np.zeros((graph.depth, n_nodes, 2))
+        for v in range(n_nodes):
+            for e in range(graph.indptr[v], graph.indptr[v + 1]):
+                upstream[v].append((int(graph.indices[e]), float(graph.data[e]), int(graph.lags[e])))
+        start = time.perf_counter()
+        for tick in range(args.loop_ticks):
+            loop_step(graph, upstream, history, tick, signals[tick % len(signals)])
+        loop_us = (time.perf_counter() - start) / args.loop_ticks * 1e6
+
+        print(f"  {n_nodes:>8,} {build * 1e3:7.0f} ms {graph.depth - 1:>8} {step_us:8.0f} µs "
+              f"{loop_us / 1e3:8.1f} ms  {'✅' if ok else '❌'}")
+    return 1 if failures else 0
+
+
+fixtures.run(main)
@@ -0,0 +1,176 @@
+"""
+Throughput and correctness of Monte Carlo scenario sweeps.
+
+Sweeps 500 districts around perturbed copies of SAMPLE_INPUT (rainfall
++20% ± 10%, water level on a three-point grid) with backend/scenario_sweep.py
+and times it in the calling thread, on a forked process pool and on a Dask
+LocalCluster (models/model_hpc.py's local_cluster). For reference, samples are also scored the way a client would
+have to without the sweep API: uploaded 1,000 rows at a time to
+/predict/batch (Flask test client, no network). Checks that every executor returns identical totals,
+that the aggregates match a direct recomputation from the sampled rows, and
+that the streamed summary stays small however many samples are drawn.
+Run from the repository root:
+
+    python benchmarks/scenario_sweep_benchmark.py [--samples 1000000] [--workers 4]
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+import fixtures
+import compiled_model
+import feature_schema
+import flood_predictor
+from backend.scenario_sweep import ScenarioSweeper, SweepSpec, SweepTotals, score_chunk
+from backend.worker_pool import fork_pool
+
+MODEL_PATH = os.path.join(fixtures.ROOT, "universal_flood_model.joblib")
+
+
+def sweep_request(n_districts, samples):
+    rng = np.random.default_rng(fixtures.SEED)
+    districts = []
+    for k, row in enumerate(fixtures.batch_rows(n_districts)):
+        # batch_rows leaves some values (pressure) out of range; districts must be valid
+        row = {f.name: min(max(row[f.name], f.low), f.high) for f in feature_schema.FEATURES}
+        # Spread the districts over wetter and drier conditions
+        row['rainfall_mm'] *= rng.uniform(0.3, 2.0)
+        districts.append(dict(row, district=f"D{k:03d}"))
+    return {
+        "base": districts,
+        "perturbations": {"rainfall_mm": {"distribution": "normal", "mean": 0.2, "std": 0.1}},
+        "grid": {"water_level_m": {"values": [-1.0, 0.0, 1.0], "relative": False}},
+        "samples": samples,
+        "seed": fixtures.SEED,
+    }
+
+
+def warm_up(executor, workers, predictor):
+    # Bulk chunks, so every worker also loads the sklearn model they are scored with
+    chunk_rows = compiled_model.COMPILED_MAX_ROWS + 1
+    sweeper = ScenarioSweeper(executor, chunk_rows=chunk_rows, max_in_flight=2 * workers)
+    timed_sweep(sweeper, SweepSpec.from_json(sweep_request(workers, 4 * chunk_rows)), predictor)
+
+
+def timed_sweep(sweeper, spec, predictor):
+    start = time.perf_counter()
+    for totals, done in sweeper.run(spec, predictor, progress_interval=0.5):
+        pass
+    return totals, time.perf_counter() - start
+
+
+def batch_endpoint_baseline(spec, n_rows):
+    # Without the sweep API a client uploads every sample to /predict/batch
+    client = fixtures.app_client()
+    features, _ = spec.sample(0, n_rows, np.random.default_rng(0))
+    rows = [dict(zip(feature_schema.FEATURE_NAMES, row)) for row in features.tolist()]
+    start = time.perf_counter()
+    for i in range(0, n_rows, 1000):
+        client.post('/predict/batch', json=rows[i:i + 1000])
+    return time.perf_counter() - start
+
+
+def direct_summary(spec, predictor, chunk_rows):
+    # Every sampled row scored and aggregated without bincount
+    probabilities, cells = [], []
+    for index, start, stop in spec.chunks(chunk_rows):
+        features, chunk_cells = spec.sample(start, stop, np.random.default_rng([spec.seed, index]))
+        probabilities.append(predictor.model.predict_proba(features)[:, 1])
+        cells.append(chunk_cells)
+    probabilities, points = np.concatenate(probabilities), np.concatenate(cells) // spec.n_districts
+    expected = []
+    for g in range(spec.n_points):
+        p = probabilities[points == g]
+        levels = np.searchsorted(flood_predictor.RISK_THRESHOLDS, p, side='right')
+        expected.append(([float((p > t).mean()) for t in spec.thresholds],
+                         np.bincount(levels, minlength=len(flood_predictor.RISK_LEVELS)) / len(p),
+                         float(p.mean())))
+    return expected
+
+
+def same_totals(a, b):
+    return all(np.allclose(getattr(a, name), getattr(b, name), rtol=1e-12, atol=1e-9) for name in SweepTotals.FIELDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=1_000_000, help="total samples per sweep")
+    parser.add_argument("--districts", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--baseline-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    failures = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor = flood_predictor.FloodRiskPredictorStandalone(MODEL_PATH)
+    per_cell = max(1, args.samples // (3 * args.districts))
+    spec = SweepSpec.from_json(sweep_request(args.districts, per_cell))
+    print(f"\n⏱ {spec.total:,} samples: {spec.n_districts} districts x {spec.n_points} grid points "
+          f"x {spec.samples:,}, chunks of {args.chunk_rows:,}, {args.workers} worker(s)")
+
+    results = {}
+    warm_up(None, 1, predictor)
+    inline, seconds = timed_sweep(ScenarioSweeper(chunk_rows=args.chunk_rows), spec, predictor)
+    results['inline'] = inline
+    print(f"  {'sweep, calling thread':<26} {spec.total / seconds:12,.0f} samples/s   {seconds:7.2f} s")
+
+    pool = fork_pool(args.workers, preload_path=MODEL_PATH)
+    try:
+        warm_up(pool, args.workers, predictor)
+        sweeper = ScenarioSweeper(pool, chunk_rows=args.chunk_rows, max_in_flight=2 * args.workers)
+        results['process'], seconds = timed_sweep(sweeper, spec, predictor)
+    finally:
+        pool.shutdown()
+    print(f"  {'sweep, process pool':<26} {spec.total / seconds:12,.0f} samples/s   {seconds:7.2f} s")
+
+    from dask.distributed import Client
+    from model_hpc import local_cluster
+    with local_cluster(n_workers=args.workers, threads_per_worker=1, dashboard_address=None,
+                       silence_logs=logging.ERROR) as cluster, Client(cluster) as client:
+        warm_up(client.get_executor(), args.workers, predictor)
+        sweeper = ScenarioSweeper(client.get_executor(), chunk_rows=args.chunk_rows,
+                                  max_in_flight=2 * args.workers)
+        results['dask'], seconds = timed_sweep(sweeper, spec, predictor)
+    print(f"  {'sweep, Dask LocalCluster':<26} {spec.total / seconds:12,.0f} samples/s   {seconds:7.2f} s")
+
+    # Last: importing the app starts background threads, and the pool above forks
+    baseline_rows = min(args.baseline_rows, spec.total)
+    with contextlib.redirect_stdout(io.StringIO()):
+        seconds = batch_endpoint_baseline(spec, baseline_rows)
+    print(f"  {'rows via /predict/batch':<26} {baseline_rows / seconds:12,.0f} samples/s   "
+          f"({baseline_rows:,} rows, left to aggregate)")
+
+    ok = all(same_totals(inline, totals) for totals in results.values())
+    failures += not ok
+    print(f"\n🔎 Calling thread, process pool and Dask return identical totals {'✅' if ok else '❌'}")
+
+    small = SweepSpec.from_json(sweep_request(20, 1000))
+    totals = small.empty_totals()
+    for chunk in small.chunks(7_000):
+        totals.merge(score_chunk(predictor, small, *chunk))
+    summary = small.summary(totals)
+    ok = True
+    for scenario, (exceedance, levels, mean) in zip(summary['scenarios'], direct_summary(small, predictor, 7_000)):
+        ok &= np.allclose(list(scenario['exceedance'].values()), exceedance, atol=1e-4)
+        ok &= np.allclose(list(scenario['risk_levels'].values()), levels, atol=1e-4)
+        ok &= abs(scenario['mean_probability'] - mean) <= 1e-4
+    failures += not ok
+    print(f"🔎 Exceedances, risk levels and means match the sampled rows ({small.total:,}) {'✅' if ok else '❌'}")
+
+    progress = len(json.dumps(spec.summary(inline)))
+    final = len(json.dumps(spec.summary(inline, districts=True)))
+    ok = final < 1000 * spec.n_points * spec.n_districts
+    failures += not ok
+    print(f"🔎 Streamed result: {progress / 1024:.1f} KiB per progress line, {final / 1024:.1f} KiB final "
+          f"for {spec.total:,} samples {'✅' if ok else '❌'}")
+    return 1 if failures else 0
+
+
+fixtures.run(main)
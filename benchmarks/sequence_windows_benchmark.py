@@ -0,0 +1,71 @@
+"""
+Memory and time of LSTM window construction: Python loop vs zero-copy views.
+
+Checks that models/sequence_windows.py reproduces both create_sequence_data
+loops (label offset sequence_length for GraphFloodPredictor and
+sequence_length - 1 for HybridHPCPredictor) and reports peak allocations.
+Run from the repository root:
+
+    python benchmarks/sequence_windows_benchmark.py [--hours 200000]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import fixtures
+from sequence_windows import create_sequence_data, iter_sequence_batches
+
+
+def loop_sequence_data(data, labels, sequence_length, label_offset):
+    # The original per-class implementation
+    X, y = [], []
+    for i in range(len(data) - sequence_length):
+        X.append(data[i:i + sequence_length])
+        y.append(labels[i + label_offset])
+    return np.array(X), np.array(y)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=int, default=200_000)
+    parser.add_argument("--sequence-length", type=int, default=72)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    data = rng.normal(size=(args.hours, 3))
+    labels = (rng.random(args.hours) > 0.95).astype(int)
+    L = args.sequence_length
+
+    ok = True
+    print(f"⏱ {args.hours} hours, {L}-hour windows")
+    for name, offset in [("GraphFloodPredictor", L), ("HybridHPCPredictor", L - 1)]:
+        (X_loop, y_loop), t_loop, m_loop = measure(loop_sequence_data, data, labels, L, offset)
+        (X_view, y_view), t_view, m_view = measure(create_sequence_data, data, labels, L, offset)
+        same = np.array_equal(X_loop, X_view) and np.array_equal(y_loop, y_view)
+        ok &= same
+        print(f"  {name} (label offset {offset}): identical={same}")
+        print(f"    loop: {t_loop:8.3f} s, peak {m_loop / 2**20:9.1f} MiB")
+        print(f"    view: {t_view:8.3f} s, peak {m_view / 2**20:9.1f} MiB")
+        del X_loop, y_loop
+
+    batches = iter_sequence_batches(X_view, y_view, args.batch_size, repeat=False)
+    _, t_epoch, m_epoch = measure(lambda: sum(len(xb) for xb, _ in batches))
+    print(f"  one shuffled epoch of {args.batch_size}-window batches: {t_epoch:.3f} s, "
+          f"peak {m_epoch / 2**20:.2f} MiB")
+    return 0 if ok else 1
+
+
+fixtures.run(main)
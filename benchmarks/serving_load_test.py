@@ -0,0 +1,131 @@
+"""
+Throughput and tail latency of /predict versus client concurrency.
+
+Starts the app in production mode in a child process for each serving
+configuration (inline scoring on the request thread, the process worker
+pool, the pool without micro-batching) and drives it with closed-loop
+clients: every client sends its next request as soon as the previous one
+returns. 503s from load shedding are counted separately.
+Run from the repository root:
+
+    python benchmarks/serving_load_test.py [--concurrency 1 8 32 128] [--duration 5]
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+import fixtures
+
+CONFIGS = {
+    "inline": {"FLOOD_INFERENCE_WORKERS": "0"},
+    "pool": {},
+    "pool, no batching": {"FLOOD_INFERENCE_MAX_BATCH": "1", "FLOOD_INFERENCE_MAX_WAIT_MS": "0"},
+}
+
+
+def start_server(port, overrides):
+    env = dict(os.environ, FLOOD_SERVE_MODE="production", FLOOD_PORT=str(port), FLOOD_HOST="127.0.0.1",
+               FLOOD_RISK_BACKGROUND="0", **overrides)
+    server = subprocess.Popen([sys.executable, "app.py"], cwd=fixtures.ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            status, _ = post(port, fixtures.SAMPLE_INPUT)
+            if status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("Server did not start.")
+
+
+def post(port, payload):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.request("POST", "/predict", body=json.dumps(payload), headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        return response.status, None
+    finally:
+        conn.close()
+
+
+def run_clients(port, concurrency, duration, seed=0):
+    latencies, shed, errors = [], [0], [0]
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def client(k):
+        rng = np.random.default_rng(seed + k)
+        local, local_shed, local_errors = [], 0, 0
+        while time.perf_counter() < stop:
+            # Vary the inputs so nothing could be served from a cache
+            payload = {key: value * float(rng.uniform(0.5, 1.5)) for key, value in fixtures.SAMPLE_INPUT.items()}
+            start = time.perf_counter()
+            try:
+                status, _ = post(port, payload)
+            except OSError:
+                status = None
+            if status == 200:
+                local.append(time.perf_counter() - start)
+            elif status == 503:
+                local_shed += 1
+            else:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            shed[0] += local_shed
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return np.array(latencies), shed[0], errors[0], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--configs", nargs="+", default=list(CONFIGS), choices=list(CONFIGS))
+    parser.add_argument("--port", type=int, default=5058)
+    args = parser.parse_args()
+
+    print(f"\n⏱ /predict, closed-loop clients, {args.duration:.0f}s per level ({os.cpu_count()} CPU)")
+    for name in args.configs:
+        server = start_server(args.port, CONFIGS[name])
+        try:
+            print(f"\n  [{name}]")
+            for concurrency in args.concurrency:
+                latencies, shed, errors, elapsed = run_clients(args.port, concurrency, args.duration)
+                if len(latencies):
+                    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3
+                else:
+                    p50 = p95 = p99 = float("nan")
+                print(f"  {concurrency:>4} clients: {len(latencies) / elapsed:7.0f} req/s | "
+                      f"p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  p99 {p99:7.1f} ms | shed {shed} errors {errors}")
+            conn = http.client.HTTPConnection("127.0.0.1", args.port, timeout=5)
+            conn.request("GET", "/api/admin/stats")
+            pool = json.loads(conn.getresponse().read())["inference_pool"]
+            if pool:
+                print(f"  pool: {pool['batches']} batches, avg {pool['avg_batch']} rows, shed {pool['shed']}")
+        finally:
+            server.terminate()
+            server.wait()
+    return 0
+
+
+fixtures.run(main)
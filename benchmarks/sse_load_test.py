@@ -0,0 +1,195 @@
+"""
+Server CPU per connected client: SSE streams versus client polling.
+
+Starts the app in a child process, then (1) holds N /stream/readings
+connections open and (2) has N clients poll /fetch_data at the same update
+rate. Server CPU time is sampled from /proc, so this runs on Linux only.
+A few extra stream clients that never read are added to show that slow
+consumers do not stall the others. While the streams are open, /predict is
+timed to show it still gets a thread.
+
+Each run is repeated per serving mode: development (Flask's server, one
+thread per connection) and production (app.py with FLOOD_SERVE_MODE=
+production: waitress with FLOOD_HTTP_THREADS threads, if installed, and
+streams capped by FLOOD_STREAM_MAX_SUBSCRIBERS, so extra ones get a 503).
+Scoring stays inline so all server CPU is in one process.
+Run from the repository root:
+
+    python benchmarks/sse_load_test.py [--clients 50 200] [--interval 0.5] [--modes production]
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import fixtures
+
+SERVER_SCRIPT = "import app; app.app.run(host='127.0.0.1', port=%d, threaded=True, debug=False)"
+
+
+def server_cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime, in clock ticks
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def start_server(port, interval, mode, threads):
+    env = dict(os.environ, FLOOD_STREAM_READINGS_SECONDS=str(interval), FLOOD_RISK_BACKGROUND="0")
+    if mode == "production":
+        env.update(FLOOD_SERVE_MODE="production", FLOOD_HOST="127.0.0.1", FLOOD_PORT=str(port),
+                   FLOOD_HTTP_THREADS=str(threads), FLOOD_INFERENCE_WORKERS="0", FLOOD_SWEEP_WORKERS="0")
+        command = [sys.executable, "app.py"]
+    else:
+        command = [sys.executable, "-c", SERVER_SCRIPT % port]
+    server = subprocess.Popen(command, cwd=fixtures.ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/admin/stats")
+            conn.getresponse().read()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("Server did not start.")
+
+
+def open_stream(port, slow=False):
+    sock = socket.create_connection(("127.0.0.1", port))
+    if slow:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.sendall(f"GET /stream/readings HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n\r\n".encode())
+    return sock
+
+
+def predict_latencies(port, n_requests=20):
+    # Sequential /predict calls; None for one that failed or took over 10 s
+    latencies = []
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            conn.request("POST", "/predict", body=json.dumps(fixtures.SAMPLE_INPUT),
+                         headers={"Content-Type": "application/json"})
+            ok = conn.getresponse().status == 200
+            conn.close()
+        except OSError:
+            ok = False
+        latencies.append(time.perf_counter() - start if ok else None)
+    return latencies
+
+
+def run_streams(port, pid, n_clients, n_slow, duration):
+    selector = selectors.DefaultSelector()
+    events, refused = {}, set()
+    for _ in range(n_clients):
+        sock = open_stream(port)
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ)
+        events[sock] = 0
+    slow = [open_stream(port, slow=True) for _ in range(n_slow)]
+
+    # Let every connection receive its first event before measuring
+    time.sleep(1.0)
+    cpu_start, start = server_cpu_seconds(pid), time.time()
+    while time.time() - start < duration:
+        for key, _ in selector.select(timeout=0.5):
+            data = key.fileobj.recv(65536)
+            if data.startswith(b"HTTP/1.1 503"):
+                refused.add(key.fileobj)
+            if not data:
+                selector.unregister(key.fileobj)
+            events[key.fileobj] += data.count(b"\nevent: ")
+    cpu = server_cpu_seconds(pid) - cpu_start
+    elapsed = time.time() - start
+    latencies = predict_latencies(port)
+
+    for sock in list(events) + slow:
+        sock.close()
+    received = sorted(n for sock, n in events.items() if sock not in refused) or [0]
+    return cpu, elapsed, received[0], received[-1], len(refused), latencies
+
+
+def run_polling(port, pid, n_clients, interval, duration):
+    def poll():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        conn.request("GET", "/fetch_data")
+        conn.getresponse().read()
+        conn.close()
+
+    requests_done = 0
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        cpu_start, start = server_cpu_seconds(pid), time.time()
+        next_round = start
+        while time.time() - start < duration:
+            # One poll per client per interval, as the setInterval clients do
+            list(pool.map(lambda _: poll(), range(n_clients)))
+            requests_done += n_clients
+            next_round += interval
+            time.sleep(max(0.0, next_round - time.time()))
+        cpu = server_cpu_seconds(pid) - cpu_start
+        elapsed = time.time() - start
+    return cpu, elapsed, requests_done
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--slow-clients", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between updates")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=5057)
+    parser.add_argument("--modes", nargs="+", choices=["development", "production"],
+                        default=["development", "production"])
+    parser.add_argument("--threads", type=int, default=32, help="FLOOD_HTTP_THREADS in production")
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/stat"):
+        print("❌ /proc is not available; this load test needs Linux.")
+        return 1
+
+    failures = 0
+    for mode in args.modes:
+        server = start_server(args.port, args.interval, mode, args.threads)
+        try:
+            print(f"\n⏱ {mode}: server CPU over {args.duration:.0f}s, one update every {args.interval}s")
+            if mode == "production" and importlib.util.find_spec("waitress") is None:
+                print("  ⚠️ waitress is not installed: production falls back to a thread per connection")
+            for n_clients in args.clients:
+                cpu, elapsed, fewest, most, refused, latencies = run_streams(
+                    args.port, server.pid, n_clients, args.slow_clients, args.duration)
+                print(f"  SSE     {n_clients:>4} clients (+{args.slow_clients} stalled): "
+                      f"{cpu / elapsed * 1e3:7.1f} ms CPU/s total, {cpu / elapsed / n_clients * 1e3:6.3f} ms/s per client, "
+                      f"events per client {fewest}-{most}, {refused} refused (503)")
+                answered = [s for s in latencies if s is not None]
+                ok = len(answered) == len(latencies)
+                failures += not ok
+                p50 = f"p50 {np.median(answered) * 1e3:.1f} ms" if answered else "no answers"
+                print(f"  /predict while streaming: {len(answered)}/{len(latencies)} answered, {p50} "
+                      f"{'✅' if ok else '❌'}")
+                cpu, elapsed, done = run_polling(args.port, server.pid, n_clients, args.interval, args.duration)
+                print(f"  polling {n_clients:>4} clients:             "
+                      f"{cpu / elapsed * 1e3:7.1f} ms CPU/s total, {cpu / elapsed / n_clients * 1e3:6.3f} ms/s per client, "
+                      f"{done / elapsed:.0f} req/s")
+
+            conn = http.client.HTTPConnection("127.0.0.1", args.port, timeout=5)
+            conn.request("GET", "/api/admin/stats")
+            print(f"\n📊 Stream stats: {json.loads(conn.getresponse().read())['streams']}")
+        finally:
+            server.terminate()
+            server.wait()
+    return 1 if failures else 0
+
+
+fixtures.run(main)
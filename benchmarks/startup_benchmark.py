@@ -0,0 +1,71 @@
+"""
+Startup benchmark for the Flask app.
+
+Each scenario runs in a fresh interpreter so import and model-load costs are
+measured cold. Run from the repository root:
+
+    python benchmarks/startup_benchmark.py [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import fixtures
+
+# Timed inside the child process; prints one JSON line with the stage timings.
+APP_SCRIPT = """
+import json, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+client = app.app.test_client()
+client.get('/')
+t2 = time.perf_counter()
+client.post('/predict', json=%r)
+t3 = time.perf_counter()
+print(json.dumps({'import_app': t1 - t0, 'first_index': t2 - t1, 'first_predict': t3 - t2}))
+""" % (fixtures.SAMPLE_INPUT,)
+
+LOAD_SCRIPT = """
+import json, time
+import joblib
+t0 = time.perf_counter()
+joblib.load('universal_flood_model.joblib', mmap_mode=%r)
+print(json.dumps({'load': time.perf_counter() - t0}))
+"""
+
+
+def run_child(script, env_overrides=None):
+    env = dict(os.environ, **(env_overrides or {}))
+    out = subprocess.run([sys.executable, "-c", script], cwd=fixtures.ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    keys = samples[0].keys()
+    return {k: round(statistics.median(s[k] for s in samples) * 1000, 2) for k in keys}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scenarios = {
+        "lazy (load on first /predict)": (APP_SCRIPT, {"FLOOD_MODEL_WARMUP": "0"}),
+        "lazy + background warm-up": (APP_SCRIPT, {"FLOOD_MODEL_WARMUP": "1"}),
+        "joblib.load (in-memory)": (LOAD_SCRIPT % (None,), None),
+        "joblib.load (mmap_mode='r')": (LOAD_SCRIPT % ('r',), None),
+    }
+
+    print(f"⏱ Startup benchmark (median of {args.repeat} cold runs, ms)")
+    for name, (script, env) in scenarios.items():
+        samples = [run_child(script, env) for _ in range(args.repeat)]
+        print(f"  {name}: {summarize(samples)}")
+
+
+fixtures.run(main)
@@ -0,0 +1,96 @@
+"""
+Parity check and per-tick timing for models/streaming_features.py.
+
+Compares StreamingFeatureEngine against the batch pandas computation used by
+HybridHPCPredictor.engineer_features_dask, then times one realtime tick of
+each approach. Run from the repository root:
+
+    python benchmarks/streaming_features_benchmark.py [--hours 20000]
+"""
+import argparse
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import fixtures
+from streaming_features import (
+    StreamingFeatureEngine, ENGINEERED_FEATURES,
+    RAINFALL_SUM_WINDOW, WATER_LEVEL_AVG_WINDOW, WATER_LEVEL_DIFF, DISCHARGE_LAG
+)
+
+BASE_FEATURES = ["rainfall", "discharge", "water_level"]
+
+
+def synthetic_stream(n_hours, seed=42):
+    # Same generator as HybridHPCPredictor.generate_dataset
+    rng = np.random.default_rng(seed)
+    rainfall = rng.uniform(0, 30, n_hours)
+    storm_indices = rng.integers(0, n_hours, n_hours // 50)
+    rainfall[storm_indices] += rng.uniform(20, 50, len(storm_indices))
+    discharge = rainfall * 2 + rng.normal(0, 1, n_hours)
+    water_level = np.clip(1.5 + discharge * 0.05 + rng.normal(0, 0.2, n_hours), 0, None)
+    return np.stack([rainfall, discharge, water_level], axis=1)
+
+
+def batch_features(df):
+    # Pandas equivalent of HybridHPCPredictor.engineer_features_dask (before dropna)
+    df = df.copy()
+    df['rainfall_24h_sum'] = df['rainfall'].rolling(window=RAINFALL_SUM_WINDOW).sum()
+    df['water_level_6h_avg'] = df['water_level'].rolling(window=WATER_LEVEL_AVG_WINDOW).mean()
+    df['water_level_diff_1h'] = df['water_level'].diff(WATER_LEVEL_DIFF)
+    df['discharge_lag_3h'] = df['discharge'].shift(DISCHARGE_LAG)
+    return df[ENGINEERED_FEATURES]
+
+
+def check_parity(stream):
+    expected = batch_features(pd.DataFrame(stream, columns=BASE_FEATURES)).values
+    engine = StreamingFeatureEngine()
+    actual = np.empty_like(expected)
+    for i, (rainfall, discharge, water_level) in enumerate(stream):
+        engine.update(rainfall, discharge, water_level)
+        actual[i] = engine.features[0]
+    same_nans = np.array_equal(np.isnan(actual), np.isnan(expected))
+    valid = ~np.isnan(expected).any(axis=1)
+    identical = same_nans and np.array_equal(actual[valid], expected[valid])
+    max_abs = np.abs(actual[valid] - expected[valid]).max()
+    return identical, max_abs
+
+
+def time_batch_tick(stream, buffer_len=100):
+    # The previous predict_realtime path: deque -> DataFrame -> rolling -> last row
+    history = deque(stream[:buffer_len], maxlen=buffer_len)
+    start = time.perf_counter()
+    for row in stream[buffer_len:]:
+        buffer_df = pd.DataFrame(data=list(history), columns=BASE_FEATURES)
+        batch_features(buffer_df).dropna().iloc[[-1]]
+        history.append(row)
+    return (time.perf_counter() - start) / (len(stream) - buffer_len)
+
+
+def time_streaming_tick(stream):
+    engine = StreamingFeatureEngine()
+    start = time.perf_counter()
+    for rainfall, discharge, water_level in stream.tolist():
+        engine.update(rainfall, discharge, water_level)
+    return (time.perf_counter() - start) / len(stream)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=int, default=20000)
+    args = parser.parse_args()
+
+    stream = synthetic_stream(args.hours)
+    identical, max_abs = check_parity(stream)
+    print(f"🔍 Parity over {args.hours} hours: identical={identical} (max abs diff {max_abs:.3g})")
+
+    batch = time_batch_tick(stream[:2100])
+    streaming = time_streaming_tick(stream)
+    print(f"⏱ Batch re-engineering: {batch * 1e6:.1f} µs/tick")
+    print(f"⏱ Streaming engine:     {streaming * 1e6:.1f} µs/tick ({batch / streaming:.0f}x faster)")
+    return 0 if identical else 1
+
+
+fixtures.run(main)
@@ -0,0 +1,372 @@
+"""
+Benchmark suite for the training and inference hot paths.
+
+Times dataset generation, sequence windowing, feature engineering on pandas
+and Dask, the XGBoost and LSTM fits, single and batched /predict through
+Flask's test client, and the realtime hybrid loops, on seeded fixtures
+(benchmarks/fixtures.py). Each case is warmed up, then timed --repeat times;
+the median is the reported figure.
+
+    --json PATH        write the results (and machine metadata) as JSON
+    --baseline PATH    compare medians with a stored result file and exit 1
+                       if any case is slower by more than --tolerance
+    --profile DIR      run each case once more under cProfile, save
+                       DIR/<case>.prof and print its top functions
+    --py-spy DIR       re-run the suite under py-spy (if installed) and save
+                       a speedscope profile to DIR/suite.speedscope.json
+
+benchmarks/baseline.json is the stored baseline; refresh it with --json on
+the reference machine when a change is meant to move the numbers.
+Run from the repository root:
+
+    python benchmarks/suite.py [--filter train.] [--repeat 5] [--baseline benchmarks/baseline.json]
+"""
+import argparse
+import contextlib
+import cProfile
+import fnmatch
+import io
+import json
+import os
+import platform
+import pstats
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import fixtures
+
+DEFAULT_BASELINE = os.path.join(fixtures.ROOT, "benchmarks", "baseline.json")
+
+Case = namedtuple('Case', 'name setup items max_repeat')
+CASES = {}
+
+
+def case(name, items=1, max_repeat=None):
+    """
+    Registers a benchmark. The decorated setup function builds its fixtures
+    and returns the zero-argument callable to time; `items` is how many
+    rows/requests/ticks one call processes, for per-item figures.
+    """
+    def register(setup):
+        CASES[name] = Case(name, setup, items, max_repeat)
+        return setup
+    return register
+
+
+# ---------------- Dataset generation ----------------
+@case("data.hybrid_dataset", items=1_000_000)
+def hybrid_dataset():
+    predictor = fixtures.hybrid_predictor()
+    return lambda: predictor.generate_dataset(n_hours=1_000_000)
+
+
+@case("data.physical_dataset", items=1_000_000)
+def physical_dataset():
+    import numpy as np
+    from physical_dataset import generate_chunk
+    return lambda: generate_chunk(1_000_000, np.random.default_rng(fixtures.SEED))
+
+
+# ---------------- Sequence windows ----------------
+@case("sequence.create_sequence_data", items=100_000)
+def sequence_windows():
+    predictor = fixtures.hybrid_predictor()
+    data, labels = fixtures.scaled_sequences(100_000)
+    return lambda: predictor.create_sequence_data(data, labels)
+
+
+@case("sequence.iter_batches", items=1000 * 32)
+def sequence_batches():
+    from sequence_windows import iter_sequence_batches
+    predictor = fixtures.hybrid_predictor()
+    X, y = predictor.create_sequence_data(*fixtures.scaled_sequences(100_000))
+
+    def run():
+        batches = iter_sequence_batches(X, y, 32, seed=fixtures.SEED)
+        for _ in range(1000):
+            next(batches)
+    return run
+
+
+# ---------------- Feature engineering ----------------
+@case("features.engineer_pandas", items=1_000_000)
+def engineer_pandas():
+    predictor = fixtures.hybrid_predictor()
+    frame = fixtures.hybrid_frame(1_000_000)
+    return lambda: predictor.engineer_features_dask(frame)
+
+
+@case("features.engineer_dask", items=1_000_000)
+def engineer_dask():
+    import dask.dataframe as dd
+    predictor = fixtures.hybrid_predictor()
+    ddf = dd.from_pandas(fixtures.hybrid_frame(1_000_000), npartitions=10)
+    return lambda: predictor.engineer_features_dask(ddf).compute(scheduler="threads")
+
+
+# ---------------- Training ----------------
+@case("train.xgboost", items=200_000, max_repeat=3)
+def train_xgboost():
+    fixtures.dask_client()
+    predictor = fixtures.hybrid_predictor()
+    X, y = fixtures.xgb_training_set(200_000)
+    return lambda: predictor.fit_xgb(X, y)
+
+
+@case("train.lstm", items=200 * 32, max_repeat=3)
+def train_lstm():
+    import tensorflow as tf
+    from sequence_windows import iter_sequence_batches
+    predictor = fixtures.hybrid_predictor()
+    X, y = predictor.create_sequence_data(*fixtures.scaled_sequences(100_000))
+
+    def run():
+        tf.keras.utils.set_random_seed(fixtures.SEED)
+        model = predictor.build_lstm_model()
+        model.fit(iter_sequence_batches(X, y, 32, seed=fixtures.SEED), steps_per_epoch=200, epochs=1, verbose=0)
+    return run
+
+
+# ---------------- Serving ----------------
+@case("serve.predict", items=100)
+def serve_predict():
+    client = fixtures.app_client()
+
+    def run():
+        for _ in range(100):
+            client.post('/predict', json=fixtures.SAMPLE_INPUT)
+    return run
+
+
+@case("serve.predict_batch", items=1000)
+def serve_predict_batch():
+    client = fixtures.app_client()
+    rows = fixtures.batch_rows(1000)
+    return lambda: client.post('/predict/batch', json=rows)
+
+
+@case("serve.scenario_sweep", items=100_000, max_repeat=5)
+def serve_scenario_sweep():
+    client = fixtures.app_client()
+    sweep = {"base": fixtures.SAMPLE_INPUT, "samples": 100_000,
+             "perturbations": {"rainfall_mm": {"distribution": "normal", "mean": 0.2, "std": 0.1}}}
+    return lambda: client.post('/api/scenarios/sweep', json=sweep).get_data()
+
+
+# ---------------- Realtime ----------------
+@case("realtime.hybrid_loop", items=20, max_repeat=3)
+def realtime_hybrid_loop():
+    predictor = fixtures.trained_hybrid()
+    return lambda: predictor.predict_realtime(hours=20)
+
+
+@case("realtime.hybrid_loop_numpy", items=20, max_repeat=3)
+def realtime_hybrid_loop_numpy():
+    predictor = fixtures.numpy_hybrid()
+    return lambda: predictor.predict_realtime(hours=20)
+
+
+def network_tick(predictor, graph=None):
+    # One tick of 1,000 stations, cycling through a day of observations
+    from multi_station import MultiStationForecaster
+    history = fixtures.station_history(1000, 96)
+    forecaster = MultiStationForecaster(predictor, 1000, graph=graph)
+    forecaster.warm_start(history[:, :72])
+    forecaster.predict()
+    ticks = iter(range(10**9))
+    return lambda: forecaster.step(history[:, 72 + next(ticks) % 24])
+
+
+@case("realtime.network_tick", items=1000)
+def realtime_network_tick():
+    return network_tick(fixtures.trained_hybrid())
+
+
+@case("realtime.network_tick_numpy", items=1000)
+def realtime_network_tick_numpy():
+    return network_tick(fixtures.numpy_hybrid())
+
+
+@case("realtime.routed_network_tick", items=1000)
+def realtime_routed_network_tick():
+    from river_graph import RiverGraph, synthetic_river_tree
+    graph = RiverGraph.from_tree(*synthetic_river_tree(1000, seed=fixtures.SEED))
+    return network_tick(fixtures.trained_hybrid(), graph)
+
+
+# ---------------- Running ----------------
+def fmt_seconds(seconds):
+    if seconds >= 1:
+        return f"{seconds:8.2f} s "
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:8.1f} ms"
+    if seconds >= 1e-6:
+        return f"{seconds * 1e6:8.1f} µs"
+    return f"{seconds * 1e9:8.1f} ns"
+
+
+def quiet(fn):
+    # The pipelines print progress; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn()
+
+
+def run_case(bench, repeat, warmup):
+    fn = quiet(bench.setup)
+    for _ in range(warmup):
+        quiet(fn)
+    times = []
+    for _ in range(min(repeat, bench.max_repeat or repeat)):
+        start = time.perf_counter()
+        quiet(fn)
+        times.append(time.perf_counter() - start)
+    median = statistics.median(times)
+    return fn, {
+        'median_s': median,
+        'min_s': min(times),
+        'stdev_s': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'runs': len(times),
+        'items': bench.items,
+        'per_item_us': median / bench.items * 1e6,
+    }
+
+
+def profile_case(name, fn, directory, top=8):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    quiet(fn)
+    profiler.disable()
+    path = os.path.join(directory, name + ".prof")
+    profiler.dump_stats(path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+    lines = [line for line in out.getvalue().splitlines() if line.strip()]
+    print(f"    cProfile -> {path}")
+    for line in lines[-top - 1:]:
+        print("      " + line)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=fixtures.ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    import numpy as np
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints the median ratio per case against the baseline; returns the
+    names of cases slower than baseline * (1 + tolerance).
+    """
+    base_results = baseline.get('results', {})
+    base_meta = baseline.get('meta', {})
+    print(f"\n📊 Against baseline ({base_meta.get('commit')}, {base_meta.get('timestamp')}), "
+          f"tolerance +{tolerance:.0%}")
+    if (base_meta.get('machine'), base_meta.get('cpu_count')) != (platform.machine(), os.cpu_count()):
+        print("  ⚠️ Baseline was recorded on a different machine; ratios are indicative only.")
+    regressions = []
+    for name, result in results.items():
+        base = base_results.get(name)
+        if base is None:
+            print(f"  {name:<34} {'new':>8}")
+            continue
+        ratio = result['median_s'] / base['median_s']
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            mark = '❌ slower'
+        elif ratio < 1 / (1 + tolerance):
+            mark = '🚀 faster'
+        else:
+            mark = '✅'
+        print(f"  {name:<34} {ratio:7.2f}x  {mark}")
+    return regressions
+
+
+def run_under_py_spy(directory):
+    if shutil.which("py-spy") is None:
+        print("❌ py-spy is not installed (pip install py-spy).")
+        return 2
+    os.makedirs(directory, exist_ok=True)
+    argv = [arg for i, arg in enumerate(sys.argv[1:], 1)
+            if arg != "--py-spy" and sys.argv[i - 1] != "--py-spy" and not arg.startswith("--py-spy=")]
+    output = os.path.join(directory, "suite.speedscope.json")
+    command = ["py-spy", "record", "--format", "speedscope", "-o", output, "--",
+               sys.executable, os.path.abspath(__file__)] + argv
+    print(f"🔥 {' '.join(command)}")
+    return subprocess.call(command)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", nargs="+", default=["*"],
+                        help="case name globs or prefixes, e.g. train. serve.predict")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"compare with a stored result file (default {os.path.relpath(DEFAULT_BASELINE)})")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument("--profile", metavar="DIR", help="save a cProfile of every case here")
+    parser.add_argument("--py-spy", metavar="DIR", help="re-run the suite under py-spy, saving a profile here")
+    args = parser.parse_args()
+
+    if args.py_spy:
+        return run_under_py_spy(args.py_spy)
+
+    selected = [bench for name, bench in CASES.items()
+                if any(fnmatch.fnmatch(name, pattern) or name.startswith(pattern) for pattern in args.filter)]
+    if args.list or not selected:
+        for name, bench in CASES.items():
+            print(f"  {name:<34} {bench.items:>10,} items per call")
+        return 0 if args.list else 1
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+
+    print(f"\n⏱ {len(selected)} case(s), median of up to {args.repeat} run(s) after {args.warmup} warm-up")
+    print(f"  {'case':<34} {'median':>11} {'min':>11} {'stdev':>7} {'per item':>11}")
+    results = {}
+    for bench in selected:
+        fn, result = run_case(bench, args.repeat, args.warmup)
+        results[bench.name] = result
+        print(f"  {bench.name:<34} {fmt_seconds(result['median_s'])} {fmt_seconds(result['min_s'])} "
+              f"{result['stdev_s'] / result['median_s']:6.1%} {fmt_seconds(result['per_item_us'] / 1e6)}")
+        if args.profile:
+            profile_case(bench.name, fn, args.profile)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'meta': metadata(), 'results': results}, f, indent=2)
+            f.write("\n")
+        print(f"\n💾 Results written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+fixtures.run(main)
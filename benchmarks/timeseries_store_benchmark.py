@@ -0,0 +1,132 @@
+"""
+Ingest and query cost of the historical time-series store.
+
+Writes months of hourly readings for many stations into a TimeSeriesStore
+in a temporary directory, then times one-week range queries and full-range
+downsampling to the historical page's 1000 points. The same queries against
+a per-station CSV read with pandas (the load-everything alternative) are the
+baseline; downsampled means are checked against pandas' resample. Resident
+memory growth while querying shows that reads map only what they touch.
+Run from the repository root:
+
+    python benchmarks/timeseries_store_benchmark.py [--stations 200] [--days 180]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import fixtures
+from backend.timeseries_store import TimeSeriesStore
+from feature_schema import SHORT_NAMES
+
+HOUR_MS = 3600 * 1000
+
+
+def rss_kib():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmRSS'))
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stations", type=int, default=200)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n_rows = args.days * 24
+    end = 1_760_000_000_000 // HOUR_MS * HOUR_MS
+    timestamps = end - HOUR_MS * np.arange(n_rows, 0, -1, dtype=np.int64)
+    stations = [f"station-{i:04d}" for i in range(args.stations)]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = TimeSeriesStore(os.path.join(root, "history"))
+        csv_dir = os.path.join(root, "csv")
+        os.makedirs(csv_dir)
+
+        ingest = csv_seconds = 0.0
+        for station in stations:
+            columns = {name: rng.gamma(2.0, 20.0, n_rows).astype(np.float32) for name in SHORT_NAMES}
+            start = time.perf_counter()
+            store.append_many("readings", station, timestamps, columns)
+            store.flush()
+            ingest += time.perf_counter() - start
+            start = time.perf_counter()
+            pd.DataFrame({"timestamp": timestamps, **columns}).to_csv(
+                os.path.join(csv_dir, station + ".csv"), index=False)
+            csv_seconds += time.perf_counter() - start
+        store.close()
+
+        total = n_rows * args.stations
+        print(f"\n⏱ {args.stations} stations x {args.days} days hourly = {total:,} rows x {len(SHORT_NAMES)} columns")
+        print(f"  {'ingest, store':<32} {ingest:8.2f} s   ({total / ingest:12,.0f} rows/s)")
+        print(f"  {'ingest, CSV':<32} {csv_seconds:8.2f} s   ({total / csv_seconds:12,.0f} rows/s)")
+
+        # Fresh opener, as after a restart: only the chunk index is read
+        rss_before = rss_kib()
+        store = TimeSeriesStore(os.path.join(root, "history"))
+        station = stations[len(stations) // 2]
+        week_start = end - 7 * 24 * HOUR_MS
+        bucket_ms = -(-(end - timestamps[0]) // 1000 // HOUR_MS) * HOUR_MS
+
+        def csv_frame():
+            frame = pd.read_csv(os.path.join(csv_dir, station + ".csv"))
+            return frame.set_index(pd.to_datetime(frame.pop("timestamp"), unit="ms"))
+
+        def csv_week():
+            frame = csv_frame()
+            return frame.loc[pd.to_datetime(week_start, unit="ms"):pd.to_datetime(end, unit="ms"), "rainfall"]
+
+        def csv_downsample():
+            return csv_frame()["rainfall"].resample(f"{bucket_ms // HOUR_MS}h", origin="epoch").mean()
+
+        cases = (
+            ("1-week range, store", lambda: store.range("readings", station, week_start, end, ["rainfall"])),
+            ("full-range downsample, store",
+             lambda: store.downsample("readings", station, timestamps[0], end, bucket_ms, ["rainfall"])),
+            ("1-week range, CSV + pandas", csv_week),
+            ("full-range downsample, CSV", csv_downsample),
+        )
+        results = []
+        for name, query in cases:
+            result, seconds = best_of(query, args.repeat)
+            results.append(result)
+            print(f"  {name:<32} {seconds * 1e3:8.2f} ms")
+            if len(results) == 2:
+                # Before pandas allocates anything
+                rss_after = rss_kib()
+
+        (week_times, week), (bucket_times, aggregates), csv_week_values, expected = results
+        expected = expected[expected.index >= pd.to_datetime(bucket_times[0], unit="ms")]
+        failures = 0
+        ok = np.array_equal(week["rainfall"], csv_week_values.to_numpy(dtype=np.float32))
+        failures += not ok
+        print(f"  week rows: {len(week_times)} match CSV {'✅' if ok else '❌'}")
+        ok = (len(bucket_times) <= 1000
+              and np.allclose(aggregates["rainfall"]["mean"], expected.to_numpy()[:len(bucket_times)], rtol=1e-4))
+        failures += not ok
+        print(f"  downsampled to {len(bucket_times)} buckets of {bucket_ms // HOUR_MS} h, "
+              f"means match pandas resample {'✅' if ok else '❌'}")
+        store_mib = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in
+                        os.walk(os.path.join(root, "history")) for f in files) / 2**20
+        print(f"  on disk {store_mib:.1f} MiB; resident growth from store queries "
+              f"{(rss_after - rss_before) / 1024:.1f} MiB")
+        store.close()
+    return 1 if failures else 0
+
+
+fixtures.run(main)
@@ -0,0 +1,132 @@
+"""
+Retrain time of HybridHPCPredictor with and without the artifact cache.
+
+Trains the hybrid models three times on the same synthetic dataset: without
+a cache, with an empty cache (every stage is built and stored) and again
+with the filled cache (every stage is read back), then with only the LSTM
+batch size changed (only the LSTM is refitted). Checks that the warm run
+reproduces the cold run's XGBoost predictions, and that interrupted XGBoost
+and LSTM fits resume from their checkpoints instead of starting over.
+Run from the repository root:
+
+    python benchmarks/training_cache_benchmark.py [--hours 400000] [--epochs 2]
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+import xgboost as xgb
+from dask.distributed import Client, LocalCluster
+
+import fixtures
+from model_hpc import XGB_CHECKPOINT, HybridHPCPredictor
+from sequence_windows import iter_sequence_batches
+
+
+def timed_training(log, **kwargs):
+    predictor = HybridHPCPredictor(model_dir=os.devnull)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        predictor.train_model(**kwargs)
+    return predictor, time.perf_counter() - start
+
+
+def xgb_probabilities(predictor, n_rows=2000):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n_rows, len(predictor.engineered_features)))
+    return predictor.model_xgb.predict(xgb.DMatrix(X, feature_names=predictor.engineered_features))
+
+
+def check_xgb_resume(directory, log):
+    # A checkpoint as an interrupted fit leaves it, 20 rounds in
+    predictor = HybridHPCPredictor(model_dir=os.devnull)
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(5000, 4))
+    y = (X[:, 0] + rng.normal(0, 0.5, 5000) > 1).astype(int)
+    xgb.train({'objective': 'binary:logistic', 'max_depth': 5}, xgb.DMatrix(X, label=y),
+              num_boost_round=20).save_model(os.path.join(directory, XGB_CHECKPOINT))
+
+    import dask.array as da
+    with contextlib.redirect_stdout(log):
+        booster = predictor.fit_xgb(da.from_array(X, chunks=2500), da.from_array(y, chunks=2500),
+                                    checkpoint_dir=directory)
+    return "Resuming XGBoost from round 20" in log.getvalue(), booster.num_boosted_rounds()
+
+
+def check_lstm_resume(directory, log, steps=20):
+    predictor = HybridHPCPredictor(model_dir=os.devnull)
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(2000, predictor.sequence_length, 3)).astype(np.float32)
+    y = (rng.random(2000) < 0.1).astype(np.float32)
+
+    def interrupted(batches, after):
+        for n, batch in enumerate(batches):
+            if n == after:
+                raise RuntimeError("simulated crash")
+            yield batch
+
+    with contextlib.redirect_stdout(log):
+        try:
+            # Dies half way through the second epoch
+            predictor._fit_lstm(interrupted(iter_sequence_batches(X, y, 32, seed=0), steps * 3 // 2),
+                                steps, 3, directory)
+        except Exception:
+            # Keras re-raises errors from the input generator as its own types
+            pass
+        model = predictor._fit_lstm(iter_sequence_batches(X, y, 32, seed=0), steps, 3, directory)
+    return model.history.epoch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=int, default=400_000)
+    parser.add_argument("--partitions", type=int, default=8)
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--lstm-fraction", type=float, default=0.125)
+    args = parser.parse_args()
+
+    xgb.set_config(verbosity=0)
+    logging.getLogger("distributed.shuffle").setLevel(logging.ERROR)
+    log = io.StringIO()
+    failures = 0
+    options = dict(epochs=args.epochs, n_hours=args.hours, npartitions=args.partitions,
+                   lstm_fraction=args.lstm_fraction)
+    with tempfile.TemporaryDirectory() as scratch, \
+            LocalCluster(n_workers=1, processes=False, dashboard_address=None, silence_logs=logging.ERROR), \
+            Client():
+        print(f"\n⏱ train_model on {args.hours:,} hours, {args.partitions} partitions, {args.epochs} LSTM epochs")
+        _, uncached = timed_training(log, **options)
+        print(f"  no cache       {uncached:8.1f} s")
+        cache_dir = os.path.join(scratch, "cache")
+        cold, cold_s = timed_training(log, cache_dir=cache_dir, **options)
+        print(f"  cold cache     {cold_s:8.1f} s")
+        warm, warm_s = timed_training(log, cache_dir=cache_dir, **options)
+        print(f"  warm cache     {warm_s:8.1f} s   ({cold_s / warm_s:.0f}x faster than cold)")
+        _, lstm_only = timed_training(log, cache_dir=cache_dir, batch_size=64, **options)
+        print(f"  LSTM changed   {lstm_only:8.1f} s")
+
+        ok = np.array_equal(xgb_probabilities(cold), xgb_probabilities(warm))
+        failures += not ok
+        print(f"\n🔎 Warm run reproduces the cold run's XGBoost predictions {'✅' if ok else '❌'}")
+        ok = not os.listdir(os.path.join(cache_dir, "checkpoints"))
+        failures += not ok
+        print(f"🔎 Checkpoints are dropped once a fit is cached {'✅' if ok else '❌'}")
+
+        os.makedirs(os.path.join(scratch, "xgb"))
+        resumed, rounds = check_xgb_resume(os.path.join(scratch, "xgb"), log)
+        ok = resumed and rounds == 100
+        failures += not ok
+        print(f"🔎 XGBoost resumed a 20-round checkpoint and finished at round {rounds} {'✅' if ok else '❌'}")
+        epochs = check_lstm_resume(os.path.join(scratch, "lstm"), log)
+        ok = epochs == [1, 2]
+        failures += not ok
+        print(f"🔎 LSTM interrupted in epoch 2 resumed at epochs {epochs} {'✅' if ok else '❌'}")
+    return 1 if failures else 0
+
+
+fixtures.run(main)
@@ -0,0 +1,297 @@
+"""
+Compiles the universal gradient-boosted model into flat NumPy node tables.
+
+FloodRiskPredictorStandalone loads universal_flood_model.joblib, a fitted
+sklearn GradientBoostingClassifier. Scoring it through sklearn means
+importing sklearn in every worker and paying per-call input validation
+plus one Python-level call per estimator. compile_model() flattens all
+trees into dense per-tree tables (split feature, threshold, leaf value)
+and CompiledGradientBoosting walks every tree for every row at once with
+a few vectorized gathers per tree level.
+
+The compiled tables are saved next to the joblib file as
+<name>.scorer.npz together with the SHA-256 of the joblib they came from;
+FloodRiskPredictorStandalone prefers it whenever that digest still matches.
+It only wins on small batches, though: BatchRoutedScorer hands anything
+above COMPILED_MAX_ROWS rows to the sklearn model.
+
+    python compiled_model.py [universal_flood_model.joblib]
+"""
+import hashlib
+import os
+import sys
+import threading
+import warnings
+
+import numpy as np
+
+SCORER_SUFFIX = '.scorer.npz'
+FORMAT_VERSION = 1
+# Largest acceptable |sklearn - compiled| probability difference on export
+PARITY_TOLERANCE = 1e-9
+# Largest batch scored faster by the compiled tables than by sklearn
+# (benchmarks/compiled_model_benchmark.py, universal model: 0.7 vs 0.8 ms at
+# 64 rows, 3.0 vs 1.7 ms at 256, 620 vs 210 ms at 50,000)
+COMPILED_MAX_ROWS = 64
+
+
+def scorer_path(model_path):
+    """
+    Where the compiled tables for `model_path` live (same stem, .scorer.npz).
+    """
+    return os.path.splitext(model_path)[0] + SCORER_SUFFIX
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CompiledGradientBoosting:
+    """
+    Array-backed stand-in for a binary GradientBoostingClassifier.
+
+    Every tree is stored as a complete binary tree of depth `depth` in heap
+    order: `feature` and `threshold` have shape (n_trees, 2**depth - 1),
+    `leaf_value` has shape (n_trees, 2**depth). A leaf that sklearn placed
+    higher up becomes a chain of always-left splits (infinite threshold)
+    ending in copies of its value, so every row takes exactly `depth` steps
+    down every tree and child positions are implicit (2i+1, 2i+2). Like
+    sklearn, features are compared as float32 against float64 thresholds.
+    """
+
+    # Rows scored per block; bounds the (rows, n_trees) index arrays
+    block_rows = 512
+
+    def __init__(self, feature, threshold, leaf_value, init_raw, classes, n_features):
+        self.n_trees, n_internal = feature.shape
+        self.depth = int(np.log2(n_internal + 1))
+        self.feature = feature.ravel()
+        self.threshold = threshold.ravel()
+        self.leaf_value = leaf_value.ravel()
+        self.init_raw = float(init_raw)
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features)
+        self._tree_base = np.arange(self.n_trees) * n_internal
+        # Offset from a tree's last-level heap position to its row of leaf_value
+        self._leaf_base = np.arange(self.n_trees) * (n_internal + 1) - n_internal
+
+    def decision_function(self, X):
+        """
+        Raw log-odds of the positive class, shape (n_rows,).
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected an array of shape (n, {self.n_features_in_}), got {X.shape}.")
+        if len(X) <= self.block_rows:
+            return self._raw_block(X)
+        raw = np.empty(len(X))
+        for start in range(0, len(X), self.block_rows):
+            raw[start:start + self.block_rows] = self._raw_block(X[start:start + self.block_rows])
+        return raw
+
+    def _raw_block(self, X):
+        n_rows, n_cols = X.shape
+        flat = X.ravel()
+        row_offset = np.arange(0, n_rows * n_cols, n_cols)[:, None]
+        node = np.zeros((n_rows, self.n_trees), dtype=np.intp)
+        slot = np.empty_like(node)
+        for _ in range(self.depth):
+            np.add(node, self._tree_base, out=slot)
+            # x <= threshold goes left (2i+1), otherwise right (2i+2)
+            go_right = flat[self.feature[slot] + row_offset] > self.threshold[slot]
+            node *= 2
+            node += 1
+            node += go_right
+        node += self._leaf_base
+        return self.init_raw + self.leaf_value[node].sum(axis=1)
+
+    def predict_proba(self, X):
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack((1.0 - positive, positive))
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+class BatchRoutedScorer:
+    """
+    Scores batches of up to `max_rows` rows with the compiled tables and
+    larger ones with the sklearn model.
+
+    The vectorized tree walk avoids sklearn's per-call overhead, which
+    dominates single rows and micro-batches, but its (rows, n_trees) gathers
+    lose to sklearn's Cython traversal on bulk batches. `load_model` is
+    called on the first bulk batch only, so workers that never see one never
+    import sklearn; if it returns None the compiled tables score everything.
+    """
+
+    def __init__(self, compiled, load_model, max_rows=COMPILED_MAX_ROWS):
+        self.compiled = compiled
+        self.max_rows = max_rows
+        self.classes_ = compiled.classes_
+        self.n_features_in_ = compiled.n_features_in_
+        self._load_model = load_model
+        self._model = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def bulk_model(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._model = self._load_model()
+                    self._loaded = True
+        return self._model
+
+    def predict_proba(self, X):
+        if len(X) > self.max_rows:
+            model = self.bulk_model()
+            if model is not None:
+                return model.predict_proba(X)
+        return self.compiled.predict_proba(X)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def compile_model(model, max_depth=12):
+    """
+    Flattens a fitted binary GradientBoostingClassifier into a
+    CompiledGradientBoosting. Leaf values are pre-scaled by the learning rate.
+    The dense layout grows as 2**depth, so deeper trees are refused.
+    """
+    if type(model).__name__ != 'GradientBoostingClassifier':
+        raise ValueError(f"Only GradientBoostingClassifier can be compiled, not {type(model).__name__}.")
+    if len(model.classes_) != 2 or model.estimators_.shape[1] != 1:
+        raise ValueError("Only binary classifiers can be compiled.")
+
+    # Same starting log-odds as sklearn's _init_raw_predictions
+    if model.init_ == 'zero':
+        init_raw = 0.0
+    else:
+        zeros = np.zeros((1, model.n_features_in_))
+        eps = np.finfo(np.float32).eps
+        p = float(np.clip(model.init_.predict_proba(zeros)[0, 1], eps, 1 - eps))
+        init_raw = np.log(p / (1 - p))
+
+    trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+    depth = max(1, max(tree.max_depth for tree in trees))
+    if depth > max_depth:
+        raise ValueError(f"Trees of depth {depth} are too deep for the dense layout (max {max_depth}).")
+    n_internal = 2 ** depth - 1
+    feature = np.zeros((len(trees), n_internal), dtype=np.intp)
+    threshold = np.full((len(trees), n_internal), np.inf)
+    leaf_value = np.empty((len(trees), n_internal + 1))
+
+    for t, tree in enumerate(trees):
+        is_leaf = tree.children_left == -1
+        # Heap positions of one level, filled from the sklearn nodes sitting there
+        nodes = np.zeros(1, dtype=np.intp)
+        for level in range(depth):
+            first = 2 ** level - 1
+            split = ~is_leaf[nodes]
+            feature[t, first:first + len(nodes)] = np.where(split, tree.feature[nodes], 0)
+            threshold[t, first:first + len(nodes)] = np.where(split, tree.threshold[nodes], np.inf)
+            # A leaf keeps standing in for itself on both sides
+            left = np.where(split, tree.children_left[nodes], nodes)
+            right = np.where(split, tree.children_right[nodes], nodes)
+            nodes = np.column_stack((left, right)).ravel()
+        leaf_value[t] = model.learning_rate * tree.value[nodes, 0, 0]
+
+    return CompiledGradientBoosting(
+        feature=feature, threshold=threshold, leaf_value=leaf_value, init_raw=init_raw,
+        classes=np.asarray(model.classes_), n_features=model.n_features_in_
+    )
+
+
+# -------------------- Persistence --------------------
+def save_compiled(compiled, path, source_digest=''):
+    np.savez(
+        path, format_version=FORMAT_VERSION, source_sha256=source_digest,
+        feature=compiled.feature.reshape(compiled.n_trees, -1).astype(np.int32),
+        threshold=compiled.threshold.reshape(compiled.n_trees, -1),
+        leaf_value=compiled.leaf_value.reshape(compiled.n_trees, -1),
+        init_raw=compiled.init_raw, classes=compiled.classes_, n_features=compiled.n_features_in_
+    )
+    return path
+
+
+def load_compiled(path):
+    """
+    Reads compiled tables; returns (CompiledGradientBoosting, source digest).
+    """
+    with np.load(path, allow_pickle=False) as data:
+        if int(data['format_version']) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported scorer format {int(data['format_version'])} in {path}")
+        compiled = CompiledGradientBoosting(
+            feature=data['feature'].astype(np.intp), threshold=data['threshold'],
+            leaf_value=data['leaf_value'], init_raw=data['init_raw'], classes=data['classes'],
+            n_features=data['n_features']
+        )
+        return compiled, str(data['source_sha256'])
+
+
+def load_scorer_for(model_path):
+    """
+    The compiled scorer for `model_path` if its .scorer.npz exists and was
+    exported from this exact file; otherwise None. When only the .scorer.npz
+    is deployed (no joblib), it is used as is.
+    """
+    path = scorer_path(model_path)
+    if not os.path.exists(path):
+        return None
+    compiled, source_digest = load_compiled(path)
+    if os.path.exists(model_path) and source_digest != file_digest(model_path):
+        print(f"⚠️ {path} was exported from a different model; re-run compiled_model.py")
+        return None
+    return compiled
+
+
+def parity_inputs(compiled, n_rows=10000, seed=0):
+    """
+    Random rows spread over each feature's split range (plus a margin), so
+    both sides of most thresholds are exercised.
+    """
+    rng = np.random.default_rng(seed)
+    X = np.zeros((n_rows, compiled.n_features_in_))
+    split = np.isfinite(compiled.threshold)
+    for j in range(compiled.n_features_in_):
+        thresholds = compiled.threshold[split & (compiled.feature == j)]
+        if len(thresholds):
+            lo, hi = thresholds.min(), thresholds.max()
+            margin = 0.1 * (hi - lo) + 1.0
+            X[:, j] = rng.uniform(lo - margin, hi + margin, n_rows)
+    return X
+
+
+def export(model_path, out_path=None, check_rows=10000):
+    """
+    Compiles the joblib model at `model_path`, checks it against sklearn's
+    predict_proba and writes the .scorer.npz. Returns the output path.
+    """
+    import joblib
+
+    model = joblib.load(model_path)
+    compiled = compile_model(model)
+    X = parity_inputs(compiled, check_rows)
+    with warnings.catch_warnings():
+        # Fitted on a DataFrame; the served path passes plain arrays too
+        warnings.simplefilter('ignore', UserWarning)
+        reference = model.predict_proba(X)
+    error = np.abs(reference - compiled.predict_proba(X)).max()
+    if error > PARITY_TOLERANCE:
+        raise ValueError(f"Compiled scorer disagrees with sklearn (max |Δp| = {error:.3g}).")
+    print(f"✅ Parity on {check_rows} rows: max |Δp| = {error:.3g}")
+
+    out_path = out_path or scorer_path(model_path)
+    save_compiled(compiled, out_path, file_digest(model_path))
+    print(f"✅ {compiled.n_trees} trees of depth {compiled.depth} -> {out_path}")
+    return out_path
+
+
+if __name__ == "__main__":
+    export(sys.argv[1] if len(sys.argv) > 1 else 'universal_flood_model.joblib')
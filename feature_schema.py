@@ -0,0 +1,264 @@
+"""
+The universal model's input schema, shared by every path that builds features.
+
+FEATURES fixes the column order the model was trained on, together with each
+feature's unit, the short name used by the dashboard readings (/fetch_data)
+and a generous physically plausible range. The decoders below turn request
+bodies - JSON rows, JSON columns, .npy arrays or Arrow IPC tables - into one
+preallocated float32 matrix in that order (the dtype the tree models compare
+in), then validate every value against its range in a single vectorized
+pass. Only rows that fail are looked at individually, to word their error.
+"""
+import io
+from collections import namedtuple
+from operator import itemgetter
+
+import numpy as np
+
+Feature = namedtuple('Feature', 'name short_name unit low high')
+
+FEATURES = (
+    Feature('rainfall_mm', 'rainfall', 'mm', 0.0, 2000.0),
+    Feature('river_discharge_cumec', 'river_discharge', 'm³/s', 0.0, 300000.0),
+    Feature('water_level_m', 'water_level', 'm', -50.0, 200.0),
+    Feature('soil_moisture_percent', 'soil_moisture', '%', 0.0, 100.0),
+    Feature('temperature_c', 'temperature', '°C', -90.0, 60.0),
+    Feature('humidity_percent', 'humidity', '%', 0.0, 100.0),
+    Feature('wind_speed_ms', 'wind_speed', 'm/s', 0.0, 120.0),
+    Feature('pressure_hpa', 'pressure', 'hPa', 800.0, 1100.0),
+    Feature('elevation_m', 'elevation', 'm', -500.0, 9000.0),
+    Feature('population_density', 'population_density', 'people/km²', 0.0, 100000.0),
+    Feature('drainage_efficiency', 'drainage_efficiency', 'fraction', 0.0, 1.0),
+    Feature('distance_to_coast_km', 'distance_to_coast', 'km', 0.0, 5000.0),
+    Feature('deforestation_index', 'deforestation_index', 'fraction', 0.0, 1.0),
+)
+
+FEATURE_NAMES = tuple(feature.name for feature in FEATURES)
+SHORT_NAMES = tuple(feature.short_name for feature in FEATURES)
+DTYPE = np.float32
+LOWER = np.array([feature.low for feature in FEATURES], dtype=DTYPE)
+UPPER = np.array([feature.high for feature in FEATURES], dtype=DTYPE)
+
+NPY_MIMETYPES = ('application/x-npy', 'application/npy')
+ARROW_MIMETYPES = ('application/vnd.apache.arrow.stream', 'application/vnd.apache.arrow.file')
+
+_row_values = itemgetter(*FEATURE_NAMES)
+
+
+def empty_matrix(n_rows):
+    return np.empty((n_rows, len(FEATURES)), dtype=DTYPE)
+
+
+# -------------------- Validation --------------------
+def validate(features, errors=None):
+    """
+    Range-checks an (N, n_features) matrix in one pass. Returns a
+    {row_index: error message} dict (extending `errors` if given); rows that
+    already have an error keep it.
+    """
+    errors = {} if errors is None else errors
+    # NaN fails both comparisons, so it is caught here as well
+    in_range = (features >= LOWER) & (features <= UPPER)
+    for i in np.flatnonzero(~in_range.all(axis=1)):
+        i = int(i)
+        if i in errors:
+            continue
+        j = int(np.argmin(in_range[i]))
+        if not np.isfinite(features[i, j]):
+            errors[i] = "❌ Invalid parameter value(s): all parameters must be finite numbers."
+        else:
+            feature = FEATURES[j]
+            errors[i] = (f"❌ Value out of range for parameter: '{feature.name}' "
+                         f"(expected {feature.low:g} to {feature.high:g} {feature.unit}).")
+    return errors
+
+
+# -------------------- JSON decoding --------------------
+def decode_row(params, check_range=True):
+    """
+    One (1, n_features) row from a dict of feature values; raises ValueError
+    on a missing, non-numeric or (with check_range) out-of-range value.
+    """
+    for name in FEATURE_NAMES:
+        if name not in params:
+            raise ValueError(f"❌ Missing parameter: '{name}'. All required parameters must be provided.")
+    features = empty_matrix(1)
+    try:
+        features[0] = _row_values(params)
+    except (TypeError, ValueError):
+        raise ValueError("❌ Invalid parameter value(s): all parameters must be numeric.")
+    if check_range:
+        raise_invalid(features)
+    return features
+
+
+def lookup(params, default=0.0):
+    """
+    Feature values in schema order from a dict keyed by either the full or
+    the short feature names; absent features take `default`. No validation.
+    """
+    return np.array([
+        params.get(feature.name, params.get(feature.short_name, default)) for feature in FEATURES
+    ], dtype=np.float64)
+
+
+def raise_invalid(features):
+    """
+    Raises ValueError with the first row's error, if any row is invalid.
+    """
+    errors = validate(features)
+    if errors:
+        raise ValueError(errors[min(errors)])
+
+
+def decode_rows(rows):
+    """
+    Matrix plus {row_index: error} from a list of feature dicts. Rows are
+    converted in one np.array call; only if that fails is each row retried
+    on its own to find the culprits.
+    """
+    features = empty_matrix(len(rows))
+    errors = {}
+    try:
+        features[:] = [_row_values(row) for row in rows]
+    except (KeyError, TypeError, ValueError):
+        for i, row in enumerate(rows):
+            try:
+                features[i] = _row_values(row)
+            except KeyError as e:
+                features[i] = np.nan
+                errors[i] = f"❌ Missing parameter: {e}. All required parameters must be provided."
+            except (TypeError, ValueError):
+                features[i] = np.nan
+                errors[i] = "❌ Invalid parameter value(s): all parameters must be numeric."
+    return features, validate(features, errors)
+
+
+def decode_columns(columns):
+    """
+    Matrix plus {row_index: error} from a {feature: [values, ...]} mapping.
+    Missing columns or unequal lengths fail the whole payload (ValueError).
+    """
+    missing = [name for name in FEATURE_NAMES if name not in columns]
+    if missing:
+        raise ValueError(f"❌ Missing column(s): {', '.join(missing)}")
+    not_lists = [name for name in FEATURE_NAMES if not isinstance(columns[name], (list, tuple, np.ndarray))]
+    if not_lists:
+        raise ValueError(f"❌ Column(s) must be lists of values: {', '.join(not_lists)}")
+    lengths = {len(columns[name]) for name in FEATURE_NAMES}
+    if len(lengths) != 1:
+        raise ValueError("❌ All feature columns must have the same length.")
+
+    features = empty_matrix(lengths.pop())
+    errors = {}
+    for j, name in enumerate(FEATURE_NAMES):
+        try:
+            features[:, j] = np.asarray(columns[name], dtype=DTYPE)
+        except (TypeError, ValueError):
+            # Fall back to per-value conversion to find the bad rows
+            for i, value in enumerate(columns[name]):
+                try:
+                    features[i, j] = float(value)
+                except (TypeError, ValueError):
+                    features[i, j] = np.nan
+                    errors.setdefault(i, f"❌ Invalid value for parameter: '{name}'")
+    return features, validate(features, errors)
+
+
+def decode_records(records):
+    """
+    Matrix plus {row_index: error} from row dicts, a columnar mapping or an
+    already assembled (N, n_features) array.
+    """
+    if isinstance(records, np.ndarray):
+        return decode_array(records)
+    if isinstance(records, dict):
+        return decode_columns(records)
+    return decode_rows(records)
+
+
+# -------------------- Binary decoding --------------------
+def decode_array(array):
+    """
+    Matrix plus {row_index: error} from an (N, n_features) array in
+    FEATURE_NAMES order, or a structured array with those field names.
+    C-ordered float32 input is used as is, without a copy.
+    """
+    if array.dtype.names:
+        missing = [name for name in FEATURE_NAMES if name not in array.dtype.names]
+        if missing:
+            raise ValueError(f"❌ Missing column(s): {', '.join(missing)}")
+        features = empty_matrix(len(array))
+        for j, name in enumerate(FEATURE_NAMES):
+            features[:, j] = array[name]
+    else:
+        if array.ndim != 2 or array.shape[1] != len(FEATURES):
+            raise ValueError(f"❌ Expected an array of shape (N, {len(FEATURES)}), got {array.shape}.")
+        try:
+            features = np.ascontiguousarray(array, dtype=DTYPE)
+        except (TypeError, ValueError):
+            raise ValueError("❌ Invalid parameter value(s): all parameters must be numeric.")
+    return features, validate(features)
+
+
+def decode_npy(body):
+    """
+    Decodes a .npy request body. Plain arrays are viewed straight out of
+    the body bytes; only a dtype conversion copies.
+    """
+    stream = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    except ValueError as e:
+        raise ValueError(f"❌ Invalid .npy body: {e}")
+    if dtype.hasobject:
+        raise ValueError("❌ Object arrays are not accepted.")
+    count = int(np.prod(shape))
+    if len(body) - stream.tell() < count * dtype.itemsize:
+        raise ValueError("❌ Truncated .npy body.")
+    array = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+    array = array.reshape(shape[::-1]).T if fortran_order else array.reshape(shape)
+    return decode_array(array)
+
+
+def decode_arrow(body):
+    """
+    Decodes an Arrow IPC body (stream or file format) whose columns are
+    named after the features. Needs pyarrow.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise RuntimeError("Decoding Arrow requires pyarrow (pip install pyarrow).")
+
+    try:
+        reader = pa.ipc.open_stream(body) if not body.startswith(b'ARROW1') else pa.ipc.open_file(body)
+        table = reader.read_all()
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"❌ Invalid Arrow body: {e}")
+    missing = [name for name in FEATURE_NAMES if name not in table.column_names]
+    if missing:
+        raise ValueError(f"❌ Missing column(s): {', '.join(missing)}")
+
+    features = empty_matrix(table.num_rows)
+    for j, name in enumerate(FEATURE_NAMES):
+        # Nulls become NaN and are then reported by validate()
+        column = table.column(name).cast(pa.float32())
+        features[:, j] = column.to_numpy(zero_copy_only=False)
+    return features, validate(features)
+
+
+def decode_body(body, mimetype):
+    """
+    Decodes a binary request body by MIME type; None if it is not one of
+    the binary formats (the caller falls back to JSON).
+    """
+    if mimetype in NPY_MIMETYPES:
+        return decode_npy(body)
+    if mimetype in ARROW_MIMETYPES:
+        return decode_arrow(body)
+    return None
@@ -1,71 +1,208 @@
-import joblib
+import os
+import threading
 import numpy as np
+
+import feature_schema
 from datetime import datetime
+from time import perf_counter
+
+# Probability cut-offs between consecutive risk levels (ascending)
+RISK_THRESHOLDS = np.array([0.25, 0.45, 0.65, 0.85])
+RISK_LEVELS = np.array(["🟢 SAFE", "🟡 LOW", "🟠 MEDIUM", "🔴 HIGH", "🚨 CRITICAL"], dtype=object)
+RECOMMENDATIONS = np.array([
+    "Current conditions appear normal.",
+    "Stay alert and monitor weather updates.",
+    "Monitor conditions closely. Prepare emergency supplies.",
+    "Take immediate precautionary measures. Prepare for potential evacuation.",
+    "IMMEDIATE EVACUATION may be required! Contact authorities."
+], dtype=object)
+
+# Optional observer for per-stage timings (see set_stage_observer)
+_stage_observer = None
+
+def set_stage_observer(observer):
+    """
+    Registers a callable that receives ((stage, seconds), ...) once per
+    predict()/predict_many() call, for the stages feature_assembly,
+    validation (predict() only), predict_proba and result. Pass None to stop reporting.
+    """
+    global _stage_observer
+    _stage_observer = observer
 
 class FloodRiskPredictorStandalone:
-    def __init__(self, model_path='universal_flood_model.joblib'):
+    def __init__(self, model_path='universal_flood_model.joblib', lazy=False, mmap_mode='r', compiled=True):
         """
         Loads the pre-trained model and required feature columns.
+
+        With lazy=True the model is only read from disk on first use (or by
+        warm_up()), so importing the app and serving static pages never waits
+        on it. mmap_mode='r' memory-maps the tree arrays so forked workers
+        share them through the page cache instead of each holding a copy.
+
+        With compiled=True a matching <name>.scorer.npz written by
+        compiled_model.py is used instead of the joblib file for small
+        batches: the same trees as flat NumPy tables, scored without
+        importing sklearn. Bulk batches still go to the joblib model, which
+        is then loaded on first use (see compiled_model.BatchRoutedScorer).
+        """
+        self.model_path = model_path
+        self.mmap_mode = mmap_mode
+        self.compiled = compiled
+        self._model = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+        if not lazy:
+            self.load()
+
+        # The training order, defined once in feature_schema
+        self.feature_columns = list(feature_schema.FEATURE_NAMES)
+
+    @property
+    def model(self):
+        if not self._loaded:
+            self.load()
+        return self._model
+
+    @model.setter
+    def model(self, value):
+        self._model = value
+        self._loaded = True
+
+    def load(self):
         """
-        print(f"🔄 Loading model from {model_path}...")
+        Reads the model from disk once; concurrent callers wait for the first.
+        """
+        with self._load_lock:
+            if self._loaded:
+                return self._model
+
+            if self.compiled:
+                import compiled_model
+                try:
+                    self._model = compiled_model.load_scorer_for(self.model_path)
+                except Exception as e:
+                    print(f"⚠️ Could not load the compiled scorer, falling back to joblib. {e}")
+                if self._model is not None:
+                    print(f"✅ Compiled scorer loaded from {compiled_model.scorer_path(self.model_path)}")
+                    if os.path.exists(self.model_path):
+                        self._model = compiled_model.BatchRoutedScorer(self._model, self._load_joblib)
+                    self._loaded = True
+                    return self._model
+
+            self._model = self._load_joblib()
+            self._loaded = True
+            return self._model
+
+    def _load_joblib(self):
+        # joblib pulls in a fair amount of machinery, so defer it until needed
+        import joblib
+
+        print(f"🔄 Loading model from {self.model_path}...")
         try:
-            self.model = joblib.load(model_path)
+            model = joblib.load(self.model_path, mmap_mode=self.mmap_mode)
             print("✅ Model loaded successfully.")
+            return model
         except FileNotFoundError:
-            print(f"❌ ERROR: Model file not found at {model_path}")
+            print(f"❌ ERROR: Model file not found at {self.model_path}")
             print("Please run the 'flood_predictor.py' script first to train and save the model.")
-            self.model = None
         except Exception as e:
             print(f"❌ ERROR: Could not load model. {e}")
-            self.model = None
+        return None
 
-        # This MUST match the order used during training in flood_predictor.py
-        self.feature_columns = [
-            'rainfall_mm', 'river_discharge_cumec', 'water_level_m',
-            'soil_moisture_percent', 'temperature_c', 'humidity_percent', 'wind_speed_ms',
-            'pressure_hpa', 'elevation_m', 'population_density', 'drainage_efficiency',
-            'distance_to_coast_km', 'deforestation_index'
-        ]
+    def warm_up(self):
+        """
+        Loads the model on a background thread so the first request is fast.
+        """
+        thread = threading.Thread(target=self.load, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
 
     def predict(self, **kwargs):
         """
         Predicts flood risk from a dictionary of physical conditions.
         """
-        if self.model is None:
+        model = self.model
+        if model is None:
             raise RuntimeError("Model is not loaded. Cannot make predictions.")
 
-        # Validate that all required features are present
-        try:
-            # Prepare feature vector in the exact order
-            features = np.array([kwargs[param] for param in self.feature_columns]).reshape(1, -1)
-        except KeyError as e:
-            raise ValueError(f"❌ Missing parameter: {e}. All required parameters must be provided.")
-        
-        # Make prediction
-        prediction = self.model.predict(features)[0]
-        probability = self.model.predict_proba(features)[0][1]
+        # Float32 feature vector in the exact order (raises on missing/non-numeric values)
+        t0 = perf_counter()
+        features = feature_schema.decode_row(kwargs, check_range=False)
+        t1 = perf_counter()
+
+        # Validate every value against its physical range
+        feature_schema.raise_invalid(features)
+        t2 = perf_counter()
+
+        # Make prediction (one pass; the class is the argmax, as predict() does)
+        proba = model.predict_proba(features)[0]
+        prediction = model.classes_[proba.argmax()]
+        probability = proba[1]
+        t3 = perf_counter()
 
         # Risk assessment and recommendation logic
-        if probability >= 0.85:
-            risk_level = "🚨 CRITICAL"
-            recommendation = "IMMEDIATE EVACUATION may be required! Contact authorities."
-        elif probability >= 0.65:
-            risk_level = "🔴 HIGH"
-            recommendation = "Take immediate precautionary measures. Prepare for potential evacuation."
-        elif probability >= 0.45:
-            risk_level = "🟠 MEDIUM"
-            recommendation = "Monitor conditions closely. Prepare emergency supplies."
-        elif probability >= 0.25:
-            risk_level = "🟡 LOW"
-            recommendation = "Stay alert and monitor weather updates."
-        else:
-            risk_level = "🟢 SAFE"
-            recommendation = "Current conditions appear normal."
-
-        return {
+        level = np.searchsorted(RISK_THRESHOLDS, probability, side='right')
+        risk_level = RISK_LEVELS[level]
+        recommendation = RECOMMENDATIONS[level]
+
+        result = {
             'prediction': 'FLOOD WARNING' if prediction == 1 else 'NORMAL CONDITIONS',
             'probability': round(probability, 3),
             'risk_level': risk_level,
             'recommendation': recommendation,
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
+
+        observe = _stage_observer
+        if observe is not None:
+            observe((('feature_assembly', t1 - t0), ('validation', t2 - t1),
+                     ('predict_proba', t3 - t2), ('result', perf_counter() - t3)))
+        return result
+
+    def predict_many(self, records):
+        """
+        Predicts flood risk for many locations in one pass.
+
+        `records` is a list of dicts (one per location), a columnar dict
+        mapping each feature name to a list of values, or an (N, n_features)
+        array already decoded by feature_schema. All valid rows are
+        scored with a single predict_proba call. Results are returned in input
+        order; rows that fail validation carry an 'error' message instead.
+        """
+        if self.model is None:
+            raise RuntimeError("Model is not loaded. Cannot make predictions.")
+
+        t0 = perf_counter()
+        features, errors = feature_schema.decode_records(records)
+        results = [{'error': errors[i]} if i in errors else None for i in range(len(features))]
+        t1 = perf_counter()
+
+        valid = np.ones(len(features), dtype=bool)
+        valid[list(errors)] = False
+        if not valid.any():
+            return results
+
+        proba = self.model.predict_proba(features[valid])
+        t2 = perf_counter()
+        predictions = self.model.classes_[proba.argmax(axis=1)]
+        probabilities = proba[:, 1]
+        levels = np.searchsorted(RISK_THRESHOLDS, probabilities, side='right')
+        risk_levels = RISK_LEVELS[levels]
+        recommendations = RECOMMENDATIONS[levels]
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        for j, i in enumerate(np.flatnonzero(valid)):
+            results[i] = {
+                'prediction': 'FLOOD WARNING' if predictions[j] == 1 else 'NORMAL CONDITIONS',
+                'probability': round(float(probabilities[j]), 3),
+                'risk_level': risk_levels[j],
+                'recommendation': recommendations[j],
+                'timestamp': timestamp
+            }
+
+        observe = _stage_observer
+        if observe is not None:
+            # Validation and assembly happen together in feature_schema.decode_records
+            observe((('feature_assembly', t1 - t0), ('predict_proba', t2 - t1), ('result', perf_counter() - t2)))
+        return results
@@ -0,0 +1,158 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+import uuid
+
+import joblib
+import dask.dataframe as dd
+
+MANIFEST = "manifest.json"
+
+
+def code_hash(*objects):
+    """
+    Hash of the source code of functions, methods or classes (repr for
+    anything else, e.g. module constants), so editing a stage invalidates it.
+    """
+    digest = hashlib.sha256()
+    for obj in objects:
+        try:
+            text = inspect.getsource(obj)
+        except (TypeError, OSError):
+            text = repr(obj)
+        digest.update(text.encode())
+    return digest.hexdigest()
+
+
+def path_signature(path):
+    """
+    (relative path, size, mtime) of every file under `path` - a cheap stand-in
+    for hashing the contents of large input datasets.
+    """
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return [[os.path.basename(path), stat.st_size, stat.st_mtime_ns]]
+    signature = []
+    for directory, _, files in sorted(os.walk(path)):
+        for name in sorted(files):
+            stat = os.stat(os.path.join(directory, name))
+            signature.append([os.path.relpath(os.path.join(directory, name), path), stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+class ArtifactCache:
+    """
+    Content-addressed store for intermediate training stages.
+
+    Every artifact lives in its own directory named after a key that hashes
+    the stage name, its configuration, the source code of the functions that
+    produce it and the keys of the artifacts it was built from. Changing any
+    of them yields a new key, so a stale artifact is never read back, while
+    unchanged stages are reused across runs.
+
+    Artifacts are written to a hidden staging directory and renamed into
+    place together with their manifest, so a run interrupted mid-write
+    never leaves a directory that looks complete. Checkpoints of model fits
+    in progress live apart from the artifacts, under checkpoints/<key>.
+
+    With root=None nothing is stored: every stage is built and no
+    checkpoints are written.
+    """
+
+    def __init__(self, root="artifact_cache"):
+        self.root = root
+
+    @property
+    def enabled(self):
+        return self.root is not None
+
+    def key(self, stage, config=None, code=(), parents=()):
+        payload = json.dumps({
+            'stage': stage,
+            'config': config,
+            'code': code_hash(*code),
+            'parents': list(parents),
+        }, sort_keys=True, default=str)
+        return f"{stage}-{hashlib.sha256(payload.encode()).hexdigest()[:16]}"
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def has(self, key):
+        return self.enabled and os.path.exists(os.path.join(self.path(key), MANIFEST))
+
+    # ---------------- Building ----------------
+    def build(self, key, write):
+        """
+        Returns the artifact directory for `key`, calling write(directory)
+        to produce it first unless it is already cached.
+        """
+        target = self.path(key)
+        if self.has(key):
+            print(f"♻ Reusing cached {key}")
+            return target
+
+        os.makedirs(self.root, exist_ok=True)
+        staging = os.path.join(self.root, f".staging-{key}-{uuid.uuid4().hex[:8]}")
+        os.makedirs(staging)
+        try:
+            start = time.perf_counter()
+            write(staging)
+            with open(os.path.join(staging, MANIFEST), 'w') as f:
+                json.dump({'key': key, 'created': time.time(),
+                           'build_seconds': round(time.perf_counter() - start, 3)}, f)
+            if self.has(key):
+                # Another run finished the same artifact first
+                shutil.rmtree(staging)
+            else:
+                # Drop a leftover without a manifest before renaming over it
+                shutil.rmtree(target, ignore_errors=True)
+                os.replace(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        print(f"💾 Cached {key}")
+        return target
+
+    def frame(self, key, make):
+        """
+        A Dask frame stored as Parquet partitions; make() builds it on a miss.
+        The index is written too, so divisions are known when it is read back.
+        """
+        if not self.enabled:
+            return make()
+        directory = self.build(key, lambda d: make().to_parquet(os.path.join(d, "data"), write_index=True))
+        return dd.read_parquet(os.path.join(directory, "data"), calculate_divisions=True)
+
+    def object(self, key, make):
+        """
+        A picklable object (e.g. a fitted scaler); make() builds it on a miss.
+        """
+        if not self.enabled:
+            return make()
+        built = []
+
+        def write(directory):
+            built.append(make())
+            joblib.dump(built[0], os.path.join(directory, "object.joblib"))
+
+        directory = self.build(key, write)
+        return built[0] if built else joblib.load(os.path.join(directory, "object.joblib"))
+
+    # ---------------- Checkpoints ----------------
+    def checkpoint_dir(self, key):
+        """
+        Directory for resumable checkpoints of the fit producing `key`.
+        """
+        if not self.enabled:
+            return None
+        directory = os.path.join(self.root, "checkpoints", key)
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def discard_checkpoints(self, key):
+        if self.enabled:
+            shutil.rmtree(os.path.join(self.root, "checkpoints", key), ignore_errors=True)
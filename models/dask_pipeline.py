@@ -0,0 +1,321 @@
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import dask
+import dask.dataframe as dd
+
+from sequence_windows import create_sequence_data, iter_sequence_batches
+from streaming_features import (
+    RAINFALL_SUM_WINDOW, WATER_LEVEL_AVG_WINDOW, WATER_LEVEL_DIFF, DISCHARGE_LAG
+)
+
+BASE_FEATURES = ["rainfall", "discharge", "water_level"]
+LABEL = "flood_occurred"
+FLOOD_QUANTILE = 0.95
+ROWS_PER_PARTITION = 100_000
+
+# Rows a partition needs from its predecessor for the longest look-back
+FEATURE_OVERLAP = max(RAINFALL_SUM_WINDOW - 1, WATER_LEVEL_AVG_WINDOW - 1, WATER_LEVEL_DIFF, DISCHARGE_LAG)
+
+
+# -------------------- Data generation / loading --------------------
+def generate_partition(start, stop, seed):
+    """
+    Rows [start, stop) of the synthetic dataset as a pandas frame, from the
+    same process as HybridHPCPredictor.generate_dataset.
+    """
+    n_hours = stop - start
+    rng = np.random.default_rng(seed)
+    rainfall = rng.uniform(0, 30, n_hours)
+    storm_indices = rng.integers(0, n_hours, n_hours // 50)
+    rainfall[storm_indices] += rng.uniform(20, 50, len(storm_indices))
+
+    discharge = rainfall * 2 + rng.normal(0, 1, n_hours)
+    water_level = 1.5 + discharge * 0.05 + rng.normal(0, 0.2, n_hours)
+    water_level = np.clip(water_level, 0, None)
+
+    data = np.stack([rainfall, discharge, water_level], axis=1)
+    return pd.DataFrame(data, columns=BASE_FEATURES, index=pd.RangeIndex(start, stop))
+
+
+def generate_partitioned_dataset(n_hours, npartitions=None, seed=42, threshold=None):
+    """
+    Lazily generates `n_hours` of synthetic data, one task per partition.
+
+    Every partition is produced on a worker with its own spawned seed, so the
+    dataset never has to exist in the driver's memory. The hourly index and
+    divisions are known, which keeps chronological slicing partition-aware.
+    Floods are labelled by label_floods (with `threshold` if given).
+    """
+    npartitions = npartitions or math.ceil(n_hours / ROWS_PER_PARTITION)
+    bounds = np.linspace(0, n_hours, npartitions + 1).astype(int)
+    seeds = np.random.SeedSequence(seed).spawn(npartitions)
+    parts = [
+        dask.delayed(generate_partition)(int(start), int(stop), part_seed)
+        for start, stop, part_seed in zip(bounds[:-1], bounds[1:], seeds)
+    ]
+    meta = generate_partition(0, 0, 0)
+    divisions = [int(b) for b in bounds[:-1]] + [int(bounds[-1]) - 1]
+    print(f"🌧 Generating {n_hours} hours of synthetic data in {npartitions} partitions...")
+    return label_floods(dd.from_delayed(parts, meta=meta, divisions=divisions), threshold=threshold)
+
+
+def read_dataset(path, threshold=None):
+    """
+    Reads hourly base features from Parquet, labelling floods if needed.
+    """
+    ddf = dd.read_parquet(path)
+    if LABEL not in ddf.columns:
+        ddf = label_floods(ddf, threshold=threshold)
+    return ddf
+
+
+def flood_threshold(ddf, quantile=FLOOD_QUANTILE):
+    """
+    The dataset-wide water-level quantile, computed now (one pass).
+    """
+    return float(ddf['water_level'].quantile(quantile).compute())
+
+
+def label_floods(ddf, quantile=FLOOD_QUANTILE, threshold=None):
+    """
+    Flags hours above the dataset-wide water-level quantile.
+
+    Without a `threshold` the quantile stays a lazy Dask scalar, so building
+    the graph reads no data; it is computed along with whatever first needs
+    the labels. Dask's quantile is approximate but streams over partitions
+    rather than collecting the column on the driver. A frame that will be
+    computed piecewise many times should get a precomputed threshold (see
+    flood_threshold), or every compute redoes the quantile.
+    """
+    if threshold is None:
+        threshold = ddf['water_level'].quantile(quantile)
+    return ddf.assign(**{LABEL: (ddf['water_level'] > threshold).astype(int)})
+
+
+# -------------------- Feature engineering --------------------
+def engineer_frame(df):
+    """
+    Adds the engineered columns to one pandas frame (NaN where history is short).
+    """
+    df = df.copy()
+    df['rainfall_24h_sum'] = df['rainfall'].rolling(window=RAINFALL_SUM_WINDOW).sum()
+    df['water_level_6h_avg'] = df['water_level'].rolling(window=WATER_LEVEL_AVG_WINDOW).mean()
+    df['water_level_diff_1h'] = df['water_level'].diff(WATER_LEVEL_DIFF)
+    df['discharge_lag_3h'] = df['discharge'].shift(DISCHARGE_LAG)
+    return df
+
+
+def engineer_features(ddf):
+    """
+    Engineers features for a pandas or Dask frame and drops incomplete rows.
+
+    For Dask, a single map_overlap pass borrows FEATURE_OVERLAP rows from each
+    previous partition, so windows spanning partition edges are correct.
+    """
+    if isinstance(ddf, pd.DataFrame):
+        return engineer_frame(ddf).dropna()
+    meta = engineer_frame(ddf._meta)
+    return ddf.map_overlap(engineer_frame, before=FEATURE_OVERLAP, after=0, meta=meta).dropna()
+
+
+# -------------------- Chronological splitting --------------------
+def time_slice(ddf, lo_frac, hi_frac):
+    """
+    Rows between two fractions of the way through the time index.
+
+    With known divisions the cut is made on the index (start + frac * span)
+    and .loc prunes partitions outside the range; otherwise whole partitions
+    are taken in order. Nothing is collected to the driver either way.
+    """
+    if not ddf.known_divisions:
+        n = ddf.npartitions
+        lo, hi = round(n * lo_frac), round(n * hi_frac)
+        return ddf.partitions[lo:max(hi, lo + 1)]
+
+    start, stop = ddf.divisions[0], ddf.divisions[-1]
+    lo = start + (stop - start) * lo_frac
+    hi = start + (stop - start) * hi_frac
+    part = ddf.loc[lo:hi] if hi_frac < 1 else ddf.loc[lo:]
+    if hi_frac < 1:
+        # .loc is inclusive; keep the upper bound exclusive so folds never overlap
+        part = part.map_partitions(_before, hi, meta=part._meta)
+    return part
+
+
+def _before(df, bound):
+    return df[df.index < bound]
+
+
+def chronological_split(ddf, train_frac=0.8):
+    """
+    (train, test): the first `train_frac` of the time span, then the rest.
+    """
+    return time_slice(ddf, 0, train_frac), time_slice(ddf, train_frac, 1)
+
+
+def walk_forward_splits(ddf, n_splits=4, test_frac=0.1, expanding=True, window_frac=None):
+    """
+    Rolling-origin folds: each test block follows its training block in time.
+
+    The last `n_splits * test_frac` of the span is cut into consecutive test
+    blocks. Training uses everything before the block (expanding) or only the
+    preceding `window_frac` of the span (rolling).
+    """
+    if n_splits * test_frac >= 1:
+        raise ValueError("n_splits * test_frac must leave room for training data.")
+    folds = []
+    for k in range(n_splits):
+        origin = 1 - (n_splits - k) * test_frac
+        train_lo = 0 if expanding else max(0, origin - (window_frac or origin))
+        folds.append((time_slice(ddf, train_lo, origin), time_slice(ddf, origin, origin + test_frac)))
+    return folds
+
+
+def _partial_scores(frame, bins):
+    y = frame['y'].to_numpy(dtype=float)
+    p = np.clip(frame['p'].to_numpy(dtype=float), 1e-7, 1 - 1e-7)
+    edges = np.linspace(0, 1, bins + 1)
+    totals = np.array([
+        len(y),
+        -(y * np.log(p) + (1 - y) * np.log(1 - p)).sum(),
+        ((p - y) ** 2).sum(),
+        ((p > 0.5) == (y == 1)).sum(),
+    ])
+    return totals, np.histogram(p[y == 1], edges)[0], np.histogram(p[y == 0], edges)[0]
+
+
+def evaluate_predictions(y, prob, bins=1000):
+    """
+    Held-out skill from per-partition partial sums (only small arrays reach the driver).
+
+    Returns log-loss, Brier score, accuracy at 0.5 and ROC-AUC from
+    `bins`-bucket probability histograms (exact to the bucket width).
+    """
+    frame = y.to_frame('y').assign(p=prob)
+    partials = dask.compute(*[dask.delayed(_partial_scores)(part, bins) for part in frame.to_delayed()])
+    totals = sum(p[0] for p in partials)
+    pos = sum(p[1] for p in partials)
+    neg = sum(p[2] for p in partials)
+
+    n = totals[0]
+    n_pos, n_neg = pos.sum(), neg.sum()
+    # Pairs where the positive scores higher, ties within a bucket count half
+    neg_below = np.concatenate([[0], np.cumsum(neg)[:-1]])
+    auc = ((pos * (neg_below + 0.5 * neg)).sum() / (n_pos * n_neg)) if n_pos and n_neg else float('nan')
+    return {
+        'rows': int(n),
+        'log_loss': float(totals[1] / n),
+        'brier': float(totals[2] / n),
+        'accuracy': float(totals[3] / n),
+        'roc_auc': float(auc),
+    }
+
+
+# -------------------- LSTM streaming --------------------
+def fit_standard_scaler(ddf, columns, scaler):
+    """
+    Fits an sklearn StandardScaler from Dask reductions (one pass, no collect).
+    """
+    mean, var, count = dask.compute(ddf[columns].mean(), ddf[columns].var(ddof=0), ddf[columns[0]].count())
+    scale = np.sqrt(var.values)
+    scale[scale == 0] = 1.0
+    scaler.mean_ = mean.values
+    scaler.var_ = var.values
+    scaler.scale_ = scale
+    scaler.n_features_in_ = len(columns)
+    scaler.n_samples_seen_ = int(count)
+    return scaler
+
+
+def count_sequence_batches(ddf, partitions, sequence_length, batch_size):
+    """
+    Batches per epoch yielded by partition_sequence_batches. Only the
+    selected partitions are computed.
+    """
+    lengths = ddf.partitions[[int(i) for i in partitions]].map_partitions(len).compute()
+    return sum(math.ceil(max(int(length) - sequence_length, 0) / batch_size) for length in lengths)
+
+
+def partition_sequence_batches(ddf, columns, scaler, sequence_length, label_offset,
+                               batch_size=32, partitions=None, seed=None):
+    """
+    Endless generator of LSTM (X, y) batches, streamed partition by partition.
+
+    Only the current partition (plus one prefetched in the background) is held
+    in memory. Partition order and the windows inside each partition are
+    reshuffled every epoch; windows never span two partitions.
+    """
+    rng = np.random.default_rng(seed)
+    partitions = list(range(ddf.npartitions)) if partitions is None else list(partitions)
+    if not partitions:
+        raise ValueError("No partitions to batch.")
+
+    def load(i):
+        return ddf.partitions[int(i)].compute()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        while True:
+            order = rng.permutation(partitions)
+            pending = pool.submit(load, order[0])
+            for k in range(len(order)):
+                part = pending.result()
+                if k + 1 < len(order):
+                    pending = pool.submit(load, order[k + 1])
+                scaled = scaler.transform(part[columns].values)
+                X, y = create_sequence_data(scaled, part[LABEL].values, sequence_length, label_offset)
+                yield from iter_sequence_batches(X, y, batch_size, seed=int(rng.integers(2**32)), repeat=False)
+
+
+def write_sequence_shards(ddf, columns, scaler, partitions, directory):
+    """
+    Writes the scaled features and labels of each partition as .npy shards.
+
+    Shards are float32 (what the LSTM computes in) and are read back
+    memory-mapped, so later epochs and runs skip both the Dask compute and
+    the scaling of every partition.
+    """
+    for i in partitions:
+        part = ddf.partitions[int(i)].compute()
+        np.save(os.path.join(directory, f"features-{int(i)}.npy"),
+                scaler.transform(part[columns].values).astype(np.float32))
+        np.save(os.path.join(directory, f"labels-{int(i)}.npy"), part[LABEL].values)
+
+
+def _shard_ids(directory):
+    return sorted(int(name[len("features-"):-len(".npy")])
+                  for name in os.listdir(directory) if name.startswith("features-"))
+
+
+def count_shard_batches(directory, sequence_length, batch_size):
+    """
+    Batches per epoch yielded by shard_sequence_batches.
+    """
+    total = 0
+    for i in _shard_ids(directory):
+        rows = len(np.load(os.path.join(directory, f"labels-{i}.npy"), mmap_mode='r'))
+        total += math.ceil(max(rows - sequence_length, 0) / batch_size)
+    return total
+
+
+def shard_sequence_batches(directory, sequence_length, label_offset, batch_size=32, seed=None):
+    """
+    Endless generator of LSTM (X, y) batches from write_sequence_shards output.
+
+    Same windows and per-epoch reshuffling as partition_sequence_batches,
+    read from memory-mapped shards instead of recomputed partitions.
+    """
+    rng = np.random.default_rng(seed)
+    shards = _shard_ids(directory)
+    if not shards:
+        # The loop below would spin forever without yielding
+        raise ValueError(f"No sequence shards in {directory}.")
+    while True:
+        for i in rng.permutation(shards):
+            scaled = np.load(os.path.join(directory, f"features-{i}.npy"), mmap_mode='r')
+            labels = np.load(os.path.join(directory, f"labels-{i}.npy"), mmap_mode='r')
+            X, y = create_sequence_data(scaled, labels, sequence_length, label_offset)
+            yield from iter_sequence_batches(X, y, batch_size, seed=int(rng.integers(2**32)), repeat=False)
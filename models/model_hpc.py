@@ -1,26 +1,78 @@
+import math
 import os
+import time
 import numpy as np
 import pandas as pd
 import joblib
-from collections import deque
 import warnings
 
 # --- HPC & Parallel Computing ---
 import dask
-import dask.dataframe as dd
+import dask.distributed
 from dask.distributed import Client, LocalCluster
 import dask_ml.preprocessing
 
 # --- ML Models ---
 import xgboost as xgb
+import xgboost.dask  # registers xgb.dask
 from sklearn.preprocessing import StandardScaler
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense
-from tensorflow.keras.callbacks import EarlyStopping
-from tensorflow.keras.optimizers import Adam
+# TensorFlow is imported only where an LSTM is built, fitted or loaded with
+# Keras, so realtime workers running the NumPy export never import it
+
+from artifact_cache import ArtifactCache, path_signature
+from dask_pipeline import (
+    generate_partitioned_dataset, generate_partition, read_dataset, label_floods, flood_threshold,
+    engineer_frame, engineer_features,
+    chronological_split, time_slice, walk_forward_splits, evaluate_predictions,
+    fit_standard_scaler, count_sequence_batches, partition_sequence_batches,
+    write_sequence_shards, count_shard_batches, shard_sequence_batches,
+    ROWS_PER_PARTITION, FEATURE_OVERLAP, FLOOD_QUANTILE
+)
+from multi_station import MultiStationForecaster
+import numpy_lstm
+from sequence_windows import create_sequence_data
+from streaming_features import (
+    StreamingFeatureEngine, ENGINEERED_FEATURES,
+    RAINFALL_SUM_WINDOW, WATER_LEVEL_AVG_WINDOW, WATER_LEVEL_DIFF, DISCHARGE_LAG
+)
 
 warnings.filterwarnings('ignore')
 
+XGB_ROUNDS = 100
+XGB_CHECKPOINT_INTERVAL = 10
+XGB_CHECKPOINT = "xgb_checkpoint.ubj"
+
+
+def local_cluster(n_workers=4, threads_per_worker=2, memory_limit='2GB', **kwargs):
+    """
+    The LocalCluster standing in for an HPC cluster on one machine. Its
+    worker processes re-import __main__, so only start it from a script
+    under an `if __name__ == "__main__"` guard.
+    """
+    return LocalCluster(n_workers=n_workers, threads_per_worker=threads_per_worker,
+                        memory_limit=memory_limit, **kwargs)
+
+
+class XGBCheckpoint(xgb.callback.TrainingCallback):
+    """
+    Saves the booster every `interval` rounds so fit_xgb can resume it.
+
+    Runs inside the Dask workers, so `directory` must be reachable from the
+    worker holding rank 0 (the local cluster shares the driver's disk).
+    """
+
+    def __init__(self, directory, interval=XGB_CHECKPOINT_INTERVAL):
+        super().__init__()
+        self.path = os.path.join(directory, XGB_CHECKPOINT)
+        self.interval = interval
+
+    def after_iteration(self, model, epoch, evals_log):
+        if (epoch + 1) % self.interval == 0 and xgb.collective.get_rank() == 0:
+            # Write then rename, so an interrupt never leaves half a checkpoint
+            model.save_model(self.path + ".tmp.ubj")
+            os.replace(self.path + ".tmp.ubj", self.path)
+        return False
+
 
 class HybridHPCPredictor:
     def __init__(self, model_dir="model_hybrid_hpc", sequence_length=72):
@@ -68,32 +120,23 @@ class HybridHPCPredictor:
         """Creates time-series features in parallel using Dask."""
         print("🛠 Engineering features in parallel...")
         # (This is a simplified version of Phase 3's engineering)
-        ddf['rainfall_24h_sum'] = ddf['rainfall'].rolling(window=24).sum()
-        ddf['water_level_6h_avg'] = ddf['water_level'].rolling(window=6).mean()
-        ddf['water_level_diff_1h'] = ddf['water_level'].diff(1)
-        ddf['discharge_lag_3h'] = ddf['discharge'].shift(3)
+        # (StreamingFeatureEngine computes the same features incrementally)
+        # One map_overlap pass; NaNs created by rolling/lag are dropped
+        ddf = engineer_features(ddf)
 
         # Store engineered feature names
-        self.engineered_features = [
-            'rainfall', 'discharge', 'water_level',
-            'rainfall_24h_sum', 'water_level_6h_avg',
-            'water_level_diff_1h', 'discharge_lag_3h'
-        ]
-        
-        # Drop NaNs created by rolling/lag
-        ddf = ddf.dropna()
+        self.engineered_features = list(ENGINEERED_FEATURES)
         return ddf
 
     def create_sequence_data(self, data, labels):
-        # (Copied from your script)
-        X, y = [], []
-        for i in range(len(data) - self.sequence_length):
-            X.append(data[i:i+self.sequence_length])
-            y.append(labels[i+self.sequence_length - 1])
-        return np.array(X), np.array(y)
+        # Window i is labelled with its own last hour; X is a zero-copy view
+        return create_sequence_data(data, labels, self.sequence_length, label_offset=self.sequence_length - 1)
 
     def build_lstm_model(self):
         # (Copied from your script)
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import LSTM, Dense
+        from tensorflow.keras.optimizers import Adam
         model = Sequential([
             LSTM(32, return_sequences=True, input_shape=(self.sequence_length, 3)),
             LSTM(16),
@@ -102,78 +145,234 @@ class HybridHPCPredictor:
         model.compile(optimizer=Adam(0.001), loss='binary_crossentropy', metrics=['accuracy'])
         return model
 
-    def train_model(self, epochs=8, batch_size=32):
-        # --- 1. Generate Massive Dataset ---
-        # Generate 1M hours. This is too big for Pandas, perfect for Dask.
-        df = self.generate_dataset(n_hours=1_000_000)
-        # Convert to Dask DataFrame, chunking into 10 partitions
-        ddf = dd.from_pandas(df, npartitions=10)
+    def fit_xgb(self, X_train, y_train, eval_set=None, checkpoint_dir=None):
+        """
+        Fits the Dask-XGBoost model; returns the booster cut at the best round.
+
+        With `checkpoint_dir` the booster is saved every few rounds, and a
+        fit that finds a checkpoint there continues from it instead of
+        starting over (early-stopping patience restarts on resume).
+        """
+        resume = None
+        if checkpoint_dir and os.path.exists(os.path.join(checkpoint_dir, XGB_CHECKPOINT)):
+            resume = xgb.Booster()
+            resume.load_model(os.path.join(checkpoint_dir, XGB_CHECKPOINT))
+            print(f"⏯ Resuming XGBoost from round {resume.num_boosted_rounds()}...")
+        done = resume.num_boosted_rounds() if resume is not None else 0
+        if done >= XGB_ROUNDS:
+            best = resume.attr('best_iteration')
+            return resume[:int(best) + 1] if eval_set and best is not None else resume
+
+        # This will use the Dask client we set up in main()
+        dask_model = xgb.dask.DaskXGBClassifier(
+            n_estimators=XGB_ROUNDS - done,
+            max_depth=5,
+            objective='binary:logistic',
+            tree_method='hist',
+            early_stopping_rounds=10 if eval_set else None,
+            callbacks=[XGBCheckpoint(checkpoint_dir)] if checkpoint_dir else None
+        )
+        dask_model.fit(X_train, y_train, eval_set=eval_set, verbose=False, xgb_model=resume)
+        booster = dask_model.get_booster()
+        if eval_set:
+            # best_iteration counts the resumed rounds too
+            booster = booster[:dask_model.best_iteration + 1]
+        return booster
+
+    def evaluate_walk_forward(self, ddf_eng, n_splits=4, test_frac=0.05, expanding=True, window_frac=None):
+        """
+        Rolling-origin evaluation of the XGBoost pipeline on the cluster.
+
+        Each fold fits a fresh scaler and model on the hours before its test
+        block and scores the block with Dask reductions, so training cost can
+        be compared against genuinely held-out skill.
+        """
+        print(f"\n--- [HPC Pipeline] Walk-forward evaluation ({n_splits} folds) ---")
+        results = []
+        for k, (train, test) in enumerate(walk_forward_splits(ddf_eng, n_splits, test_frac, expanding, window_frac)):
+            scaler = dask_ml.preprocessing.StandardScaler()
+            X_train = scaler.fit_transform(train[self.engineered_features])
+            X_test = scaler.transform(test[self.engineered_features])
+
+            start = time.perf_counter()
+            booster = self.fit_xgb(X_train, train['flood_occurred'])
+            fit_seconds = time.perf_counter() - start
+
+            prob = xgb.dask.predict(dask.distributed.default_client(), booster, X_test)
+            scores = evaluate_predictions(test['flood_occurred'], prob)
+            scores.update(fold=k, fit_seconds=round(fit_seconds, 2))
+            results.append(scores)
+            print(f"  Fold {k}: AUC {scores['roc_auc']:.4f}, log-loss {scores['log_loss']:.4f}, "
+                  f"accuracy {scores['accuracy']:.4f} on {scores['rows']} rows (fit {fit_seconds:.1f}s)")
+        return results
+
+    def train_model(self, epochs=8, batch_size=32, n_hours=1_000_000, npartitions=None,
+                    data_path=None, lstm_fraction=0.05, walk_forward_folds=0, cache_dir=None):
+        # With cache_dir, every stage goes through a content-addressed
+        # ArtifactCache: stages whose config and code are unchanged are read
+        # back instead of rebuilt, and interrupted model fits resume from
+        # their checkpoints on the next run.
+        cache = ArtifactCache(cache_dir)
+
+        # --- 1. Build the Massive Dataset, partition by partition ---
+        # Partitions are generated (or read from Parquet) on the workers, so
+        # the dataset size is bounded by the cluster, not the driver's RAM.
+        if data_path:
+            print(f"📂 Reading training data from {data_path}...")
+            raw_key = cache.key('raw', {'data_path': os.path.abspath(data_path),
+                                        'files': path_signature(data_path),
+                                        'flood_quantile': FLOOD_QUANTILE},
+                                code=(read_dataset, label_floods, flood_threshold))
+
+            def raw_frame(threshold=None):
+                return read_dataset(data_path, threshold=threshold)
+        else:
+            npartitions = npartitions or math.ceil(n_hours / ROWS_PER_PARTITION)
+            raw_key = cache.key('raw', {'n_hours': n_hours, 'npartitions': npartitions,
+                                        'flood_quantile': FLOOD_QUANTILE},
+                                code=(generate_partitioned_dataset, generate_partition,
+                                      label_floods, flood_threshold))
+
+            def raw_frame(threshold=None):
+                return generate_partitioned_dataset(n_hours, npartitions, threshold=threshold)
+        if cache.enabled:
+            # The lazy flood threshold is resolved in the pass writing the Parquet copy
+            ddf = cache.frame(raw_key, raw_frame)
+        else:
+            # Computed piecewise many times below: fix the flood threshold once
+            ddf = raw_frame(flood_threshold(raw_frame()))
         
         # --- 2. Train HPC Model (Dask-XGBoost) ---
         print("\n--- [HPC Pipeline] Training Dask-XGBoost Model ---")
-        ddf_eng = self.engineer_features_dask(ddf)
+        # The window constants live in streaming_features, outside the hashed code
+        features_key = cache.key('features', {'overlap': FEATURE_OVERLAP,
+                                              'rainfall_sum_window': RAINFALL_SUM_WINDOW,
+                                              'water_level_avg_window': WATER_LEVEL_AVG_WINDOW,
+                                              'water_level_diff': WATER_LEVEL_DIFF,
+                                              'discharge_lag': DISCHARGE_LAG},
+                                 code=(engineer_frame, engineer_features), parents=[raw_key])
+        ddf_eng = cache.frame(features_key, lambda: self.engineer_features_dask(ddf))
+        self.engineered_features = list(ENGINEERED_FEATURES)
         
-        X = ddf_eng[self.engineered_features]
-        y = ddf_eng['flood_occurred']
+        if walk_forward_folds:
+            self.evaluate_walk_forward(ddf_eng, n_splits=walk_forward_folds)
         
-        print("Scaling HPC features (Dask-ML)...")
-        X_scaled = self.scaler_xgb.fit_transform(X)
+        # Split data (time-series aware): first 80% of the hours train, the
+        # last 20% drive early stopping. Cuts are on the index, per partition.
+        train, test = chronological_split(ddf_eng, train_frac=0.8)
         
-        # Split data (time-series aware)
-        train_frac = 0.8
-        X_train, X_test = X_scaled.loc[:train_frac], X_scaled.loc[train_frac:]
-        y_train, y_test = y.loc[:train_frac], y.loc[train_frac:]
+        print("Scaling HPC features (Dask-ML)...")
+        # Fit on the training span only so no test statistics leak in
+        scaler_xgb_key = cache.key('scaler_xgb', {'train_frac': 0.8, 'features': self.engineered_features},
+                                   code=(chronological_split, time_slice), parents=[features_key])
+        self.scaler_xgb = cache.object(
+            scaler_xgb_key, lambda: dask_ml.preprocessing.StandardScaler().fit(train[self.engineered_features]))
+        X_train = self.scaler_xgb.transform(train[self.engineered_features])
+        X_test = self.scaler_xgb.transform(test[self.engineered_features])
+        y_train, y_test = train['flood_occurred'], test['flood_occurred']
 
         print("Training Dask-XGBoost model (distributed)...")
-        # This will use the Dask client we set up in main()
-        dask_model = xgb.dask.DaskXGBClassifier(
-            n_estimators=100,
-            max_depth=5,
-            objective='binary:logistic',
-            tree_method='hist'
-        )
-        dask_model.fit(X_train, y_train, eval_set=[(X_test, y_test)], early_stopping_rounds=10, verbose=False)
-        
         # Save the final (non-Dask) booster model
-        self.model_xgb = dask_model.client.sync(dask_model.best_model)
-        print("✅ HPC Model Trained.")
+        xgb_key = cache.key('xgb', code=(self.fit_xgb, XGBCheckpoint, XGB_ROUNDS), parents=[scaler_xgb_key])
+        if cache.enabled:
+            xgb_dir = cache.build(xgb_key, lambda d: self.fit_xgb(
+                X_train, y_train, eval_set=[(X_test, y_test)], checkpoint_dir=cache.checkpoint_dir(xgb_key)
+            ).save_model(os.path.join(d, "xgb_model.json")))
+            cache.discard_checkpoints(xgb_key)
+            self.model_xgb = xgb.Booster()
+            self.model_xgb.load_model(os.path.join(xgb_dir, "xgb_model.json"))
+        else:
+            self.model_xgb = self.fit_xgb(X_train, y_train, eval_set=[(X_test, y_test)])
+        prob = xgb.dask.predict(dask.distributed.default_client(), self.model_xgb, X_test)
+        scores = evaluate_predictions(y_test, prob)
+        print(f"✅ HPC Model Trained. Eval-span AUC {scores['roc_auc']:.4f}, log-loss {scores['log_loss']:.4f}")
 
         # --- 3. Train Temporal Model (LSTM) ---
         print("\n--- [Temporal Pipeline] Training LSTM Model ---")
-        # We can't train the LSTM on 1M rows easily.
-        # We'll take a 50k sample to train the temporal patterns.
-        df_sample = ddf.sample(frac=0.05).compute() # 50,000 rows
-        
-        data_lstm = df_sample[self.base_features].values
-        labels_lstm = df_sample['flood_occurred'].values
+        # Train on a fraction of whole partitions, streamed one at a time.
+        # Unlike a row sample, partitions keep the hours contiguous.
+        rng = np.random.default_rng(42)
+        n_lstm = max(1, round(ddf.npartitions * lstm_fraction))
+        lstm_partitions = sorted(rng.choice(ddf.npartitions, n_lstm, replace=False))
         
         print("Scaling LSTM features...")
-        scaled_data_lstm = self.scaler_lstm.fit_transform(data_lstm)
-        X_seq, y_seq = self.create_sequence_data(scaled_data_lstm, labels_lstm)
+        scaler_lstm_key = cache.key('scaler_lstm', {'columns': self.base_features},
+                                    code=(fit_standard_scaler,), parents=[raw_key])
+        self.scaler_lstm = cache.object(
+            scaler_lstm_key, lambda: fit_standard_scaler(ddf, self.base_features, StandardScaler()))
+        if cache.enabled:
+            # Scaled partitions are kept as memory-mapped shards
+            shards_key = cache.key('sequence_shards', {'partitions': [int(i) for i in lstm_partitions]},
+                                   code=(write_sequence_shards,), parents=[scaler_lstm_key])
+            shards = cache.build(shards_key, lambda d: write_sequence_shards(
+                ddf, self.base_features, self.scaler_lstm, lstm_partitions, d))
+            steps = count_shard_batches(shards, self.sequence_length, batch_size)
+            batches = shard_sequence_batches(shards, self.sequence_length,
+                                             label_offset=self.sequence_length - 1, batch_size=batch_size)
+        else:
+            shards_key = scaler_lstm_key
+            steps = count_sequence_batches(ddf, lstm_partitions, self.sequence_length, batch_size)
+            batches = partition_sequence_batches(
+                ddf, self.base_features, self.scaler_lstm, self.sequence_length,
+                label_offset=self.sequence_length - 1, batch_size=batch_size, partitions=lstm_partitions
+            )
 
-        self.model_lstm = self.build_lstm_model()
-        es = EarlyStopping(monitor='loss', patience=2, restore_best_weights=True)
-        
-        print("Training LSTM model...")
-        self.model_lstm.fit(X_seq, y_seq, epochs=epochs, batch_size=batch_size, verbose=1, callbacks=[es])
+        lstm_key = cache.key('lstm', {'epochs': epochs, 'batch_size': batch_size,
+                                      'sequence_length': self.sequence_length},
+                             code=(self.build_lstm_model, self._fit_lstm), parents=[shards_key])
+        print(f"Training LSTM model on {n_lstm}/{ddf.npartitions} partitions...")
+        if cache.enabled:
+            lstm_dir = cache.build(lstm_key, lambda d: self._fit_lstm(
+                batches, steps, epochs, cache.checkpoint_dir(lstm_key)
+            ).save(os.path.join(d, "lstm_model.keras")))
+            cache.discard_checkpoints(lstm_key)
+            from tensorflow.keras.models import load_model
+            self.model_lstm = load_model(os.path.join(lstm_dir, "lstm_model.keras"))
+        else:
+            self.model_lstm = self._fit_lstm(batches, steps, epochs)
         print("✅ Temporal (LSTM) Model Trained.")
         
         self.is_trained = True
 
+    def _fit_lstm(self, batches, steps, epochs, checkpoint_dir=None):
+        from tensorflow.keras.callbacks import EarlyStopping, BackupAndRestore
+        model = self.build_lstm_model()
+        callbacks = [EarlyStopping(monitor='loss', patience=2, restore_best_weights=True)]
+        if checkpoint_dir:
+            # Restores weights and epoch from the last completed epoch of an
+            # interrupted fit; the backup is deleted once fit() returns
+            callbacks.insert(0, BackupAndRestore(checkpoint_dir))
+        model.fit(batches, steps_per_epoch=steps, epochs=epochs, verbose=1, callbacks=callbacks)
+        return model
+
     def save_model(self):
         os.makedirs(self.model_dir, exist_ok=True)
         # Save LSTM
         self.model_lstm.save(self.model_lstm_path)
+        # NumPy copy for realtime workers without TensorFlow (parity-checked)
+        numpy_lstm.export(self.model_lstm_path, model=self.model_lstm)
         joblib.dump(self.scaler_lstm, self.scaler_lstm_path)
         # Save XGB
         self.model_xgb.save_model(self.model_xgb_path)
         joblib.dump(self.scaler_xgb, self.scaler_xgb_path)
         print("📦 Both Hybrid Models and Scalers saved!")
 
-    def load_model(self):
+    def load_model(self, lstm_backend='keras'):
+        """
+        Loads both models and scalers. With lstm_backend='numpy' the LSTM is
+        the NumpyLSTM exported next to the .keras file, and TensorFlow is not
+        imported unless that export is missing or stale.
+        """
         try:
             # Load LSTM
-            self.model_lstm = load_model(self.model_lstm_path)
+            self.model_lstm = None
+            if lstm_backend == 'numpy':
+                self.model_lstm = numpy_lstm.load_lstm_for(self.model_lstm_path)
+                if self.model_lstm is None:
+                    print("ℹ No current NumPy LSTM export; loading the Keras model.")
+            if self.model_lstm is None:
+                from tensorflow.keras.models import load_model
+                self.model_lstm = load_model(self.model_lstm_path)
             self.scaler_lstm = joblib.load(self.scaler_lstm_path)
             # Load XGB
             self.model_xgb = xgb.Booster()
@@ -181,7 +380,7 @@ class HybridHPCPredictor:
             self.scaler_xgb = joblib.load(self.scaler_xgb_path)
             
             # Re-populate engineered features (lost on load)
-            self.engineer_features_dask(dd.from_pandas(pd.DataFrame(columns=self.base_features), npartitions=1))
+            self.engineered_features = list(ENGINEERED_FEATURES)
             
             self.is_trained = True
             print("✅ Both Hybrid Models loaded successfully!")
@@ -193,35 +392,34 @@ class HybridHPCPredictor:
         print(f"\n📡 Simulating {hours} hours of HYBRID real-time forecasting...")
         rng = np.random.default_rng()
         
-        # We need a longer buffer for the XGB feature engineering (e.g., 24h)
-        # We'll use 100 hours to be safe.
-        buffer_len = 100 
-        print(f"Generating initial {buffer_len}-hour history buffer...")
-        history_df, _ = self.generate_dataset(n_hours=buffer_len)
-        history_deque = deque(history_df[self.base_features].values, maxlen=buffer_len)
+        # The LSTM needs the last 72 hours; the XGB features are kept up to
+        # date incrementally, so no longer buffer has to be re-engineered.
+        print(f"Generating initial {self.sequence_length}-hour history buffer...")
+        history = self.generate_dataset(n_hours=self.sequence_length)[self.base_features].values
+        features = StreamingFeatureEngine()
+        features.extend(history)
+
+        # Scaled LSTM window, shifted in place each hour
+        lstm_mean = np.asarray(self.scaler_lstm.mean_, dtype=float)
+        lstm_scale = np.asarray(self.scaler_lstm.scale_, dtype=float)
+        lstm_sample = ((history - lstm_mean) / lstm_scale).reshape(1, self.sequence_length, 3)
+        xgb_mean = np.asarray(self.scaler_xgb.mean_, dtype=float)
+        xgb_scale = np.asarray(self.scaler_xgb.scale_, dtype=float)
+        xgb_latest_scaled = np.empty_like(features.features)
 
         flood_alert = []
 
         for h in range(hours):
             # --- 1. Get LSTM Prediction ---
-            # Get the last 72 hours
-            lstm_window_raw = np.array(list(history_deque))[-self.sequence_length:]
-            lstm_window_scaled = self.scaler_lstm.transform(lstm_window_raw)
-            lstm_sample = lstm_window_scaled.reshape(1, self.sequence_length, 3)
             prob_lstm = self.model_lstm.predict(lstm_sample, verbose=0)[0][0]
 
             # --- 2. Get XGBoost Prediction ---
-            # Get the full buffer and engineer features
-            xgb_buffer_df = pd.DataFrame(data=list(history_deque), columns=self.base_features)
-            xgb_features_df = self.engineer_features_dask(xgb_buffer_df) # This works on pandas too
-            
-            # Get the *last* row of engineered features
-            xgb_latest_features = xgb_features_df[self.engineered_features].iloc[[-1]] # Keep as 2D array
-            
-            xgb_latest_scaled = self.scaler_xgb.transform(xgb_latest_features)
+            # Latest engineered row, scaled like scaler_xgb.transform
+            np.subtract(features.features, xgb_mean, out=xgb_latest_scaled)
+            np.divide(xgb_latest_scaled, xgb_scale, out=xgb_latest_scaled)
             
             # Convert to DMatrix for XGBoost
-            dmatrix = xgb.DMatrix(xgb_latest_scaled)
+            dmatrix = xgb.DMatrix(xgb_latest_scaled, feature_names=self.engineered_features)
             prob_xgb = self.model_xgb.predict(dmatrix)[0]
 
             # --- 3. Ensemble (Hybrid) Prediction ---
@@ -238,20 +436,53 @@ class HybridHPCPredictor:
             if rng.random() < 0.02: new_rainfall += rng.uniform(20, 50)
             new_discharge = new_rainfall * 2 + rng.normal(0, 1)
             new_water_level = 1.5 + new_discharge * 0.05 + rng.normal(0, 0.2)
-            new_data_point = np.array([new_rainfall, new_discharge, new_water_level])
-            
-            history_deque.append(new_data_point)
+            features.update(new_rainfall, new_discharge, new_water_level)
+            lstm_sample[0, :-1] = lstm_sample[0, 1:]
+            lstm_sample[0, -1] = (features.features[0, :3] - lstm_mean) / lstm_scale
 
         print("\n🌊 Last 10 flood alerts:", flood_alert[-10:])
         print("✅ Real-time hybrid simulation done!")
 
+    def predict_realtime_stations(self, n_stations=100, hours=50, graph=None):
+        """
+        Simulates a whole gauge network, scoring all stations in one batch per hour.
+        Pass a RiverGraph over the stations to route upstream flow downstream.
+        """
+        print(f"\n📡 Simulating {hours} hours of HYBRID forecasting for {n_stations} stations...")
+        rng = np.random.default_rng()
+        forecaster = MultiStationForecaster(self, n_stations, graph=graph)
+
+        print(f"Generating initial {self.sequence_length}-hour history per station...")
+        history = self.generate_dataset(n_hours=n_stations * self.sequence_length)[self.base_features].values
+        history = history.reshape(n_stations, self.sequence_length, 3)
+        forecaster.warm_start(history)
+
+        alert_counts = np.zeros(n_stations, dtype=int)
+        for h in range(hours):
+            forecaster.predict()
+            alert_counts += forecaster.alerts
+            if forecaster.alerts.any():
+                print(f"  Hour {h}: 🚨 FLOOD WARNING at {int(forecaster.alerts.sum())} station(s)")
+
+            # --- Generate the next observation for every station ---
+            new_rainfall = rng.uniform(0, 30, n_stations)
+            storms = rng.random(n_stations) < 0.02
+            new_rainfall[storms] += rng.uniform(20, 50, int(storms.sum()))
+            new_discharge = new_rainfall * 2 + rng.normal(0, 1, n_stations)
+            new_water_level = 1.5 + new_discharge * 0.05 + rng.normal(0, 0.2, n_stations)
+            forecaster.observe(np.stack([new_rainfall, new_discharge, new_water_level], axis=1))
+
+        print(f"\n🌊 Stations with alerts: {int((alert_counts > 0).sum())}/{n_stations}")
+        print("✅ Multi-station hybrid simulation done!")
+        return alert_counts
+
 # -------------------- RUN SCRIPT --------------------
 if __name__ == "__main__":
     # This check is CRITICAL for Dask to work
     
     # --- Setup HPC Dask Cluster ---
     # This uses all your local cores to simulate an HPC cluster
-    with LocalCluster(n_workers=4, threads_per_worker=2, memory_limit='2GB') as cluster:
+    with local_cluster() as cluster:
         with Client(cluster) as client:
             print("="*50)
             print(f"🚀 Dask HPC Client Ready: {client.dashboard_link}")
@@ -262,7 +493,8 @@ if __name__ == "__main__":
 
             if not predictor.is_trained:
                 print("\n--- Training new hybrid models... ---")
-                predictor.train_model(epochs=8)
+                # Stages and interrupted fits are picked up from the cache on rerun
+                predictor.train_model(epochs=8, cache_dir="artifact_cache")
                 predictor.save_model()
 
             predictor.predict_realtime(hours=30)
@@ -2,10 +2,9 @@ import os
 import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense
-from tensorflow.keras.callbacks import EarlyStopping
-from tensorflow.keras.optimizers import Adam
+
+import numpy_lstm
+from sequence_windows import create_sequence_data, iter_sequence_batches, n_sequence_batches
 
 class GraphFloodPredictor:
     def __init__(self, model_dir="model_simple", sequence_length=72):
@@ -29,13 +28,14 @@ class GraphFloodPredictor:
         return df.values, flood_flag.values
 
     def create_sequence_data(self, data, labels):
-        X, y = [], []
-        for i in range(len(data) - self.sequence_length):
-            X.append(data[i:i+self.sequence_length])
-            y.append(labels[i+self.sequence_length])
-        return np.array(X), np.array(y)
+        # Window i is labelled with the hour right after it; X is a zero-copy view
+        return create_sequence_data(data, labels, self.sequence_length, label_offset=self.sequence_length)
 
     def build_model(self):
+        # Keras is imported here and in train/load so the NumPy LSTM path never loads TensorFlow
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import LSTM, Dense
+        from tensorflow.keras.optimizers import Adam
         model = Sequential([
             LSTM(32, return_sequences=True, input_shape=(self.sequence_length, 3)),
             LSTM(16),
@@ -45,6 +45,7 @@ class GraphFloodPredictor:
         return model
 
     def train_model(self, epochs=8, batch_size=32):
+        from tensorflow.keras.callbacks import EarlyStopping
         data, labels = self.generate_dataset()
         scaled_data = self.scaler.fit_transform(data)
 
@@ -54,20 +55,28 @@ class GraphFloodPredictor:
 
         es = EarlyStopping(monitor='loss', patience=2, restore_best_weights=True)
         print("🚀 Training model...")
-        self.model.fit(X, y, epochs=epochs, batch_size=batch_size, verbose=1, callbacks=[es])
+        # Stream batches from the window view instead of materializing every window
+        self.model.fit(iter_sequence_batches(X, y, batch_size), steps_per_epoch=n_sequence_batches(len(X), batch_size),
+                       epochs=epochs, verbose=1, callbacks=[es])
         self.is_trained = True
         print("✅ Training complete!")
 
     def save_model(self):
         os.makedirs(self.model_dir, exist_ok=True)
         self.model.save(os.path.join(self.model_dir, "simple_model.keras"))
+        numpy_lstm.export(os.path.join(self.model_dir, "simple_model.keras"), model=self.model)
         np.save(os.path.join(self.model_dir, "scaler.npy"), self.scaler.mean_)
         np.save(os.path.join(self.model_dir, "scale.npy"), self.scaler.scale_)
         print("📦 Model and scaler saved!")
 
-    def load_model(self):
+    def load_model(self, lstm_backend='keras'):
+        # lstm_backend='numpy' serves the NumpyLSTM export (no TensorFlow import)
         try:
-            self.model = load_model(os.path.join(self.model_dir, "simple_model.keras"))
+            model_path = os.path.join(self.model_dir, "simple_model.keras")
+            self.model = numpy_lstm.load_lstm_for(model_path) if lstm_backend == 'numpy' else None
+            if self.model is None:
+                from tensorflow.keras.models import load_model
+                self.model = load_model(model_path)
             self.scaler.mean_ = np.load(os.path.join(self.model_dir, "scaler.npy"))
             self.scaler.scale_ = np.load(os.path.join(self.model_dir, "scale.npy"))
             self.is_trained = True
@@ -93,12 +102,13 @@ class GraphFloodPredictor:
         print("✅ Real-time simulation done!")
 
 # -------------------- RUN SCRIPT --------------------
-predictor = GraphFloodPredictor()
-predictor.load_model()
+if __name__ == "__main__":
+    predictor = GraphFloodPredictor()
+    predictor.load_model()
 
-if not predictor.is_trained:
-    print("\n--- Training new model... ---")
-    predictor.train_model(epochs=8)
-    predictor.save_model()
+    if not predictor.is_trained:
+        print("\n--- Training new model... ---")
+        predictor.train_model(epochs=8)
+        predictor.save_model()
 
-predictor.predict_realtime(hours=30)
+    predictor.predict_realtime(hours=30)
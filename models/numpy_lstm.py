@@ -0,0 +1,225 @@
+"""
+Runs the trained Keras LSTM stacks with NumPy alone.
+
+GraphFloodPredictor and HybridHPCPredictor score 72-hour windows with a
+two-layer Keras LSTM. Importing TensorFlow costs seconds and hundreds of
+megabytes in every process that serves forecasts, and Keras' predict()
+adds per-call overhead far above the arithmetic for a few windows.
+export() reads the weights of a saved .keras model into <name>.lstm.npz,
+checks NumpyLSTM against Keras on random windows and records the SHA-256
+of the .keras file it came from; load_lstm_for() returns the NumPy model
+only while that digest still matches. Nothing here imports TensorFlow
+except export() itself.
+
+    python models/numpy_lstm.py model_hybrid_hpc/lstm_model.keras
+"""
+import hashlib
+import os
+import sys
+
+import numpy as np
+
+LSTM_SUFFIX = '.lstm.npz'
+FORMAT_VERSION = 1
+# Largest acceptable |Keras - NumPy| probability difference on export (float32)
+PARITY_TOLERANCE = 1e-5
+
+
+def lstm_path(model_path):
+    """
+    Where the NumPy weights for `model_path` live (same stem, .lstm.npz).
+    """
+    return os.path.splitext(model_path)[0] + LSTM_SUFFIX
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class NumpyLSTM:
+    """
+    NumPy forward pass of stacked LSTM layers ending in one sigmoid unit.
+
+    Takes the weights in Keras order - per LSTM layer (kernel, recurrent
+    kernel, bias) with gate blocks i, f, c, o - and computes what Keras'
+    LSTM does at inference: sigmoid gates, tanh cell activation, zero
+    initial state. Weights are stored gate-major with the gates reordered to
+    i, f, o, c and states kept as (units, batch), so a single sigmoid covers
+    one contiguous block. Every layer's input projection is one matmul over
+    all time steps, which leaves only the (4 * units, units) x (units, batch)
+    recurrent product in the time loop.
+    Sigmoid is evaluated as 0.5 * tanh(0.5 * z) + 0.5, which cannot
+    overflow, with the inner halving folded into the gate weights.
+
+    Stands in for the Keras model in the realtime paths: predict() and
+    predict_on_batch() take (batch, time, features) windows and return
+    (batch, 1) probabilities.
+    """
+
+    def __init__(self, layers, dense_kernel, dense_bias, dtype=np.float32):
+        self.dtype = np.dtype(dtype)
+        self.weights = [np.asarray(w) for layer in layers for w in layer] + [
+            np.asarray(dense_kernel), np.asarray(dense_bias)]
+        self._layers = []
+        for kernel, recurrent, bias in layers:
+            units = np.shape(recurrent)[0]
+            order = np.r_[0:2 * units, 3 * units:4 * units, 2 * units:3 * units]
+            # Gate-major (4 * units, inputs), so a gate is a contiguous row block
+            weights = tuple(np.ascontiguousarray(np.asarray(w)[..., order].T, dtype=self.dtype)
+                            for w in (kernel, recurrent, np.reshape(bias, (1, -1))))
+            for w in weights:
+                # Pre-halved sigmoid inputs (exact: a power of two)
+                w[:3 * units] *= 0.5
+            self._layers.append(weights)
+        self.n_features = self._layers[0][0].shape[1]
+        self.units = [recurrent.shape[1] for _, recurrent, _ in self._layers]
+        self._dense_kernel = np.ascontiguousarray(np.asarray(dense_kernel, dtype=self.dtype).T)
+        self._dense_bias = np.asarray(dense_bias, dtype=self.dtype).reshape(-1, 1)
+
+    def predict_on_batch(self, X):
+        X = np.asarray(X, dtype=self.dtype)
+        if X.ndim != 3 or X.shape[2] != self.n_features:
+            raise ValueError(f"Expected windows of shape (batch, time, {self.n_features}), got {X.shape}.")
+        # (time, features, batch): states are (units, batch), so every gate
+        # slice below is one contiguous block whatever the batch size
+        sequence = np.ascontiguousarray(X.transpose(1, 2, 0))
+        steps, _, batch = sequence.shape
+        last = len(self._layers) - 1
+        for index, (kernel, recurrent, bias) in enumerate(self._layers):
+            units = recurrent.shape[1]
+            projected = kernel @ sequence
+            projected += bias
+            outputs = np.empty((steps, units, batch), dtype=self.dtype) if index < last else None
+            h = np.zeros((units, batch), dtype=self.dtype)
+            c = np.zeros((units, batch), dtype=self.dtype)
+            z = np.empty((4 * units, batch), dtype=self.dtype)
+            gates, candidate = z[:3 * units], z[3 * units:]
+            i, f, o = z[:units], z[units:2 * units], z[2 * units:3 * units]
+            for t in range(steps):
+                np.matmul(recurrent, h, out=z)
+                z += projected[t]
+                np.tanh(gates, out=gates)
+                gates *= 0.5
+                gates += 0.5
+                np.tanh(candidate, out=candidate)
+                # c = f * c + i * candidate; h = o * tanh(c)
+                c *= f
+                i *= candidate
+                c += i
+                if outputs is not None:
+                    h = outputs[t]
+                np.tanh(c, out=h)
+                h *= o
+            sequence = outputs
+        logits = self._dense_kernel @ h
+        logits += self._dense_bias
+        return (0.5 * np.tanh(0.5 * logits) + 0.5).T
+
+    def predict(self, X, **kwargs):
+        """
+        predict_on_batch(X); Keras' keyword arguments (verbose, ...) are ignored.
+        """
+        return self.predict_on_batch(X)
+
+    def __call__(self, X):
+        return self.predict_on_batch(X)
+
+
+def from_keras(model, dtype=np.float32):
+    """
+    NumpyLSTM with the weights of a Keras model made of LSTM layers
+    followed by a single sigmoid Dense unit; anything else is refused.
+    """
+    layers, dense = [], None
+    for layer in model.layers:
+        kind, config = type(layer).__name__, layer.get_config()
+        if kind == 'LSTM' and dense is None:
+            if (config['activation'] != 'tanh' or config['recurrent_activation'] != 'sigmoid'
+                    or not config['use_bias'] or config['go_backwards'] or config['stateful']):
+                raise ValueError(f"LSTM layer {layer.name} uses options the NumPy export does not implement.")
+            layers.append((layer, layer.get_weights()))
+        elif kind == 'Dense' and dense is None and config['units'] == 1 and config['activation'] == 'sigmoid':
+            dense = layer.get_weights()
+        else:
+            raise ValueError(f"Cannot export layer {layer.name} ({kind}).")
+    if not layers or dense is None:
+        raise ValueError("Expected LSTM layers followed by a Dense(1, activation='sigmoid') layer.")
+    if not all(layer.return_sequences for layer, _ in layers[:-1]) or layers[-1][0].return_sequences:
+        raise ValueError("Every LSTM layer but the last must return sequences.")
+    return NumpyLSTM([weights for _, weights in layers], dense[0], dense[1], dtype=dtype)
+
+
+# -------------------- Persistence --------------------
+def save_lstm(lstm, path, source_digest=''):
+    np.savez(path, format_version=FORMAT_VERSION, source_sha256=source_digest,
+             n_layers=len(lstm.units), **{f"w{k}": w for k, w in enumerate(lstm.weights)})
+    return path
+
+
+def load_lstm(path, dtype=np.float32):
+    """
+    Reads exported weights; returns (NumpyLSTM, source digest).
+    """
+    with np.load(path, allow_pickle=False) as data:
+        if int(data['format_version']) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported LSTM format {int(data['format_version'])} in {path}")
+        n_layers = int(data['n_layers'])
+        weights = [data[f"w{k}"] for k in range(3 * n_layers + 2)]
+        lstm = NumpyLSTM([weights[3 * k:3 * k + 3] for k in range(n_layers)], weights[-2], weights[-1],
+                         dtype=dtype)
+        return lstm, str(data['source_sha256'])
+
+
+def load_lstm_for(model_path, dtype=np.float32):
+    """
+    The NumPy LSTM for `model_path` if its .lstm.npz exists and was exported
+    from this exact file; otherwise None. When only the .lstm.npz is
+    deployed (no .keras), it is used as is.
+    """
+    path = lstm_path(model_path)
+    if not os.path.exists(path):
+        return None
+    lstm, source_digest = load_lstm(path, dtype)
+    if os.path.exists(model_path) and source_digest != file_digest(model_path):
+        print(f"⚠️ {path} was exported from a different model; re-run numpy_lstm.py")
+        return None
+    return lstm
+
+
+def parity_windows(lstm, n_windows=1000, sequence_length=72, seed=0):
+    """
+    Random standardized windows, with heavier tails than the training data
+    so saturated gates are exercised too.
+    """
+    rng = np.random.default_rng(seed)
+    return (rng.standard_t(4, (n_windows, sequence_length, lstm.n_features))).astype(np.float32)
+
+
+def export(model_path, out_path=None, check_windows=1000, model=None):
+    """
+    Converts the Keras model saved at `model_path` (or the already loaded
+    `model` it was saved from), checks it against Keras' predictions and
+    writes the .lstm.npz. Returns the output path.
+    """
+    if model is None:
+        from tensorflow.keras.models import load_model
+        model = load_model(model_path)
+    lstm = from_keras(model)
+    X = parity_windows(lstm, check_windows, model.input_shape[1] or 72)
+    error = float(np.abs(model.predict(X, verbose=0) - lstm.predict_on_batch(X)).max())
+    if error > PARITY_TOLERANCE:
+        raise ValueError(f"NumPy LSTM disagrees with Keras (max |Δp| = {error:.3g}).")
+    print(f"✅ Parity on {check_windows} windows: max |Δp| = {error:.3g}")
+
+    out_path = out_path or lstm_path(model_path)
+    save_lstm(lstm, out_path, file_digest(model_path))
+    print(f"✅ LSTM {lstm.units} -> {out_path}")
+    return out_path
+
+
+if __name__ == "__main__":
+    export(sys.argv[1] if len(sys.argv) > 1 else os.path.join("model_hybrid_hpc", "lstm_model.keras"))
@@ -0,0 +1,181 @@
+"""
+Vectorized generator for the universal model's training data.
+
+Same physical process and labelling as PhysicalFloodPredictor.generate_physical_dataset
+in new_flood.ipynb (the data behind universal_flood_model.joblib), but each
+chunk is drawn with whole-array NumPy operations instead of a per-sample
+Python loop. Output is reproducible for a given (seed, chunk_size): chunk k
+always uses the k-th child of SeedSequence(seed).
+
+    python models/physical_dataset.py --samples 10000000 --out physical.parquet
+"""
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Same order as FloodRiskPredictorStandalone.feature_columns
+FEATURE_COLUMNS = [
+    'rainfall_mm', 'river_discharge_cumec', 'water_level_m',
+    'soil_moisture_percent', 'temperature_c', 'humidity_percent', 'wind_speed_ms',
+    'pressure_hpa', 'elevation_m', 'population_density', 'drainage_efficiency',
+    'distance_to_coast_km', 'deforestation_index'
+]
+LABEL = 'flood_occurred'
+COLUMNS = FEATURE_COLUMNS + [LABEL]
+
+MAX_ELEVATION = 2500  # Capping at a reasonable max for inhabited areas
+FLOOD_SCORE_THRESHOLD = 0.40
+LABEL_NOISE = 0.03
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def generate_chunk(n_samples, rng, dtype=np.float64):
+    """
+    One (n_samples, len(COLUMNS)) array; columns in COLUMNS order, label last.
+    """
+    out = np.empty((n_samples, len(COLUMNS)), dtype=dtype)
+
+    # Location-agnostic physical properties
+    elevation = rng.uniform(0, MAX_ELEVATION, n_samples)
+    population_density = np.maximum(10, rng.lognormal(mean=6, sigma=1.5, size=n_samples))
+    distance_to_coast = rng.uniform(0, 1500, n_samples)
+    drainage_efficiency = rng.uniform(0.1, 0.9, n_samples)
+    deforestation = rng.uniform(0.05, 0.9, n_samples)
+
+    # Rainfall scenarios: 5% extreme, 10% heavy, otherwise exponential background
+    scenario = rng.random(n_samples)
+    rainfall = np.maximum(0, rng.exponential(15, n_samples))
+    heavy = (scenario > 0.85) & (scenario <= 0.95)
+    extreme = scenario > 0.95
+    rainfall[heavy] = rng.uniform(50, 150, int(heavy.sum()))
+    rainfall[extreme] = rng.uniform(150, 300, int(extreme.sum()))
+
+    river_discharge = np.maximum(0, rainfall * 0.5 * (1 + elevation / 1000) + rng.normal(0, 30, n_samples))
+    water_level = np.maximum(0, 1.5 + river_discharge / 300 + rng.normal(0, 0.8, n_samples))
+    soil_moisture = np.clip(35 + rainfall * 1.5 + rng.normal(0, 12, n_samples), 15, 100)
+    temperature = rng.normal(25, 6, n_samples)
+    humidity = np.clip(60 + rainfall * 0.7, 40, 100)
+    wind_speed = np.maximum(0, rng.normal(10, 8, n_samples))
+    pressure = rng.normal(1010, 12, n_samples) - rainfall / 10  # Lower pressure with more rain
+
+    # Comprehensive flood risk score
+    flood_risk_score = (
+        (rainfall / 250) * 0.30 +
+        (river_discharge / 800) * 0.25 +
+        (water_level / 8) * 0.20 +
+        (soil_moisture / 100) * 0.08 +
+        ((MAX_ELEVATION - elevation) / MAX_ELEVATION) * 0.07 +  # Low elevation risk
+        deforestation * 0.05 +
+        (1 - drainage_efficiency) * 0.03 +
+        (np.minimum(population_density, 5000) / 5000) * 0.02  # Capped population pressure
+    )
+    flood_occurred = flood_risk_score > FLOOD_SCORE_THRESHOLD
+    flood_occurred ^= rng.random(n_samples) < LABEL_NOISE  # Add noise
+
+    for j, column in enumerate((
+        rainfall, river_discharge, water_level, soil_moisture,
+        temperature, humidity, wind_speed, pressure, elevation,
+        population_density, drainage_efficiency, distance_to_coast,
+        deforestation, flood_occurred
+    )):
+        out[:, j] = column
+    return out
+
+
+def iter_chunks(n_samples, seed=42, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+    """
+    Yields (start, array) chunks of at most `chunk_size` rows covering n_samples.
+    """
+    n_chunks = max(1, math.ceil(n_samples / chunk_size))
+    for k, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        start = k * chunk_size
+        yield start, generate_chunk(min(chunk_size, n_samples - start), np.random.default_rng(child), dtype)
+
+
+def to_frame(array):
+    df = pd.DataFrame(array, columns=COLUMNS)
+    df[LABEL] = df[LABEL].astype(int)
+    return df
+
+
+def generate_physical_dataset(n_samples=10000, seed=42, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+    """
+    Drop-in for PhysicalFloodPredictor.generate_physical_dataset: a DataFrame
+    of the 13 feature columns plus 'flood_occurred'.
+    """
+    print(f"🔄 Generating {n_samples} generalized samples...")
+    data = np.empty((n_samples, len(COLUMNS)), dtype=dtype)
+    for start, chunk in iter_chunks(n_samples, seed, chunk_size, dtype):
+        data[start:start + len(chunk)] = chunk
+    df = to_frame(data)
+    print(f"✅ Generalized dataset created! Shape: {df.shape}, Floods: {df[LABEL].sum()}")
+    return df
+
+
+# -------------------- Streaming writers --------------------
+def write_npy(path, n_samples, seed=42, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float32):
+    """
+    Streams an (n_samples, 14) array into a .npy file chunk by chunk, so only
+    one chunk is in memory at a time. Columns are in COLUMNS order; load it
+    back with np.load(path, mmap_mode='r').
+    """
+    header = {
+        'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        'fortran_order': False,
+        'shape': (n_samples, len(COLUMNS)),
+    }
+    with open(path, 'wb') as f:
+        np.lib.format.write_array_header_1_0(f, header)
+        for _, chunk in iter_chunks(n_samples, seed, chunk_size, dtype):
+            chunk.tofile(f)
+    return path
+
+
+def write_parquet(path, n_samples, seed=42, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float32, compression='snappy'):
+    """
+    Streams the dataset to Parquet, one row group per chunk (needs pyarrow).
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Writing Parquet requires pyarrow (pip install pyarrow).")
+
+    schema = pa.schema([(col, pa.from_numpy_dtype(np.dtype(dtype))) for col in FEATURE_COLUMNS] + [(LABEL, pa.int8())])
+    with pq.ParquetWriter(path, schema, compression=compression) as writer:
+        for _, chunk in iter_chunks(n_samples, seed, chunk_size, dtype):
+            arrays = [pa.array(chunk[:, j]) for j in range(len(FEATURE_COLUMNS))]
+            arrays.append(pa.array(chunk[:, -1].astype(np.int8)))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--out", required=True, help="output path ending in .parquet or .npy")
+    parser.add_argument("--float64", action="store_true", help="store features as float64 instead of float32")
+    args = parser.parse_args()
+
+    dtype = np.float64 if args.float64 else np.float32
+    start = time.perf_counter()
+    print(f"🔄 Writing {args.samples} samples to {args.out}...")
+    if args.out.endswith(".npy"):
+        write_npy(args.out, args.samples, args.seed, args.chunk_size, dtype)
+    elif args.out.endswith(".parquet"):
+        write_parquet(args.out, args.samples, args.seed, args.chunk_size, dtype)
+    else:
+        print("❌ --out must end in .parquet or .npy")
+        return 1
+    print(f"✅ Done in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
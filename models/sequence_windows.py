@@ -0,0 +1,59 @@
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def sliding_windows(data, sequence_length):
+    """
+    Zero-copy (n - sequence_length + 1, sequence_length, n_features) view of `data`.
+    """
+    data = np.asarray(data)
+    # sliding_window_view puts the window axis last; move it next to the sample axis
+    return np.moveaxis(sliding_window_view(data, sequence_length, axis=0), -1, 1)
+
+
+def create_sequence_data(data, labels, sequence_length, label_offset):
+    """
+    Vectorized equivalent of the create_sequence_data loops in model_op/model_hpc.
+
+    Window i covers data[i:i + sequence_length] and is labelled with
+    labels[i + label_offset]; there are len(data) - sequence_length windows,
+    exactly as the loops produced. X is a read-only view into `data` and y a
+    view into `labels`, so nothing is copied.
+    """
+    data = np.asarray(data)
+    n_windows = max(len(data) - sequence_length, 0)
+    if n_windows == 0:
+        return np.empty((0, sequence_length) + data.shape[1:], dtype=data.dtype), np.asarray(labels)[:0]
+    X = sliding_windows(data, sequence_length)[:n_windows]
+    y = np.asarray(labels)[label_offset:label_offset + n_windows]
+    return X, y
+
+
+def iter_sequence_batches(X, y, batch_size=32, shuffle=True, seed=None, repeat=True):
+    """
+    Yields (X_batch, y_batch) copies of `batch_size` windows at a time.
+
+    Use with Keras fit(..., steps_per_epoch=n_sequence_batches(...)) so only
+    one batch of windows is ever materialized instead of the whole dataset.
+    Window order is reshuffled every epoch, like fit() does for arrays.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(X)
+    if n == 0:
+        # With repeat=True the loop below would spin forever without yielding
+        raise ValueError("No sequence windows to batch (the series is shorter than one window).")
+    while True:
+        order = rng.permutation(n) if shuffle else np.arange(n)
+        for start in range(0, n, batch_size):
+            idx = order[start:start + batch_size]
+            if not shuffle:
+                # contiguous range: slicing the view is cheaper than fancy indexing
+                idx = slice(idx[0], idx[-1] + 1)
+            yield np.ascontiguousarray(X[idx]), np.asarray(y[idx])
+        if not repeat:
+            return
+
+
+def n_sequence_batches(n_windows, batch_size=32):
+    return math.ceil(n_windows / batch_size)
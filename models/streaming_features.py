@@ -0,0 +1,281 @@
+import math
+import numpy as np
+
+# Window sizes shared with HybridHPCPredictor.engineer_features_dask
+RAINFALL_SUM_WINDOW = 24
+WATER_LEVEL_AVG_WINDOW = 6
+WATER_LEVEL_DIFF = 1
+DISCHARGE_LAG = 3
+
+ENGINEERED_FEATURES = [
+    'rainfall', 'discharge', 'water_level',
+    'rainfall_24h_sum', 'water_level_6h_avg',
+    'water_level_diff_1h', 'discharge_lag_3h'
+]
+
+
+class RollingWindow:
+    """
+    Fixed-size rolling sum/mean updated in O(1) per observation.
+
+    Mirrors pandas' rolling kernels (Kahan-compensated add/remove, the
+    repeated-value guard and the sign clamp on means), so values match
+    Series.rolling(window).sum()/.mean() over the same stream exactly.
+    """
+    __slots__ = ('window', '_values', '_pos', 'nobs', '_sum', '_comp_add', '_comp_remove',
+                 '_neg', '_same', '_prev', '_started')
+
+    def __init__(self, window):
+        self.window = window
+        self._values = [math.nan] * window
+        self._pos = 0
+        self.nobs = 0
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._neg = 0
+        self._same = 0
+        self._prev = math.nan
+        self._started = False
+
+    def push(self, value):
+        old = self._values[self._pos]
+        if old == old:
+            # remove the observation falling out of the window
+            self.nobs -= 1
+            if old < 0:
+                self._neg -= 1
+            y = -old - self._comp_remove
+            t = self._sum + y
+            self._comp_remove = t - self._sum - y
+            self._sum = t
+
+        if not self._started:
+            self._prev = value
+            self._started = True
+        if value == value:
+            self.nobs += 1
+            if value < 0:
+                self._neg += 1
+            y = value - self._comp_add
+            t = self._sum + y
+            self._comp_add = t - self._sum - y
+            self._sum = t
+            if value == self._prev:
+                self._same += 1
+            else:
+                self._same = 1
+            self._prev = value
+
+        self._values[self._pos] = value
+        self._pos = (self._pos + 1) % self.window
+
+    def sum(self):
+        if self.nobs < self.window:
+            return math.nan
+        if self._same >= self.nobs:
+            return self._prev * self.nobs
+        return self._sum
+
+    def mean(self):
+        if self.nobs < self.window:
+            return math.nan
+        if self._same >= self.nobs:
+            return self._prev
+        result = self._sum / self.nobs
+        if self._neg == 0 and result < 0:
+            return 0.0
+        if self._neg == self.nobs and result > 0:
+            return 0.0
+        return result
+
+
+class StreamingFeatureEngine:
+    """
+    Incremental version of HybridHPCPredictor.engineer_features_dask for one gauge.
+
+    Each update() costs the same regardless of history length and writes the
+    latest engineered row into the preallocated `features` array (in
+    ENGINEERED_FEATURES order), instead of rebuilding a DataFrame and
+    re-running the rolling windows over the whole buffer.
+    """
+
+    def __init__(self):
+        self.rainfall_sum = RollingWindow(RAINFALL_SUM_WINDOW)
+        self.water_level_avg = RollingWindow(WATER_LEVEL_AVG_WINDOW)
+        self._levels = [math.nan] * (WATER_LEVEL_DIFF + 1)
+        self._discharges = [math.nan] * (DISCHARGE_LAG + 1)
+        self.n_seen = 0
+        # Rows before this many observations are NaN and dropped by the batch path
+        self.warmup = max(RAINFALL_SUM_WINDOW, WATER_LEVEL_AVG_WINDOW, WATER_LEVEL_DIFF + 1, DISCHARGE_LAG + 1)
+        self.features = np.full((1, len(ENGINEERED_FEATURES)), np.nan)
+
+    @property
+    def ready(self):
+        return self.n_seen >= self.warmup
+
+    def update(self, rainfall, discharge, water_level):
+        """
+        Adds one hourly observation. Returns True once `features` is complete.
+        """
+        rainfall, discharge, water_level = float(rainfall), float(discharge), float(water_level)
+        self.rainfall_sum.push(rainfall)
+        self.water_level_avg.push(water_level)
+
+        level_slot = self.n_seen % len(self._levels)
+        discharge_slot = self.n_seen % len(self._discharges)
+        self._levels[level_slot] = water_level
+        self._discharges[discharge_slot] = discharge
+        previous_level = self._levels[(self.n_seen - WATER_LEVEL_DIFF) % len(self._levels)]
+        lagged_discharge = self._discharges[(self.n_seen - DISCHARGE_LAG) % len(self._discharges)]
+        self.n_seen += 1
+
+        row = self.features[0]
+        row[0] = rainfall
+        row[1] = discharge
+        row[2] = water_level
+        row[3] = self.rainfall_sum.sum()
+        row[4] = self.water_level_avg.mean()
+        row[5] = water_level - previous_level
+        row[6] = lagged_discharge
+        return self.ready
+
+    def extend(self, observations):
+        """
+        Feeds an (n, 3) array of [rainfall, discharge, water_level] rows.
+        """
+        for rainfall, discharge, water_level in observations:
+            self.update(rainfall, discharge, water_level)
+        return self.ready
+
+
+class StationRollingWindow:
+    """
+    RollingWindow for many stations at once: one column of state per station.
+
+    All stations advance together, one observation each per update, using the
+    same compensated add/remove arithmetic element-wise so every column
+    matches what RollingWindow would produce for that station alone.
+    Observations are assumed finite.
+    """
+
+    def __init__(self, n_stations, window):
+        self.window = window
+        self._values = np.zeros((window, n_stations))
+        self._pos = 0
+        self.nobs = 0
+        self._sum = np.zeros(n_stations)
+        self._comp_add = np.zeros(n_stations)
+        self._comp_remove = np.zeros(n_stations)
+        self._neg = np.zeros(n_stations, dtype=np.int64)
+        self._same = np.zeros(n_stations, dtype=np.int64)
+        self._prev = np.full(n_stations, np.nan)
+        self._y = np.empty(n_stations)
+        self._t = np.empty(n_stations)
+
+    def _accumulate(self, value, compensation):
+        # y = value - c; t = sum + y; c = (t - sum) - y; sum = t
+        y, t = self._y, self._t
+        np.subtract(value, compensation, out=y)
+        np.add(self._sum, y, out=t)
+        np.subtract(t, self._sum, out=compensation)
+        np.subtract(compensation, y, out=compensation)
+        self._sum, self._t = t, self._sum
+
+    def push(self, values):
+        old = self._values[self._pos]
+        if self.nobs == self.window:
+            self._neg -= old < 0
+            np.negative(old, out=old)
+            self._accumulate(old, self._comp_remove)
+        else:
+            self.nobs += 1
+            if self.nobs == 1:
+                self._prev[:] = values
+
+        self._neg += values < 0
+        self._accumulate(values, self._comp_add)
+        repeated = values == self._prev
+        self._same += 1
+        self._same[~repeated] = 1
+        self._prev[:] = values
+
+        old[:] = values
+        self._pos = (self._pos + 1) % self.window
+
+    def sum(self, out):
+        if self.nobs < self.window:
+            out.fill(np.nan)
+            return out
+        np.copyto(out, self._sum)
+        repeated = self._same >= self.nobs
+        out[repeated] = self._prev[repeated] * self.nobs
+        return out
+
+    def mean(self, out):
+        if self.nobs < self.window:
+            out.fill(np.nan)
+            return out
+        np.divide(self._sum, self.nobs, out=out)
+        out[(self._neg == 0) & (out < 0)] = 0.0
+        out[(self._neg == self.nobs) & (out > 0)] = 0.0
+        repeated = self._same >= self.nobs
+        out[repeated] = self._prev[repeated]
+        return out
+
+
+class StationFeatureBank:
+    """
+    StreamingFeatureEngine for a whole gauge network.
+
+    update() takes an (n_stations, 3) array of [rainfall, discharge,
+    water_level] and refreshes the preallocated (n_stations, 7) `features`
+    matrix with NumPy ops, so per-tick cost does not grow with history and
+    there is no per-station Python loop.
+    """
+
+    def __init__(self, n_stations):
+        self.n_stations = n_stations
+        self.rainfall_sum = StationRollingWindow(n_stations, RAINFALL_SUM_WINDOW)
+        self.water_level_avg = StationRollingWindow(n_stations, WATER_LEVEL_AVG_WINDOW)
+        self._levels = np.full((WATER_LEVEL_DIFF + 1, n_stations), np.nan)
+        self._discharges = np.full((DISCHARGE_LAG + 1, n_stations), np.nan)
+        self.n_seen = 0
+        self.warmup = max(RAINFALL_SUM_WINDOW, WATER_LEVEL_AVG_WINDOW, WATER_LEVEL_DIFF + 1, DISCHARGE_LAG + 1)
+        self.features = np.full((n_stations, len(ENGINEERED_FEATURES)), np.nan)
+        self._column = np.empty(n_stations)
+
+    @property
+    def ready(self):
+        return self.n_seen >= self.warmup
+
+    def update(self, observations):
+        """
+        Adds one observation per station. Returns True once `features` is complete.
+        """
+        observations = np.asarray(observations, dtype=float)
+        rainfall, discharge, water_level = observations[:, 0], observations[:, 1], observations[:, 2]
+        self.rainfall_sum.push(rainfall)
+        self.water_level_avg.push(water_level)
+
+        self._levels[self.n_seen % len(self._levels)] = water_level
+        self._discharges[self.n_seen % len(self._discharges)] = discharge
+        previous_level = self._levels[(self.n_seen - WATER_LEVEL_DIFF) % len(self._levels)]
+        lagged_discharge = self._discharges[(self.n_seen - DISCHARGE_LAG) % len(self._discharges)]
+        self.n_seen += 1
+
+        features = self.features
+        features[:, :3] = observations
+        features[:, 3] = self.rainfall_sum.sum(self._column)
+        features[:, 4] = self.water_level_avg.mean(self._column)
+        np.subtract(water_level, previous_level, out=features[:, 5])
+        features[:, 6] = lagged_discharge
+        return self.ready
+
+    def extend(self, history):
+        """
+        Feeds an (n_stations, n_hours, 3) history array hour by hour.
+        """
+        for hour in range(history.shape[1]):
+            self.update(history[:, hour])
+        return self.ready
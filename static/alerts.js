@@ -4,22 +4,11 @@ document.addEventListener("DOMContentLoaded", () => {
     const filterRisk = document.getElementById("filterRisk");
     const ctx = document.getElementById("alertChart").getContext("2d");
 
-    const regions = [
-        { name: "Delhi", lat: 28.6139, lon: 77.2090 },
-        { name: "Mumbai", lat: 19.0760, lon: 72.8777 },
-        { name: "Kolkata", lat: 22.5726, lon: 88.3639 },
-        { name: "Chennai", lat: 13.0827, lon: 80.2707 },
-        { name: "Assam", lat: 26.2006, lon: 92.9376 },
-        { name: "Kerala", lat: 10.8505, lon: 76.2711 },
-        { name: "Bihar", lat: 25.0961, lon: 85.3131 },
-        { name: "Uttarakhand", lat: 30.0668, lon: 79.0193 },
-        { name: "Punjab", lat: 31.1471, lon: 75.3412 },
-        { name: "Odisha", lat: 20.9517, lon: 85.0985 }
-    ];
-
     const riskLevels = ["Low", "Moderate", "High"];
     let alertsData = [];
-    let map, markers = [];
+    let map, riskLayer, cellLayer, markers = [];
+    // Cell alert id -> { marker, popup } currently on the map
+    const cellMarkers = new Map();
 
     // Initialize Map (Google-like style)
     function initMap() {
@@ -28,20 +17,60 @@ document.addEventListener("DOMContentLoaded", () => {
             attribution: "&copy; OpenStreetMap, © CartoDB",
             maxZoom: 19
         }).addTo(map);
+        // Model risk overlay from the cached risk raster
+        riskLayer = L.tileLayer("/api/risk/tiles/{z}/{x}/{y}.png", { opacity: 0.7, maxZoom: 18 }).addTo(map);
+        cellLayer = L.layerGroup().addTo(map);
+        map.on("moveend", loadCellAlerts);
     }
 
-    // Generate Mock Alerts
-    function generateAlerts() {
-        alertsData = regions.map(region => {
-            const risk = riskLevels[Math.floor(Math.random() * riskLevels.length)];
-            return {
-                region: region.name,
-                risk,
-                lat: region.lat,
-                lon: region.lon,
-                time: new Date().toLocaleTimeString()
-            };
-        });
+    // Active cell alerts inside the current view, from the server's spatial index.
+    // A cell keeps its id and first-raised time, so only changed markers are touched.
+    function loadCellAlerts() {
+        const b = map.getBounds();
+        const bbox = [b.getSouth(), b.getWest(), b.getNorth(), b.getEast()].map(v => v.toFixed(4)).join(",");
+        fetch(`/api/alerts?bbox=${bbox}&limit=2000`)
+            .then(res => res.json())
+            .then(data => {
+                const alerts = data.success ? data.alerts : [];
+                const active = new Set();
+                alerts.forEach(alert => {
+                    active.add(alert.id);
+                    const popup = `${alert.risk_level}<br>Probability: <b>${alert.probability}</b><br>⏰ ${alert.time}`;
+                    const known = cellMarkers.get(alert.id);
+                    if (known) {
+                        if (known.popup !== popup) {
+                            known.marker.setPopupContent(popup);
+                            known.popup = popup;
+                        }
+                        return;
+                    }
+                    const marker = L.circleMarker([alert.lat, alert.lon], {
+                        radius: 3,
+                        color: "#880e4f",
+                        weight: 1,
+                        fillOpacity: 0.5
+                    }).bindPopup(popup).addTo(cellLayer);
+                    cellMarkers.set(alert.id, { marker, popup });
+                });
+                cellMarkers.forEach((known, id) => {
+                    if (!active.has(id)) {
+                        cellLayer.removeLayer(known.marker);
+                        cellMarkers.delete(id);
+                    }
+                });
+            })
+            .catch(err => console.error("Error fetching alerts in view:", err));
+    }
+
+    // Basin alerts pushed from the server's risk raster
+    function setAlerts(alerts) {
+        alertsData = alerts.map(alert => ({
+            region: alert.region,
+            risk: alert.title.split(" ")[0],
+            lat: alert.lat,
+            lon: alert.lon,
+            time: alert.time
+        }));
     }
 
     // Render Alerts List
@@ -124,17 +153,38 @@ document.addEventListener("DOMContentLoaded", () => {
     }
 
     // Refresh All Data
-    function refreshData() {
-        generateAlerts();
+    function refreshData(alerts) {
+        setAlerts(alerts);
         renderAlerts();
         updateMapMarkers();
         updateChart();
+        riskLayer.redraw();
+        loadCellAlerts();
     }
 
     // Initialize
     initMap();
-    refreshData();
-    setInterval(refreshData, 20000);
+    // One server push per update instead of a poll every 20 s. A 503 (every
+    // stream slot taken) closes an EventSource for good: fall back to the
+    // 20 s poll until a retry of the stream gets a slot.
+    function subscribeAlerts() {
+        const source = new EventSource("/stream/alerts");
+        source.addEventListener("alerts", e => refreshData(JSON.parse(e.data)));
+        source.onerror = () => {
+            if (source.readyState !== EventSource.CLOSED) return;
+            const refresh = () => fetch("/fetch_alerts")
+                .then(response => response.ok ? response.json() : null)
+                .then(alerts => { if (alerts) refreshData(alerts); })
+                .catch(() => {});
+            refresh();
+            const poll = setInterval(refresh, 20000);
+            setTimeout(() => {
+                clearInterval(poll);
+                subscribeAlerts();
+            }, 60000 + Math.random() * 30000);
+        };
+    }
+    subscribeAlerts();
 
     // Event Listeners
     searchRegion.addEventListener("input", renderAlerts);
@@ -4,6 +4,9 @@ L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
     attribution: 'Map data © OpenStreetMap contributors'
 }).addTo(map);
 
+// Model risk overlay, rendered server-side from the cached risk raster
+var riskLayer = L.tileLayer('/api/risk/tiles/{z}/{x}/{y}.png', {opacity: 0.7, maxZoom: 18}).addTo(map);
+
 // Simulated regions with flood risk
 var regions = [
     {name:"Delhi", coords:[28.6139,77.2090], risk:"high"},
@@ -44,21 +47,45 @@ var waterChart = createChart('waterLevelChart','Water Level (m)',[3,4,5,7,6,4],'
 var soilChart = createChart('soilMoistureChart','Soil Moisture (%)',[30,40,50,45,60,55],'rgba(255,193,7,1)');
 
 // ---- Metrics & Alerts ----
-function updateDashboard() {
-    document.getElementById('rainfallMetric').innerText = (Math.random()*200).toFixed(2) + " mm";
-    document.getElementById('waterLevelMetric').innerText = (Math.random()*15).toFixed(2) + " m";
-    document.getElementById('popDensityMetric').innerText = (Math.random()*2000).toFixed(0);
-    document.getElementById('floodRiskMetric').innerText = (Math.random()*100).toFixed(1);
+// Pushed by the server over SSE; EventSource reconnects on its own after a
+// dropped connection, but a 503 (every stream slot taken) closes it for good.
+// The page then polls `fallback` every `pollMs` and tries the stream again
+// a minute or so later.
+function subscribe(name, handler, fallback, pollMs) {
+    const source = new EventSource('/stream/' + name);
+    source.addEventListener(name, e => handler(JSON.parse(e.data)));
+    source.onerror = () => {
+        if (source.readyState !== EventSource.CLOSED) return;
+        const refresh = () => fetch(fallback)
+            .then(response => response.ok ? response.json() : null)
+            .then(data => { if (data) handler(data); })
+            .catch(() => {});
+        refresh();
+        const poll = setInterval(refresh, pollMs);
+        setTimeout(() => {
+            clearInterval(poll);
+            subscribe(name, handler, fallback, pollMs);
+        }, 60000 + Math.random() * 30000);
+    };
+}
 
+function updateMetrics(reading) {
+    document.getElementById('rainfallMetric').innerText = reading.rainfall.toFixed(2) + " mm";
+    document.getElementById('waterLevelMetric').innerText = reading.water_level.toFixed(2) + " m";
+    document.getElementById('popDensityMetric').innerText = reading.population_density.toFixed(0);
+    document.getElementById('floodRiskMetric').innerText = reading.flood_risk;
+}
+
+function updateAlerts(alerts) {
     var alertsList = document.getElementById('alertsList');
     alertsList.innerHTML = '';
-    var alertCount = Math.floor(Math.random()*5)+1;
-    for (var i=0;i<alertCount;i++){
+    alerts.forEach(a=>{
         var li = document.createElement('li');
-        var severity = ["Low","Medium","High"][Math.floor(Math.random()*3)];
-        li.innerHTML = `<strong>${severity}:</strong> Flood risk alert in Region ${i+1}`;
+        li.innerHTML = `<strong>${a.title.split(" ")[0]}:</strong> Flood risk alert in ${a.region}`;
         alertsList.appendChild(li);
-    }
+    });
+    // New alerts mean a new risk raster; unchanged tiles still come back as 304s
+    riskLayer.redraw();
 }
 
 document.getElementById('applyFilter').addEventListener('click', ()=>{
@@ -70,5 +97,5 @@ document.getElementById('applyFilter').addEventListener('click', ()=>{
     });
 });
 
-setInterval(updateDashboard, 4000);
-updateDashboard();
+subscribe('readings', updateMetrics, '/fetch_data', 5000);
+subscribe('alerts', updateAlerts, '/fetch_alerts', 20000);
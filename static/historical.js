@@ -2,63 +2,81 @@
 const applyBtn = document.getElementById('apply-btn');
 const resetBtn = document.getElementById('reset-btn');
 const parameterSelect = document.getElementById('parameter');
+const stationSelect = document.getElementById('station');
+const startDate = document.getElementById('start-date');
+const endDate = document.getElementById('end-date');
 const avgValue = document.getElementById('avg-value');
 const maxValue = document.getElementById('max-value');
 const minValue = document.getElementById('min-value');
+const historyStatus = document.getElementById('history-status');
 
 let historicalChart;
 
-// Generate Random Historical Data
-function generateMockData(days = 30, parameter = 'rainfall') {
-    const labels = [];
-    const data = [];
-    for (let i = days; i >= 1; i--) {
-        const date = new Date();
-        date.setDate(date.getDate() - i);
-        labels.push(date.toISOString().split('T')[0]);
+// Explains an empty chart; hidden again once there is data
+function showStatus(message) {
+    historyStatus.innerText = message || '';
+    historyStatus.hidden = !message;
+}
 
-        let value;
-        switch(parameter){
-            case 'rainfall': value = Math.random() * 120; break;
-            case 'river_discharge': value = Math.random() * 500; break;
-            case 'water_level': value = Math.random() * 20; break;
-            case 'soil_moisture': value = Math.random() * 70; break;
-            case 'temperature': value = 10 + Math.random() * 35; break;
-            case 'humidity': value = 30 + Math.random() * 60; break;
-            case 'wind_speed': value = Math.random() * 25; break;
-            case 'pressure': value = 900 + Math.random() * 120; break;
-            default: value = Math.random() * 100;
-        }
-        data.push(parseFloat(value.toFixed(2)));
-    }
-    return { labels, data };
+// Stations with recorded readings
+function loadStations() {
+    return fetch('/api/history')
+        .then(response => response.json())
+        .then(result => {
+            if (!result.success) showStatus(result.error);
+            const readings = result.success && result.series.readings;
+            if (!readings || !readings.stations.length) return;
+            stationSelect.innerHTML = readings.stations
+                .map(station => `<option value="${station}">${station}</option>`).join('');
+        })
+        .catch(err => console.error("Could not load history stations:", err));
 }
 
-// Update Chart
-function updateChart(parameter) {
-    const { labels, data } = generateMockData(30, parameter);
+// Fetch recorded readings; long ranges come back downsampled (min/max/mean per bucket)
+function fetchHistory(parameter) {
+    const params = new URLSearchParams({ columns: parameter, max_points: 500 });
+    if (startDate.value) params.set('start', startDate.value);
+    if (endDate.value) params.set('end', `${endDate.value}T23:59:59`);
+    const station = encodeURIComponent(stationSelect.value || 'simulated');
+    return fetch(`/api/history/readings/${station}?${params}`)
+        .then(response => response.json())
+        .then(result => {
+            if (!result.success) throw new Error(result.error || "History query failed.");
+            const column = result.columns[parameter];
+            const labels = result.time.map(t => new Date(t).toLocaleString());
+            if (result.bucket_seconds) {
+                return { labels, data: column.mean, min: column.min, max: column.max, counts: column.count };
+            }
+            return { labels, data: column, min: column, max: column, counts: column.map(v => v === null ? 0 : 1) };
+        });
+}
+
+function renderChart(parameter, { labels, data, min, max }) {
+    const datasets = [
+        {
+            label: parameter,
+            data: data,
+            backgroundColor: 'rgba(52, 152, 219, 0.2)',
+            borderColor: 'rgba(52, 152, 219, 1)',
+            borderWidth: 2,
+            tension: 0.3,
+            fill: false,
+            pointRadius: 0,
+        },
+        // Min/max envelope of each bucket (identical to the line for raw data)
+        { label: 'max', data: max, borderWidth: 0, pointRadius: 0, fill: '+1', backgroundColor: 'rgba(52, 152, 219, 0.15)' },
+        { label: 'min', data: min, borderWidth: 0, pointRadius: 0, fill: false },
+    ];
 
     if (historicalChart) {
         historicalChart.data.labels = labels;
-        historicalChart.data.datasets[0].data = data;
-        historicalChart.data.datasets[0].label = parameter;
+        historicalChart.data.datasets = datasets;
         historicalChart.update();
     } else {
         const ctx = document.getElementById('historicalChart').getContext('2d');
         historicalChart = new Chart(ctx, {
             type: 'line',
-            data: {
-                labels: labels,
-                datasets: [{
-                    label: parameter,
-                    data: data,
-                    backgroundColor: 'rgba(52, 152, 219, 0.2)',
-                    borderColor: 'rgba(52, 152, 219, 1)',
-                    borderWidth: 2,
-                    tension: 0.3,
-                    fill: true,
-                }]
-            },
+            data: { labels: labels, datasets: datasets },
             options: {
                 responsive: true,
                 plugins: {
@@ -70,20 +88,40 @@ function updateChart(parameter) {
             }
         });
     }
+}
+
+// Update Chart
+function updateChart(parameter) {
+    fetchHistory(parameter)
+        .then(series => {
+            renderChart(parameter, series);
+            showStatus(series.labels.length ? '' : "No readings were recorded in this range yet.");
 
-    // Update Summary Stats
-    const sum = data.reduce((a,b)=>a+b,0);
-    avgValue.innerText = (sum/data.length).toFixed(2);
-    maxValue.innerText = Math.max(...data).toFixed(2);
-    minValue.innerText = Math.min(...data).toFixed(2);
+            // Update Summary Stats (count-weighted across buckets)
+            let sum = 0, count = 0;
+            series.data.forEach((v, i) => {
+                if (v !== null) { sum += v * series.counts[i]; count += series.counts[i]; }
+            });
+            const maxima = series.max.filter(v => v !== null);
+            const minima = series.min.filter(v => v !== null);
+            avgValue.innerText = count ? (sum / count).toFixed(2) : '-';
+            maxValue.innerText = maxima.length ? Math.max(...maxima).toFixed(2) : '-';
+            minValue.innerText = minima.length ? Math.min(...minima).toFixed(2) : '-';
+        })
+        .catch(err => {
+            console.error("Could not load history:", err);
+            showStatus(err.message);
+            avgValue.innerText = maxValue.innerText = minValue.innerText = '-';
+        });
 }
 
 // Event Listeners
 applyBtn.addEventListener('click', () => updateChart(parameterSelect.value));
 resetBtn.addEventListener('click', () => {
     parameterSelect.value = 'rainfall';
+    startDate.value = endDate.value = '';
     updateChart('rainfall');
 });
 
 // Initialize chart with default
-updateChart('rainfall');
+loadStations().then(() => updateChart('rainfall'));
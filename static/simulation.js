@@ -72,14 +72,10 @@ function updateChartDisplay() {
  chart.update();
 }
 
-// NEW FUNCTION: Handles the backend API call
-function fetchPrediction() {
-    console.log("Running simulation...");
-    const statusEl = document.getElementById("sim-status");
-    statusEl.textContent = "Running simulation...";
-
-    // 1. Collect all data and map to backend keys (from your example index.js)
-    const data = {
+// Slider values mapped to backend keys; the two percentage sliders are
+// fractions in the model's schema
+function collectConditions() {
+    return {
         rainfall_mm: parseFloat(document.getElementById('rainfall').value),
         river_discharge_cumec: parseFloat(document.getElementById('river_discharge').value),
         water_level_m: parseFloat(document.getElementById('water_level').value),
@@ -90,10 +86,20 @@ function fetchPrediction() {
         pressure_hpa: parseFloat(document.getElementById('pressure').value),
         elevation_m: parseFloat(document.getElementById('elevation').value),
         population_density: parseFloat(document.getElementById('population_density').value),
-        drainage_efficiency: parseFloat(document.getElementById('drainage_efficiency').value),
+        drainage_efficiency: parseFloat(document.getElementById('drainage_efficiency').value) / 100,
         distance_to_coast_km: parseFloat(document.getElementById('distance_to_coast').value),
-        deforestation_index: parseFloat(document.getElementById('deforestation_index').value)
+        deforestation_index: parseFloat(document.getElementById('deforestation_index').value) / 100
     };
+}
+
+// NEW FUNCTION: Handles the backend API call
+function fetchPrediction() {
+    console.log("Running simulation...");
+    const statusEl = document.getElementById("sim-status");
+    statusEl.textContent = "Running simulation...";
+
+    // 1. Collect all data and map to backend keys (from your example index.js)
+    const data = collectConditions();
 
     // 2. Send data to Flask backend
     fetch("/predict", { // Using relative URL for Flask
@@ -113,12 +119,13 @@ function fetchPrediction() {
         console.log("Prediction result:", result);
         if (result.success) {
             // 3. Update UI with backend results
-            statusEl.textContent = "Complete";
+            // Degraded answers come from the heuristic fallback and carry no probability
+            statusEl.textContent = result.degraded ? "Complete (heuristic estimate)" : "Complete";
 
-            const riskPercent = (result.probability * 100).toFixed(1);
+            const riskPercent = result.probability == null ? 0 : (result.probability * 100).toFixed(1);
 
             // Update Gauge
-            document.getElementById("riskValue").textContent = `${riskPercent}%`;
+            document.getElementById("riskValue").textContent = result.probability == null ? "N/A" : `${riskPercent}%`;
             document.getElementById("gauge").style.background = 
                 `conic-gradient(#d9534f ${riskPercent}%, #ccc ${riskPercent}%)`; // Red for risk
 
@@ -145,8 +152,81 @@ function fetchPrediction() {
 }
 
 
+// Ensemble sweep: many perturbed copies of the current conditions, scored on
+// the server; only aggregates come back, one JSON line per progress update
+let sweepChart = new Chart(document.getElementById('sweepChart').getContext('2d'), {
+ type: 'bar',
+ data: {
+  labels: [],
+  datasets: [{ label: 'Share of samples', data: [], backgroundColor: '#d9534f' }]
+ },
+ options: { responsive: true, scales: { y: { min: 0, max: 1 } } }
+});
+
+function showSweep(result) {
+    if (!result.success) {
+        throw new Error(result.error || "Sweep failed on server.");
+    }
+    const scenario = result.scenarios[0];
+    document.getElementById("sweep-status").textContent = result.done
+        ? `Complete: ${result.samples.toLocaleString()} samples in ${result.seconds}s`
+        : `${result.samples.toLocaleString()} / ${result.total.toLocaleString()} samples...`;
+    document.getElementById("sweepMean").textContent =
+        `${(scenario.mean_probability * 100).toFixed(1)}% ± ${(scenario.std_probability * 100).toFixed(1)}%`;
+    document.getElementById("sweepExceedance").innerHTML = Object.entries(scenario.exceedance)
+        .map(([threshold, p]) => `<li>P(risk > ${threshold}): ${(p * 100).toFixed(1)}%` +
+             ` ± ${(scenario.exceedance_stderr[threshold] * 100).toFixed(1)}%</li>`)
+        .join("");
+    sweepChart.data.labels = Object.keys(scenario.risk_levels);
+    sweepChart.data.datasets[0].data = Object.values(scenario.risk_levels);
+    sweepChart.update();
+}
+
+async function runEnsemble() {
+    const statusEl = document.getElementById("sweep-status");
+    statusEl.textContent = "Running ensemble...";
+    const request = {
+        base: collectConditions(),
+        perturbations: {
+            rainfall_mm: {
+                distribution: "normal",
+                mean: parseFloat(document.getElementById('sweepRainChange').value) / 100,
+                std: parseFloat(document.getElementById('sweepRainSpread').value) / 100
+            }
+        },
+        samples: parseInt(document.getElementById('sweepSamples').value, 10)
+    };
+    try {
+        const response = await fetch("/api/scenarios/sweep", {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(request)
+        });
+        if (!response.ok) {
+            const error = await response.json().catch(() => ({}));
+            throw new Error(error.error || `HTTP error! status: ${response.status}`);
+        }
+        // Newline-delimited JSON: handle each complete line as it arrives
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split("\n");
+            buffer = lines.pop();
+            lines.filter(line => line.trim()).forEach(line => showSweep(JSON.parse(line)));
+        }
+    } catch (err) {
+        console.error('Ensemble Error:', err);
+        statusEl.textContent = `Error: ${err.message}`;
+    }
+}
+
 // MODIFIED: "runSim" button now calls fetchPrediction
 document.getElementById("runSim").addEventListener("click", fetchPrediction);
+document.getElementById("runSweep").addEventListener("click", runEnsemble);
 document.getElementById("resetSim").addEventListener("click", () => location.reload());
 
 // MODIFIED: Preset buttons now call updateChartDisplay
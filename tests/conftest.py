@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_INPUT = {
+    'rainfall_mm': 100.0, 'river_discharge_cumec': 250.0, 'water_level_m': 4.5,
+    'soil_moisture_percent': 95.0, 'temperature_c': 24.0, 'humidity_percent': 98.0,
+    'wind_speed_ms': 20.0, 'pressure_hpa': 998.0, 'elevation_m': 10.0,
+    'population_density': 1800.0, 'drainage_efficiency': 0.4,
+    'distance_to_coast_km': 5.0, 'deforestation_index': 0.7
+}
+
+
+@pytest.fixture(scope='session')
+def model_path():
+    return os.path.join(ROOT, "universal_flood_model.joblib")
+
+
+@pytest.fixture
+def sample_input():
+    return dict(SAMPLE_INPUT)
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """
+    The Flask app module, imported once with background jobs off and a
+    scratch model registry and history directory.
+    """
+    scratch = tmp_path_factory.mktemp("app")
+    os.environ.update({
+        "FLOOD_RISK_BACKGROUND": "0",
+        "FLOOD_MODEL_WARMUP": "0",
+        "FLOOD_MODEL_REGISTRY": str(scratch / "model_registry"),
+        "FLOOD_HISTORY_DIR": str(scratch / "history"),
+    })
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from backend.alert_index import AlertIndex, haversine_km
+
+BASINS = {"North": (25.0, 75.0, 30.0, 85.0), "South": (10.0, 75.0, 15.0, 80.0)}
+
+
+@pytest.fixture
+def alerts():
+    rng = np.random.default_rng(0)
+    lats, lons = rng.uniform(8, 32, 500).round(3), rng.uniform(70, 90, 500).round(3)
+    return {f"a{i}": {"id": f"a{i}", "lat": float(lat), "lon": float(lon), "time": "t0"}
+            for i, (lat, lon) in enumerate(zip(lats, lons))}
+
+
+@pytest.fixture
+def index(alerts):
+    index = AlertIndex(cell_size=0.5, basins=BASINS)
+    index.sync(alerts)
+    return index
+
+
+def ids(found):
+    return sorted(alert["id"] for alert in found)
+
+
+@pytest.mark.parametrize("box", [(20.0, 76.0, 24.0, 81.0), (20.1, 76.3, 20.4, 76.9), (-5.0, 0.0, 60.0, 120.0),
+                                 (30.5, 89.5, 31.0, 90.0)])
+def test_bbox_matches_a_scan(index, alerts, box):
+    lat_min, lon_min, lat_max, lon_max = box
+    expected = [a for a in alerts.values() if lat_min <= a["lat"] <= lat_max and lon_min <= a["lon"] <= lon_max]
+    assert ids(index.in_bbox(*box)) == ids(expected)
+
+
+def test_bbox_edges_are_inclusive_and_limited(index):
+    index.upsert("edge", {"id": "edge", "lat": 20.0, "lon": 76.0})
+    assert "edge" in ids(index.in_bbox(20.0, 76.0, 20.0, 76.0))
+    assert len(index.in_bbox(8.0, 70.0, 32.0, 90.0, limit=7)) == 7
+    with pytest.raises(ValueError):
+        index.in_bbox(24.0, 76.0, 20.0, 81.0)
+
+
+def test_basins_and_moves(index, alerts):
+    north = [a for a in alerts.values() if 25.0 <= a["lat"] <= 30.0 and 75.0 <= a["lon"] <= 85.0]
+    assert ids(index.in_basin("North")) == ids(north)
+    moved = dict(north[0], lat=12.0, lon=77.0)
+    index.upsert(moved["id"], moved)
+    assert moved["id"] not in ids(index.in_basin("North"))
+    assert moved["id"] in ids(index.in_basin("South"))
+    with pytest.raises(KeyError):
+        index.in_basin("Nowhere")
+
+
+def test_nearest_matches_a_scan(index, alerts):
+    found = index.nearest(21.0, 80.0, k=10)
+    expected = sorted(haversine_km(21.0, 80.0, a["lat"], a["lon"]) for a in alerts.values())[:10]
+    np.testing.assert_allclose([distance for distance, _ in found], expected)
+    assert all(distance <= 50 for distance, _ in index.nearest(21.0, 80.0, k=50, max_km=50))
+
+
+def test_sync_keeps_the_first_raised_time(index, alerts):
+    later = {alert_id: dict(alert, time="t1") for alert_id, alert in alerts.items() if alert_id != "a0"}
+    later["a1"]["probability"] = 0.9
+    later["new"] = {"id": "new", "lat": 20.0, "lon": 80.0, "time": "t1"}
+    assert index.sync(later, keep=("time",)) == (1, 1, 1)
+    assert index.get("a1")["time"] == "t0" and index.get("a1")["probability"] == 0.9
+    assert index.get("new")["time"] == "t1"
+    assert "a0" not in index
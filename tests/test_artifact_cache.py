@@ -0,0 +1,81 @@
+import os
+
+import dask.dataframe as dd
+import pandas as pd
+import pytest
+
+from artifact_cache import ArtifactCache, path_signature
+
+
+def stage_a(x):
+    return x + 1
+
+
+def stage_b(x):
+    return x + 2
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArtifactCache(str(tmp_path / "cache"))
+
+
+def test_keys_change_with_config_code_and_parents(cache):
+    key = cache.key("scaled", {"window": 24}, code=(stage_a,), parents=("raw-1",))
+    assert key == cache.key("scaled", {"window": 24}, code=(stage_a,), parents=("raw-1",))
+    assert key.startswith("scaled-")
+    for other in (cache.key("scaled", {"window": 48}, code=(stage_a,), parents=("raw-1",)),
+                  cache.key("scaled", {"window": 24}, code=(stage_b,), parents=("raw-1",)),
+                  cache.key("scaled", {"window": 24}, code=(stage_a,), parents=("raw-2",))):
+        assert other != key
+
+
+def test_objects_are_built_once(cache):
+    calls = []
+
+    def make():
+        calls.append(1)
+        return {"mean": 3.0}
+
+    key = cache.key("scaler")
+    assert cache.object(key, make) == {"mean": 3.0}
+    assert cache.object(key, make) == {"mean": 3.0}
+    assert len(calls) == 1 and cache.has(key)
+
+
+def test_interrupted_build_leaves_nothing_behind(cache):
+    key = cache.key("model")
+
+    def fail(directory):
+        with open(os.path.join(directory, "partial.bin"), "wb") as f:
+            f.write(b"half")
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        cache.build(key, fail)
+    assert not cache.has(key) and os.listdir(cache.root) == []
+    assert cache.object(key, lambda: "rebuilt") == "rebuilt"
+
+
+def test_frames_keep_their_divisions(cache):
+    frame = pd.DataFrame({"rainfall": range(100)}, index=pd.RangeIndex(100))
+    ddf = cache.frame(cache.key("raw"), lambda: dd.from_pandas(frame, npartitions=4))
+    assert ddf.known_divisions and ddf.npartitions == 4
+    pd.testing.assert_frame_equal(ddf.compute(), frame, check_index_type=False)
+
+
+def test_input_signature_tracks_file_changes(tmp_path, cache):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "part-0.csv").write_text("a\n1\n")
+    before = cache.key("raw", {"files": path_signature(str(data))})
+    (data / "part-0.csv").write_text("a\n1\n2\n")
+    assert cache.key("raw", {"files": path_signature(str(data))}) != before
+
+
+def test_disabled_cache_always_builds():
+    cache = ArtifactCache(None)
+    calls = []
+    for _ in range(2):
+        cache.object("scaler", lambda: calls.append(1))
+    assert len(calls) == 2 and cache.checkpoint_dir("scaler") is None
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier
+
+import compiled_model
+from compiled_model import BatchRoutedScorer, PARITY_TOLERANCE, compile_model
+
+
+@pytest.fixture(scope='module')
+def model():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 5))
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(0, 0.3, 400) > 0).astype(int)
+    return GradientBoostingClassifier(n_estimators=20, max_depth=3, random_state=0).fit(X, y)
+
+
+def test_compiled_matches_sklearn(model):
+    compiled = compile_model(model)
+    X = compiled_model.parity_inputs(compiled, n_rows=2000, seed=1)
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=0, atol=PARITY_TOLERANCE)
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+
+
+def test_save_and_load_round_trip(model, tmp_path):
+    compiled = compile_model(model)
+    path = compiled_model.save_compiled(compiled, str(tmp_path / 'model.scorer.npz'), source_digest='abc')
+    loaded, digest = compiled_model.load_compiled(path)
+    X = compiled_model.parity_inputs(compiled, n_rows=100, seed=2)
+    assert digest == 'abc'
+    np.testing.assert_array_equal(loaded.predict_proba(X), compiled.predict_proba(X))
+
+
+def test_routes_bulk_batches_to_sklearn(model):
+    loads = []
+    scorer = BatchRoutedScorer(compile_model(model), lambda: loads.append(1) or model, max_rows=8)
+    X = compiled_model.parity_inputs(scorer.compiled, n_rows=9, seed=3)
+    scorer.predict_proba(X[:8])
+    assert loads == []
+    np.testing.assert_array_equal(scorer.predict_proba(X), model.predict_proba(X))
+    scorer.predict_proba(X)
+    assert loads == [1]
+
+
+def test_compiled_scores_everything_without_bulk_model(model):
+    scorer = BatchRoutedScorer(compile_model(model), lambda: None, max_rows=8)
+    X = compiled_model.parity_inputs(scorer.compiled, n_rows=50, seed=4)
+    np.testing.assert_array_equal(scorer.predict_proba(X), scorer.compiled.predict_proba(X))
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from dask_pipeline import (
+    BASE_FEATURES, LABEL, count_shard_batches, fit_standard_scaler, generate_partition,
+    generate_partitioned_dataset, partition_sequence_batches, shard_sequence_batches, write_sequence_shards
+)
+
+
+@pytest.fixture(scope="module")
+def ddf():
+    return generate_partitioned_dataset(600, npartitions=3, seed=1)
+
+
+def test_generate_partition_is_reproducible():
+    a, b = generate_partition(100, 150, 7), generate_partition(100, 150, 7)
+    pd.testing.assert_frame_equal(a, b)
+    assert list(a.columns) == BASE_FEATURES
+    assert (a.index[0], len(a)) == (100, 50)
+
+
+def test_partitions_follow_the_seeded_generator(ddf):
+    frame = ddf.compute()
+    assert len(frame) == 600 and frame.index.is_monotonic_increasing
+    assert set(frame[LABEL].unique()) <= {0, 1}
+
+
+def test_shards_yield_the_counted_batches(ddf, tmp_path):
+    scaler = fit_standard_scaler(ddf, BASE_FEATURES, StandardScaler())
+    write_sequence_shards(ddf, BASE_FEATURES, scaler, range(ddf.npartitions), str(tmp_path))
+    n_batches = count_shard_batches(str(tmp_path), sequence_length=24, batch_size=32)
+    batches = shard_sequence_batches(str(tmp_path), sequence_length=24, label_offset=0, batch_size=32, seed=0)
+    rows = sum(len(next(batches)[1]) for _ in range(n_batches))
+    # One epoch covers every window of every shard exactly once
+    assert rows == ddf.map_partitions(len).compute().sub(24).clip(lower=0).sum()
+    X, y = next(batches)
+    assert X.shape[1:] == (24, len(BASE_FEATURES)) and X.dtype == np.float32
+
+
+def test_empty_shard_directory_raises(tmp_path):
+    with pytest.raises(ValueError):
+        next(shard_sequence_batches(str(tmp_path), sequence_length=24, label_offset=0))
+
+
+def test_no_partitions_raises(ddf):
+    with pytest.raises(ValueError):
+        next(partition_sequence_batches(ddf, BASE_FEATURES, StandardScaler(), 24, 0, partitions=[]))
@@ -0,0 +1,121 @@
+import io
+
+import numpy as np
+import pytest
+
+import feature_schema
+from feature_schema import FEATURE_NAMES
+
+
+@pytest.fixture
+def matrix():
+    # In-range rows, float32-exact so every decoder must return them unchanged
+    rng = np.random.default_rng(0)
+    return rng.uniform(feature_schema.LOWER, feature_schema.UPPER, (50, len(FEATURE_NAMES))).astype(np.float32)
+
+
+def test_schema_matches_model_columns():
+    from physical_dataset import FEATURE_COLUMNS
+    assert tuple(FEATURE_COLUMNS) == FEATURE_NAMES
+
+
+def test_round_trip(matrix):
+    rows = [dict(zip(FEATURE_NAMES, row)) for row in matrix.tolist()]
+    body = io.BytesIO()
+    np.save(body, matrix.astype(np.float64))
+    decoded = {
+        'rows': feature_schema.decode_rows(rows),
+        'columns': feature_schema.decode_columns({name: matrix[:, j].tolist() for j, name in enumerate(FEATURE_NAMES)}),
+        'array': feature_schema.decode_array(matrix),
+        'npy': feature_schema.decode_npy(body.getvalue()),
+    }
+    for name, (features, errors) in decoded.items():
+        assert features.dtype == feature_schema.DTYPE, name
+        assert errors == {}, name
+        np.testing.assert_array_equal(features, matrix, err_msg=name)
+
+
+def test_arrow_round_trip(matrix):
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table({name: matrix[:, j] for j, name in enumerate(FEATURE_NAMES)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    features, errors = feature_schema.decode_arrow(sink.getvalue().to_pybytes())
+    assert errors == {}
+    np.testing.assert_array_equal(features, matrix)
+
+
+def test_invalid_values_are_reported(matrix):
+    rows = [dict(zip(FEATURE_NAMES, row)) for row in matrix[:5].tolist()]
+    rows[1]['rainfall_mm'] = -1.0
+    rows[3]['pressure_hpa'] = 'low'
+    del rows[4]['elevation_m']
+    features, errors = feature_schema.decode_rows(rows)
+    assert sorted(errors) == [1, 3, 4]
+    assert 'rainfall_mm' in errors[1]
+    assert 'numeric' in errors[3]
+    assert 'elevation_m' in errors[4]
+    assert np.isnan(features[3]).all() and np.isnan(features[4]).all()
+
+
+def test_non_list_column_is_refused(matrix):
+    columns = {name: matrix[:3, j].tolist() for j, name in enumerate(FEATURE_NAMES)}
+    columns['humidity_percent'] = 80.0
+    with pytest.raises(ValueError, match='humidity_percent'):
+        feature_schema.decode_columns(columns)
+
+
+def npy_body(array):
+    body = io.BytesIO()
+    np.save(body, array)
+    return body.getvalue()
+
+
+@pytest.mark.parametrize("payload, message", [
+    ({"columns": {"rainfall_mm": [1.0]}}, "Missing column"),
+    ({"columns": {name: [1.0, 2.0] if name != "elevation_m" else [1.0] for name in FEATURE_NAMES}}, "same length"),
+])
+def test_json_decode_errors_are_400s(client, payload, message):
+    response = client.post("/predict/batch", json=payload)
+    assert response.status_code == 400 and message in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("body, message", [
+    (b"not an npy body", "Invalid .npy"),
+    (npy_body(np.zeros((4, len(FEATURE_NAMES))))[:-8], "Truncated"),
+    (npy_body(np.zeros((4, 3))), "shape"),
+    (npy_body(np.array([[object()] * len(FEATURE_NAMES)], dtype=object)), "Object arrays"),
+])
+def test_npy_decode_errors_are_400s(client, body, message):
+    response = client.post("/predict/batch", data=body, content_type="application/x-npy")
+    assert response.status_code == 400 and message in response.get_json()["error"]
+
+
+def test_npy_out_of_range_rows_are_reported_per_row(client, matrix):
+    matrix[1, FEATURE_NAMES.index("humidity_percent")] = 250.0
+    results = client.post("/predict/batch", data=npy_body(matrix[:3]), content_type="application/x-npy").get_json()["results"]
+    assert [row["success"] for row in results] == [True, False, True]
+
+
+def test_arrow_decode_errors(client, matrix):
+    pa = pytest.importorskip("pyarrow")
+    response = client.post("/predict/batch", data=b"garbage", content_type="application/vnd.apache.arrow.stream")
+    assert response.status_code == 400 and "Invalid Arrow" in response.get_json()["error"]
+
+    def arrow_body(table):
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    columns = {name: pa.array(matrix[:3, j]) for j, name in enumerate(FEATURE_NAMES)}
+    partial = arrow_body(pa.table({name: column for name, column in columns.items() if name != "elevation_m"}))
+    response = client.post("/predict/batch", data=partial, content_type="application/vnd.apache.arrow.file")
+    assert response.status_code == 400 and "elevation_m" in response.get_json()["error"]
+
+    # Nulls decode to NaN and fail only their own row
+    columns["rainfall_mm"] = pa.array([1.0, None, 2.0], type=pa.float32())
+    results = client.post("/predict/batch", data=arrow_body(pa.table(columns)),
+                          content_type="application/vnd.apache.arrow.file").get_json()["results"]
+    assert [row["success"] for row in results] == [True, False, True]
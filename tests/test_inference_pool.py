@@ -0,0 +1,100 @@
+import os
+import signal
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import flood_predictor
+from backend.inference_pool import InferencePool, Overloaded
+from backend.telemetry import Telemetry
+
+
+class GatedPredictor:
+    """
+    Echoes each record's 'n' back, blocking every call until `gate` is set.
+    """
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.batch_sizes = []
+
+    def predict_many(self, records):
+        self.gate.wait(5)
+        self.batch_sizes.append(len(records))
+        return [{"error": "bad row"} if row.get("bad") else {"n": row["n"]} for row in records]
+
+
+def wait_until_busy(pool):
+    deadline = time.monotonic() + 5
+    while not pool._in_flight and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def pool():
+    pool = InferencePool(workers=1, max_batch=8, max_wait=0.05, max_queue=6, use_processes=False).start()
+    yield pool
+    pool.shutdown()
+
+
+def test_waiting_requests_are_batched_and_split_back(pool):
+    predictor = GatedPredictor()
+    first = pool.submit(predictor, [{"n": 0}])
+    wait_until_busy(pool)
+    futures = [pool.submit(predictor, [{"n": i}, {"n": i + 100}]) for i in range(1, 4)]
+    predictor.gate.set()
+    assert first.result(5) == [{"n": 0}]
+    for i, future in enumerate(futures, start=1):
+        assert future.result(5) == [{"n": i}, {"n": i + 100}]
+    # The three queued while the worker was busy went out as one batch
+    assert predictor.batch_sizes == [1, 6]
+    assert pool.stats()["batches"] == 2 and pool.stats()["rows"] == 7
+
+
+def test_full_queue_sheds_load(pool):
+    predictor = GatedPredictor()
+    busy = pool.submit(predictor, [{"n": 0}])
+    wait_until_busy(pool)
+    queued = pool.submit(predictor, [{"n": i} for i in range(5)])
+    with pytest.raises(Overloaded):
+        pool.submit(predictor, [{"n": 9}, {"n": 10}])
+    predictor.gate.set()
+    assert len(busy.result(5)) == 1 and len(queued.result(5)) == 5
+    assert pool.stats()["shed"] == 1
+
+
+def test_row_errors_surface_as_value_errors(pool):
+    predictor = GatedPredictor()
+    predictor.gate.set()
+    assert pool.predict(predictor, {"n": 3}) == {"n": 3}
+    with pytest.raises(ValueError):
+        pool.predict(predictor, {"n": 4, "bad": True})
+
+
+def test_process_workers_match_direct_scoring_and_recover(model_path, sample_input):
+    predictor = flood_predictor.FloodRiskPredictorStandalone(model_path)
+    records = [dict(sample_input, rainfall_mm=r) for r in (0.0, 150.0, 300.0)]
+    telemetry = Telemetry()
+    pool = InferencePool(workers=1, use_processes=True, preload_path=model_path, telemetry=telemetry).start()
+    try:
+        expected = [row["probability"] for row in predictor.predict_many(records)]
+        assert [row["probability"] for row in pool.predict_many(predictor, records, timeout=30)] == expected
+        # Stage timings measured in the worker are recorded here
+        assert telemetry.snapshot()["latency"]["stage_duration_seconds"]["predict_proba"]["count"] == 1
+
+        for process in list(pool._executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+            process.join()
+        # The batch in flight when the pool broke may fail; the pool is then replaced
+        for _ in range(3):
+            try:
+                results = pool.predict_many(predictor, records, timeout=30)
+                break
+            except BrokenProcessPool:
+                continue
+        assert [row["probability"] for row in results] == expected
+        assert pool.stats()["restarts"] == 1
+    finally:
+        pool.shutdown()
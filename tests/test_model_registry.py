@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from backend.model_registry import BUNDLED_VERSION, ModelRegistry, version_key
+
+
+class FakePredictor:
+    def __init__(self, name):
+        self.name = name
+        self.model = object()
+
+    def load(self):
+        pass
+
+
+def load_fake(version_dir):
+    with open(os.path.join(version_dir, "model.txt"), encoding="utf-8") as f:
+        content = f.read()
+    if content == "broken":
+        raise RuntimeError("unreadable model")
+    return FakePredictor(content)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path / "registry"), keep=2, loader=load_fake, fallback=FakePredictor("bundled"))
+
+
+def publish(registry, tmp_path, version, content):
+    source = tmp_path / f"src-{version}"
+    source.mkdir(exist_ok=True)
+    (source / "model.txt").write_text(content, encoding="utf-8")
+    return registry.publish(str(source), version)
+
+
+def test_serves_the_fallback_until_a_version_is_published(registry, tmp_path):
+    assert registry.active()[0] == BUNDLED_VERSION
+    publish(registry, tmp_path, "v1", "one")
+    assert registry.refresh() and registry.active()[1].name == "one"
+    assert not registry.refresh()
+
+
+def test_hot_swap_leaves_held_snapshots_alone(registry, tmp_path):
+    publish(registry, tmp_path, "v1", "one")
+    held = registry.active()
+    publish(registry, tmp_path, "v2", "two")
+    registry.refresh()
+    assert held[0] == "v1" and held[1].name == "one"
+    assert registry.active_version == "v2"
+    assert not [name for name in os.listdir(registry.artifact_dir) if name.startswith(".")]
+
+
+def test_eviction_and_rollback(registry, tmp_path):
+    for version in ("v1", "v2", "v3"):
+        publish(registry, tmp_path, version, version)
+        registry.refresh()
+    assert registry.resident_versions() == ["v2", "v3"]
+    assert registry.rollback() == "v2"
+    # Evicted versions are loaded back from disk
+    assert registry.activate("v1") == "v1" and registry.active()[1].name == "v1"
+    with pytest.raises(ValueError):
+        registry.activate("v9")
+
+
+def test_broken_version_is_retried_once_fixed(registry, tmp_path):
+    publish(registry, tmp_path, "v1", "one")
+    registry.refresh()
+    publish(registry, tmp_path, "v2", "broken")
+    assert not registry.refresh() and registry.active_version == "v1"
+    assert not registry.refresh()
+    path = os.path.join(registry.artifact_dir, "v2", "model.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("fixed")
+    os.utime(path, ns=(os.stat(path).st_mtime_ns + 10**9,) * 2)
+    assert registry.refresh() and registry.active()[1].name == "fixed"
+
+
+def test_versions_sort_naturally():
+    assert sorted(["v10", "v9", "v100"], key=version_key) == ["v9", "v10", "v100"]
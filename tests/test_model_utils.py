@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import feature_schema
+from backend.model_utils import HeuristicScorer, default_scorer, predict_flood_risk
+
+
+def percent_scale_level(params):
+    # The original /fetch_data heuristic, with deforestation_index in percent
+    score = (params['rainfall'] * 0.3 + params['river_discharge'] * 0.2 + params['water_level'] * 0.1 +
+             params['soil_moisture'] * 0.1 + params['humidity'] * 0.05 + params['wind_speed'] * 0.05 +
+             params['pressure'] * 0.05 + params['deforestation_index'] * 100 * 0.15)
+    return "High Risk ⚠️" if score > 150 else "Moderate Risk ⚡" if score > 80 else "Low Risk ✅"
+
+
+@pytest.fixture
+def matrix():
+    # Spread over the training ranges so all three levels occur
+    rng = np.random.default_rng(0)
+    low = [0, 0, 0, 15, 10, 40, 0, 980, 0, 10, 0.1, 0, 0.05]
+    high = [300, 700, 8, 100, 40, 100, 30, 1040, 2500, 5000, 0.9, 1500, 0.9]
+    return rng.uniform(low, high, (200, len(feature_schema.FEATURES)))
+
+
+def test_fetch_data_readings_are_schema_valid(app_module):
+    for _ in range(50):
+        reading = app_module.simulated_readings()
+        features = feature_schema.lookup(reading)[None, :].astype(feature_schema.DTYPE)
+        assert feature_schema.validate(features) == {}, reading
+        assert reading['flood_risk'] == percent_scale_level(reading)
+
+
+def test_fraction_inputs_score_like_percent_readings(sample_input):
+    short = {feature.short_name: sample_input[feature.name] for feature in feature_schema.FEATURES}
+    assert predict_flood_risk(sample_input) == predict_flood_risk(short) == percent_scale_level(short)
+    score, _ = default_scorer.predict_one(sample_input)
+    assert score == pytest.approx(100 * 0.3 + 250 * 0.2 + 4.5 * 0.1 + 95 * 0.1 + 98 * 0.05 + 20 * 0.05
+                                  + 998 * 0.05 + 70 * 0.15)
+
+
+def test_matrix_frame_and_dicts_agree(matrix):
+    scores, labels = default_scorer.predict(matrix)
+    frame = pd.DataFrame(matrix, columns=feature_schema.FEATURE_NAMES)
+    np.testing.assert_allclose(default_scorer.score(frame), scores)
+    dict_labels = [predict_flood_risk(dict(zip(feature_schema.FEATURE_NAMES, row))) for row in matrix.tolist()]
+    assert list(labels) == dict_labels
+    assert len(set(dict_labels)) == 3
+
+
+def test_levels_at_thresholds():
+    scorer = HeuristicScorer()
+    np.testing.assert_array_equal(scorer.levels(np.array([0, 80, 80.01, 150, 150.01])), [0, 0, 1, 1, 2])
+
+
+def test_results_are_degraded_answers(matrix):
+    results = default_scorer.results(matrix[:3])
+    assert [row['probability'] for row in results] == [None] * 3
+    assert all(row['risk_level'] in default_scorer.labels for row in results)
+
+
+def test_config_overrides_and_validation(tmp_path):
+    path = tmp_path / "heuristic.json"
+    path.write_text(json.dumps({"weights": {"rainfall": 1.0}, "thresholds": [10, 20]}))
+    scorer = HeuristicScorer.from_config(str(path))
+    assert scorer.predict_one({"rainfall_mm": 15})[1] == "Moderate Risk ⚡"
+    with pytest.raises(ValueError):
+        HeuristicScorer(weights={"snowfall": 1.0})
+    with pytest.raises(ValueError):
+        HeuristicScorer(thresholds=[150, 80])
@@ -0,0 +1,54 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+import numpy_lstm
+from numpy_lstm import PARITY_TOLERANCE
+
+tf = pytest.importorskip("tensorflow")
+
+
+@pytest.fixture(scope='module')
+def model():
+    # Same layout as HybridHPCPredictor.build_lstm_model, scaled down
+    tf.keras.utils.set_random_seed(0)
+    return tf.keras.Sequential([
+        tf.keras.Input(shape=(12, 3)),
+        tf.keras.layers.LSTM(8, return_sequences=True),
+        tf.keras.layers.LSTM(4),
+        tf.keras.layers.Dense(1, activation='sigmoid'),
+    ])
+
+
+def test_numpy_matches_keras(model):
+    lstm = numpy_lstm.from_keras(model)
+    X = numpy_lstm.parity_windows(lstm, n_windows=200, sequence_length=12)
+    expected = model.predict(X, verbose=0)
+    for batch in (X[:1], X[:7], X):
+        np.testing.assert_allclose(lstm.predict_on_batch(batch), expected[:len(batch)],
+                                   rtol=0, atol=PARITY_TOLERANCE)
+
+
+def test_unsupported_layers_are_refused():
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(12, 3)),
+        tf.keras.layers.LSTM(4),
+        tf.keras.layers.Dense(2, activation='softmax'),
+    ])
+    with pytest.raises(ValueError):
+        numpy_lstm.from_keras(model)
+
+
+def test_export_is_tied_to_its_source(model, tmp_path):
+    path = str(tmp_path / 'lstm_model.keras')
+    model.save(path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        numpy_lstm.export(path, model=model, check_windows=50)
+        lstm = numpy_lstm.load_lstm_for(path)
+        X = numpy_lstm.parity_windows(lstm, n_windows=5, sequence_length=12)
+        np.testing.assert_allclose(lstm.predict(X), model.predict(X, verbose=0), rtol=0, atol=PARITY_TOLERANCE)
+        with open(path, 'ab') as f:
+            f.write(b'retrained')
+        assert numpy_lstm.load_lstm_for(path) is None
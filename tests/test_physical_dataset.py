@@ -0,0 +1,56 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+from scipy.stats import kstest
+
+from physical_dataset import (
+    COLUMNS, FLOOD_SCORE_THRESHOLD, LABEL, LABEL_NOISE, MAX_ELEVATION, generate_physical_dataset
+)
+
+
+def generate(n_samples, seed):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return generate_physical_dataset(n_samples, seed=seed, chunk_size=5000)
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    return generate(20_000, seed=7)
+
+
+def test_dataset_is_reproducible(dataset):
+    assert list(dataset.columns) == COLUMNS
+    assert set(dataset[LABEL].unique()) <= {0, 1}
+    np.testing.assert_array_equal(dataset.values, generate(20_000, seed=7).values)
+    assert not np.array_equal(dataset.values, generate(20_000, seed=8).values)
+
+
+def test_label_follows_the_notebook_score(dataset):
+    # The notebook's flood_risk_score, row by row in PhysicalFloodPredictor
+    score = (
+        dataset['rainfall_mm'] / 250 * 0.30 +
+        dataset['river_discharge_cumec'] / 800 * 0.25 +
+        dataset['water_level_m'] / 8 * 0.20 +
+        dataset['soil_moisture_percent'] / 100 * 0.08 +
+        (MAX_ELEVATION - dataset['elevation_m']) / MAX_ELEVATION * 0.07 +
+        dataset['deforestation_index'] * 0.05 +
+        (1 - dataset['drainage_efficiency']) * 0.03 +
+        np.minimum(dataset['population_density'], 5000) / 5000 * 0.02
+    )
+    flipped = ((score > FLOOD_SCORE_THRESHOLD).astype(int) != dataset[LABEL]).mean()
+    assert abs(flipped - LABEL_NOISE) < 0.005
+
+
+def test_column_distributions(dataset):
+    # The notebook's draws, compared with a 0.1% KS critical value
+    for column, low, high in (('elevation_m', 0, MAX_ELEVATION), ('distance_to_coast_km', 0, 1500),
+                              ('drainage_efficiency', 0.1, 0.9), ('deforestation_index', 0.05, 0.9)):
+        assert kstest(dataset[column], 'uniform', args=(low, high - low)).pvalue > 1e-3, column
+    assert kstest(dataset['temperature_c'], 'norm', args=(25, 6)).pvalue > 1e-3
+    # 5% extreme (150-300 mm) and 10% heavy (50-150 mm) rainfall scenarios
+    assert abs((dataset['rainfall_mm'] > 150).mean() - 0.05) < 0.005
+    assert dataset['population_density'].min() >= 10
+    assert dataset['soil_moisture_percent'].between(15, 100).all()
+    assert dataset['humidity_percent'].between(40, 100).all()
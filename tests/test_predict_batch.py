@@ -0,0 +1,36 @@
+import flood_predictor
+
+
+def test_batch_matches_single_predictions(client, sample_input):
+    records = [sample_input, dict(sample_input, rainfall_mm=5.0, water_level_m=1.0), dict(sample_input, humidity_percent=250.0)]
+    response = client.post("/predict/batch", json=records)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["success"] and body["count"] == 3
+
+    for record, row in zip(records[:2], body["results"]):
+        single = client.post("/predict", json=record).get_json()
+        assert row["success"]
+        assert (row["probability"], row["risk_level"]) == (single["probability"], single["risk_level"])
+    # An invalid row is reported in place without failing the batch
+    assert not body["results"][2]["success"] and "humidity_percent" in body["results"][2]["error"]
+
+
+def test_columnar_and_records_payloads_agree(client, sample_input):
+    records = [sample_input, dict(sample_input, rainfall_mm=40.0)]
+    columns = {name: [record[name] for record in records] for name in sample_input}
+    by_records = client.post("/predict/batch", json={"records": records}).get_json()["results"]
+    by_columns = client.post("/predict/batch", json={"columns": columns}).get_json()["results"]
+    assert [row["probability"] for row in by_records] == [row["probability"] for row in by_columns]
+
+
+def test_batch_rejects_a_non_list_payload(client):
+    response = client.post("/predict/batch", json={"records": "nope"})
+    assert response.status_code == 400 and not response.get_json()["success"]
+
+
+def test_predict_many_keeps_input_order(model_path, sample_input):
+    predictor = flood_predictor.FloodRiskPredictorStandalone(model_path)
+    records = [dict(sample_input, rainfall_mm=r) for r in (300.0, 0.0, 150.0)]
+    results = predictor.predict_many(records)
+    assert [row["probability"] for row in results] == [predictor.predict(**r)["probability"] for r in records]
@@ -0,0 +1,72 @@
+import pytest
+
+from backend import prediction_cache
+from backend.prediction_cache import PredictionCache
+
+
+class CountingPredictor:
+    feature_columns = ["rainfall_mm", "water_level_m"]
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, **params):
+        self.calls.append(params)
+        return {"probability": params["rainfall_mm"] / 1000, "timestamp": "then"}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(prediction_cache, "time", clock)
+    return clock
+
+
+def test_rounded_inputs_share_an_entry(clock):
+    cache, predictor = PredictionCache(ttl=60, default_decimals=1), CountingPredictor()
+    first = cache.predict("v1", predictor, {"rainfall_mm": 100.04, "water_level_m": 2.0})
+    second = cache.predict("v1", predictor, {"rainfall_mm": 99.96, "water_level_m": 2.01})
+    assert len(predictor.calls) == 1 and predictor.calls[0]["rainfall_mm"] == 100.0
+    assert first["probability"] == second["probability"] and second["timestamp"] != "then"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache, predictor = PredictionCache(ttl=60), CountingPredictor()
+    params = {"rainfall_mm": 10.0, "water_level_m": 1.0}
+    cache.predict("v1", predictor, params)
+    clock.now += 60
+    cache.predict("v1", predictor, params)
+    clock.now += 61
+    cache.predict("v1", predictor, params)
+    assert len(predictor.calls) == 2 and cache.expirations == 1
+
+
+def test_a_new_model_version_drops_the_cache(clock):
+    cache, predictor = PredictionCache(), CountingPredictor()
+    params = {"rainfall_mm": 10.0, "water_level_m": 1.0}
+    cache.predict("v1", predictor, params)
+    cache.predict("v2", predictor, params)
+    cache.predict("v2", predictor, params)
+    assert len(predictor.calls) == 2
+    assert cache.stats()["invalidations"] == 1 and cache.stats()["size"] == 1
+
+
+def test_lru_eviction_and_invalid_inputs(clock):
+    cache, predictor = PredictionCache(maxsize=2), CountingPredictor()
+    for rainfall in (1.0, 2.0, 1.0, 3.0):
+        cache.predict("v1", predictor, {"rainfall_mm": rainfall, "water_level_m": 0.0})
+    # 2.0 was the least recently used
+    cache.predict("v1", predictor, {"rainfall_mm": 1.0, "water_level_m": 0.0})
+    assert cache.evictions == 1 and cache.hits == 2
+    # Unquantizable inputs go straight to the predictor (and its own errors)
+    with pytest.raises(KeyError):
+        cache.predict("v1", predictor, {"water_level_m": 0.0})
@@ -0,0 +1,38 @@
+import io
+
+import numpy as np
+
+from backend.risk_raster import RiskSnapshot
+
+
+def test_raster_and_tiles_revalidate_with_the_snapshot_etag(client, app_module):
+    snapshot = app_module.risk_raster.current()
+    for path in ("/api/risk/raster", "/fetch_alerts", "/api/risk/tiles/5/22/13.png"):
+        first = client.get(path)
+        assert first.status_code == 200 and first.headers["Cache-Control"] == "no-cache"
+        assert first.get_etag()[0] == snapshot.etag
+        again = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+        assert again.status_code == 304 and not again.data
+
+    # A new snapshot gets a new etag, so the old one no longer matches
+    app_module.risk_raster.refresh()
+    stale = client.get("/api/risk/tiles/5/22/13.png", headers={"If-None-Match": first.headers["ETag"]})
+    assert stale.status_code == 200 and stale.data.startswith(b"\x89PNG")
+
+
+def test_raw_raster_and_tile_range(client, app_module):
+    response = client.get("/api/risk/raster?format=npy")
+    probability = np.load(io.BytesIO(response.data))
+    assert probability.shape == tuple(client.get("/api/risk/raster").get_json()["shape"])
+    np.testing.assert_array_equal(probability, app_module.risk_raster.current().probability)
+    assert client.get("/api/risk/tiles/2/4/0.png").status_code == 404
+
+
+def test_snapshot_tiles_are_cached_and_etags_unique():
+    probability = np.linspace(0, 1, 100, dtype=np.float32).reshape(10, 10)
+    a = RiskSnapshot(probability, (20.0, 75.0, 21.0, 76.0), 0.1, "v1", cycle=1, epoch="a", max_tiles=2)
+    b = RiskSnapshot(probability, (20.0, 75.0, 21.0, 76.0), 0.1, "v1", cycle=1, epoch="b")
+    assert a.etag != b.etag
+    assert a.tile(8, 181, 112) is a.tile(8, 181, 112)
+    a.tile(8, 182, 112), a.tile(8, 183, 112)
+    assert len(a._tiles) == 2
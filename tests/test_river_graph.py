@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from river_graph import RiverGraph, synthetic_river_tree
+
+
+def route_by_loop(graph, locals_):
+    """
+    The routing recurrence node by node, with ticks before the first one
+    held at the first tick's steady state.
+    """
+    before = graph.steady_state(locals_[0])
+    routed = []
+    for t, local in enumerate(locals_):
+        now = graph.local_weight[:, None] * local
+        for v in range(graph.n_nodes):
+            for k in range(graph.indptr[v], graph.indptr[v + 1]):
+                u, lag = graph.indices[k], graph.lags[k]
+                now[v] += graph.data[k] * (routed[t - lag][u] if t >= lag else before[u])
+        routed.append(now)
+    return np.array(routed)
+
+
+def test_step_matches_the_recurrence():
+    graph = RiverGraph.from_tree(*synthetic_river_tree(60, seed=2))
+    locals_ = np.random.default_rng(0).uniform(0, 10, (25, 60, 2))
+    expected = route_by_loop(graph, locals_)
+    for t, local in enumerate(locals_):
+        np.testing.assert_allclose(graph.step(local), expected[t], rtol=1e-12)
+
+
+def test_pulse_arrives_after_the_summed_travel_time():
+    # 2 -> 1 -> 0 with travel times 2 and 3
+    graph = RiverGraph.from_tree([-1, 0, 1], [1, 3, 2], local_area=[1.0, 1.0, 1.0])
+    outlet = []
+    for t in range(10):
+        local = np.zeros(3)
+        if t == 1:
+            local[2] = 9.0
+        outlet.append(graph.step(local)[0])
+    # Node 2 holds a third of the outlet's catchment
+    assert np.flatnonzero(outlet).tolist() == [6]
+    assert outlet[6] == pytest.approx(3.0)
+
+
+def test_uniform_input_stays_uniform():
+    downstream, travel_time, area = synthetic_river_tree(40, seed=5)
+    graph = RiverGraph.from_tree(downstream, travel_time, area)
+    np.testing.assert_allclose(graph.steady_state(np.full(40, 2.5)), 2.5)
+    for _ in range(8):
+        routed = graph.step(np.full(40, 2.5))
+    np.testing.assert_allclose(routed, 2.5)
+    # The upstream share of a node's catchment is 1 - its local weight
+    np.testing.assert_allclose(graph.inflow.ravel(), 2.5 * (1 - graph.local_weight))
+
+
+def test_zero_travel_time_is_rejected():
+    with pytest.raises(ValueError):
+        RiverGraph.from_edges(2, [1], [0], [0], [1.0], [1.0, 1.0])
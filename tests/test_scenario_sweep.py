@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import feature_schema
+import flood_predictor
+from backend.scenario_sweep import ScenarioSweeper, SweepSpec, SweepTotals
+from backend.worker_pool import worker_predictor
+
+
+@pytest.fixture
+def payload(sample_input):
+    return {
+        "base": [dict(sample_input, district="A"), dict(sample_input, rainfall_mm=20.0, district="B")],
+        "perturbations": {"rainfall_mm": {"distribution": "normal", "mean": 0.0, "std": 0.2}},
+        "grid": {"water_level_m": {"values": [-1.0, 0.0, 1.0], "relative": False}},
+        "samples": 500,
+        "seed": 3,
+    }
+
+
+class FixedModel:
+    """
+    Scores each row by its rainfall, so expected aggregates are easy to recompute.
+    """
+
+    def predict_proba(self, X):
+        p = np.clip(X[:, 0] / 200, 0, 1)
+        return np.column_stack((1 - p, p))
+
+
+class FixedPredictor:
+    model = FixedModel()
+
+
+def test_spec_layout(payload):
+    spec = SweepSpec.from_json(payload)
+    assert (spec.n_points, spec.n_districts, spec.total) == (3, 2, 3000)
+    features, cells = spec.sample(0, spec.total, np.random.default_rng(0))
+    assert features.dtype == feature_schema.DTYPE
+    np.testing.assert_array_equal(np.bincount(cells), np.full(6, 500))
+    # Grid offsets are absolute on water_level_m, one grid point per block of districts * samples
+    water = features[:, feature_schema.FEATURE_NAMES.index('water_level_m')]
+    np.testing.assert_allclose(water[::1000], [3.5, 4.5, 5.5])
+
+
+def test_aggregates_match_the_samples(payload):
+    spec = SweepSpec.from_json(payload)
+    totals = None
+    for totals, done in ScenarioSweeper(chunk_rows=700).run(spec, FixedPredictor(), progress_interval=60):
+        pass
+    assert done and totals.samples == spec.total
+
+    probabilities, cells = [], []
+    for index, start, stop in spec.chunks(700):
+        features, chunk_cells = spec.sample(start, stop, np.random.default_rng([spec.seed, index]))
+        probabilities.append(FixedModel().predict_proba(features)[:, 1])
+        cells.append(chunk_cells)
+    probabilities, cells = np.concatenate(probabilities), np.concatenate(cells)
+    expected = SweepTotals(spec.n_points, spec.n_districts, len(spec.thresholds))
+    expected.add(cells, cells // spec.n_districts, probabilities, spec.thresholds)
+    for name in SweepTotals.FIELDS:
+        np.testing.assert_allclose(getattr(totals, name), getattr(expected, name), err_msg=name)
+
+    summary = spec.summary(totals, districts=True)
+    assert len(summary['scenarios']) == 3
+    levels = summary['scenarios'][0]['risk_levels']
+    assert list(levels) == list(flood_predictor.RISK_LEVELS)
+    assert sum(levels.values()) == pytest.approx(1.0)
+
+
+def test_executor_totals_match_the_calling_thread(payload, model_path):
+    # Chunks are seeded by index, so where they run does not change the draws
+    predictor = worker_predictor(model_path)
+    spec = SweepSpec.from_json(payload)
+    results = []
+    with ThreadPoolExecutor(2) as executor:
+        for sweeper in (ScenarioSweeper(chunk_rows=700), ScenarioSweeper(executor, chunk_rows=700)):
+            for totals, _ in sweeper.run(spec, predictor, progress_interval=60):
+                pass
+            results.append(totals)
+    for name in SweepTotals.FIELDS:
+        np.testing.assert_allclose(getattr(results[0], name), getattr(results[1], name), err_msg=name)
+
+
+def test_oversized_grid_is_refused_before_expansion(payload):
+    # 100 values for each of the 13 features is 100**13 grid points
+    payload["grid"] = {name: {"values": list(range(100)), "relative": False} for name in feature_schema.FEATURE_NAMES}
+    with pytest.raises(ValueError, match="at most"):
+        SweepSpec.from_json(payload, max_samples=10_000_000)
+
+
+def test_oversized_grid_gets_a_400(client, payload):
+    payload["grid"] = {name: {"values": list(range(100)), "relative": False} for name in feature_schema.FEATURE_NAMES}
+    response = client.post("/api/scenarios/sweep", json=payload)
+    assert response.status_code == 400
+    assert "at most" in response.get_json()["error"]
+
+
+def test_invalid_sweeps_get_a_400(client, payload):
+    payload["perturbations"] = {"rainfall_mm": {"distribution": "cauchy"}}
+    response = client.post("/api/scenarios/sweep", json=payload)
+    assert response.status_code == 400
+    assert "cauchy" in response.get_json()["error"]
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dask_pipeline import BASE_FEATURES, engineer_frame
+from streaming_features import ENGINEERED_FEATURES, StreamingFeatureEngine
+
+
+@pytest.fixture
+def stream():
+    # Same shape as HybridHPCPredictor.generate_dataset, a few days long
+    rng = np.random.default_rng(0)
+    rainfall = rng.uniform(0, 30, 200)
+    rainfall[rng.integers(0, 200, 5)] += 40
+    discharge = rainfall * 2 + rng.normal(0, 1, 200)
+    water_level = np.clip(1.5 + discharge * 0.05 + rng.normal(0, 0.2, 200), 0, None)
+    return np.stack([rainfall, discharge, water_level], axis=1)
+
+
+def test_streaming_matches_batch_features(stream):
+    expected = engineer_frame(pd.DataFrame(stream, columns=BASE_FEATURES))[ENGINEERED_FEATURES].values
+    engine = StreamingFeatureEngine()
+    actual = np.empty_like(expected)
+    for i, row in enumerate(stream):
+        engine.update(*row)
+        actual[i] = engine.features[0]
+
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    valid = ~np.isnan(expected).any(axis=1)
+    np.testing.assert_allclose(actual[valid], expected[valid], rtol=1e-12, atol=1e-9)
+
+
+def test_ready_after_warmup(stream):
+    engine = StreamingFeatureEngine()
+    assert not engine.extend(stream[:engine.warmup - 1])
+    assert engine.update(*stream[engine.warmup - 1])
+    # The first complete row is the first one the batch path keeps after dropna
+    expected = engineer_frame(pd.DataFrame(stream, columns=BASE_FEATURES))[ENGINEERED_FEATURES].dropna()
+    assert expected.index[0] == engine.warmup - 1
+    np.testing.assert_allclose(engine.features[0], expected.values[0])
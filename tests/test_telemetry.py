@@ -0,0 +1,72 @@
+import threading
+
+import numpy as np
+import pytest
+
+from backend.telemetry import Telemetry
+
+
+def test_thread_shards_merge():
+    telemetry = Telemetry()
+
+    def work():
+        for _ in range(1000):
+            telemetry.count("hits", (("kind", "a"),))
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counters, _ = telemetry.merged()
+    assert counters[("hits", (("kind", "a"),))] == 4000
+
+
+def test_quantiles_track_the_samples():
+    telemetry = Telemetry()
+    samples = np.random.default_rng(0).lognormal(np.log(0.005), 0.8, 20000)
+    for seconds in samples:
+        telemetry.observe("latency", seconds)
+    histogram = telemetry.merged()[1][("latency", ())]
+    for q in (0.5, 0.95, 0.99):
+        assert telemetry.quantile(histogram, q) == pytest.approx(np.quantile(samples, q), rel=0.15)
+    assert telemetry.summary(histogram)["count"] == len(samples)
+
+
+def test_instrument_counts_statuses_and_errors():
+    telemetry = Telemetry()
+
+    @telemetry.instrument("view")
+    def view(fail=False, status=None):
+        if fail:
+            raise RuntimeError("boom")
+        return ("body", status) if status else "body"
+
+    view()
+    view(status=404)
+    with pytest.raises(RuntimeError):
+        view(fail=True)
+    counters = telemetry.snapshot()["counters"]["requests_total"]
+    assert counters == {"view,200": 1, "view,404": 1, "view,500": 1}
+    assert telemetry.snapshot()["latency"]["request_duration_seconds"]["view"]["count"] == 3
+
+
+def test_prometheus_histograms_are_cumulative():
+    telemetry = Telemetry(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.5, 5.0):
+        telemetry.observe("stage_duration_seconds", seconds, (("stage", 'say "hi"'),))
+    text = telemetry.prometheus(gauges={"up": [((), 1)]})
+    assert 'flood_stage_duration_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 1' in text
+    assert 'flood_stage_duration_seconds_bucket{stage="say \\"hi\\"",le="1.0"} 3' in text
+    assert 'flood_stage_duration_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 4' in text
+    assert 'flood_stage_duration_seconds_count{stage="say \\"hi\\""} 4' in text
+    assert "# TYPE flood_up gauge\nflood_up 1" in text
+
+
+def test_app_exposes_request_and_stage_metrics(client, sample_input):
+    client.post("/predict", json=sample_input)
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'flood_requests_total{endpoint="predict",status="200"}' in text
+    assert 'flood_stage_duration_seconds_count{stage="predict_proba"}' in text
+    stats = client.get("/api/admin/stats").get_json()
+    assert stats["requests"]["predict,200"] >= 1 and stats["total_predictions"] >= 1
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pytest
+
+from backend.timeseries_store import TimeSeriesStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TimeSeriesStore(str(tmp_path / "history"), chunk_rows=8, flush_interval=3600)
+    yield store
+    store.close()
+
+
+def fill(store, n, start=0):
+    for i in range(start, start + n):
+        store.append("readings", "a", {"rainfall": float(i), "level": 2.0 * i}, timestamp=1000 + i)
+
+
+def test_range_is_half_open_across_chunks_and_buffer(store):
+    fill(store, 20)
+    store.flush()
+    fill(store, 3, start=20)
+    ts, values = store.range("readings", "a", 1005, 1021)
+    np.testing.assert_array_equal(ts, np.arange(1005, 1021))
+    np.testing.assert_array_equal(values["rainfall"], np.arange(5, 21, dtype=np.float32))
+    assert store.count("readings", "a", 0, 10**12) == 23
+    assert store.range("readings", "a", 5000, 6000)[0].size == 0
+
+
+def test_flush_fills_the_open_chunk_in_place(store):
+    directory = os.path.join(store.root, "readings", "a")
+    fill(store, 3)
+    store.flush()
+    chunk = sorted(os.listdir(directory))
+    fill(store, 2, start=3)
+    store.flush()
+    # Same files, now holding five rows
+    assert sorted(os.listdir(directory)) == chunk
+    assert store.count("readings", "a", 0, 10**12) == 5
+    np.testing.assert_array_equal(store.range("readings", "a", 0, 10**12)[1]["level"], [0, 2, 4, 6, 8])
+
+
+def test_reopened_store_reads_sealed_rows(store):
+    fill(store, 13)
+    store.close()
+    reopened = TimeSeriesStore(store.root, chunk_rows=8)
+    try:
+        ts, values = reopened.range("readings", "a", 0, 10**12, ["level"])
+        np.testing.assert_array_equal(ts, np.arange(1000, 1013))
+        fill(reopened, 2, start=13)
+        assert reopened.count("readings", "a", 0, 10**12) == 15
+    finally:
+        reopened.close()
+
+
+def test_timestamps_never_go_backwards(store):
+    store.append("readings", "a", {"rainfall": 1.0}, timestamp=2000)
+    store.append("readings", "a", {"rainfall": 2.0}, timestamp=1000)
+    np.testing.assert_array_equal(store.range("readings", "a", 0, 10**12)[0], [2000, 2000])
+
+
+def test_downsample_merges_buckets_across_chunks(store):
+    fill(store, 20)
+    store.flush()
+    times, result = store.downsample("readings", "a", 0, 10**12, 10, ["rainfall"])
+    np.testing.assert_array_equal(times, [1000, 1010])
+    np.testing.assert_array_equal(result["rainfall"]["count"], [10, 10])
+    np.testing.assert_allclose(result["rainfall"]["mean"], [4.5, 14.5])
+
+
+def test_second_opener_is_read_only(store):
+    fill(store, 4)
+    store.flush()
+    reader = TimeSeriesStore(store.root, chunk_rows=8)
+    try:
+        assert store.writable and not reader.writable
+        reader.append("readings", "a", {"rainfall": 99.0})
+        fill(store, 2, start=4)
+        store.flush()
+        # The reader rescans on every query and sees the writer's rows, not its own
+        assert reader.count("readings", "a", 0, 10**12) == 6
+        with pytest.raises(KeyError):
+            reader.range("readings", "missing", 0, 10**12)
+    finally:
+        reader.close()